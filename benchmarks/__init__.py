@@ -0,0 +1,13 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Performance benchmarks for pestifer's Python hot paths.
+
+The unit and integration suites say whether pestifer is right, not whether it got slower.  These
+benchmarks time the pure-Python stages a large build spends its time in -- PSF parsing, ring
+checks, PDB reading, NAMD log and XST parsing, the parameter-coverage check, the athermal conformer
+sampler, membrane gridding, loop closure, solvation, PSF subsetting and trajectory density
+profiles -- on deterministic synthetic inputs of 10k, 100k or 1M atoms
+(:mod:`benchmarks.generators`), with no VMD or NAMD.  Run them from the
+repository root (see ``python -m benchmarks --help``); save a results file per commit and
+``compare`` two of them to flag regressions.
+"""
@@ -0,0 +1,58 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Command line for the benchmarks::
+
+    python -m benchmarks list
+    python -m benchmarks run [-b NAME ...] [-s 10k 100k 1m] [-o results.json]
+    python -m benchmarks compare BASE.json NEW.json [--threshold 0.10]
+
+``compare`` (and ``run --compare BASE.json``) exits 1 if any benchmark regressed.
+"""
+import argparse
+import sys
+
+from . import harness
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Benchmark pestifer's Python hot paths.")
+    sub = parser.add_subparsers(dest='action', required=True)
+    sub.add_parser('list', help='list the benchmarks')
+    p = sub.add_parser('run', help='run benchmarks')
+    p.add_argument('-b', '--benchmark', nargs='+', default=None, metavar='NAME', help='benchmarks to run (default: all)')
+    p.add_argument('-s', '--size', nargs='+', default=['10k'], help='system sizes: 10k, 100k, 1m (default: %(default)s)')
+    p.add_argument('-r', '--repeat', type=int, default=None, help='timed calls per benchmark (default: per benchmark)')
+    p.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory call')
+    p.add_argument('--workdir', default=None, help='keep generated inputs here (default: a temporary directory)')
+    p.add_argument('-o', '--output', default=None, help='write results to this JSON file')
+    p.add_argument('--compare', default=None, metavar='BASE', help='compare against this earlier results file')
+    p.add_argument('--threshold', type=float, default=0.10, help='time regression threshold, as a fraction (default: %(default)s)')
+    p.add_argument('--memory-threshold', type=float, default=0.10, help='peak-memory regression threshold (default: %(default)s)')
+    c = sub.add_parser('compare', help='compare two results files')
+    c.add_argument('base')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=0.10, help='time regression threshold, as a fraction (default: %(default)s)')
+    c.add_argument('--memory-threshold', type=float, default=0.10, help='peak-memory regression threshold (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.action == 'list':
+        from . import suite  # noqa: F401
+        for name, bench in harness.REGISTRY.items():
+            print(f'{name:<28s} {bench.description}')
+        return 0
+    if args.action == 'run':
+        new = harness.run(args.benchmark, args.size, args.repeat, memory=not args.no_memory, workdir=args.workdir)
+        if args.output:
+            harness.save(new, args.output)
+        if not args.compare:
+            return 0
+        base = harness.load(args.compare)
+    else:
+        base, new = harness.load(args.base), harness.load(args.new)
+    rows = harness.compare(base, new, args.threshold, args.memory_threshold)
+    print(harness.format_comparison(rows, base, new))
+    return 1 if any(r['regressed'] for r in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Deterministic synthetic inputs for the benchmarks.
+
+Everything here is generated from a seed, with no VMD, NAMD or CHARMM force field, so a
+benchmark measures the same input on every machine and every commit.  The synthetic system is a
+lattice of ring-bearing ``CHL1`` residues (segtype ``lipid``): each residue is a six-membered ring
+with a six-carbon tail hanging off it, twelve atoms in all, so it exercises the ring finder and
+every bonded-term section of a PSF.  Residues are split into segments of at most 1000, as psfgen
+would split a large membrane.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+RING_TYPE = 'CG2R61'
+TAIL_TYPE = 'CTL2'
+RESNAME = 'CHL1'
+ATOMS_PER_RESIDUE = 12
+RESIDUES_PER_SEGMENT = 1000
+SPACING = 9.0
+""" Lattice spacing between residue origins (Angstrom); wide enough that no two residues touch. """
+
+
+def _template():
+    """One residue: names, types, local coordinates, and its bonds as local index pairs."""
+    names = [f'C{i + 1}' for i in range(ATOMS_PER_RESIDUE)]
+    types = [RING_TYPE] * 6 + [TAIL_TYPE] * 6
+    theta = np.arange(6) * np.pi / 3
+    ring = np.column_stack([1.39 * np.cos(theta), 1.39 * np.sin(theta), np.zeros(6)])
+    tail = np.zeros((6, 3))
+    for i in range(6):    # planar zig-zag up from ring atom C1, which sits at (1.39, 0, 0)
+        tail[i] = (1.39 + (0.0 if i % 2 else 0.85), 0.0, 1.25 * (i + 1))
+    coords = np.vstack([ring, tail])
+    bonds = [(i, (i + 1) % 6) for i in range(6)] + [(0, 6)] + [(6 + i, 7 + i) for i in range(5)]
+    return names, types, coords, bonds
+
+
+def _terms(bonds, n):
+    """Angles, proper dihedrals and one improper of a bond graph on ``n`` atoms (local indices)."""
+    nbr = [[] for _ in range(n)]
+    for a, b in bonds:
+        nbr[a].append(b)
+        nbr[b].append(a)
+    angles = [(i, j, k) for j in range(n) for i in nbr[j] for k in nbr[j] if i < k]
+    dihedrals = []
+    for b, c in bonds:
+        for a in nbr[b]:
+            for d in nbr[c]:
+                if a != c and d != b and a != d:
+                    dihedrals.append((a, b, c, d))
+    impropers = [(0, 1, 5, 6)]
+    return angles, dihedrals, impropers
+
+
+def n_residues(natoms: int) -> int:
+    """Residues in a synthetic system of about ``natoms`` atoms."""
+    return max(1, natoms // ATOMS_PER_RESIDUE)
+
+
+def system_coordinates(natoms: int, seed: int = 0) -> np.ndarray:
+    """``(N, 3)`` coordinates of the synthetic system: the residue template on a cubic lattice,
+    each copy spun about z and jittered."""
+    _, _, local, _ = _template()
+    nres = n_residues(natoms)
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(nres ** (1 / 3)))
+    idx = np.arange(nres)
+    origins = SPACING * np.column_stack([idx % side, (idx // side) % side, idx // side**2]).astype(float)
+    spin = rng.uniform(0, 2 * np.pi, nres)
+    c, s = np.cos(spin), np.sin(spin)
+    x = local[None, :, 0] * c[:, None] - local[None, :, 1] * s[:, None]
+    y = local[None, :, 0] * s[:, None] + local[None, :, 1] * c[:, None]
+    z = np.broadcast_to(local[None, :, 2], x.shape)
+    coords = np.stack([x, y, z], axis=-1) + origins[:, None, :] + rng.normal(0, 0.05, (nres, 1, 3))
+    return coords.reshape(-1, 3)
+
+
+def _segment_of(r: int) -> tuple[str, int]:
+    return f'L{r // RESIDUES_PER_SEGMENT:03d}', r % RESIDUES_PER_SEGMENT + 1
+
+
+def _write_section(f, lines_per_row, rows, label):
+    f.write(f'\n{len(rows):10d} !{label}\n')
+    flat = np.asarray(rows, dtype=np.int64).reshape(-1) if len(rows) else np.empty(0, dtype=np.int64)
+    width = lines_per_row
+    for i in range(0, len(flat), width):
+        f.write(''.join(f'{v:10d}' for v in flat[i:i + width]) + '\n')
+
+
+def write_psf(path: str | Path, natoms: int) -> Path:
+    """Write the synthetic system's PSF (EXT format) to ``path``."""
+    names, types, _, bonds = _template()
+    angles, dihedrals, impropers = _terms(bonds, ATOMS_PER_RESIDUE)
+    nres = n_residues(natoms)
+    offsets = (np.arange(nres) * ATOMS_PER_RESIDUE + 1)[:, None, None]
+    expand = lambda local: (np.asarray(local)[None, :, :] + offsets).reshape(-1, len(local[0]))  # noqa: E731
+    path = Path(path)
+    with open(path, 'w') as f:
+        segnames = sorted({_segment_of(r)[0] for r in range(0, nres, RESIDUES_PER_SEGMENT)})
+        f.write(f'PSF EXT\n\n{1 + len(segnames):10d} !NTITLE\n REMARKS pestifer benchmark synthetic system\n')
+        for segname in segnames:
+            f.write(f' REMARKS segment {segname} {{ first none; last none; auto angles dihedrals }}\n')
+        f.write(f'\n{nres * ATOMS_PER_RESIDUE:10d} !NATOM\n')
+        serial = 0
+        for r in range(nres):
+            seg, resid = _segment_of(r)
+            for name, atype in zip(names, types):
+                serial += 1
+                f.write(f'{serial:10d} {seg:<8s} {resid:<8d} {RESNAME:<8s} {name:<8s} {atype:<6s} '
+                        f'{0.0:10.6f} {12.011:13.4f} {0:11d}\n')
+        _write_section(f, 8, expand(bonds), 'NBOND: bonds')
+        _write_section(f, 9, expand(angles), 'NTHETA: angles')
+        _write_section(f, 8, expand(dihedrals), 'NPHI: dihedrals')
+        _write_section(f, 8, expand(impropers), 'NIMPHI: impropers')
+        f.write('\n         0 !NDON: donors\n\n         0 !NACC: acceptors\n\n         0 !NNB\n\n')
+    return path
+
+
+def write_pdb(path: str | Path, natoms: int, seed: int = 0) -> Path:
+    """Write the synthetic system's coordinates as a PDB matching :func:`write_psf`.  Serials past
+    99999 wrap, as VMD's do."""
+    names, _, _, _ = _template()
+    coords = system_coordinates(natoms, seed)
+    path = Path(path)
+    with open(path, 'w') as f:
+        for i, (x, y, z) in enumerate(coords):
+            r = i // ATOMS_PER_RESIDUE
+            seg, resid = _segment_of(r)
+            name = names[i % ATOMS_PER_RESIDUE]
+            f.write(f'ATOM  {(i + 1) % 100000:5d} {name:<4s} {RESNAME:<4s}A{resid % 10000:4d}    '
+                    f'{x:8.3f}{y:8.3f}{z:8.3f}{1.0:6.2f}{0.0:6.2f}      {seg:<4s}\n')
+        f.write('END\n')
+    return path
+
+
+def parameter_text() -> str:
+    """CHARMM parameter text resolving every term of the synthetic system (dihedrals and the
+    improper through wildcards, as real parameter sets do)."""
+    pairs = [(RING_TYPE, RING_TYPE), (RING_TYPE, TAIL_TYPE), (TAIL_TYPE, TAIL_TYPE)]
+    triples = [(a, b, c) for a in (RING_TYPE, TAIL_TYPE) for b in (RING_TYPE, TAIL_TYPE)
+               for c in (RING_TYPE, TAIL_TYPE)]
+    lines = ['* pestifer benchmark synthetic parameters', '*', '', 'BONDS']
+    lines += [f'{a:<8s}{b:<8s}300.0   1.45' for a, b in pairs]
+    lines += ['', 'ANGLES'] + [f'{a:<8s}{b:<8s}{c:<8s}50.0   110.0' for a, b, c in triples]
+    lines += ['', 'DIHEDRALS'] + [f'X       {a:<8s}{b:<8s}X       0.2000  1   0.00' for a, b in pairs]
+    lines += ['', 'IMPROPER', f'{RING_TYPE:<8s}X       X       {TAIL_TYPE:<8s}120.0   0   0.00']
+    lines += ['', 'NONBONDED nbxmod 5 atom cdiel fshift vatom vdistance vfswitch -',
+              'cutnb 16.0 ctofnb 12.0 ctonnb 10.0 eps 1.0 e14fac 1.0 wmin 1.5',
+              f'{RING_TYPE:<8s}0.0  -0.070   1.9924', f'{TAIL_TYPE:<8s}0.0  -0.056   2.0100', '']
+    return '\n'.join(lines)
+
+
+_ETITLE = ('TS BOND ANGLE DIHED IMPRP ELECT VDW BOUNDARY MISC KINETIC TOTAL TEMP POTENTIAL TOTAL3 '
+           'TEMPAVG PRESSURE GPRESSURE VOLUME PRESSAVG GPRESSAVG').split()
+
+
+def write_namd_log(path: str | Path, nenergy: int, natoms: int = 100000, seed: int = 0,
+                   every: int = 100) -> Path:
+    """Write a NAMD NPT log with ``nenergy`` ``ENERGY:`` records, one every ``every`` steps, with
+    the timing, performance and restart lines NAMD interleaves."""
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    with open(path, 'w') as f:
+        f.write('Info: NAMD 3.0.2 for Linux-x86_64-multicore\n')
+        f.write('Info: STRUCTURE SUMMARY:\n')
+        f.write(f'Info: {natoms} ATOMS\nInfo: {natoms} BONDS\nInfo: {2 * natoms} ANGLES\n')
+        f.write(f'Info: {3 * natoms} DIHEDRALS\nInfo: 0 IMPROPERS\nInfo: *****************************\n')
+        f.write('TCL: Running for {} steps\n'.format(nenergy * every))
+        f.write('ETITLE:' + ''.join(f'{t:>15s}' for t in _ETITLE) + '\n\n')
+        base = np.array([6000, 17000, 19000, 1000, -1.02e6, 8.5e4, 0, 0, 1.8e5, -7.1e5, 298.0,
+                         -8.9e5, -7.1e5, 298.0, -50.0, -10.0, 2.92e6, 0.0, 0.0])
+        noise = rng.normal(0, 1, (nenergy, len(base))) * np.abs(base + 1) * 1e-3
+        for i in range(nenergy):
+            step = (i + 1) * every
+            f.write(f'ENERGY: {step:7d}' + ''.join(f'{v:15.4f}' for v in base + noise[i]) + '\n\n')
+            if step % (10 * every) == 0:
+                f.write(f'TIMING: {step}  CPU: {step * 0.02:.3f}, 0.0216/step  Wall: {step * 0.022:.3f}, '
+                        f'0.0218/step, 0.03 hours remaining, 1680.25 MB of memory in use.\n')
+                f.write(f'PERFORMANCE: {step}  averaging 7.90437 ns/day, 0.0218607 sec/step with '
+                        f'current timing\n')
+            if step % (50 * every) == 0:
+                f.write(f'WRITING COORDINATES TO RESTART FILE AT STEP {step}\n')
+        f.write(f'WallClock: {nenergy * every * 0.022:.3f}  CPUTime: {nenergy * every * 0.02:.3f}  '
+                f'Memory: 1680.25 MB\n')
+    return path
+
+
+def write_loop_environment(path: str | Path, src_pdb: str | Path, natoms: int, seed: int = 0) -> Path:
+    """Copy the ``ATOM`` records of chain A of ``src_pdb`` to ``path`` as segment ``PROA``, and pad
+    them with an inert lattice of carbon atoms (segment ``PAD``), kept 4 A clear of the protein, up
+    to about ``natoms`` atoms.  The padding grows the environment a loop is closed against without
+    touching the loop itself."""
+    from scipy.spatial import cKDTree
+    protein, xyz = [], []
+    with open(src_pdb) as f:
+        for line in f:
+            if line.startswith('ATOM') and line[21] == 'A':
+                protein.append(line.rstrip('\n')[:66].ljust(72) + 'PROA')
+                xyz.append((float(line[30:38]), float(line[38:46]), float(line[46:54])))
+    xyz = np.array(xyz)
+    npad = max(0, natoms - len(protein))
+    rng = np.random.default_rng(seed)
+    side = max(1, int(np.ceil((2 * npad) ** (1 / 3))))
+    grid = np.stack(np.meshgrid(*[np.arange(side)] * 3, indexing='ij'), -1).reshape(-1, 3) * 3.2
+    grid = grid - grid.mean(axis=0) + xyz.mean(axis=0) + rng.normal(0, 0.1, grid.shape)
+    far = cKDTree(xyz).query(grid)[0] > 4.0
+    pad = grid[far][:npad]
+    path = Path(path)
+    with open(path, 'w') as f:
+        for line in protein:
+            f.write(line + '\n')
+        for i, (x, y, z) in enumerate(pad):
+            f.write(f'HETATM{(len(protein) + i + 1) % 100000:5d}  CP  PAD X{(i // 10) % 10000 + 1:4d}    '
+                    f'{x:8.3f}{y:8.3f}{z:8.3f}{1.0:6.2f}{0.0:6.2f}      PAD\n')
+        f.write('END\n')
+    return path
+
+
+def water_box(n: int = 6, seed: int = 0):
+    """A periodic :class:`~pestifer.psfutil.solvation.SolventBox` of ``n**3`` rigid TIP3 waters on a
+    jittered lattice at liquid density (about 0.0334 molecules per cubic Angstrom)."""
+    from pestifer.psfutil.solvation import PSF_ATOM_DTYPE, SolventBox
+    edge = (n ** 3 / 0.0334) ** (1 / 3)
+    g = (np.arange(n) + 0.5) * edge / n - edge / 2
+    O = np.stack(np.meshgrid(g, g, g, indexing='ij'), -1).reshape(-1, 3)
+    O = O + np.random.default_rng(seed).normal(0, 0.2, O.shape)
+    xyz = np.stack([O, O + [0.9572, 0, 0], O + [-0.24, 0.927, 0]], 1).reshape(-1, 3)
+    nmol = len(O)
+    atoms = np.zeros(3 * nmol, dtype=PSF_ATOM_DTYPE)
+    atoms['segname'] = 'QQQ'
+    atoms['resid'] = np.repeat(np.arange(1, nmol + 1).astype(str), 3)
+    atoms['resname'] = 'TIP3'
+    atoms['name'] = np.tile(['OH2', 'H1', 'H2'], nmol)
+    atoms['type'] = np.tile(['OT', 'HT', 'HT'], nmol)
+    atoms['charge'] = np.tile([-0.834, 0.417, 0.417], nmol)
+    atoms['mass'] = np.tile([15.9994, 1.008, 1.008], nmol)
+    offsets = 3 * np.arange(nmol)[:, None, None]
+    terms = {'bonds': (np.array([[0, 1], [0, 2], [1, 2]])[None] + offsets).reshape(-1, 2),
+             'angles': (np.array([[1, 0, 2]])[None] + offsets).reshape(-1, 3),
+             'dihedrals': np.empty((0, 4), dtype=np.int64), 'impropers': np.empty((0, 4), dtype=np.int64)}
+    return SolventBox(atoms, xyz, terms, edge, 'OH2')
+
+
+def alkane_chain_mc(ncarbon: int = 18, cylinder_radius: float = 5.0):
+    """A single extended all-trans chain set up for :func:`~pestifer.charmmff.athermal_mc.run_mc`,
+    as the sampler sees a lipid tail."""
+    import networkx as nx
+    from pestifer.charmmff.athermal_mc import MoleculeMC, RotatableBond, build_exclusions, moving_set
+    half = np.deg2rad(112.0) / 2.0
+    dz, dx = 1.53 * np.sin(half), 1.53 * np.cos(half)
+    coords = np.zeros((ncarbon, 3))
+    for i in range(1, ncarbon):
+        coords[i] = coords[i - 1] + (dx if i % 2 else -dx, 0.0, dz)
+    g = nx.path_graph(ncarbon)
+    rot = [RotatableBond(a=i, b=i + 1, moving=moving_set(g, i, i + 1)) for i in range(1, ncarbon - 1)]
+    return MoleculeMC(coords=coords, radii=np.full(ncarbon, 1.7 * 2.0 ** (-1.0 / 6.0)), rotatable=rot,
+                      exclusions=build_exclusions(g, order=2), cylinder_radius=cylinder_radius)
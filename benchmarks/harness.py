@@ -0,0 +1,225 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Running benchmarks, storing their results, and comparing two result files.
+
+A benchmark is a *setup* function registered with :func:`benchmark`.  Given a size and a scratch
+directory, the setup generates (or reuses) its inputs and returns the callable to time, so input
+generation is never part of a measurement.  Each callable is timed ``repeat`` times; the minimum
+is the figure compared across commits, since noise only ever adds time.  One further call runs
+under :mod:`tracemalloc` for the peak memory the hot path allocated (NumPy reports its buffers to
+tracemalloc, so arrays count).
+"""
+from __future__ import annotations
+
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+RESULTS_FORMAT = 1
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+""" Named system sizes, in atoms (or the benchmark's own unit; see its description). """
+
+
+class Unavailable(Exception):
+    """Raised by a setup whose inputs cannot be had here (e.g. no CHARMM force field); the
+    benchmark is reported as skipped."""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable
+    description: str = ''
+    sizes: tuple = tuple(SIZES)
+    repeat: int = 3
+
+
+REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, sizes: tuple = tuple(SIZES), repeat: int = 3):
+    """Register ``setup(natoms, workdir) -> callable`` as the benchmark ``name``; its docstring's
+    first line is the description."""
+    def decorator(setup):
+        doc = (setup.__doc__ or '').strip().splitlines()
+        REGISTRY[name] = Benchmark(name, setup, doc[0] if doc else '', tuple(sizes), repeat)
+        return setup
+    return decorator
+
+
+def parse_size(label: str) -> int:
+    """``'10k'`` -> 10000, ``'1m'`` -> 1000000, ``'2500'`` -> 2500."""
+    label = label.strip().lower()
+    if label in SIZES:
+        return SIZES[label]
+    scale = {'k': 1_000, 'm': 1_000_000}.get(label[-1:], 1)
+    return int(float(label.rstrip('km')) * scale)
+
+
+def _git_commit() -> str | None:
+    try:
+        p = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=10)
+        return p.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _meta() -> dict:
+    import numpy
+    from pestifer.util.stringthings import __pestifer_version__
+    return dict(date=datetime.datetime.now().isoformat(timespec='seconds'), commit=_git_commit(),
+                pestifer=__pestifer_version__, python=platform.python_version(),
+                numpy=numpy.__version__, machine=platform.machine(), platform=platform.platform(),
+                cpus=os.cpu_count())
+
+
+@dataclass
+class Measurement:
+    times_s: list = field(default_factory=list)
+    peak_mb: float | None = None
+    skipped: str | None = None
+
+    def as_dict(self) -> dict:
+        if self.skipped:
+            return dict(skipped=self.skipped)
+        return dict(min_s=min(self.times_s), median_s=sorted(self.times_s)[len(self.times_s) // 2],
+                    times_s=self.times_s, peak_mb=self.peak_mb)
+
+
+def measure(fn: Callable, repeat: int = 3, memory: bool = True) -> Measurement:
+    """Time ``fn`` ``repeat`` times, then (if ``memory``) once more under tracemalloc."""
+    m = Measurement()
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        m.times_s.append(time.perf_counter() - t0)
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            m.peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+        finally:
+            tracemalloc.stop()
+    return m
+
+
+def run(names=None, sizes=None, repeat=None, memory=True, workdir=None, out=print) -> dict:
+    """
+    Run the named benchmarks (default: all) at the named sizes (default: ``10k``).
+
+    Inputs are generated under ``workdir`` (a temporary directory by default) and reused across
+    benchmarks of the same size.  Returns the results as a plain dict (see :func:`save`).
+    """
+    from . import suite  # noqa: F401  (registers the benchmarks)
+    names = list(names or REGISTRY)
+    unknown = [n for n in names if n not in REGISTRY]
+    if unknown:
+        raise KeyError(f'unknown benchmark(s): {", ".join(unknown)}; known: {", ".join(REGISTRY)}')
+    sizes = list(sizes or ['10k'])
+    results = {}
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix='pestifer-bench-')
+        workdir = tmp.name
+    cwd = os.getcwd()
+    try:
+        for name in names:
+            bench = REGISTRY[name]
+            for size in sizes:
+                if size not in bench.sizes:
+                    continue
+                d = Path(workdir) / size
+                d.mkdir(parents=True, exist_ok=True)
+                os.chdir(d)
+                try:
+                    fn = bench.setup(parse_size(size), d)
+                    m = measure(fn, repeat or bench.repeat, memory)
+                except Unavailable as e:
+                    m = Measurement(skipped=str(e))
+                finally:
+                    os.chdir(cwd)
+                results.setdefault(name, {})[size] = m.as_dict()
+                out(_row(name, size, results[name][size]))
+    finally:
+        os.chdir(cwd)
+        if tmp is not None:
+            tmp.cleanup()
+    return dict(format=RESULTS_FORMAT, meta=_meta(), results=results)
+
+
+def _row(name, size, r) -> str:
+    if 'skipped' in r:
+        return f'{name:<28s} {size:>5s}  skipped: {r["skipped"]}'
+    mem = f'{r["peak_mb"]:9.1f} MB' if r.get('peak_mb') is not None else ''
+    return f'{name:<28s} {size:>5s}  {r["min_s"]:10.4f} s  (median {r["median_s"]:.4f} s) {mem}'
+
+
+def save(results: dict, path: str | Path) -> Path:
+    path = Path(path)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+    return path
+
+
+def load(path: str | Path) -> dict:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get('format') != RESULTS_FORMAT:
+        raise ValueError(f'{path} is not a pestifer benchmark results file (format {RESULTS_FORMAT})')
+    return results
+
+
+def compare(base: dict, new: dict, time_threshold: float = 0.10, memory_threshold: float = 0.10) -> list[dict]:
+    """
+    Compare two results.  A benchmark regresses when its minimum time grows by more than
+    ``time_threshold`` (a fraction), or its peak memory by more than ``memory_threshold``.
+
+    Returns one row per benchmark and size the two results share: ``name``, ``size``, the
+    ``time_ratio`` and ``memory_ratio`` (new/base; None where either is missing) and ``regressed``.
+    """
+    rows = []
+    for name, by_size in new['results'].items():
+        for size, r in by_size.items():
+            b = base['results'].get(name, {}).get(size)
+            if b is None or 'skipped' in b or 'skipped' in r:
+                continue
+            time_ratio = r['min_s'] / b['min_s'] if b['min_s'] > 0 else None
+            memory_ratio = (r['peak_mb'] / b['peak_mb']
+                            if r.get('peak_mb') is not None and b.get('peak_mb') else None)
+            regressed = []
+            if time_ratio is not None and time_ratio > 1 + time_threshold:
+                regressed.append('time')
+            if memory_ratio is not None and memory_ratio > 1 + memory_threshold:
+                regressed.append('memory')
+            rows.append(dict(name=name, size=size, base_s=b['min_s'], new_s=r['min_s'],
+                             time_ratio=time_ratio, memory_ratio=memory_ratio, regressed=regressed))
+    return rows
+
+
+def format_comparison(rows: list[dict], base: dict, new: dict) -> str:
+    lines = [f'base: {base["meta"].get("commit")} ({base["meta"].get("date")})',
+             f'new:  {new["meta"].get("commit")} ({new["meta"].get("date")})', '']
+    for r in rows:
+        tr = f'{r["time_ratio"]:6.2f}x' if r['time_ratio'] is not None else '     --'
+        mr = f'{r["memory_ratio"]:6.2f}x' if r['memory_ratio'] is not None else '     --'
+        flag = '  REGRESSION (' + ', '.join(r['regressed']) + ')' if r['regressed'] else ''
+        lines.append(f'{r["name"]:<28s} {r["size"]:>5s}  {r["base_s"]:9.4f} s -> {r["new_s"]:9.4f} s'
+                     f'  time {tr}  memory {mr}{flag}')
+    nreg = sum(1 for r in rows if r['regressed'])
+    lines += ['', f'{nreg} regression(s) in {len(rows)} comparison(s)']
+    return '\n'.join(lines)
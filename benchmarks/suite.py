@@ -0,0 +1,188 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+The benchmarked hot paths.  Each setup builds its inputs and returns the call to time.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+from . import generators
+from .harness import Unavailable, benchmark
+
+BPTI = Path(__file__).resolve().parents[1] / 'tests' / 'inputs' / '6pti.pdb'
+
+
+def _synthetic(natoms: int, workdir: Path) -> tuple[str, str]:
+    """The synthetic system's PSF and PDB in ``workdir``, written on first use."""
+    psf, pdb = workdir / 'synthetic.psf', workdir / 'synthetic.pdb'
+    if not psf.exists():
+        generators.write_psf(psf, natoms)
+    if not pdb.exists():
+        generators.write_pdb(pdb, natoms)
+    return str(psf), str(pdb)
+
+
+@benchmark('psf_parse')
+def psf_parse(natoms, workdir):
+    """PSFContents: parse a PSF, with its bonds, as the ring checker does."""
+    from pestifer.psfutil.psfcontents import PSFContents
+    psf, _ = _synthetic(natoms, workdir)
+    return lambda: PSFContents(psf, parse_topology=['bonds'], topology_segtypes=['lipid'])
+
+
+@benchmark('coorddf_from_pdb')
+def coorddf(natoms, workdir):
+    """coorddf_from_pdb: read a PDB into a coordinate DataFrame."""
+    from pestifer.util.coord import coorddf_from_pdb
+    _, pdb = _synthetic(natoms, workdir)
+    return lambda: coorddf_from_pdb(pdb)
+
+
+@benchmark('ring_checker_init')
+def ring_checker_init(natoms, workdir):
+    """RingChecker(): parse the topology and find every ring."""
+    from pestifer.psfutil.psfring import RingChecker
+    psf, _ = _synthetic(natoms, workdir)
+    return lambda: RingChecker(psf, segtypes=['lipid'])
+
+
+@benchmark('ring_check')
+def ring_check(natoms, workdir):
+    """RingChecker.check: scan one whole frame for pierced rings."""
+    from pestifer.psfutil.psfring import RingChecker
+    psf, pdb = _synthetic(natoms, workdir)
+    checker = RingChecker(psf, segtypes=['lipid'])
+    return lambda: checker.check(pdb)
+
+
+@benchmark('namd_log_parse')
+def namd_log_parse(natoms, workdir):
+    """NAMDLogParser.static: parse a NAMD log of natoms/10 energy records."""
+    from pestifer.logparsers import NAMDLogParser
+    log = workdir / 'synthetic-namd.log'
+    if not log.exists():
+        generators.write_namd_log(log, max(1, natoms // 10), natoms=natoms)
+    return lambda: NAMDLogParser().static(str(log))
+
+
+@benchmark('check_psf_parameters')
+def psf_parameters(natoms, workdir):
+    """check_psf_parameters: resolve every bonded term of a parsed PSF against a parameter set."""
+    from pestifer.charmmff.charmmffprm import CharmmParamFile
+    from pestifer.charmmff.psf_param_check import check_psf_parameters
+    from pestifer.psfutil.psfcontents import PSFContents
+    psf, _ = _synthetic(natoms, workdir)
+    contents = PSFContents(psf)
+    param = CharmmParamFile.from_text(generators.parameter_text())
+    return lambda: check_psf_parameters(contents, param)
+
+
+@benchmark('run_mc')
+def athermal_mc(natoms, workdir):
+    """run_mc: natoms/10 athermal pivot proposals on an 18-carbon chain."""
+    from pestifer.charmmff.athermal_mc import run_mc
+    mol = generators.alkane_chain_mc()
+    proposals = max(1, natoms // 10)
+    return lambda: run_mc(mol, nsamples=1, n_equil=proposals, n_decorr=1, seed=0)
+
+
+@benchmark('bilayer_write_grid_pdb')
+def bilayer_grid(natoms, workdir):
+    """Bilayer.write_grid_pdb: grid a POPC patch of about natoms atoms (needs the CHARMM force field)."""
+    from pestifer.core.config import Config
+    from pestifer.core.errors import PestiferError
+    from pestifer.molecule.bilayer import Bilayer, specstrings_builddict
+    try:
+        content = Config().configure_new().RM.charmmff_content
+    except (FileNotFoundError, PestiferError) as e:
+        raise Unavailable(f'no CHARMM force field here ({e.__class__.__name__}: {e})')
+    cdict = specstrings_builddict(lipid_specstring='POPC', lipid_ratio_specstring='1',
+                                  lipid_conformers_specstring='0')
+    nlipids = max(4, natoms // 500)      # ~134 lipid atoms plus ~120 water atoms per lipid, per leaflet
+    bilayer = Bilayer(composition_dict=cdict, leaflet_nlipids=dict(upper=nlipids, lower=nlipids),
+                      charmmffcontent=content)
+    bilayer.spec_out(SAPL=64.0)
+    return lambda: bilayer.write_grid_pdb(str(workdir / 'grid.pdb'), seed=1)
+
+
+@benchmark('close_one_loop', repeat=1)
+def loop_closure(natoms, workdir):
+    """loop_ccd.close_one_loop: close BPTI loop 12-17 against an environment of about natoms atoms."""
+    from pestifer.psfutil.loop_ccd import close_one_loop, loop_atoms_from_pdb
+    src = workdir / 'bpti-env.pdb'
+    if not src.exists():
+        generators.write_loop_environment(src, BPTI, natoms)
+    loop = [12, 13, 14, 15, 16, 17]
+    _, _, serials = loop_atoms_from_pdb(str(src), loop, segname='PROA')
+    return lambda: close_one_loop(str(src), 'PROA', loop, 11, 18, serials, seed=0, ensemble=2, refine=50)
+
+
+@benchmark('solvate_python')
+def solvate_python(natoms, workdir):
+    """solvation: tile, carve and ionize a water box around BPTI to about natoms atoms, and write the fragments."""
+    import numpy as np
+    from pestifer.psfutil import solvation
+    from pestifer.psfutil.loop_ccd import heavy_env_mask, pdb_atoms
+    box = generators.water_box()
+    solute = pdb_atoms(str(BPTI))
+    heavy = solute['xyz'][heavy_env_mask(solute)]
+    center = heavy.mean(axis=0)
+    half = 0.5 * (natoms / 0.1) ** (1 / 3)       # TIP3 water is about 0.1 atoms per cubic Angstrom
+    nions = max(2, natoms // 3000)
+
+    def run():
+        molecules = box.fill(center - half, center + half)
+        molecules = molecules[~solvation.overlapping(molecules, heavy)]
+        sites = solvation.choose_ion_sites(box.keys(molecules), nions, heavy, rng=0)
+        resnames = ['SOD', 'CLA'] * (nions // 2) + ['SOD'] * (nions % 2)
+        solvation.write_ion_fragment(str(workdir / 'ions'), resnames, box.keys(molecules[sites]),
+                                     {'SOD': ('SOD', 'SOD', 1.0, 22.98977), 'CLA': ('CLA', 'CLA', -1.0, 35.45)})
+        solvation.write_solvent_fragment(str(workdir / 'solvent'), box, np.delete(molecules, sites, axis=0))
+    return run
+
+
+@benchmark('psf_subset')
+def psf_subset(natoms, workdir):
+    """PSFArrays: drop every other segment of a PSF/PDB pair, then write the subset."""
+    import numpy as np
+    from pestifer.psfutil.psfarrays import PSFArrays
+    psf, pdb = _synthetic(natoms, workdir)
+    system = PSFArrays.from_files(psf, pdb)
+    segnames = system.segnames()
+    keep = np.isin(system.atoms['segname'], segnames[::2])
+    return lambda: system.subset(keep).write(str(workdir / 'subset'))
+
+
+@benchmark('density_profile_dcd')
+def density_profile_dcd(natoms, workdir):
+    """DensityProfile.trajectory: block-averaged species profiles over a 10-frame DCD."""
+    import numpy as np
+    from pestifer.util.dcdfile import write_dcd
+    from pestifer.util.densityprofile import DensityProfile
+    psf, _ = _synthetic(natoms, workdir)
+    dcd = workdir / 'synthetic.dcd'
+    if not dcd.exists():
+        xyz = generators.system_coordinates(natoms)
+        rng = np.random.default_rng(0)
+        frames = xyz[None] + rng.normal(0, 0.5, (10, 1, 3))
+        edge = xyz.max(axis=0) - xyz.min(axis=0) + generators.SPACING
+        write_dcd(dcd, frames, np.tile([edge[0], 0, edge[1], 0, 0, edge[2]], (10, 1)))
+    profile = DensityProfile(psf)
+    return lambda: profile.trajectory(str(dcd), dz=1.0, nblocks=5)
+
+
+@benchmark('xst_parse')
+def xst_parse(natoms, workdir):
+    """XSTFile: read a .xst of natoms/10 lines and compute the cell volumes."""
+    import numpy as np
+    from pestifer.util.xstfile import XSTFile
+    xst = workdir / 'synthetic.xst'
+    if not xst.exists():
+        nrows = max(2, natoms // 10)
+        cells = np.tile([80.0, 0, 0, 0, 80.0, 0, 0, 0, 100.0], (nrows, 1))
+        cells += np.random.default_rng(0).normal(0, 0.1, cells.shape)
+        rows = np.column_stack([100 * np.arange(nrows), cells, np.zeros((nrows, 3))])
+        np.savetxt(xst, rows, fmt=['%d'] + ['%.6f'] * 12,
+                   header='NAMD extended system trajectory file\n$LABELS step a_x a_y a_z b_x b_y b_z '
+                          'c_x c_y c_z o_x o_y o_z')
+    return lambda: XSTFile(str(xst)).read().volumes()
@@ -5,6 +5,7 @@ This module defines classes that facilitate the handling of CHARMM force field c
 import logging
 import os
 import re
+import threading
 
 from pathlib import Path
 
@@ -19,6 +20,8 @@ from ..util.stringthings import my_logger
 
 logger = logging.getLogger(__name__)
 
+_local_copy_lock = threading.Lock()
+
 def charmmff_version_key(version_str: str) -> str:
     """ Parse a CHARMMFF version string in the format 'MonthYEAR' and return the version key (e.g. 'jul24', 'feb26'). """
     match = re.match(r'([A-Za-z]+)(\d{4})', version_str)
@@ -584,6 +587,10 @@ class CHARMMFFContent(CacheableObject):
         If the file is found in the tarball or any custom directory, it extracts it and writes it to the local directory, filtering out CHARMM commands that give NAMD trouble.
         If the file is not found in either location, it logs a warning.
 
+        Tasks running concurrently in one directory (e.g. the calibration-patch equilibrations of
+        an asymmetric membrane) may ask for the same file at once, so copies are made one at a time
+        and each file appears under its name only once it is complete.
+
         Parameters
         ----------
         basename : str
@@ -594,6 +601,10 @@ class CHARMMFFContent(CacheableObject):
         str
             The basename of the copied file in the local directory.
         """
+        with _local_copy_lock:
+            return self._copy_charmmfile_local(basename)
+
+    def _copy_charmmfile_local(self, basename: str) -> str:
         # When copying a parameter file into a NAMD run directory, lines that begin with these keywords are removed
         comment_these_out = ['set', 'if', 'WRNLEV', 'BOMLEV', 'return', 'endif']
 
@@ -610,14 +621,6 @@ class CHARMMFFContent(CacheableObject):
             with open(self.filenamemap[ext][basename]) as file:  # custom files are not part of the cache?
                 lines = file.read().splitlines()
                 # logger.debug(f'found {len(lines)} lines in {basename} in custom files')
-                with open(basename, 'w') as f:
-                    for l in lines:  # l will contain the newline character
-                        is_comment = any([l.startswith(x) for x in comment_these_out])
-                        if not is_comment:
-                            f.write(l + '\n')
-                        else:
-                            f.write('! commented out by pestifer:\n')
-                            f.write(f'! {l}' + '\n')
         elif basename in self.filenamemap[ext]:
             logger.debug(f'found {basename} in at {self.filenamemap[ext][basename]} in tarball')
             stem, dum = os.path.splitext(basename)
@@ -637,16 +640,19 @@ class CHARMMFFContent(CacheableObject):
             lines = content.splitlines()
             # logger.debug(f'type of lines is {type(lines)}')
             # logger.debug(f'found {len(lines)} lines in {basename} in tarfile')
-            with open(basename, 'w') as f:
-                for l in lines:  # l will NOT contain the newline character
-                    is_comment = any([l.startswith(x) for x in comment_these_out])
-                    if not is_comment:
-                        f.write(l + '\n')
-                    else:
-                        f.write('! commented out by pestifer:\n')
-                        f.write(f'! {l}\n')
         else:
             logger.warning(f'copy_charmmfile_local: {basename} not found in charmmff')
+            return basename
+        tmp = f'.{basename}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            for l in lines:  # l will NOT contain the newline character
+                is_comment = any([l.startswith(x) for x in comment_these_out])
+                if not is_comment:
+                    f.write(l + '\n')
+                else:
+                    f.write('! commented out by pestifer:\n')
+                    f.write(f'! {l}\n')
+        os.replace(tmp, basename)
         return basename
 
     def add_custom_directory(self, user_custom_directory: str | Path):
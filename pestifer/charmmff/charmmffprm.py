@@ -22,12 +22,27 @@ Usage example::
     atom_types = {'C', 'NH1', 'CT1', ...}   # from PSF
     minimal = combined.extract_for_atomtypes(atom_types)
     minimal.write('my_system_minimal.prm')
+
+Parsing is memoized by file content: :meth:`CharmmParamFile.from_file` and
+:meth:`CharmmParamFile.from_files` consult a :class:`ParamParseCache` keyed by the
+SHA-256 of each file's bytes, which holds the parsed records as pickled plain tuples
+(in memory for the life of the process, and on disk under the per-user cache
+directory).  The same stream files are consolidated by several tasks of one build and
+by every build thereafter, so after the first parse each costs a hash and an unpickle.
+:meth:`~CharmmParamFile.from_files` parses cold-cache misses in a process pool.
 """
 
+import hashlib
 import logging
+import os
+import pickle
 import re
+import tempfile
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from pathlib import Path
+from platformdirs import user_cache_dir
 
 logger = logging.getLogger(__name__)
 
@@ -165,11 +180,93 @@ class CharmmParamFile:
     # ------------------------------------------------------------------
 
     @classmethod
-    def from_file(cls, filename: str) -> 'CharmmParamFile':
-        """Parse a CHARMM parameter file (or stream file) from disk."""
-        with open(filename, 'r') as f:
-            text = f.read()
-        return cls.from_text(text)
+    def from_file(cls, filename: str, cache: 'ParamParseCache | None' = None) -> 'CharmmParamFile':
+        """Parse a CHARMM parameter file (or stream file) from disk.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the ``.prm`` or ``.str`` file.
+        cache : ParamParseCache, optional
+            The parse cache to consult; defaults to :func:`default_parse_cache`.
+        """
+        cache = cache or default_parse_cache()
+        with open(filename, 'rb') as f:
+            raw = f.read()
+        key = cache.key(raw)
+        payload = cache.get(key)
+        if payload is None:
+            payload = _parse_payload(raw)
+            cache.put(key, payload)
+        return cls._from_payload(payload)
+
+    @classmethod
+    def from_files(cls, filenames: list[str], cache: 'ParamParseCache | None' = None,
+                   processes: int | None = None) -> list['CharmmParamFile | Exception']:
+        """Parse several parameter/stream files, in order.
+
+        Every file is looked up in the parse cache first; the misses are parsed in a
+        process pool when there are several of them and enough text to repay the pool's
+        startup (and ``processes`` is not 1), otherwise in this process, and are then
+        added to the cache.
+
+        Parameters
+        ----------
+        filenames : list of str
+            Paths of the files to parse.
+        cache : ParamParseCache, optional
+            The parse cache to consult; defaults to :func:`default_parse_cache`.
+        processes : int, optional
+            Maximum number of worker processes for cache misses; defaults to the CPU count.
+
+        Returns
+        -------
+        list
+            One entry per filename: the parsed :class:`CharmmParamFile`, or the exception
+            raised while reading or parsing that file, so a caller can report and skip it.
+        """
+        cache = cache or default_parse_cache()
+        results: list = [None] * len(filenames)
+        misses: dict[str, tuple[bytes, list[int]]] = {}
+        for i, fname in enumerate(filenames):
+            try:
+                with open(fname, 'rb') as f:
+                    raw = f.read()
+            except OSError as exc:
+                results[i] = exc
+                continue
+            key = cache.key(raw)
+            payload = cache.get(key)
+            if payload is not None:
+                results[i] = cls._from_payload(payload)
+            else:
+                misses.setdefault(key, (raw, []))[1].append(i)
+        if misses:
+            keys = list(misses)
+            nworkers = min(len(keys), processes or os.cpu_count() or 1)
+            if nworkers > 1 and sum(len(misses[k][0]) for k in keys) >= _POOL_MIN_BYTES:
+                logger.debug(f'Parsing {len(keys)} uncached parameter files in {nworkers} processes')
+                with ProcessPoolExecutor(max_workers=nworkers) as ex:
+                    futures = [ex.submit(_parse_payload, misses[k][0]) for k in keys]
+                    outcomes = []
+                    for fut in futures:
+                        try:
+                            outcomes.append(fut.result())
+                        except Exception as exc:
+                            outcomes.append(exc)
+            else:
+                outcomes = []
+                for k in keys:
+                    try:
+                        outcomes.append(_parse_payload(misses[k][0]))
+                    except Exception as exc:
+                        outcomes.append(exc)
+            for k, outcome in zip(keys, outcomes):
+                if not isinstance(outcome, Exception):
+                    cache.put(k, outcome)
+                for i in misses[k][1]:
+                    results[i] = outcome if isinstance(outcome, Exception) else cls._from_payload(outcome)
+        return results
 
     @classmethod
     def from_text(cls, text: str) -> 'CharmmParamFile':
@@ -184,6 +281,28 @@ class CharmmParamFile:
             obj._parse_param_section(section_text)
         return obj
 
+    # ------------------------------------------------------------------
+    # Compact (cacheable) form
+    # ------------------------------------------------------------------
+
+    def _to_payload(self) -> dict:
+        """Return this instance's records as plain tuples (see :class:`ParamParseCache`)."""
+        payload = {name: [tuple(r.__dict__.values()) for r in getattr(self, name)]
+                   for name in _PAYLOAD_LISTS}
+        payload['nonbonded'] = [tuple(r.__dict__.values()) for r in self.nonbonded.values()]
+        payload['nonbonded_header'] = self.nonbonded_header
+        return payload
+
+    @classmethod
+    def _from_payload(cls, payload: dict) -> 'CharmmParamFile':
+        """Rebuild an instance (with fresh record objects) from :meth:`_to_payload` output."""
+        obj = cls()
+        for name, record_cls in _PAYLOAD_LISTS.items():
+            setattr(obj, name, [record_cls(*t) for t in payload[name]])
+        obj.nonbonded = {t[0]: CharmmNonbondedParam(*t) for t in payload['nonbonded']}
+        obj.nonbonded_header = payload['nonbonded_header']
+        return obj
+
     # ------------------------------------------------------------------
     # Internal parsing helpers
     # ------------------------------------------------------------------
@@ -624,3 +743,110 @@ class CharmmParamFile:
             f'nonbonded={len(self.nonbonded)}, nbfix={len(self.nbfix)}, '
             f'cmap={len(self.cmaps)}'
         )
+
+
+_POOL_MIN_BYTES = 1 << 20
+"""Total size of uncached files below which :meth:`CharmmParamFile.from_files` parses serially."""
+
+_PAYLOAD_LISTS = {
+    'bonds': CharmmBondParam,
+    'angles': CharmmAngleParam,
+    'dihedrals': CharmmDihedralParam,
+    'impropers': CharmmImproperParam,
+    'nbfix': CharmmNBFixParam,
+    'cmaps': CharmmCMAPParam,
+}
+
+
+def _parse_payload(raw: bytes) -> dict:
+    """Parse the raw bytes of a parameter file into its compact payload (process-pool entry point)."""
+    return CharmmParamFile.from_text(raw.decode('utf-8', errors='replace'))._to_payload()
+
+
+# ---------------------------------------------------------------------------
+# Parse cache
+# ---------------------------------------------------------------------------
+
+class ParamParseCache:
+    """
+    Content-addressed cache of parsed CHARMM parameter files.
+
+    Entries are keyed by the SHA-256 of a file's bytes (plus :attr:`FORMAT`), so a
+    renamed or re-staged copy of a file hits, and an edited file misses.  Each entry
+    is the parsed records as plain tuples, pickled; they are held in memory for the
+    life of the process and written to ``directory`` (atomically, so concurrent
+    builds never see a partial entry).  A damaged or unreadable on-disk entry is
+    treated as a miss.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Where entries are persisted; ``None`` keeps the cache in memory only.
+    """
+
+    FORMAT = 1
+    """Bump whenever the parser or the record dataclasses change, so stale entries miss."""
+
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory) if directory is not None else None
+        self._memory: dict[str, dict] = {}
+
+    def key(self, raw: bytes) -> str:
+        """The cache key for a file whose content is *raw*."""
+        return hashlib.sha256(raw).hexdigest() + f'-f{self.FORMAT}'
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.pkl'
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached payload for *key*, or ``None`` on a miss."""
+        payload = self._memory.get(key)
+        if payload is None and self.directory is not None:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    payload = pickle.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception as exc:
+                logger.debug(f'Ignoring unreadable parameter-cache entry {key}: {exc}')
+                return None
+            self._memory[key] = payload
+        return payload
+
+    def put(self, key: str, payload: dict) -> None:
+        """Store *payload* under *key*."""
+        self._memory[key] = payload
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.directory), suffix='.pkl.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError as exc:
+            logger.debug(f'Could not persist parameter-cache entry {key}: {exc}')
+
+    def clear(self) -> list[Path]:
+        """Forget every entry; return the on-disk entry files removed."""
+        self._memory.clear()
+        removed = []
+        if self.directory is not None and self.directory.is_dir():
+            for f in self.directory.glob('*.pkl'):
+                try:
+                    f.unlink()
+                    removed.append(f)
+                except OSError:
+                    pass
+        return removed
+
+
+_default_cache: ParamParseCache | None = None
+
+
+def default_parse_cache() -> ParamParseCache:
+    """The process-wide :class:`ParamParseCache`, persisted under the per-user cache directory."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParamParseCache(Path(user_cache_dir('pestifer')) / 'charmmprm')
+    return _default_cache
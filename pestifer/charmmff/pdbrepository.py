@@ -1,28 +1,42 @@
 # Author: Cameron F. Abrams, <cfa22@drexel.edu>
 """ 
 Defines the PDBInput class for representing PDB files used as inputs for grid-packed membrane building.
-Defines the PDBCollection class for managing the collection of said PDBs.
+Defines the PDBCollection class for managing the collection of said PDBs, and the
+PDBCollectionIndex class holding a collection's per-entry metadata.
 """
 from collections import UserDict
+from collections.abc import Mapping
 
 # Suffix marking a residue's liquid-ordered conformer ensemble in a PDB collection, and the
 # markers used to fold it onto the residue's own listing entry.
 _LO_SUFFIX = '__Lo'
 _LO_BOTH_MARK = '*'
 _LO_ONLY_MARK = '^'
+import hashlib
+import json
 import os
 import logging
+import shutil
+import tarfile
+import tempfile
 from pathlib import Path
 from typing import Callable
 import yaml
 from dataclasses import dataclass, field
-from ..util.cacheable_object import TarBytesFS, CacheableObject
+from filelock import FileLock
+from platformdirs import user_cache_dir
+from ..util.cacheable_object import CacheableObject
 from ..util.util import countTime
 from ..util.spinner_wrapper import with_spinner
 from ..util.stringthings import my_logger, plu 
 
 logger = logging.getLogger(__name__)
 
+def _z_extent(text: str) -> float:
+    """Coordinate z-span (``max_z - min_z``) of the atoms in PDB text; 0.0 if there are none."""
+    zs = [float(ln[46:54]) for ln in text.splitlines() if ln.startswith(('ATOM', 'HETATM'))]
+    return (max(zs) - min(zs)) if zs else 0.0
+
 @dataclass
 class PDBInput:
     """ 
@@ -38,6 +52,8 @@ class PDBInput:
     """ A dictionary containing optional tags for the residue. """
     psf_content: str = ''
     """ The PSF contents of a pre-equilibrated solvent box (``kind: box`` entries only; empty for ``molecule`` entries). """
+    z_extents: list = field(default_factory=list)
+    """ Per-conformer coordinate z-spans recorded in the collection index; empty if not indexed (then computed from the coordinates). """
 
     def is_box(self) -> bool:
         """True if this is a pre-equilibrated solvent *box* entry (``kind: box``) rather
@@ -171,13 +187,14 @@ class PDBInput:
 
     def get_z_extent(self, conformerID: int = 0) -> float:
         """Coordinate z-span (``max_z - min_z``) of one conformer -- see :meth:`get_max_z_extent`."""
+        if 0 <= conformerID < len(self.z_extents):
+            return self.z_extents[conformerID]
         text = self.pdbcontents.get(conformerID)
         if text is None and conformerID == 0 and self.pdbcontents:
             text = next(iter(self.pdbcontents.values()))   # solo entry keyed '0'/0
         if text is None:
             return 0.0
-        zs = [float(ln[46:54]) for ln in text.splitlines() if ln.startswith(('ATOM', 'HETATM'))]
-        return (max(zs) - min(zs)) if zs else 0.0
+        return _z_extent(text)
 
     def get_max_z_extent(self) -> float:
         """The largest coordinate z-span (``max_z - min_z``) over all conformers.
@@ -190,13 +207,9 @@ class PDBInput:
         max over conformers covers the packer's per-lipid draw across the ensemble.  Returns 0.0 if
         there are no coordinates.
         """
-        best = 0.0
-        for text in self.pdbcontents.values():
-            zs = [float(ln[46:54]) for ln in text.splitlines()
-                  if ln.startswith(('ATOM', 'HETATM'))]
-            if zs:
-                best = max(best, max(zs) - min(zs))
-        return best
+        if self.z_extents:
+            return max(self.z_extents)
+        return max((_z_extent(text) for text in self.pdbcontents.values()), default=0.0)
 
     def get_head_tail_length(self, conformerID: int = 0):
         """
@@ -255,6 +268,214 @@ class PDBInputDict(UserDict[str, PDBInput]):
     """ A dictionary mapping residue names to their corresponding PDBInput objects. """
     pass
 
+class _ConformerTexts(Mapping):
+    """ Conformer ID -> PDB text for one indexed entry, read from the collection on first access and memoized. """
+
+    def __init__(self, index: 'PDBCollectionIndex', files: list[str]):
+        self._index = index
+        self._files = list(files)
+        self._texts: dict[int, str] = {}
+
+    def __getitem__(self, conformerID: int) -> str:
+        if not isinstance(conformerID, int) or not 0 <= conformerID < len(self._files):
+            raise KeyError(conformerID)
+        if conformerID not in self._texts:
+            self._texts[conformerID] = self._index.read(self._files[conformerID])
+        return self._texts[conformerID]
+
+    def __iter__(self):
+        return iter(range(len(self._files)))
+
+    def __len__(self):
+        return len(self._files)
+
+class _LazyPDBInputDict(PDBInputDict):
+    """ A :class:`PDBInputDict` whose entries are checked out of a :class:`PDBCollectionIndex` on first access. """
+
+    def __init__(self, index: 'PDBCollectionIndex', names: list[str]):
+        super().__init__()
+        self.index = index
+        self.names = list(names)
+        self._names = set(self.names)
+
+    def __contains__(self, resname) -> bool:
+        return resname in self.data or resname in self._names
+
+    def __missing__(self, resname: str) -> PDBInput:
+        if resname not in self._names:
+            raise KeyError(resname)
+        self.data[resname] = self.index.checkout(resname)
+        return self.data[resname]
+
+    def __iter__(self):
+        return iter(self.names + [k for k in self.data if k not in self._names])
+
+    def __len__(self):
+        return len(self._names | set(self.data))
+
+class PDBCollectionIndex:
+    """
+    The per-entry metadata of one PDB collection, cached so that opening the collection does not
+    touch its entry files.
+
+    Each entry is one compact row -- ``kind``, ``is_box``, ``n_conformers``, ``z_extents``,
+    ``charge``, ``head_tail_lengths`` -- plus its ``info.yaml`` contents and the paths of its
+    coordinate files.  A tarball is read in a single streaming pass and extracted next to the
+    index under the per-user cache directory (``pdbindex/``); a directory collection is read in
+    place.  Either way the index is rebuilt only when the source changes: the tarball's size and
+    modification time, or for a directory the number of its entries and the newest modification
+    time beneath it.  Conformer coordinates are read only when an entry is checked out and one of
+    its conformers is asked for (see :class:`_ConformerTexts`).
+
+    Parameters
+    ----------
+    path_or_tarball : str
+        The collection directory, or a ``.tgz``/``.tar.gz`` holding exactly one top-level
+        directory named ``streamID``.
+    streamID : str
+        The collection's stream name.
+    cache_dir : str | Path, optional
+        Where indices (and extracted tarballs) live; defaults to ``<user cache>/pdbindex``.
+    """
+    FORMAT = 1
+    """ Bumped whenever the layout of the index file changes, invalidating every stored index. """
+
+    def __init__(self, path_or_tarball: str, streamID: str, cache_dir: str | Path | None = None):
+        self.source = str(Path(path_or_tarball).resolve())
+        self.streamID = streamID
+        self.is_tarball = self.source.endswith(('.tar.gz', '.tgz'))
+        cache_dir = Path(cache_dir) if cache_dir else default_index_directory()
+        digest = hashlib.sha256(self.source.encode()).hexdigest()[:12]
+        self.index_dir = cache_dir / f'{streamID}-{digest}'
+        self.root = str(self.index_dir / streamID) if self.is_tarball else self.source
+        self.entries: dict[str, dict] = {}
+        self._load_or_build()
+
+    def _signature(self) -> list:
+        if self.is_tarball:
+            st = os.stat(self.source)
+            return [st.st_size, st.st_mtime_ns]
+        count, newest = 0, 0
+        for top in os.scandir(self.source):
+            if top.name.startswith('.'):
+                continue
+            count += 1
+            paths = [top] if top.is_file() else [x for x in os.scandir(top.path) if not x.name.startswith('.')]
+            for entry in paths:
+                newest = max(newest, entry.stat().st_mtime_ns)
+        return [count, newest]
+
+    def _load_or_build(self):
+        signature = self._signature()
+        index_file = self.index_dir / 'index.json'
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with FileLock(str(self.index_dir) + '.lock'):
+            try:
+                with open(index_file) as f:
+                    stored = json.load(f)
+                if (stored.get('format') == self.FORMAT and stored.get('signature') == signature
+                        and (not self.is_tarball or os.path.isdir(self.root))):
+                    self.entries = stored['entries']
+                    return
+            except (OSError, ValueError):
+                pass
+            logger.debug(f'Indexing PDB collection {self.source}')
+            if self.is_tarball:
+                self._extract()
+            self.entries = self._scan(self.root)
+            fd, tmp = tempfile.mkstemp(dir=str(self.index_dir), suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format': self.FORMAT, 'source': self.source, 'signature': signature,
+                           'entries': self.entries}, f, default=str)
+            os.replace(tmp, index_file)
+
+    def _extract(self):
+        """Unpack the tarball under the index directory in one streaming pass, skipping the
+        hidden bookkeeping files (e.g. ``.<resname>.lock``) that may ride along in it."""
+        staging = Path(tempfile.mkdtemp(dir=str(self.index_dir)))
+        try:
+            with tarfile.open(self.source, 'r:*') as tf:
+                for member in tf:
+                    parts = member.name.strip('/').split('/')
+                    if parts[0] != self.streamID:
+                        raise ValueError(f'Tarball {self.source}\'s top-level directory does not match stream name {self.streamID} (root_dir {parts[0]}).')
+                    if len(parts) < 2 or parts[1].startswith('.') or not member.isfile():
+                        continue
+                    target = staging.joinpath(*parts)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(tf.extractfile(member).read())
+            (staging / self.streamID).mkdir(exist_ok=True)
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.replace(staging / self.streamID, self.root)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @staticmethod
+    def _scan(root: str) -> dict[str, dict]:
+        """Index every entry of the collection directory ``root``: bare ``RESI.pdb`` solo
+        entries (no metadata) and ``RESI/`` subdirectories described by ``info.yaml``."""
+        entries = {}
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            if name.startswith('.'):
+                continue
+            if os.path.isfile(path):
+                if name.endswith('.pdb'):
+                    entries[os.path.splitext(name)[0]] = PDBCollectionIndex._row({}, [name], None, root)
+                continue
+            info_file = os.path.join(path, 'info.yaml')
+            if not os.path.exists(info_file):
+                logger.warning(f'No info.yaml found for {name} in {root}.')
+                continue
+            with open(info_file) as f:
+                info = yaml.safe_load(f) or {}
+            if info.get('kind', 'molecule') == 'box':
+                files, psf = [f'{name}/{info["pdb"]}'], f'{name}/{info["psf"]}'
+            else:
+                files, psf = [f'{name}/{c["pdb"]}' for c in info.get('conformers', [])], None
+            entries[name] = PDBCollectionIndex._row(info, files, psf, root)
+        return entries
+
+    @staticmethod
+    def _row(info: dict, files: list[str], psf: str | None, root: str) -> dict:
+        is_box = info.get('kind', 'molecule') == 'box'
+        z_extents = []
+        if not is_box:
+            try:
+                for fn in files:
+                    with open(os.path.join(root, fn)) as f:
+                        z_extents.append(_z_extent(f.read()))
+            except ValueError:
+                # not fixed-column coordinates; leave the extents to be computed on demand
+                z_extents = []
+        return dict(kind=info.get('kind', 'molecule'), is_box=is_box, n_conformers=len(files),
+                    z_extents=z_extents, charge=info.get('charge', 0.0),
+                    head_tail_lengths=[c.get('head-tail-length', 0.0) for c in info.get('conformers', [])],
+                    info=info, files=files, psf=psf)
+
+    def read(self, relpath: str) -> str:
+        """The text of ``relpath`` (relative to the collection root)."""
+        path = os.path.join(self.root, relpath)
+        if self.is_tarball and not os.path.exists(path):
+            # the extracted copy was removed (e.g. by ``pestifer cache clear``); restore it
+            with FileLock(str(self.index_dir) + '.lock'):
+                if not os.path.exists(path):
+                    self.index_dir.mkdir(parents=True, exist_ok=True)
+                    self._extract()
+        with open(path) as f:
+            return f.read()
+
+    def checkout(self, resname: str) -> PDBInput:
+        """A :class:`PDBInput` for ``resname`` whose conformer coordinates are read on demand."""
+        row = self.entries[resname]
+        return PDBInput(name=resname, pdbcontents=_ConformerTexts(self, row['files']), info=row['info'],
+                        psf_content=self.read(row['psf']) if row['psf'] else '',
+                        z_extents=list(row['z_extents']))
+
+def default_index_directory() -> Path:
+    """Where :class:`PDBCollectionIndex` keeps its indices: ``<user cache>/pdbindex``."""
+    return Path(user_cache_dir('pestifer')) / 'pdbindex'
+
 @dataclass
 class PDBCollection:
     """ 
@@ -275,100 +496,36 @@ class PDBCollection:
     registration_place: int = 0
     """ The registration place of the collection in the repository indicating when it registered. """
 
+    index: PDBCollectionIndex | None = None
+    """ The collection's metadata index; entries in ``contents`` are checked out of it on first access. """
+
     @classmethod
     def build_from_resources(cls, path_or_tarball: str, resnames: list[str] = [], streamID_override: str = None):
+        """
+        Open the collection at ``path_or_tarball`` through its :class:`PDBCollectionIndex`.
+
+        Only the index is read; ``contents`` checks out each entry on first access, and an
+        entry's conformer coordinates are read only when asked for.  With ``resnames``, the
+        collection is restricted to those entries.  Returns ``None`` if ``path_or_tarball`` is
+        neither a tarball nor a directory.
+        """
         if not path_or_tarball:
             return cls()
         streamID = os.path.splitext(os.path.basename(path_or_tarball))[0] if not streamID_override else streamID_override
-        # logger.debug(f'{path_or_tarball} streamID {streamID}')
-        contents = PDBInputDict({})
-        info = {}
         if path_or_tarball.endswith('.tar.gz') or path_or_tarball.endswith('.tgz'):
             logger.debug(f'Initializing PDBCollection from tarball {path_or_tarball}')
-            pdbrepo_fs = TarBytesFS.from_file(path_or_tarball, compression='gzip')
-            root_dir = pdbrepo_fs.ls()[0].get('name', None)
-            logger.debug(f'Tarball {path_or_tarball} root directory: {root_dir}')
-            if not root_dir or root_dir != streamID:
-                raise ValueError(f'Tarball {path_or_tarball}\'s top-level directory does not match stream name {streamID} (root_dir {root_dir}).')
-            # Solo entries are single-PDB collection members; require the .pdb extension so
-            # hidden bookkeeping files that ride along in the tarball -- notably the per-entry
-            # `.<resname>.lock` advisory locks -- are not mistaken for entries (a `.PSM.lock`
-            # would otherwise register a phantom resname `.PSM`, doubling the collection). This
-            # mirrors the directory branch below, which already filters solos to `.pdb`.
-            toplevel_solos = [x['name'] for x in pdbrepo_fs.ls(root_dir)
-                              if x['type'] != 'directory' and x['name'].endswith('.pdb')]
-            toplevel_subdirs = [x['name'] for x in pdbrepo_fs.ls(root_dir) if x['type'] == 'directory']
-            for solo in toplevel_solos:
-                # update info and contents for a solo PDB file (info is empty in this case)
-                resname = os.path.splitext(os.path.basename(solo))[0]
-                if not resnames or resname in resnames:
-                    info[resname] = {}
-                    with pdbrepo_fs.open(solo, 'r') as f:
-                        contents[resname] = PDBInput(name=resname, pdbcontents={'0': f.read()}, info=info[resname])
-            for subdir in toplevel_subdirs:
-                resname = os.path.basename(subdir)
-                if not resnames or resname in resnames:
-                    info_search = [x for x in pdbrepo_fs.ls(subdir) if 'info.yaml' in x['name']]
-                    if len(info_search) == 0:
-                        logger.warning(f'No info.yaml found for {resname} in tarball {path_or_tarball}.')
-                        continue
-                    sd_member = info_search[0]
-                    with pdbrepo_fs.open(sd_member['name'], 'r') as f:
-                        info[resname] = yaml.safe_load(f)
-                    if info[resname].get('kind', 'molecule') == 'box':
-                        # a pre-equilibrated solvent box: one psf + one pdb, no conformers
-                        with pdbrepo_fs.open(os.path.join(subdir, info[resname]['pdb']), 'r') as f:
-                            box_pdb = f.read()
-                        with pdbrepo_fs.open(os.path.join(subdir, info[resname]['psf']), 'r') as f:
-                            box_psf = f.read()
-                        contents[resname] = PDBInput(name=resname, pdbcontents={0: box_pdb},
-                                                     info=info[resname], psf_content=box_psf)
-                    else:
-                        pdbcontents = {}
-                        for index, conformer in enumerate(info[resname].get('conformers', [])):
-                            with pdbrepo_fs.open(os.path.join(subdir, conformer['pdb']), 'r') as f:
-                                pdbcontents[index] = f.read()
-                        contents[resname] = PDBInput(name=resname, pdbcontents=pdbcontents, info=info[resname])
-            if len(contents) == 0:
-                logger.debug(f'No valid PDB contents for {"any resnames" if not resnames else resnames} found in tarball {path_or_tarball}.')
-            del pdbrepo_fs
-            return cls(path_or_tarball=path_or_tarball, streamID=streamID, info=info, contents=contents)
+            index = PDBCollectionIndex(path_or_tarball, streamID)
         elif os.path.isdir(path_or_tarball):
             logger.debug(f'Initializing PDBCollection from {path_or_tarball}')
-            cwd = os.getcwd()
-            os.chdir(path_or_tarball)
-            dircontents = os.listdir()
-            solos = [x for x in dircontents if os.path.isfile(x) and x.endswith('.pdb')]
-            subdirs = [x for x in dircontents if os.path.isdir(x) and not x.startswith('.')]
-            for solo in solos:
-                resname = os.path.splitext(solo)[0]
-                if not resnames or resname in resnames:
-                    info[resname] = {}
-                    with open(solo, 'r') as f:
-                        contents[resname] = PDBInput(name=resname, pdbcontents={0: f.read()}, info=info[resname])
-            for subdir in subdirs:
-                resname = subdir
-                if not resnames or resname in resnames:
-                    if os.path.exists(os.path.join(subdir, 'info.yaml')):
-                        with open(os.path.join(subdir, 'info.yaml'), 'r') as f:
-                            info[resname] = yaml.safe_load(f)
-                    if info[resname].get('kind', 'molecule') == 'box':
-                        with open(os.path.join(subdir, info[resname]['pdb']), 'r') as f:
-                            box_pdb = f.read()
-                        with open(os.path.join(subdir, info[resname]['psf']), 'r') as f:
-                            box_psf = f.read()
-                        contents[resname] = PDBInput(name=resname, pdbcontents={0: box_pdb},
-                                                     info=info[resname], psf_content=box_psf)
-                    else:
-                        pdbcontents = {}
-                        for index, conformer in enumerate(info[resname].get('conformers', [])):
-                            with open(os.path.join(subdir, conformer['pdb']), 'r') as f:
-                                pdbcontents[index] = f.read()
-                        contents[resname] = PDBInput(name=resname, pdbcontents=pdbcontents, info=info[resname])
-            os.chdir(cwd)
-            if len(contents) == 0:
-                logger.debug(f'No valid PDB contents for {"any resnames" if not resnames else resnames} found in directory {path_or_tarball}.')
-            return cls(path_or_tarball=path_or_tarball, streamID=streamID, info=info, contents=contents)
+            index = PDBCollectionIndex(path_or_tarball, streamID)
+        else:
+            return None
+        names = [r for r in index.entries if not resnames or r in resnames]
+        if len(names) == 0:
+            logger.debug(f'No valid PDB contents for {"any resnames" if not resnames else resnames} found in {path_or_tarball}.')
+        info = {r: index.entries[r]['info'] for r in names}
+        return cls(path_or_tarball=path_or_tarball, streamID=streamID, info=info,
+                   contents=_LazyPDBInputDict(index, names), index=index)
 
     def show(self, fullnames: bool = False, missing_fullnames: dict = None) -> str:
         """
@@ -505,8 +662,12 @@ class PDBRepository(CacheableObject):
     A ``PDBRepository`` is a set of _collections_, each of which respresents a CHARMMFF _stream_.  The base ``PDBRepository`` is the one that comes with pestifer, and it is located in ``PESTIFER/resources/charmmff/pdbrepository/``. The base ``PDBRepository`` contains a ``lipid`` collection and a ``solvent`` collection (water + ions, formerly ``water_ions``).  A user may register additional collections by specifying them in the yaml config file. 
     """
     
+    COLLECTION_FORMAT = 2
+    """ Layout of the pickled collections; a cached repository of another layout is rebuilt.  (Layout 2: collections hold a :class:`PDBCollectionIndex` and check out entries lazily, so the cache no longer carries every conformer's coordinates.) """
+
     @countTime
     def __init__(self, *args, **kwargs):
+        self.collection_format = self.COLLECTION_FORMAT
         is_custom = 'resnames' in kwargs and len(kwargs['resnames']) > 0
         if is_custom:
             self.build_custom(*args, **kwargs)
@@ -515,6 +676,12 @@ class PDBRepository(CacheableObject):
                 kwargs['resource_label'] = Path(args[0]).parent.name
             super().__init__(*args, **kwargs)
 
+    def _adopt_state_from(self, other: 'PDBRepository') -> None:
+        if getattr(other, 'collection_format', None) != self.COLLECTION_FORMAT:
+            # raised inside CacheableObject's load, which then rebuilds from resources
+            raise ValueError('cached PDBRepository has an outdated collection layout')
+        super()._adopt_state_from(other)
+
     @with_spinner('Building PDBRepository cache..')
     def _build_from_resources(self, charmmff_pdbrepository_path: str = '', **kwargs):
         """
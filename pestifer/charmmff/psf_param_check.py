@@ -18,21 +18,29 @@ Matching mirrors CHARMM's own parameter lookup:
 - **atom types** (vdW/nonbonded): exact membership, no wildcards.
 - **bonds**: unordered pair (``b0``/``Kb`` are symmetric).
 - **angles**: the triple, canonicalised by reversibility.
-- **dihedrals**: the quartet, canonicalised by reversibility; the wildcard atom
-  type ``X`` may appear in positions 1 and/or 4 (the common ``X A B X`` central-pair
-  form is indexed for speed; rarer partial-wildcard entries are matched directly).
+- **dihedrals**: the quartet, in either direction; the wildcard atom type ``X``
+  may appear in positions 1 and/or 4 (the common ``X A B X`` central-pair form).
 - **impropers**: matched against each parameter's quartet with ``X`` wildcards in
   any position, in either direction (CHARMM improper matching is permissive).
 
-Terms are deduplicated by their atom-type tuple, so the scan is cheap even on a
-multi-million-atom system: each distinct type-tuple is looked up once.
+The scan is vectorized: atom types are integer-encoded once, each bonded section
+is parsed straight into an array of serials and mapped to type codes by NumPy
+indexing, and distinct terms are found over packed integer keys (a scatter-min
+into a dense table, or :func:`numpy.unique` for very large key spaces).
+Parameters are compiled into per-wildcard-mask lookup tables
+(:class:`_PatternTable`), so resolving every distinct term costs a handful of
+:func:`numpy.isin` calls, even on a multi-million-term PSF.
 """
 import logging
 
+import numpy as np
+
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+_WILDCARD = 'X'
+
 
 @dataclass
 class MissingParameters:
@@ -53,110 +61,157 @@ class MissingParameters:
                     or self.dihedrals or self.impropers)
 
 
-def _serial_chunks(lines, n):
-    """Yield successive ``n``-tuples of integer atom serials from raw PSF section lines."""
-    for line in lines:
-        vals = [int(x) for x in line.split()]
-        for i in range(0, len(vals) - n + 1, n):
-            yield tuple(vals[i:i + n])
-
-
-def _quartet_match(pattern, quartet) -> bool:
-    """True if a parameter ``pattern`` (may contain ``'X'``) matches ``quartet`` in either direction."""
-    def m(p, q):
-        return all(pi == 'X' or pi == qi for pi, qi in zip(p, q))
-    return m(pattern, quartet) or m(pattern, quartet[::-1])
-
-
-def _index_params(param):
-    """Build fast lookup structures from a merged :class:`CharmmParamFile`."""
-    bondset = {tuple(sorted((b.type1, b.type2))) for b in param.bonds}
-    angleset = {min((a.type1, a.type2, a.type3), (a.type3, a.type2, a.type1))
-                for a in param.angles}
-    dih_exact = set()
-    dih_wild_mid = set()   # central pair (b,c) for the common 'X b c X' form
-    dih_wild_other = []    # rarer partial-wildcard quartets, matched directly
-    for d in param.dihedrals:
-        q = (d.type1, d.type2, d.type3, d.type4)
-        if 'X' not in q:
-            dih_exact.add(min(q, q[::-1]))
-        elif q[0] == 'X' and q[3] == 'X' and q[1] != 'X' and q[2] != 'X':
-            dih_wild_mid.add(min((q[1], q[2]), (q[2], q[1])))
-        else:
-            dih_wild_other.append(q)
-    improper_quartets = [(i.type1, i.type2, i.type3, i.type4) for i in param.impropers]
-    return bondset, angleset, dih_exact, dih_wild_mid, dih_wild_other, improper_quartets
+def _encode_atom_types(atoms):
+    """Integer-encode the atom types of a PSF atom list.
 
+    Returns
+    -------
+    vocab : np.ndarray
+        The sorted distinct atom-type strings; a type's code is its index here, so
+        comparing codes orders tuples exactly as comparing the type strings would.
+    codes : np.ndarray
+        The type code of each atom, in atom-list order.
+    serial_lut : np.ndarray
+        Lookup vector mapping an atom serial to its index in the atom list
+        (``-1`` where no atom carries that serial).
+    """
+    vocab, codes = np.unique(np.array([a.atomtype for a in atoms], dtype=str), return_inverse=True)
+    serials = np.fromiter((int(a.serial) for a in atoms), dtype=np.int64, count=len(atoms))
+    serial_lut = np.full(int(serials.max(initial=0)) + 1, -1, dtype=np.int64)
+    serial_lut[serials] = np.arange(len(atoms), dtype=np.int64)
+    return vocab, codes.astype(np.int64), serial_lut
 
-def check_psf_parameters(psf, param) -> MissingParameters:
-    """Return the atom types and bonded terms in *psf* that *param* does not resolve.
 
-    Parameters
-    ----------
-    psf : PSFContents
-        A parsed PSF (atoms + raw token sections; no ``parse_topology`` required).
-    param : CharmmParamFile
-        The merged parameter set for the build's CHARMM release.
-    """
-    (bondset, angleset, dih_exact, dih_wild_mid,
-     dih_wild_other, improper_quartets) = _index_params(param)
+def _section_serials(lines, n) -> np.ndarray:
+    """Parse the raw lines of a PSF bonded-term section into an ``(m, n)`` array of atom serials."""
+    vals = np.fromstring(' '.join(lines), dtype=np.int64, sep=' ') if lines else np.empty(0, dtype=np.int64)
+    m = len(vals) // n
+    return vals[:m * n].reshape(m, n)
 
-    serial_to_atom = {int(a.serial): a for a in psf.atoms}
 
-    def typ(s):
-        return serial_to_atom[s].atomtype
+def _pack(codes: np.ndarray, base: int) -> np.ndarray:
+    """Pack each row of an ``(m, n)`` integer-code array into one ``int64`` key.
 
-    def label(s):
-        a = serial_to_atom[s]
-        return f'{a.resname} {a.segname}{a.resid.resid}'
+    Packing is positional in ``base``, so key order is the lexicographic order of the rows.
+    """
+    keys = np.zeros(len(codes), dtype=np.int64)
+    for j in range(codes.shape[1]):
+        keys = keys * base + codes[:, j]
+    return keys
 
-    missing = MissingParameters()
 
-    # --- atom types (vdW / nonbonded): exact membership, no wildcards ---
-    seen_at = set()
-    nonbonded = param.nonbonded
-    for a in psf.atoms:
-        at = a.atomtype
-        if at in seen_at:
-            continue
-        seen_at.add(at)
-        if at not in nonbonded:
-            missing.atomtypes.append((at, f'{a.resname} {a.segname}{a.resid.resid}'))
-
-    # --- bonded terms: dedupe by type-tuple so each distinct term is checked once ---
-    def scan(section, n, key_fn, ok_fn, out):
-        seen = set()
-        for serials in _serial_chunks(psf.token_lines.get(section, []), n):
+def _first_occurrences(keys: np.ndarray, space: int) -> np.ndarray:
+    """Indices of the first occurrence of each distinct value in *keys*, in order of appearance.
+
+    When the key space is small (the usual case: a few hundred atom types), a scatter-min
+    into a dense table avoids the stable sort :func:`numpy.unique` needs for ``return_index``.
+    """
+    if space <= max(1 << 22, len(keys)):
+        first = np.full(space, len(keys), dtype=np.int64)
+        np.minimum.at(first, keys, np.arange(len(keys), dtype=np.int64))
+        first = first[first < len(keys)]
+    else:
+        _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+class _PatternTable:
+    """Precompiled lookup table for one family of bonded-term parameters.
+
+    Parameter type-tuples are encoded in the PSF's type-code space (tuples naming a
+    type the PSF never uses cannot match anything and are dropped) and grouped by
+    *wildcard mask* -- the set of positions holding ``X``.  For each mask the table
+    keeps the sorted packed keys of its patterns, with wildcard positions set to a
+    sentinel code.  A batch of terms is resolved by blanking the same positions in
+    the terms and testing membership, once per mask and per direction, so the cost
+    no longer depends on how many wildcard patterns the release carries.
+
+    Parameters
+    ----------
+    patterns : iterable of tuple[str, ...]
+        The parameter type-tuples.
+    vocab : np.ndarray
+        The PSF's sorted atom-type vocabulary (see :func:`_encode_atom_types`).
+    wildcards : bool
+        Whether ``X`` in a pattern matches any type (dihedrals/impropers) or is an
+        ordinary type name (bonds/angles).
+    """
+    def __init__(self, patterns, vocab, wildcards: bool = False):
+        self.sentinel = len(vocab)
+        self.base = len(vocab) + 1
+        code_of = {t: i for i, t in enumerate(vocab.tolist())}
+        by_mask = {}
+        for p in patterns:
+            mask = tuple(i for i, t in enumerate(p) if wildcards and t == _WILDCARD)
             try:
-                types = tuple(typ(s) for s in serials)
+                row = [self.sentinel if i in mask else code_of[t] for i, t in enumerate(p)]
             except KeyError:
-                continue  # a term referencing an atom serial not in ATOM (malformed PSF) -- skip
-            k = key_fn(types)
-            if k in seen:
                 continue
-            seen.add(k)
-            if not ok_fn(types):
-                out.append(('-'.join(types), label(serials[0])))
+            by_mask.setdefault(mask, []).append(row)
+        self.tables = {mask: np.unique(_pack(np.array(rows, dtype=np.int64), self.base))
+                       for mask, rows in by_mask.items()}
+
+    def resolves(self, terms: np.ndarray) -> np.ndarray:
+        """Boolean mask over the rows of *terms* (type codes) that some pattern matches in either direction."""
+        ok = np.zeros(len(terms), dtype=bool)
+        for mask, keys in self.tables.items():
+            for oriented in (terms, terms[:, ::-1]):
+                blanked = oriented.copy()
+                if mask:
+                    blanked[:, list(mask)] = self.sentinel
+                ok |= np.isin(_pack(blanked, self.base), keys)
+        return ok
 
-    scan('BOND', 2, lambda t: tuple(sorted(t)),
-         lambda t: tuple(sorted(t)) in bondset, missing.bonds)
-    scan('THETA', 3, lambda t: min((t[0], t[1], t[2]), (t[2], t[1], t[0])),
-         lambda t: min((t[0], t[1], t[2]), (t[2], t[1], t[0])) in angleset, missing.angles)
 
-    def dihedral_ok(t):
-        a, b, c, d = t
-        if min(t, t[::-1]) in dih_exact:
-            return True
-        if min((b, c), (c, b)) in dih_wild_mid:
-            return True
-        return any(_quartet_match(w, t) for w in dih_wild_other)
+def check_psf_parameters(psf, param) -> MissingParameters:
+    """Return the atom types and bonded terms in *psf* that *param* does not resolve.
 
-    scan('PHI', 4, lambda t: min(t, t[::-1]), dihedral_ok, missing.dihedrals)
+    Parameters
+    ----------
+    psf : PSFContents
+        A parsed PSF (atoms + raw token sections; no ``parse_topology`` required).
+    param : CharmmParamFile
+        The merged parameter set for the build's CHARMM release.
+    """
+    atoms = psf.atoms.data
+    missing = MissingParameters()
+    if not atoms:
+        return missing
+    vocab, codes, serial_lut = _encode_atom_types(atoms)
 
-    def improper_ok(t):
-        return any(_quartet_match(w, t) for w in improper_quartets)
+    def label(i):
+        a = atoms[i]
+        return f'{a.resname} {a.segname}{a.resid.resid}'
 
-    scan('IMPHI', 4, lambda t: min(t, t[::-1]), improper_ok, missing.impropers)
+    # --- atom types (vdW / nonbonded): exact membership, no wildcards ---
+    for i in _first_occurrences(codes, len(vocab)):
+        at = vocab[codes[i]]
+        if at not in param.nonbonded:
+            missing.atomtypes.append((str(at), label(i)))
+
+    # --- bonded terms: dedupe by packed canonical type-tuple so each distinct term is checked once ---
+    def scan(section, n, table, out):
+        serials = _section_serials(psf.token_lines.get(section, []), n)
+        idx = np.full(serials.shape, -1, dtype=np.int64)
+        in_range = (serials >= 0) & (serials < len(serial_lut))
+        idx[in_range] = serial_lut[serials[in_range]]
+        idx = idx[(idx >= 0).all(axis=1)]   # drop terms referencing a serial not in ATOM (malformed PSF)
+        if len(idx) == 0:
+            return
+        types = codes[idx]
+        canonical = np.minimum(_pack(types, table.base), _pack(types[:, ::-1], table.base))
+        first = _first_occurrences(canonical, table.base ** n)
+        for i in first[~table.resolves(types[first])]:
+            out.append(('-'.join(vocab[types[i]].tolist()), label(idx[i, 0])))
+
+    scan('BOND', 2, _PatternTable(((b.type1, b.type2) for b in param.bonds), vocab),
+         missing.bonds)
+    scan('THETA', 3, _PatternTable(((a.type1, a.type2, a.type3) for a in param.angles), vocab),
+         missing.angles)
+    scan('PHI', 4, _PatternTable(((d.type1, d.type2, d.type3, d.type4) for d in param.dihedrals),
+                                 vocab, wildcards=True), missing.dihedrals)
+    scan('IMPHI', 4, _PatternTable(((i.type1, i.type2, i.type3, i.type4) for i in param.impropers),
+                                   vocab, wildcards=True), missing.impropers)
 
     return missing
 
@@ -9,7 +9,7 @@ import shutil
 import sys
 
 from ..util.stringthings import banner, __pestifer_version__
-from ..subcommands import _subcommands
+from ..subcommands import _subcommands, find_subcommand
 from ..core.errors import PestiferError
 
 logger = logging.getLogger(__name__)
@@ -86,10 +86,31 @@ def subcommand_exit_code(result) -> int:
     return code
 
 
-def cli():
+_OPTIONS_WITH_VALUES = ('--log-level', '--log-file')
+""" top-level options that consume the following token """
+
+def invoked_command(argv: list[str]) -> str | None:
+    """The command token in ``argv`` (the first non-option that is not an option's value)."""
+    skip = False
+    for token in argv:
+        if skip:
+            skip = False
+        elif token in _OPTIONS_WITH_VALUES:
+            skip = True
+        elif not token.startswith('-'):
+            return token
+    return None
+
+
+def cli(argv: list[str] | None = None):
     """
     Command-line interface for pestifer.
+
+    Only the invoked subcommand's module is imported (see
+    :class:`~pestifer.subcommands.SubcommandEntry`); every other command is registered with
+    just its name, aliases and one-line help, which is all ``pestifer --help`` shows.
     """
+    argv = sys.argv[1:] if argv is None else argv
 
     parser = ap.ArgumentParser(formatter_class=grouped_formatter(_subcommands))
     parser.add_argument(
@@ -126,10 +147,14 @@ def cli():
         required=False
     )
 
-    for subcommand in _subcommands:
-        subcommand.add_subparser(subparsers)
+    invoked = find_subcommand(invoked_command(argv) or '')
+    for entry in _subcommands:
+        if entry is invoked:
+            entry.load().add_subparser(subparsers)
+        else:
+            subparsers.add_parser(entry.name, aliases=list(entry.aliases), help=entry.short_help)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     loglevel_numeric = getattr(logging, args.log_level.upper())
     default_log_file_func = getattr(args, 'default_log_file_func', None)
     log_file = args.log_file or (default_log_file_func(args) if default_log_file_func else None)
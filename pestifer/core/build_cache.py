@@ -0,0 +1,287 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Content-addressed cache of task results, shared by all of a user's builds.
+
+``--restart`` (see :mod:`pestifer.core.run_manifest`) reuses completed tasks within one build
+directory.  The build cache reuses them across directories.  After each task completes, the
+STATE fileset it leaves (psf/pdb/coor/xsc/vel) and the plain data artifacts it registered are
+stored under a key that covers everything the result depends on:
+
+- the task's class, name and resolved spec (:func:`~pestifer.core.run_manifest.spec_hash`);
+- the content of its input STATE files, of any file its spec names, and of any other file
+  it reads (:meth:`BaseTask.cache_inputs <pestifer.tasks.basetask.BaseTask.cache_inputs>`);
+- the keys of the tasks it depends on (see
+  :func:`~pestifer.tasks.pipeline_contract.task_dependencies`), so a task's key covers every
+  currency handed down to it, not only STATE -- ``psfgen`` after ``fetch`` starts from no STATE
+  at all, and it is the ``fetch`` key that tells one source structure from another;
+- the pestifer version and the CHARMM force-field release.
+
+A later build with ``--build-cache`` looks up its tasks in order, chaining each hit's output
+digests and key into the keys of the tasks after it.  It restores the longest prefix that hits, as ``--restart``
+would restore it, and runs the rest.  So a second build of the same PDB with the same front-end
+modifications, or a parameter sweep that varies only late-stage options, skips ``psfgen``, the
+ring checks and the minimizations they share.
+
+Files are stored once per content digest under ``blobs/``, so tasks that leave STATE unchanged
+cost an entry and nothing more.  Entries live under ``entries/``; a hit refreshes its entry's
+modification time, and once the store exceeds its size limit the least recently used entries are
+dropped, along with any blob no remaining entry uses.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from pathlib import Path
+
+from .run_manifest import spec_hash
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 2
+""" Layout of an entry; bump to make every existing entry miss. """
+
+DEFAULT_MAX_BYTES = 20 * 1024**3
+""" Default size limit of the store (20 GB). """
+
+
+def default_build_cache_directory() -> Path:
+    """Where the build cache lives: ``build-cache/`` in the per-user cache directory."""
+    from platformdirs import user_cache_dir
+    return Path(user_cache_dir('pestifer')) / 'build-cache'
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's bytes."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _spec_files(specs) -> dict:
+    """``{name: digest}`` of every file in the working directory that ``specs`` names."""
+    found = {}
+    stack = [specs]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, str) and item and len(item) < 4096 and os.path.isfile(item):
+            found[item] = file_digest(item)
+    return found
+
+
+def task_key(task, input_digests: dict, pestifer_version: str = '', charmmff_release: str = '',
+             upstream=()) -> str:
+    """
+    The cache key of ``task`` run on STATE files with the given content, downstream of the tasks
+    with keys ``upstream``.
+
+    Parameters
+    ----------
+    task : BaseTask
+        The task, before it executes (several tasks rewrite their specs as they run).
+    input_digests : dict
+        ``{slot: digest}`` of the STATE fileset the task starts from; empty for an origin task.
+    upstream : iterable of str
+        Keys of the tasks ``task`` depends on; their order does not matter.
+    pestifer_version : str
+        Version of pestifer doing the build.
+    charmmff_release : str
+        CHARMM force-field release in use.
+    """
+    payload = dict(format=FORMAT,
+                   task_class=f'{type(task).__module__}.{type(task).__qualname__}',
+                   taskname=task.taskname,
+                   spec=spec_hash(task.specs),
+                   inputs=dict(sorted(input_digests.items())),
+                   upstream=sorted(upstream),
+                   spec_files=_spec_files([task.specs, list(getattr(task, 'cache_inputs', list)())]),
+                   pestifer=pestifer_version,
+                   charmmff=charmmff_release)
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class BuildCache:
+    """
+    The on-disk store of task results.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Root of the store; defaults to :func:`default_build_cache_directory`.
+    max_bytes : int
+        Size limit; least recently used entries are evicted beyond it.
+    pestifer_version : str
+        Stamped into every key (see :func:`task_key`).
+    charmmff_release : str
+        Stamped into every key (see :func:`task_key`).
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 pestifer_version: str = '', charmmff_release: str = ''):
+        self.directory = Path(directory) if directory is not None else default_build_cache_directory()
+        self.max_bytes = max_bytes
+        self.pestifer_version = pestifer_version
+        self.charmmff_release = charmmff_release
+
+    @property
+    def _entries(self) -> Path:
+        return self.directory / 'entries'
+
+    @property
+    def _blobs(self) -> Path:
+        return self.directory / 'blobs'
+
+    def _lock(self):
+        from filelock import FileLock
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return FileLock(str(self.directory / '.lock'))
+
+    def _blob(self, digest: str) -> Path:
+        return self._blobs / digest[:2] / digest
+
+    def key(self, task, input_digests: dict, upstream=()) -> str:
+        """:func:`task_key` with this store's version stamps."""
+        return task_key(task, input_digests, self.pestifer_version, self.charmmff_release, upstream)
+
+    def get(self, key: str) -> dict | None:
+        """
+        The entry stored under ``key``, or None on a miss.  An entry is a dict with ``taskname``,
+        ``state`` (``{slot: {'name', 'digest', 'size'}}``) and ``data`` (``{artifact key: data}``).
+        """
+        path = self._entries / f'{key}.json'
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.debug(f'build cache: ignoring unreadable entry {key}: {exc}')
+            return None
+        if entry.get('format') != FORMAT or not all(self._blob(r['digest']).is_file()
+                                                    for r in entry.get('state', {}).values()):
+            return None
+        try:
+            os.utime(path)          # most recently used
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, taskname: str, state_files: dict, data: dict | None = None) -> bool:
+        """
+        Store a task's result under ``key``.
+
+        Parameters
+        ----------
+        key : str
+            From :meth:`key`, computed before the task ran.
+        taskname : str
+            For the record.
+        state_files : dict
+            ``{slot: filename}`` of the STATE fileset the task left.
+        data : dict, optional
+            JSON-serializable data artifacts the task registered, by artifact key.
+
+        Returns
+        -------
+        bool
+            True if the result was stored.  Failures are logged and never raised: the cache must
+            not fail a build.
+        """
+        try:
+            state = {}
+            for slot, name in state_files.items():
+                digest = file_digest(name)
+                state[slot] = dict(name=os.path.basename(name), digest=digest, size=os.path.getsize(name))
+            entry = dict(format=FORMAT, taskname=taskname, created=time.time(), state=state, data=data or {})
+            payload = json.dumps(entry, indent=2)
+            with self._lock():
+                for slot, name in state_files.items():
+                    blob = self._blob(state[slot]['digest'])
+                    if not blob.is_file():
+                        blob.parent.mkdir(parents=True, exist_ok=True)
+                        fd, tmp = tempfile.mkstemp(dir=str(blob.parent), suffix='.tmp')
+                        os.close(fd)
+                        shutil.copyfile(name, tmp)
+                        os.replace(tmp, blob)
+                self._entries.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=str(self._entries), suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp, self._entries / f'{key}.json')
+                self._evict()
+            return True
+        except Exception as exc:
+            logger.warning(f'build cache: could not store the result of {taskname}: {exc}')
+            return False
+
+    def restore(self, entry: dict, destination: str | Path = '.') -> dict | None:
+        """
+        Copy an entry's STATE files into ``destination`` under the names they were stored with.
+        Returns ``{slot: filename}``, or None if any file could not be restored.
+        """
+        restored = {}
+        try:
+            for slot, record in entry.get('state', {}).items():
+                target = Path(destination) / record['name']
+                fd, tmp = tempfile.mkstemp(dir=str(target.parent), prefix=f'.{target.name}.', suffix='.tmp')
+                os.close(fd)
+                shutil.copyfile(self._blob(record['digest']), tmp)
+                os.replace(tmp, target)
+                restored[slot] = record['name']
+        except Exception as exc:
+            logger.warning(f'build cache: could not restore {entry.get("taskname", "?")}: {exc}')
+            return None
+        return restored
+
+    def entries(self) -> list[Path]:
+        """Every entry file, least recently used first."""
+        if not self._entries.is_dir():
+            return []
+        return sorted(self._entries.glob('*.json'), key=lambda p: p.stat().st_mtime)
+
+    def size(self) -> int:
+        """Bytes held by the store."""
+        if not self.directory.is_dir():
+            return 0
+        return sum(p.stat().st_size for p in self.directory.rglob('*') if p.is_file())
+
+    def _evict(self):
+        """Drop least recently used entries, then orphaned blobs, until the store fits (lock held)."""
+        entries = self.entries()
+        referenced = {}
+        for path in entries:
+            try:
+                with open(path) as f:
+                    referenced[path] = {r['digest']: r['size'] for r in json.load(f).get('state', {}).values()}
+            except Exception:
+                referenced[path] = {}
+        def total():
+            blobs = {}
+            for digests in referenced.values():
+                blobs.update(digests)
+            return sum(blobs.values()), set(blobs)
+        used, live = total()
+        while used > self.max_bytes and len(referenced) > 1:
+            oldest = entries.pop(0)
+            referenced.pop(oldest, None)
+            oldest.unlink(missing_ok=True)
+            logger.debug(f'build cache: evicted {oldest.stem}')
+            used, live = total()
+        if self._blobs.is_dir():
+            for blob in self._blobs.glob('*/*'):
+                if blob.name not in live and not blob.name.endswith('.tmp'):
+                    blob.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        """Delete the whole store; returns the number of entries removed."""
+        n = len(self.entries())
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return n
@@ -5,8 +5,11 @@ Class for handling and running external commands and managing their output.
 """
 
 import atexit
+import codecs
+import io
 import logging
 import os
+import selectors
 import signal
 import shutil
 import subprocess
@@ -14,8 +17,10 @@ import sys
 import threading
 import time
 
+from collections import deque
 from glob import glob
 
+from . import telemetry
 from ..logparsers import LogParser
 from ..util.util import running_under_pytest
 
@@ -113,6 +118,87 @@ def install_signal_handlers() -> None:
             pass
     _signal_handlers_installed = True
 
+def open_logfile(logfile: str, overwrite: bool = False, buffering: int = -1):
+    """
+    Open ``logfile`` for writing.  An existing log is rotated aside to ``%<logfile>-<n>%``
+    unless ``overwrite`` is True.
+    """
+    if os.path.exists(logfile) and not overwrite:
+        nlogs = len(glob(f'%{logfile}'))
+        shutil.move(logfile, f'%{logfile}-{nlogs+1}%')
+        logger.debug(f'Rotating {logfile} to %{logfile}-{nlogs+1}%')
+    log = open(logfile, 'w', buffering=buffering)
+    logger.debug(f'Opened {logfile} for writing')
+    return log
+
+
+def finish_logparser(logparser: LogParser, _pytest: bool = False):
+    """
+    Close out a log parser after its process is done: finish its progress bar, then let it
+    finalize and write its CSV, if it does those things.
+    """
+    if hasattr(logparser, 'progress_bar') and logparser.progress_bar is not None:
+        if not _pytest:
+            logparser.progress_bar.finish()
+        else:
+            print()
+    elif not _pytest:
+        logparser.update_progress_bar()
+    if hasattr(logparser, 'finalize'):
+        logparser.finalize()
+    if hasattr(logparser, 'write_csv'):
+        logparser.write_csv()
+
+
+class _StreamCapture:
+    """
+    What :class:`Command` keeps of one output stream of its child: the last ``tail_chars``
+    characters (for error reports) and whether ``needle`` appeared anywhere in the stream.
+
+    Raw chunks are decoded incrementally (UTF-8, universal newlines, undecodable bytes
+    replaced), so a multi-byte character or a ``\\r\\n`` split across two reads is handled.
+    The needle search carries the last ``len(needle) - 1`` characters from chunk to chunk, so a
+    match straddling a read boundary is still found.
+    """
+
+    def __init__(self, tail_chars: int, needle: str = ''):
+        self.tail_chars = tail_chars
+        self.needle = needle
+        self.found = False
+        self.truncated = False
+        self._chunks: deque[str] = deque()
+        self._size = 0
+        self._carry = ''
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+
+    def feed(self, data: bytes, final: bool = False) -> str:
+        """Decode ``data``, retain its tail, and return the decoded text."""
+        text = self._decoder.decode(data, final=final)
+        if not text:
+            return text
+        if self.needle and not self.found:
+            window = self._carry + text
+            self.found = self.needle in window
+            self._carry = window[-(len(self.needle) - 1):] if len(self.needle) > 1 else ''
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size - len(self._chunks[0]) >= self.tail_chars:
+            self._size -= len(self._chunks.popleft())
+            self.truncated = True
+        return text
+
+    def text(self) -> str:
+        """The retained tail of the stream."""
+        joined = ''.join(self._chunks)
+        if len(joined) > self.tail_chars:
+            joined = joined[-self.tail_chars:]
+            self.truncated = True
+        self._chunks = deque([joined]) if joined else deque()
+        self._size = len(joined)
+        return joined
+
+
 class Command:
     """ 
     Class for running external commands in a subprocess.
@@ -128,6 +214,22 @@ class Command:
     """
     The length of the divider line used in logging output to separate sections of the log.
     """
+
+    tail_chars = 1 << 20
+    """
+    How much of each output stream is retained in :attr:`stdout`/:attr:`stderr` for error
+    reports.  A NAMD run can print millions of lines; keeping all of it cost memory and, through
+    repeated string concatenation, time quadratic in the output size.
+    """
+
+    read_chunk = 1 << 16
+    """ Bytes requested per read of a child's pipe. """
+
+    batch_chars = 1 << 16
+    """ Decoded stdout accumulated before it is handed to the log parser (see :attr:`batch_seconds`). """
+
+    batch_seconds = 0.25
+    """ Longest interval between log-parser updates (and log-file flushes) while output is arriving. """
  
     def __init__(self, command: str, *args, **options):
         """ 
@@ -176,12 +278,7 @@ class Command:
             if not quiet:
                 logger.debug(f'No logfile specified for {self.c}')
         else:
-            if os.path.exists(logfile) and not kwargs.get('overwrite_logs', False):
-                nlogs = len(glob(f'%{logfile}'))
-                shutil.move(logfile, f'%{logfile}-{nlogs+1}%')
-                logger.debug(f'Rotating {logfile} to %{logfile}-{nlogs+1}%')
-            log = open(logfile, 'w')
-            logger.debug(f'Opened {logfile} for writing')
+            log = open_logfile(logfile, overwrite=kwargs.get('overwrite_logs', False), buffering=self.read_chunk)
 
         if log_stderr:
             stderr_redirect = subprocess.STDOUT
@@ -194,60 +291,102 @@ class Command:
         # site VMD 2.x builds) then exits immediately without running the script -- so
         # VMD stays in pestifer's session and is signaled by pid instead.
         install_signal_handlers()
+        probe = telemetry.command_probe(self.c)
         process = subprocess.Popen(self.c, shell=True, stdout=subprocess.PIPE, stderr=stderr_redirect,
-                                   text=True, start_new_session=new_session, stdin=stdin)
+                                   start_new_session=new_session, stdin=stdin)
         _register_child(process.pid, new_session=new_session)
-        self.stdout = ''
-        self.stderr = ''
-        output = ''
-
+        needle = override[0] if len(override) == 2 else ''
+        out = _StreamCapture(self.tail_chars, needle)
+        err = _StreamCapture(self.tail_chars, needle)
         try:
-            while True:
-                output = process.stdout.readline()
-                self.stdout += output
-                if logparser:
-                    logparser.update(output)
-                    if not _pytest:
-                        logparser.update_progress_bar()
-                if log:
-                    log.write(output)
-                    log.flush()
-                if output == '' and process.poll() is not None:
-                    break
-            if hasattr(logparser, 'progress_bar') and logparser.progress_bar is not None:
-                if not _pytest:
-                    logparser.progress_bar.finish()
-                else:
-                    print()
-            if logfile:
-                logger.debug(f'Log written to {logfile}')
-                log.close()
-            remaining_stdout, self.stderr = process.communicate()
-            self.stdout += remaining_stdout
+            self._stream(process, out, err, log, logparser, _pytest)
+            if probe is not None:
+                probe.reap(process)
+            process.wait()
         finally:
             _unregister_child(process.pid)
+            if log:
+                log.close()
+            if probe is not None:
+                probe.finish(process.returncode)
+        self.stdout = out.text()
+        self.stderr = err.text()
+        if logfile:
+            logger.debug(f'Log written to {logfile}')
         if logparser:
-            logparser.update(remaining_stdout)
-            if not _pytest and not (hasattr(logparser, 'progress_bar') and logparser.progress_bar is not None):
-                logparser.update_progress_bar()
-            if hasattr(logparser, 'finalize'):
-                logparser.finalize()
-            if hasattr(logparser, 'write_csv'):
-                logparser.write_csv()
+            finish_logparser(logparser, _pytest)
         if process.returncode != 0 and not process.returncode in ignore_codes:
             logger.error(f'Returncode: {process.returncode}')
             if len(self.stdout) > 0:
-                logger.error('stdout buffer follows\n' + '*' * self.divider_line_length + '\n' + self.stdout + '\n' + '*' * self.divider_line_length)
+                self._report('stdout', out)
             if len(self.stderr) > 0:
-                logger.error('stderr buffer follows\n' + '*' * self.divider_line_length + '\n' + self.stderr + '\n' + '*' * self.divider_line_length)
+                self._report('stderr', err)
             return process.returncode
         if len(override) == 2:
             needle, msg = override
-            if needle in self.stdout or needle in self.stderr:
+            if out.found or err.found:
                 logger.info(f'Returncode: {process.returncode}, but another error was detected:')
                 logger.error(msg)
-                if len(self.stdout) > 0 and needle in self.stdout:
-                    logger.error('stdout buffer follows\n' + '*' * self.divider_line_length + '\n' + self.stdout + '\n' + '*' * self.divider_line_length)
-                if len(self.stderr) > 0 and needle in self.stderr:
-                    logger.error('stderr buffer follows\n' + '*' * self.divider_line_length + '\n' + self.stderr + '\n' + '*' * self.divider_line_length)
-        return 0
\ No newline at end of file
+                if len(self.stdout) > 0 and out.found:
+                    self._report('stdout', out)
+                if len(self.stderr) > 0 and err.found:
+                    self._report('stderr', err)
+        return 0
+
+    def _report(self, name: str, capture: _StreamCapture):
+        """Log the retained tail of one output stream."""
+        what = f'last {len(capture.text())} characters of {name}' if capture.truncated else f'{name} buffer'
+        logger.error(f'{what} follows\n' + '*' * self.divider_line_length + '\n' + capture.text() + '\n' + '*' * self.divider_line_length)
+
+    def _stream(self, process: subprocess.Popen, out: _StreamCapture, err: _StreamCapture, log, logparser: LogParser, _pytest: bool):
+        """
+        Pump the child's output until both of its pipes close.
+
+        Both pipes are multiplexed with :mod:`selectors` and read in chunks of up to
+        :attr:`read_chunk` bytes, so a chatty stderr can never fill its pipe and stall the child
+        while stdout is being read.  stdout goes to the log file (buffered; flushed with each
+        batch), to ``out``, and -- in batches of :attr:`batch_chars` characters or every
+        :attr:`batch_seconds` -- to the log parser and its progress bar.  stderr goes to ``err``.
+        """
+        sel = selectors.DefaultSelector()
+        sel.register(process.stdout, selectors.EVENT_READ, out)
+        if process.stderr is not None:
+            sel.register(process.stderr, selectors.EVENT_READ, err)
+        pending: list[str] = []
+        npending = 0
+        last_flush = time.monotonic()
+
+        def flush():
+            nonlocal npending, last_flush
+            if logparser and pending:
+                with telemetry.section('log parse'):
+                    logparser.update(''.join(pending))
+                if not _pytest:
+                    logparser.update_progress_bar()
+            pending.clear()
+            npending = 0
+            if log:
+                log.flush()
+            last_flush = time.monotonic()
+
+        try:
+            while sel.get_map():
+                for key, _ in sel.select(timeout=self.batch_seconds):
+                    data = os.read(key.fd, self.read_chunk)
+                    capture: _StreamCapture = key.data
+                    if not data:
+                        sel.unregister(key.fileobj)
+                    text = capture.feed(data, final=not data)
+                    if capture is out and text:
+                        if log:
+                            log.write(text)
+                        pending.append(text)
+                        npending += len(text)
+                if npending >= self.batch_chars or time.monotonic() - last_flush >= self.batch_seconds:
+                    flush()
+            flush()
+        finally:
+            sel.close()
+            process.stdout.close()
+            if process.stderr is not None:
+                process.stderr.close()
\ No newline at end of file
@@ -134,7 +134,16 @@ class Config(Yclept):
         self._set_internal_shortcuts()
         self._set_shell_commands(verify_access=(self.userfile != ''))
         self._set_kwargs_to_scripters()
-        self.scripters = {
+        self.scripters = self.make_scripters()
+        return self
+
+    def make_scripters(self) -> dict:
+        """
+        A new set of scripters, built from the configuration.  :meth:`configure` makes the set the
+        tasks share; a task run concurrently with others gets a set of its own, since a scripter
+        holds the script being written.
+        """
+        return {
             'psfgen': PsfgenScripter(**self.kwargs_to_scripters),
             'namd': NAMDScripter(**self.kwargs_to_scripters),
             'tcl': VMDScripter(**self.kwargs_to_scripters),
@@ -142,9 +151,8 @@ class Config(Yclept):
             'vmd': VMDScripter(**self.kwargs_to_scripters),
             'namd_colvar': NAMDColvarInputScripter(**self.kwargs_to_scripters)
         }
-        return self
 
-    def taskless_subconfig(self) -> 'Config':
+    def taskless_subconfig(self, ncpus: int = 0) -> 'Config':
         """ Create a taskless subconfiguration from the progenitor configuration.
 
         The subconfiguration inherits the progenitor's user settings (NAMD launcher,
@@ -153,9 +161,12 @@ class Config(Yclept):
         in the same execution environment as the top-level run.  Only the task list is
         reset to empty; without this inheritance the subcontroller would fall back to
         schema defaults (e.g. ``cpu-parallel-launcher: auto``) and ignore user overrides.
+
+        A positive ``ncpus`` limits the subconfiguration to that many PEs, as ``--ncpus`` would;
+        subcontrollers that run side by side split the progenitor's CPUs this way.
         """
         user_overrides = {k: copy.deepcopy(v) for k, v in self['user'].items() if k != 'tasks'}
-        subconfig = self.__class__(userdict=user_overrides, quiet=True, RM=self.RM).configure()
+        subconfig = self.__class__(userdict=user_overrides, quiet=True, RM=self.RM, ncpus_override=ncpus).configure()
         subconfig['user']['tasks'] = TaskList([])
         return subconfig
 
@@ -206,6 +217,8 @@ class Config(Yclept):
             tcl_script_path = self.tcl_script_path,
             vmd = self.shell_commands['vmd'],
             vmd_startup_script = self.vmd_startup_script,
+            vmd_workers = self['user']['vmd']['workers'],
+            vmd_worker_max_jobs = self['user']['vmd']['worker-max-jobs'],
         )
 
     def _set_processor_info(self):
@@ -345,11 +358,11 @@ class Config(Yclept):
         out, or reports something unrecognized warns and continues: an advisory probe must never be
         able to block a build through its own malfunction.
         """
-        from ..util.provenance import catdcd_version
+        from ..util.provenance import cached_version, catdcd_version
         cmd = self.shell_commands.get('catdcd')
         if not cmd or not shutil.which(cmd):
             return          # presence is the required-command loop's business, not ours
-        reported = catdcd_version(cmd)
+        reported = cached_version(catdcd_version, cmd)
         parsed = _version_tuple(reported)
         want = '.'.join(str(v) for v in MIN_CATDCD_VERSION)
         if parsed is None:
@@ -63,6 +63,7 @@ class Controller:
         self.restart = False   # --restart: resume from the last cleanly-completed task
         self.fresh = False     # --fresh: ignore any existing manifest
         self.from_task = None  # --from: resume explicitly at this task (index or taskname)
+        self.build_cache = None  # --build-cache: a BuildCache to restore from and store into
         self.packet = None     # provisioning packet, kept for the resume state-restore
 
     def configure(self, config: Config, userspecs: dict = {}, index: int = 0, terminate: bool = True,
@@ -98,10 +99,10 @@ class Controller:
         return self
 
     @classmethod
-    def spawn_subcontroller(cls, progenitor: 'Controller') -> 'Controller':
+    def spawn_subcontroller(cls, progenitor: 'Controller', ncpus: int = 0) -> 'Controller':
         logger.debug(f'Spawning subcontroller from {progenitor.index:02d}')
         subcontroller = cls()
-        subcontroller.configure(progenitor.config.taskless_subconfig(), index=progenitor.index+1, terminate=False)
+        subcontroller.configure(progenitor.config.taskless_subconfig(ncpus=ncpus), index=progenitor.index+1, terminate=False)
         subcontroller.parent = progenitor
         return subcontroller
     
@@ -138,12 +139,16 @@ class Controller:
 
     def do_tasks(self) -> dict:
         """
-        Execute the tasks in the order they were defined.
+        Execute the tasks, each as soon as the tasks it depends on have succeeded.
 
-        This method iterates through the list of tasks, executing each one in turn.
-        It collects the results of each task in a report dictionary, which maps task indices to their
-        names, indices, and results. If any task fails (i.e., returns a non-zero result),
-        a warning is logged, and the execution of subsequent tasks is aborted.
+        Dependencies come from the tasks' pipeline contracts (see
+        :func:`~pestifer.tasks.pipeline_contract.task_dependencies`), and tasks that do not depend
+        on each other may run at the same time when their :meth:`resource_demand
+        <pestifer.tasks.basetask.BaseTask.resource_demand>` fits within the configuration's CPUs and
+        GPUs (see :mod:`pestifer.core.scheduler`); otherwise tasks run one at a time in the order
+        they were defined.  The results of each task are collected in a report dictionary, which
+        maps task indices to their names, indices, and results. If any task fails (i.e., returns a
+        non-zero result), a warning is logged, and no further tasks are started.
 
         Returns
         -------
@@ -155,37 +160,86 @@ class Controller:
             - ``taskindex``: The index of the task
             - ``result``: The task's return code
         """
+        from ..tasks.pipeline_contract import task_dependencies
+        from .scheduler import TaskScheduler
         task_report = {}
-        task_durations = 0
+        try:
+            dependencies = task_dependencies(self.tasks)
+        except Exception as exc:
+            logger.debug(f'Task dependencies unavailable ({exc}); running tasks in order')
+            dependencies = {t.index: {u.index for u in self.tasks if u.index < t.index} for t in self.tasks}
+        cache_keys = {}    # build-cache keys, computed before execute() -- some tasks mutate their specs
         manifest, resume_from = self._init_run_manifest()   # (None, 0) for subcontrollers
         if resume_from > 0:
             self._restore_state_for_resume(manifest, resume_from)
             self._clean_resumed_task_outputs(resume_from)
-        for task in self.tasks:
-            if task.index < resume_from:
-                logger.info(f"--restart: skipping completed task {task.index:02d} '{task.taskname}'")
-                continue
-            pre_hash = None
+            for task in self.tasks:
+                if task.index < resume_from:
+                    logger.info(f"--restart: skipping completed task {task.index:02d} '{task.taskname}'")
+        elif self.build_cache is not None and self.index == 0:
+            resume_from = self._restore_from_build_cache(manifest, dependencies, cache_keys)
+        todo = [task for task in self.tasks if task.index >= resume_from]
+
+        from .run_manifest import spec_hash
+        pre_hashes = {}    # computed BEFORE execute() -- some tasks mutate their specs
+        finished_state = {}
+        recorder = _ManifestRecorder(manifest, self.pipeline, todo)
+
+        def on_start(task):
             if manifest is not None:
-                from .run_manifest import spec_hash
-                pre_hash = spec_hash(task.specs)   # BEFORE execute() -- some tasks mutate their specs
-            returned_result = task.execute()
-            task_report[task.index] = dict(taskname=task.taskname, taskindex=task.index, result=returned_result)
-            task_durations += task.duration
+                pre_hashes[task.index] = spec_hash(task.specs)
+            if self.build_cache is not None and self.index == 0:
+                upstream = [cache_keys.get(i) for i in dependencies.get(task.index, ())]
+                cache_keys[task.index] = None if None in upstream else self._build_cache_key(task, upstream)
+
+        def on_finish(task):
+            # the state as this task left it, before a concurrently running task can move it on
+            finished_state[task.index] = self.pipeline.get_current_artifact('state')
+
+        def on_done(task):
+            task_report[task.index] = dict(taskname=task.taskname, taskindex=task.index, result=task.result)
             if task.result != 0:
-                logger.warning(f'Task {task.taskname} failed; task.result {task.result} returned result {returned_result} controller is aborted.')
-                self.exit_code = task.result if isinstance(task.result, int) and task.result != 0 else 1
-                break
-            if manifest is not None:
-                manifest.record(task, self.pipeline, task_spec_hash=pre_hash)   # durable resume point
-        if manifest is not None and task_report and all(r['result'] == 0 for r in task_report.values()):
+                logger.warning(f'Task {task.taskname} failed; task.result {task.result}; controller is aborted.')
+            recorder.finished(task, pre_hashes.get(task.index), finished_state.get(task.index))
+            if task.result == 0 and cache_keys.get(task.index):
+                from .run_manifest import _state_files
+                self.build_cache.put(cache_keys[task.index], task.taskname,
+                                     _state_files(finished_state.get(task.index)),
+                                     data=self._data_artifacts_of(task))
+
+        scheduler = TaskScheduler(todo, dependencies,
+                                  ncpus=getattr(self.config, 'ncpus', 1) or 1,
+                                  ngpus=getattr(self.config, 'ngpus', 0) or 0,
+                                  on_start=self._private_scripters(todo, dependencies, on_start),
+                                  on_done=on_done, on_finish=on_finish)
+        scheduler.run()
+        failed = sorted(i for i, r in task_report.items() if r['result'] != 0)
+        if failed:
+            result = task_report[failed[0]]['result']
+            self.exit_code = result if isinstance(result, int) and result != 0 else 1
+        if manifest is not None and task_report and not failed and len(task_report) == len(todo):
             manifest.mark_complete()   # a finished build has nothing to resume
+        task_durations = sum(task.duration for task in self.tasks if task.index in task_report)
         for task in self.tasks:
             if task.index not in task_report:
                 continue
             task_report[task.index]['duration'] = task.duration
             task_report[task.index]['duration_frac'] = task.duration/task_durations if task_durations > 0 else 0
-        return task_report
+        return dict(sorted(task_report.items()))
+
+    def _private_scripters(self, tasks, dependencies, on_start):
+        """Wrap ``on_start`` so that each task that might run concurrently with another gets its
+        own scripters; scripters hold the script being written, so two tasks cannot share one."""
+        ancestors = {t.index: _ancestors(t.index, dependencies) for t in tasks}
+        def overlapping(task):
+            # a task ordered (through its dependencies) against every other one never overlaps any
+            return any(task.index not in ancestors[t.index] and t.index not in ancestors[task.index]
+                       for t in tasks if t is not task)
+        def wrapped(task):
+            if hasattr(self.config, 'make_scripters') and overlapping(task):
+                task.scripters = self.config.make_scripters()
+            on_start(task)
+        return wrapped
 
     def _init_run_manifest(self):
         """Return ``(manifest, resume_from)`` for a top-level build, or ``(None, 0)``.
@@ -287,16 +341,106 @@ class Controller:
             logger.info(f'--restart: task {k:02d} recorded no STATE fileset; the resume task is an '
                         f'origin, nothing to restore')
             return
-        from ..tasks.continuation import ContinuationTask
         logger.info(f'--restart: restoring STATE from task {k:02d}: {state}')
+        if not self._continue_from_state(state, k):
+            raise PestiferBuildError(
+                f'--restart: could not restore state from task {k:02d} ({state}); '
+                f'the recorded files may be missing or corrupt -- rebuild with --fresh')
+
+    def _continue_from_state(self, state: dict, k: int) -> bool:
+        """Register the ``{slot: filename}`` fileset ``state`` as the pipeline STATE by running a
+        `continuation` standing in for task ``k``; True if it succeeded."""
+        from ..tasks.continuation import ContinuationTask
         ct = ContinuationTask(specs=dict(state), index=k)
         if self.packet is not None:
             ct.provision(self.packet)
         ct.controller_index = self.index
-        if ct.execute() != 0:
-            raise PestiferBuildError(
-                f'--restart: could not restore state from task {k:02d} ({state}); '
-                f'the recorded files may be missing or corrupt -- rebuild with --fresh')
+        return ct.execute() == 0
+
+    def _build_cache_key(self, task, upstream=()) -> str | None:
+        """``task``'s build-cache key given the current STATE and the keys ``upstream`` of the tasks
+        it depends on, or None if its result is not cached (a terminal task, or one whose contract
+        cannot be read)."""
+        from .run_manifest import _state_files
+        from .build_cache import file_digest
+        try:
+            contract = task.pipeline_contract(task.specs)
+            if contract.terminal or contract.standalone:
+                return None
+            state = _state_files(self.pipeline.get_current_artifact('state'))
+            return self.build_cache.key(task, {slot: file_digest(name) for slot, name in state.items()},
+                                        upstream)
+        except Exception as exc:
+            logger.debug(f'build cache: no key for task {task.index:02d} ({exc})')
+            return None
+
+    def _data_artifacts_of(self, task) -> dict:
+        """The plain, JSON-serializable data artifacts ``task`` left in the pipeline head."""
+        import json
+        from .artifacts import DataArtifact
+        data = {}
+        for key, artifact in list(self.pipeline.head.items()):
+            if type(artifact) is DataArtifact and artifact.produced_by is task:
+                try:
+                    json.dumps(artifact.data)
+                except (TypeError, ValueError):
+                    continue
+                data[key] = artifact.data
+        return data
+
+    def _restore_from_build_cache(self, manifest, dependencies, cache_keys) -> int:
+        """Restore the longest prefix of the pipeline found in the build cache; returns the index of
+        the first task to run.
+
+        Tasks are looked up in order, each keyed on the STATE the hit before it left and on the keys
+        of the tasks it depends on (``dependencies``, ``{task index: earlier task indices}``); the
+        restored tasks' keys are put in ``cache_keys``, for the keys of the tasks that run.  The prefix
+        is backed up, as a ``--restart`` resume point is, so that no task after it needs a currency
+        other than STATE from a skipped task.  The last hit's STATE files are copied into the build
+        directory and registered by a `continuation`; the skipped tasks' data artifacts are
+        registered again, and each skipped task is recorded in the run manifest with the restored
+        fileset, so an interrupted build can still ``--restart``.  Any failure falls back to
+        running the whole pipeline."""
+        from .run_manifest import guard_resume_point, spec_hash
+        from .artifacts import DataArtifact
+        cache = self.build_cache
+        hits = []
+        keys = {}
+        digests = {}
+        for task in self.tasks:
+            try:
+                contract = task.pipeline_contract(task.specs)
+            except Exception:
+                break
+            if contract.terminal or contract.standalone:
+                break
+            keys[task.index] = cache.key(task, digests, [keys[i] for i in dependencies.get(task.index, ())])
+            entry = cache.get(keys[task.index])
+            if entry is None:
+                break
+            hits.append((task, entry, sorted(str(c) for c in contract.provides)))
+            digests = {slot: record['digest'] for slot, record in entry['state'].items()}
+        rp = guard_resume_point(self.tasks, len(hits) - 1,
+                                {t.index: set(provides) for t, _, provides in hits}, {'state'})
+        hits = hits[:rp + 1]
+        if not hits:
+            return 0
+        task, entry, _ = hits[-1]
+        state = cache.restore(entry)
+        if state is None:
+            return 0
+        if state and not self._continue_from_state(state, task.index):
+            logger.warning('build cache: could not register the restored state; running every task')
+            return 0
+        for task, entry, _ in hits:
+            cache_keys[task.index] = keys[task.index]
+            for key, data in entry.get('data', {}).items():
+                self.pipeline.register(data, key=key, requestor=task, artifact_type=DataArtifact)
+            task.result = 0
+            logger.info(f"build cache: task {task.index:02d} '{task.taskname}' restored from cache")
+            if manifest is not None:
+                manifest.record(task, self.pipeline, task_spec_hash=spec_hash(task.specs))
+        return len(hits)
 
     def write_complete_config(self, filename='complete-user.yaml'):
         """ 
@@ -309,4 +453,54 @@ class Controller:
         filename : str, optional
             The name of the file to which the user configuration will be written. Default is 'complete-user.yaml'.
         """
-        self.config.dump_user(filename=filename)
\ No newline at end of file
+        self.config.dump_user(filename=filename)
+
+
+def _ancestors(index, dependencies):
+    """Every task index that ``index`` depends on, directly or not."""
+    seen, stack = set(), list(dependencies.get(index, ()))
+    while stack:
+        i = stack.pop()
+        if i not in seen:
+            seen.add(i)
+            stack.extend(dependencies.get(i, ()))
+    return seen
+
+
+class _ManifestRecorder:
+    """
+    Records finished tasks in a :class:`~pestifer.core.run_manifest.RunManifest` in pipeline
+    order.  ``--restart`` resumes after the longest run of completed tasks from the top, so a task
+    that finishes ahead of an earlier one is held back until the earlier one is recorded; a task
+    that leaves STATE alone is recorded with the state of the task recorded before it, which is
+    the state it saw in a serial run.
+    """
+
+    def __init__(self, manifest, pipeline, tasks):
+        from ..tasks.pipeline_contract import resolve_contracts, STATE
+        self.manifest = manifest
+        self.pipeline = pipeline
+        self.order = [t.index for t in tasks]
+        self.held = {}
+        self.state = None
+        self.touches_state = {}
+        if manifest is None:
+            return
+        try:
+            contracts = resolve_contracts(tasks)
+        except Exception:
+            contracts = [None] * len(tasks)
+        for task, contract in zip(tasks, contracts):
+            self.touches_state[task.index] = (contract is None or contract.terminal
+                                              or STATE in contract.requires or STATE in contract.provides)
+
+    def finished(self, task, pre_hash, state):
+        if self.manifest is None or task.result != 0:
+            return
+        self.held[task.index] = (task, pre_hash, state)
+        while self.order and self.order[0] in self.held:
+            task, pre_hash, state = self.held.pop(self.order.pop(0))
+            if not self.touches_state.get(task.index, True) and self.state is not None:
+                state = self.state
+            self.state = state
+            self.manifest.record(task, self.pipeline, task_spec_hash=pre_hash, state=state)   # durable resume point
@@ -8,12 +8,24 @@ This method requires an object, a key, the id of the object requesting the regis
 """
 from __future__ import annotations
 import logging
+import threading
+
+from functools import wraps
 
 from .artifacts import Artifact, FileArtifact, ArtifactDict, ArtifactList, FileArtifactDict, FileArtifactList, StateArtifacts
 from ..util.stringthings import my_logger
 
 logger = logging.getLogger(__name__)
 
+def _locked(method):
+    """Run ``method`` holding the pipeline's lock: tasks the scheduler runs side by side share
+    one pipeline."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class PipelineContext:
     """ Context for managing the pipeline of artifacts by which tasks communicate. 
     
@@ -31,10 +43,12 @@ class PipelineContext:
         self.head: ArtifactDict = ArtifactDict(key='Head')
         self.history: ArtifactList = ArtifactList(key='History')
         self.controller_index = controller_index
+        self._lock = threading.RLock()
 
     def __repr__(self):
         return f"PipelineContext(controller_index={self.controller_index})"
 
+    @_locked
     def register(self, data: object, key: str, requestor: object, artifact_type: type = Artifact | ArtifactList | ArtifactDict, **kwargs) -> Artifact:
         """
         Artifact registrar.  If an artifact with the requested key already exists, and the data is the same, the existing artifact
@@ -97,6 +111,7 @@ class PipelineContext:
             logger.debug(f'File artifact {fa.name} does not exist; not registering.')
             return None
 
+    @_locked
     def rekey(self, old_key: str, new_key: str):
         """
         Change the key of an existing artifact in the head.
@@ -161,6 +176,7 @@ class PipelineContext:
         else:
             logger.debug(f'{"    "*depth}- "{artifact.key}" {my_id_str}: ***Unknown artifact type: {type(artifact)}***')
 
+    @_locked
     def bury(self, artifact: Artifact):
         """
         Bury an artifact in the history without registering it as a current artifact
@@ -172,6 +188,7 @@ class PipelineContext:
         """
         self.history.append(artifact)
 
+    @_locked
     def get_current_artifact(self, key: str, **kwargs) -> Artifact | None:
         return self.head.get(key, None)
 
@@ -306,6 +323,7 @@ class PipelineContext:
         """
         return "\n".join([f"{h.key}: {h.data} (produced by {h.produced_by})" for h in self.history])
 
+    @_locked
     def stash(self, key: str) -> str:
         """
         Stash the current artifact under a new key.
@@ -319,6 +337,7 @@ class PipelineContext:
         if artifact:
             self.history.append(artifact)
 
+    @_locked
     def import_artifacts(self, other: PipelineContext):
         """
         Import artifacts from another pipeline context.
@@ -0,0 +1,153 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Defines the :class:`ResnameSearchIndex` class, an n-gram index for substring, prefix, and
+fuzzy searches over residue names and their descriptive synonyms.
+
+:meth:`ResourceManager.search_resnames <pestifer.core.resourcemanager.ResourceManager.search_resnames>`
+used to rebuild the merged set of names (CHARMM ``RESI``/``PRES``, user-custom residues, PDB
+repository) and scan it linearly on every call.  This index is built once per distinct set of
+names and shared by every :class:`~pestifer.core.resourcemanager.ResourceManager` in the
+process (see :meth:`ResnameSearchIndex.shared`):
+
+- every 1-, 2- and 3-character substring of every name is posted, so a needle of up to three
+  characters is answered by one dictionary lookup and a longer one by intersecting the
+  postings of its trigrams and verifying the few survivors;
+- synonyms (e.g. ``"1-palmitoyl-2-oleoyl-sn-glycero-3-phosphocholine"``) are posted by
+  trigram only;
+- prefix queries bisect a sorted name list;
+- fuzzy queries rank names by shared trigrams of the anchored name (``^NAME$``) and
+  re-rank the best candidates with :class:`difflib.SequenceMatcher`.
+"""
+import logging
+
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class ResnameSearchIndex:
+    """
+    An n-gram index over residue names (case-insensitive) and their synonyms.
+
+    Parameters
+    ----------
+    synonyms : dict
+        Maps each residue name to its descriptive synonym (``''`` if it has none).
+    """
+
+    _shared: dict = {}
+    """Process-wide indices, keyed by the caller's description of the name set (see :meth:`shared`)."""
+
+    def __init__(self, synonyms: dict[str, str]):
+        self.names = sorted(synonyms, key=str.upper)
+        self._upper = [n.upper() for n in self.names]
+        self._synonyms = [(synonyms[n] or '').upper() for n in self.names]
+        self._name_postings: dict[str, set[int]] = {}
+        self._synonym_postings: dict[str, set[int]] = {}
+        self._fuzzy_postings: dict[str, set[int]] = {}
+        for i, (name, synonym) in enumerate(zip(self._upper, self._synonyms)):
+            for n in (1, 2, 3):
+                for g in _grams(name, n):
+                    self._name_postings.setdefault(g, set()).add(i)
+            for g in _grams(synonym, 3):
+                self._synonym_postings.setdefault(g, set()).add(i)
+            for g in _grams(f'^{name}$', 3):
+                self._fuzzy_postings.setdefault(g, set()).add(i)
+        logger.debug(f'Indexed {len(self.names)} residue names ({len(self._name_postings)} name '
+                     f'n-grams, {len(self._synonym_postings)} synonym trigrams)')
+
+    @classmethod
+    def shared(cls, key: Hashable, synonyms: Callable[[], dict[str, str]]) -> 'ResnameSearchIndex':
+        """Return the process-wide index for ``key``, building it from ``synonyms()`` on first use.
+
+        ``key`` must change whenever the set of names would (e.g. it carries the force-field
+        path and the user-custom and PDB-collection contents); ``synonyms`` is only called on
+        a miss, so a hit costs nothing beyond computing the key.
+        """
+        index = cls._shared.get(key)
+        if index is None:
+            index = cls(synonyms())
+            cls._shared[key] = index
+        return index
+
+    @classmethod
+    def forget_shared(cls):
+        """Drop every process-wide index (after the underlying residue sets change)."""
+        cls._shared.clear()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        i = bisect_left(self._upper, name.upper())
+        return i < len(self._upper) and self._upper[i] == name.upper()
+
+    def _candidates(self, needle: str, postings: dict[str, set[int]]) -> set[int] | None:
+        """Ids whose text may contain ``needle``: exact for ``len(needle) <= 3`` on names,
+        a superset (to be verified) otherwise; ``None`` if the postings cannot narrow it."""
+        if len(needle) <= 3 and postings is self._name_postings:
+            return set(postings.get(needle, ()))
+        if len(needle) < 3:
+            return None
+        sets = sorted((postings.get(g, set()) for g in _grams(needle, 3)), key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            if not result:
+                break
+            result &= s
+        return result
+
+    def contains(self, substring: str, synonyms: bool = False) -> list[str]:
+        """Return the names containing ``substring`` (case-insensitive), in sorted order.
+
+        With ``synonyms=True`` a name also matches when its synonym contains ``substring``.
+        """
+        needle = substring.upper()
+        if not needle:
+            return list(self.names)
+        hits = {i for i in self._candidates(needle, self._name_postings) if needle in self._upper[i]}
+        if synonyms:
+            candidates = self._candidates(needle, self._synonym_postings)
+            if candidates is None:
+                candidates = range(len(self.names))
+            hits.update(i for i in candidates if needle in self._synonyms[i])
+        return [self.names[i] for i in sorted(hits)]
+
+    def startswith(self, prefix: str) -> list[str]:
+        """Return the names beginning with ``prefix`` (case-insensitive), in sorted order."""
+        p = prefix.upper()
+        i = bisect_left(self._upper, p)
+        out = []
+        while i < len(self._upper) and self._upper[i].startswith(p):
+            out.append(self.names[i])
+            i += 1
+        return out
+
+    def fuzzy(self, query: str, limit: int = 5, cutoff: float = 0.5) -> list[str]:
+        """Return up to ``limit`` names most similar to ``query``, best first.
+
+        Candidates sharing trigrams with ``^QUERY$`` are ranked by shared-trigram count; the
+        best few are re-ranked by :class:`difflib.SequenceMatcher` ratio, and those below
+        ``cutoff`` are dropped.
+        """
+        q = query.upper()
+        shared = Counter()
+        for g in _grams(f'^{q}$', 3):
+            shared.update(self._fuzzy_postings.get(g, ()))
+        if not shared:
+            return []
+        pool = [i for i, _ in shared.most_common(max(50, 5 * limit))]
+        scored = []
+        for i in pool:
+            ratio = SequenceMatcher(None, q, self._upper[i]).ratio()
+            if ratio >= cutoff:
+                scored.append((-ratio, self._upper[i], i))
+        scored.sort()
+        return [self.names[i] for _, _, i in scored[:limit]]
@@ -11,12 +11,11 @@ from pathlib import Path
 from typing import Callable
 
 from .errors import PestiferError
-from .examplemanager import ExampleManager
 from .labels import Labels
+from .resnamesearch import ResnameSearchIndex
 
 from .. import resources
 
-from ..charmmff.charmmffcontent import CHARMMFFContent, charmmff_version_key
 from ..util.gitutil import get_git_origin_url
 
 logger = logging.getLogger(__name__)
@@ -89,6 +88,7 @@ class ResourceManager:
         version directory is used as the default.
         """
         if version_str:
+            from ..charmmff.charmmffcontent import charmmff_version_key
             key = charmmff_version_key(version_str)
             path = Path(self.resource_path['charmmff']) / key
             if not path.is_dir():
@@ -102,6 +102,9 @@ class ResourceManager:
     @property
     def charmmff_content(self):
         if self._charmmff_content is None:
+            # imported on first use, like ExampleManager below: commands that only need the
+            # resource paths (e.g. wheretcl) should not pay for the force-field machinery
+            from ..charmmff.charmmffcontent import CHARMMFFContent
             charmmff_path = self.charmmff_version_path(self._charmmff_config.get('release', ''))
             logger.info(f'Using CHARMMFF version: {charmmff_path.name}')
             user_custom = self._charmmff_config.get('user_custom', {})
@@ -128,6 +131,7 @@ class ResourceManager:
     @property
     def example_manager(self):
         if self._example_manager is None:
+            from .examplemanager import ExampleManager
             is_source_package_with_git = os.path.isdir(os.path.join(self.package_path, '.git'))
             if is_source_package_with_git:
                 remote = get_git_origin_url()
@@ -258,25 +262,49 @@ class ResourceManager:
             self._resname_index_cache = ResnameIndex(self.charmmff_content.charmmff_path).index
         return self._resname_index_cache
 
-    def all_resnames(self) -> set:
-        """Every residue/patch name pestifer knows about -- the union of the CHARMM
-        ``RESI``/``PRES`` names (from the cached index, plus any user-custom residues) and the
-        resnames in the PDB repository."""
+    def resname_search_index(self) -> ResnameSearchIndex:
+        """The :class:`~pestifer.core.resnamesearch.ResnameSearchIndex` over every residue/patch
+        name pestifer knows about -- the CHARMM ``RESI``/``PRES`` names (from the cached index,
+        plus any user-custom residues) and the resnames in the PDB repository -- with their
+        synonyms.  Built lazily and shared process-wide among resource managers that see the
+        same force field, user-custom residues, and PDB collections."""
         cc = self.charmmff_content
         if cc.pdbrepository is None:
             cc.provision_pdbrepository()
-        names = set(self._resname_index().keys())
-        names |= getattr(cc, 'user_custom_resnames', set())
-        if cc.pdbrepository:
-            for coll in cc.pdbrepository.collections.values():
-                names.update(coll.info.keys())
-        return names
-
-    def search_resnames(self, substring: str) -> list:
+        user_custom = frozenset(getattr(cc, 'user_custom_resnames', set()))
+        collections = cc.pdbrepository.collections if cc.pdbrepository else {}
+        key = (str(cc.charmmff_path), user_custom,
+               tuple(sorted((name, len(coll.info)) for name, coll in collections.items())))
+
+        def _synonyms():
+            synonyms = {name: entry.get('synonym') or '' for name, entry in self._resname_index().items()}
+            for name in user_custom:
+                synonyms.setdefault(name, '')
+            for coll in collections.values():
+                for name, info in coll.info.items():
+                    if not synonyms.get(name):
+                        synonyms[name] = (info.get('synonym') or '').strip()
+            for name, fullname in self.labels.residue_fullnames.items():
+                if name in synonyms and not synonyms[name]:
+                    synonyms[name] = fullname
+            return synonyms
+
+        return ResnameSearchIndex.shared(key, _synonyms)
+
+    def all_resnames(self) -> set:
+        """Every residue/patch name pestifer knows about (see :meth:`resname_search_index`)."""
+        return set(self.resname_search_index().names)
+
+    def search_resnames(self, substring: str, synonyms: bool = False) -> list:
         """Return the sorted residue names (see :meth:`all_resnames`) that contain
-        ``substring`` (case-insensitive)."""
-        needle = substring.upper()
-        return sorted(name for name in self.all_resnames() if needle in name.upper())
+        ``substring`` (case-insensitive); with ``synonyms=True``, also those whose
+        descriptive synonym contains it."""
+        return self.resname_search_index().contains(substring, synonyms=synonyms)
+
+    def suggest_resnames(self, resname: str, limit: int = 5) -> list:
+        """Return up to ``limit`` known residue names most similar to ``resname``, best first
+        (for "did you mean" hints on a name that is not found)."""
+        return self.resname_search_index().fuzzy(resname, limit=limit)
 
     def get_resource_path(self,r):
         """
@@ -370,6 +398,7 @@ class ResourceManager:
         from ..util.cacheable_object import CacheableObject
         CacheableObject.clear_cache()
         self._resname_index_cache = None
+        ResnameSearchIndex.forget_shared()
 
         return {
             'resnames': resnames,
@@ -478,6 +507,7 @@ class ResourceManager:
         from ..util.cacheable_object import CacheableObject
         CacheableObject.clear_cache()
         self._resname_index_cache = None
+        ResnameSearchIndex.forget_shared()
 
     def add_pdb_entry(self, entry_dir, collection: str = None, force: bool = False) -> dict:
         """
@@ -631,6 +661,7 @@ class ResourceManager:
             The derived ``segtype -> sorted[resnames]`` mapping that was written.
         """
         import json
+        from ..charmmff.charmmffcontent import CHARMMFFContent
         from ..charmmff.segtype_classifier import derive_segtypes
         from .labels import curated_resname_set, water_resnames, _DERIVED_SEGTYPES_PATH
 
@@ -57,6 +57,36 @@ def _state_files(state) -> dict:
     return out
 
 
+def guard_resume_point(tasks, rp, provides_by_index, restored) -> int:
+    """Back ``rp`` up so no task after it needs a currency, other than the ``restored`` ones, that
+    only a skipped task (index <= ``rp``) provides; see :meth:`RunManifest._guard_currencies`.
+    ``provides_by_index`` maps each skipped task's index to the currencies it provides."""
+    changed = True
+    while changed and rp >= 0:
+        changed = False
+        available = set(restored)
+        for t in tasks:
+            if t.index <= rp:
+                continue
+            try:
+                contract = t.pipeline_contract(t.specs)
+                req = set(getattr(contract, 'requires', ()) or ())
+                prov = set(getattr(contract, 'provides', ()) or ())
+            except Exception:
+                req, prov = set(), set()
+            missing = req - available
+            suppliers = [i for i, p in provides_by_index.items() if i <= rp and (p & missing)]
+            if suppliers:
+                rp = min(suppliers) - 1   # re-run from the earliest needed supplier
+                changed = True
+                break
+            available |= prov
+    return rp
+
+
+_CURRENT = object()   # RunManifest.record: "the pipeline's current state"
+
+
 class RunManifest:
     """The build's per-task completion record, persisted atomically as it grows."""
 
@@ -80,7 +110,7 @@ class RunManifest:
         m.data = raw
         return m
 
-    def record(self, task, pipeline, task_spec_hash=None) -> None:
+    def record(self, task, pipeline, task_spec_hash=None, state=_CURRENT) -> None:
         """Append (or replace) the entry for a cleanly-completed ``task`` and persist.
 
         Records the current ``state`` fileset (unchanged tasks carry the prior state forward) and the
@@ -92,9 +122,14 @@ class RunManifest:
         so hashing here (post-execution) would not match the pre-execution hash a later ``--restart``
         recomputes.  The caller passes the pre-execution hash; we fall back to hashing now only if it
         is omitted.
+
+        ``state`` is the STATE artifact to record, when it is not the pipeline's current one: tasks
+        that ran concurrently finish out of order, so the caller captures each one's state as it
+        finishes (see :mod:`pestifer.core.scheduler`).
         """
         try:
-            state = pipeline.get_current_artifact('state')
+            if state is _CURRENT:
+                state = pipeline.get_current_artifact('state')
             try:
                 provides = sorted(str(c) for c in task.pipeline_contract(task.specs).provides)
             except Exception:
@@ -149,27 +184,7 @@ class RunManifest:
         static pipeline check owns that case.
         """
         provides_by_index = {e['index']: set(e.get('provides', [])) for e in self.data['tasks']}
-        changed = True
-        while changed and rp >= 0:
-            changed = False
-            available = set(restored)
-            for t in tasks:
-                if t.index <= rp:
-                    continue
-                try:
-                    contract = t.pipeline_contract(t.specs)
-                    req = set(getattr(contract, 'requires', ()) or ())
-                    prov = set(getattr(contract, 'provides', ()) or ())
-                except Exception:
-                    req, prov = set(), set()
-                missing = req - available
-                suppliers = [i for i, p in provides_by_index.items() if i <= rp and (p & missing)]
-                if suppliers:
-                    rp = min(suppliers) - 1   # re-run from the earliest needed supplier
-                    changed = True
-                    break
-                available |= prov
-        return rp
+        return guard_resume_point(tasks, rp, provides_by_index, restored)
 
     def state_entry(self, index: int) -> dict:
         """The recorded ``{slot: filename}`` STATE fileset for a completed task index, or ``{}``."""
@@ -110,12 +110,14 @@ def system_facts_from_tasks(tasks):
     return {}
 
 
-def build_run_record(config, tasks, *, environment=None, citations=None):
+def build_run_record(config, tasks, *, environment=None, citations=None, telemetry=None):
     """Assemble the full record as a plain, JSON-serializable dict.
 
     ``environment`` and ``citations`` are passed in rather than recomputed, so the record carries
     exactly what the build already reported to its log, and the system facts come from the task
-    that captured them rather than from files that no longer exist.
+    that captured them rather than from files that no longer exist.  ``telemetry``, the report of a
+    ``--profile`` build (:meth:`pestifer.core.telemetry.Telemetry.report`), is included only when
+    given.
     """
     from ..util.stringthings import __pestifer_version__
 
@@ -126,7 +128,7 @@ def build_run_record(config, tasks, *, environment=None, citations=None):
         pass
     namd = (user.get('namd') or {}) if isinstance(user, dict) else {}
 
-    return {
+    record = {
         'run_record_version': RUN_RECORD_VERSION,
         'pestifer_version': __pestifer_version__,
         # A record is only written for a build that finished, so its existence already implies
@@ -144,6 +146,9 @@ def build_run_record(config, tasks, *, environment=None, citations=None):
         'system': system_facts_from_tasks(tasks),
         'protocol': protocol_from_tasks(tasks),
     }
+    if telemetry is not None:
+        record['telemetry'] = telemetry
+    return record
 
 
 def write_run_record(record, path=RUN_RECORD_NAME):
@@ -0,0 +1,175 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Dependency-aware execution of a controller's task list.
+
+A pipeline is written as a list, but not every task needs the one before it: an ``mdplot`` and a
+``validate`` that both follow an ``md`` read different currencies and change neither, so they can
+run side by side.  :func:`~pestifer.tasks.pipeline_contract.task_dependencies` works out, from the
+tasks' contracts, which earlier tasks each one must wait for; a :class:`TaskScheduler` then starts
+every task whose dependencies have succeeded, as long as the CPUs and GPUs the running tasks ask
+for (see :meth:`BaseTask.resource_demand <pestifer.tasks.basetask.BaseTask.resource_demand>`) fit
+in the budget.
+
+By default a task asks for the whole budget, so a pipeline of ordinary tasks runs exactly as it
+always has: one task at a time, in order, on the calling thread.  Worker threads are used only
+when two or more tasks can actually run together.  Two instances of the same task class never run
+together, since a class may keep process-wide state (``mdplot`` draws through pyplot's global
+figure).
+"""
+
+import logging
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class TaskScheduler:
+    """
+    Runs ``tasks`` as their dependencies allow, within a CPU/GPU budget.
+
+    Parameters
+    ----------
+    tasks : list of BaseTask
+        Tasks in pipeline order.
+    dependencies : dict
+        ``{task.index: set of task indices it must wait for}``; indices not among ``tasks`` (for
+        example, tasks skipped by ``--restart``) count as already done.
+    ncpus : int
+        CPUs the tasks may use between them.
+    ngpus : int
+        GPUs the tasks may use between them.
+    on_start : callable, optional
+        Called with a task, on the calling thread, just before it is started.
+    on_done : callable, optional
+        Called with a task, on the calling thread, after it finishes (successfully or not).
+    on_finish : callable, optional
+        Called with a task on the thread that ran it, the moment ``execute()`` returns; for
+        capturing pipeline state before another task can change it.
+    """
+
+    def __init__(self, tasks, dependencies, ncpus: int = 1, ngpus: int = 0,
+                 on_start=None, on_done=None, on_finish=None):
+        self.tasks = list(tasks)
+        indices = {t.index for t in self.tasks}
+        self.dependencies = {t.index: set(dependencies.get(t.index, ())) & indices for t in self.tasks}
+        self.ncpus = max(1, ncpus)
+        self.ngpus = max(0, ngpus)
+        self.on_start = on_start
+        self.on_done = on_done
+        self.on_finish = on_finish
+        self.max_concurrent = 0
+        """ Most tasks that were running at once. """
+
+    def demand(self, task) -> tuple[int, int]:
+        """``task``'s (CPU, GPU) demand, clipped to the budget so every task can run at all."""
+        cpus, gpus = task.resource_demand(self.ncpus, self.ngpus)
+        return min(max(0, cpus), self.ncpus), min(max(0, gpus), self.ngpus)
+
+    def _execute(self, task):
+        result = task.execute()
+        if self.on_finish:
+            self.on_finish(task)
+        return result
+
+    def run(self) -> list:
+        """
+        Run the tasks.  After the first failure nothing new is started; tasks already running are
+        allowed to finish.  An exception raised by a task is re-raised once the running tasks have
+        finished.
+
+        Returns
+        -------
+        list of BaseTask
+            The tasks that ran, in the order they finished.
+        """
+        pending = list(self.tasks)
+        succeeded = set()
+        running = {}           # future -> task
+        used = [0, 0]
+        finished = []
+        failed = False
+        error = None
+
+        def finish(task):
+            nonlocal failed
+            finished.append(task)
+            if task.result == 0:
+                succeeded.add(task.index)
+            else:
+                failed = True
+            if self.on_done:
+                self.on_done(task)
+
+        def startable():
+            batch = []
+            cpus, gpus = used
+            classes = {type(t) for t in running.values()}
+            for task in pending:
+                if not self.dependencies[task.index] <= succeeded or type(task) in classes:
+                    continue
+                c, g = self.demand(task)
+                if cpus + c <= self.ncpus and gpus + g <= self.ngpus:
+                    batch.append(task)
+                    classes.add(type(task))
+                    cpus += c
+                    gpus += g
+            return batch
+
+        executor = None
+        try:
+            while pending and not failed and error is None:
+                batch = startable()
+                if not batch and not running:
+                    break      # only tasks whose dependencies failed (or never ran) remain
+                if batch and not running and len(batch) == 1:
+                    # nothing to overlap with: run it here, as a serial pipeline always has
+                    task = batch[0]
+                    pending.remove(task)
+                    if self.on_start:
+                        self.on_start(task)
+                    self.max_concurrent = max(self.max_concurrent, 1)
+                    self._execute(task)
+                    finish(task)
+                    continue
+                if executor is None:
+                    executor = ThreadPoolExecutor(thread_name_prefix='pestifer-task')
+                for task in batch:
+                    pending.remove(task)
+                    if self.on_start:
+                        self.on_start(task)
+                    c, g = self.demand(task)
+                    used[0] += c
+                    used[1] += g
+                    running[executor.submit(self._execute, task)] = task
+                    logger.debug(f'Task {task.index:02d} \'{task.taskname}\' started alongside '
+                                 f'{len(running) - 1} other{"s" if len(running) != 2 else ""}')
+                self.max_concurrent = max(self.max_concurrent, len(running))
+                error = self._collect(running, used, finish)
+            while running:
+                err = self._collect(running, used, finish)
+                error = error or err
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        if error is not None:
+            raise error
+        return finished
+
+    def _collect(self, running, used, finish):
+        """Wait for at least one running task to finish and retire it; returns its exception, if any."""
+        done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        error = None
+        for future in sorted(done, key=lambda f: running[f].index):
+            task = running.pop(future)
+            c, g = self.demand(task)
+            used[0] -= c
+            used[1] -= g
+            exc = future.exception()
+            if exc is not None:
+                logger.error(f'Task {task.index:02d} \'{task.taskname}\' raised {exc!r}')
+                task.result = task.result if isinstance(getattr(task, 'result', None), int) and task.result != 0 else 1
+                error = error or exc
+            finish(task)
+        return error
+
@@ -0,0 +1,280 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Opt-in profiling of a build: where its time and memory go.
+
+``task.duration`` says how long each task took, but not whether that was pestifer parsing a PSF
+or psfgen, VMD or NAMD doing the work, nor how much memory either needed.  With
+``pestifer build --profile`` a :class:`Telemetry` session records, for every task:
+
+- wall time, and the CPU time of the thread that ran it (pestifer's own Python work);
+- every external :class:`~pestifer.core.command.Command` (and every script run in a persistent
+  VMD worker) it launched: wall time and, for a command, the CPU time, peak RSS and block I/O of
+  the child and everything the child waited for;
+- pestifer's peak RSS and the bytes it read and wrote;
+- time inside named hot sections (:func:`section`, :func:`profiled`): PSF parsing, ring checks,
+  parameter consolidation and log parsing.
+
+:meth:`Telemetry.report` is what goes under ``telemetry`` in ``run-record.json``;
+:meth:`Telemetry.write_trace` writes the same spans as a Chrome trace, which ``chrome://tracing``,
+Perfetto and speedscope all open.
+
+Profiling is off unless :func:`enable` is called, and then every hook is a single test of a
+module global.  Pestifer's peak RSS is the process high-water mark as of the end of each task;
+the operating system offers no per-task reset.  ``read_bytes``/``write_bytes`` are process-wide
+(``/proc/self/io``), so tasks the scheduler runs side by side share them.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+_session: Telemetry | None = None
+_local = threading.local()
+
+MAX_TRACE_EVENTS = 200000
+""" Trace events kept; spans beyond this are still summed, only not drawn. """
+
+
+def _rss_mb(maxrss: int) -> float:
+    """``ru_maxrss`` in MB (Linux reports KB, macOS bytes)."""
+    return maxrss / (1024**2 if sys.platform == 'darwin' else 1024)
+
+
+def _peak_rss_mb(who=None) -> float | None:
+    try:
+        import resource
+        return _rss_mb(resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss)
+    except Exception:
+        return None
+
+
+def _io_bytes() -> tuple[int, int] | None:
+    """``(bytes read, bytes written)`` by this process so far, where the OS reports it."""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['rchar']), int(fields['wchar'])
+    except Exception:
+        return None
+
+
+def _stack() -> list:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class _Sections(dict):
+    """``{name: {'calls', 'wall_s', 'cpu_s'}}``"""
+
+    def add(self, name, wall, cpu):
+        s = self.setdefault(name, dict(calls=0, wall_s=0.0, cpu_s=0.0))
+        s['calls'] += 1
+        s['wall_s'] += wall
+        s['cpu_s'] += cpu
+
+
+class CommandProbe:
+    """
+    Measures one external command.  :class:`~pestifer.core.command.Command` reaps its child
+    through :meth:`reap`, which collects the child's own resource usage with ``wait4``.
+    """
+
+    def __init__(self, session: Telemetry, command: str):
+        self.session = session
+        self.command = command
+        self.t0 = time.perf_counter()
+        self.usage = None
+
+    def reap(self, process):
+        """Wait for ``process`` and collect its resource usage; sets its ``returncode``."""
+        try:
+            _, status, self.usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        except ChildProcessError:
+            pass      # already reaped; Popen.wait() will report it
+
+    def finish(self, returncode=None):
+        record = dict(command=self.command[:200], wall_s=time.perf_counter() - self.t0, returncode=returncode)
+        if self.usage is not None:
+            record.update(cpu_s=self.usage.ru_utime + self.usage.ru_stime,
+                          peak_rss_mb=_rss_mb(self.usage.ru_maxrss),
+                          read_bytes=self.usage.ru_inblock * 512,
+                          write_bytes=self.usage.ru_oublock * 512)
+        self.session._command(self.t0, record)
+
+
+class Telemetry:
+    """
+    One build's profile.  Create it with :func:`enable`; tasks, commands and sections report to
+    it through the module-level hooks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.t0 = time.perf_counter()
+        self.tasks: list[dict] = []
+        self.sections = _Sections()
+        self.events: list[dict] = []
+        self._tids: dict[int, int] = {}
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        with self._lock:
+            return self._tids.setdefault(ident, len(self._tids))
+
+    def _event(self, name, cat, t0, wall, args=None):
+        if len(self.events) >= MAX_TRACE_EVENTS:
+            return
+        event = dict(name=name, cat=cat, ph='X', pid=os.getpid(), tid=self._tid(),
+                     ts=round((t0 - self.t0) * 1e6, 1), dur=round(wall * 1e6, 1))
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def task(self, task):
+        """Profile ``task`` while it executes."""
+        stack = _stack()
+        label = f'{getattr(task, "controller_index", 0)}:{task.index:02d}:{task.taskname}'
+        record = dict(index=task.index, taskname=task.taskname,
+                      controller=getattr(task, 'controller_index', 0),
+                      parent=stack[-1]['label'] if stack else None, label=label,
+                      commands=[], sections=_Sections())
+        io0 = _io_bytes()
+        t0, c0 = time.perf_counter(), time.thread_time()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            wall, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            io1 = _io_bytes()
+            commands = record['commands']
+            record.update(start_s=t0 - self.t0, wall_s=wall, cpu_s=cpu,
+                          peak_rss_mb=_peak_rss_mb(),
+                          read_bytes=io1[0] - io0[0] if io0 and io1 else None,
+                          write_bytes=io1[1] - io0[1] if io0 and io1 else None,
+                          external_wall_s=sum(c['wall_s'] for c in commands),
+                          external_cpu_s=sum(c.get('cpu_s', 0.0) for c in commands),
+                          external_peak_rss_mb=max((c.get('peak_rss_mb') or 0.0 for c in commands), default=None),
+                          result=getattr(task, 'result', None))
+            with self._lock:
+                self.tasks.append(record)
+            self._event(task.taskname, 'task', t0, wall, dict(index=task.index, controller=record['controller']))
+
+    @contextmanager
+    def section(self, name):
+        """Profile a named hot section; a section re-entered on the same thread counts once."""
+        active = getattr(_local, 'sections', None)
+        if active is None:
+            active = _local.sections = set()
+        if name in active:
+            yield
+            return
+        active.add(name)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            active.discard(name)
+            wall, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            with self._lock:
+                self.sections.add(name, wall, cpu)
+            stack = _stack()
+            if stack:
+                stack[-1]['sections'].add(name, wall, cpu)
+            self._event(name, 'section', t0, wall)
+
+    def _command(self, t0, record):
+        stack = _stack()
+        if stack:
+            stack[-1]['commands'].append(record)
+        else:
+            with self._lock:
+                self.sections.add('external (no task)', record['wall_s'], 0.0)
+        self._event(record['command'].split()[0] if record['command'] else 'command', 'command', t0,
+                    record['wall_s'], {k: v for k, v in record.items() if k != 'wall_s'})
+
+    def report(self) -> dict:
+        """The profile as a plain, JSON-serializable dict, tasks in the order they started."""
+        import resource
+        tasks = sorted(self.tasks, key=lambda r: r['start_s'])
+        return dict(wall_s=time.perf_counter() - self.t0,
+                    peak_rss_mb=_peak_rss_mb(),
+                    external_peak_rss_mb=_peak_rss_mb(resource.RUSAGE_CHILDREN),
+                    sections={k: dict(v) for k, v in sorted(self.sections.items())},
+                    tasks=[{k: (dict(v) if isinstance(v, _Sections) else v) for k, v in r.items() if k != 'label'}
+                           for r in tasks])
+
+    def write_trace(self, path: str) -> str | None:
+        """Write the spans as a Chrome trace (JSON object format).  Never raises."""
+        try:
+            names = [dict(name='thread_name', ph='M', pid=os.getpid(), tid=tid,
+                          args=dict(name='main' if tid == 0 else f'worker {tid}'))
+                     for tid in sorted(self._tids.values())]
+            with open(path, 'w') as f:
+                json.dump(dict(traceEvents=names + self.events, displayTimeUnit='ms'), f)
+            logger.info(f'wrote profile trace {path}')
+            return path
+        except Exception as e:
+            logger.warning(f'could not write profile trace {path}: {e}')
+            return None
+
+
+def enable() -> Telemetry:
+    """Start profiling this process; returns the session."""
+    global _session
+    _session = Telemetry()
+    return _session
+
+
+def disable() -> Telemetry | None:
+    """Stop profiling; returns the session that was active, if any."""
+    global _session
+    session, _session = _session, None
+    return session
+
+
+def active() -> Telemetry | None:
+    """The current session, or None when profiling is off."""
+    return _session
+
+
+def task_span(task):
+    """Context manager profiling ``task`` (a no-op when profiling is off)."""
+    return nullcontext() if _session is None else _session.task(task)
+
+
+def section(name: str):
+    """Context manager timing the hot section ``name`` (a no-op when profiling is off)."""
+    return nullcontext() if _session is None else _session.section(name)
+
+
+def command_probe(command: str) -> CommandProbe | None:
+    """A probe for one external command, or None when profiling is off."""
+    return None if _session is None else CommandProbe(_session, command)
+
+
+def profiled(name: str):
+    """Decorator: time every call of the function as the hot section ``name``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _session is None:
+                return func(*args, **kwargs)
+            with _session.section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
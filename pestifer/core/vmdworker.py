@@ -0,0 +1,335 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Persistent VMD worker processes.
+
+Every VMD or psfgen script pestifer runs normally gets a VMD process of its own (see
+:meth:`VMDScripter.runscript <pestifer.scripters.vmd.VMDScripter.runscript>`), and each one pays
+for VMD startup, loading the pestifer Tcl packages and psfgen, and reading every CHARMM topology
+file again.  A build runs dozens of these scripts.  A :class:`VMDWorker` is one long-lived VMD
+running the command loop in ``worker.tcl`` (in the pestifer Tcl root).  Scripts are submitted to
+it one at a time; the worker keeps packages and topologies loaded and resets everything else
+between scripts.  A :class:`VMDWorkerPool` hands out workers to concurrent callers, such as
+subcontrollers, and starts new workers as needed, up to its size.
+
+Jobs go to the worker over a loopback TCP socket that the worker connects back to.  Its stdin
+stays on ``/dev/null`` for the same reason :meth:`VMDScripter.runscript` gives VMD ``/dev/null``:
+an rlwrap-wrapping VMD launcher quits when stdin is not what it expects.  The worker's output
+(stdout and stderr) is copied into each job's log, up to a sentinel line that carries the job's
+return code.
+
+Anything that runs ``worker.tcl`` can serve as a worker.  The tests use plain ``tclsh``.
+"""
+
+import atexit
+import codecs
+import io
+import logging
+import os
+import re
+import secrets
+import select
+import socket
+import subprocess
+import threading
+import time
+
+from . import telemetry
+from .command import _register_child, _unregister_child, finish_logparser, open_logfile
+from .errors import PestiferError
+from ..logparsers import LogParser
+from ..util.util import running_under_pytest
+
+logger = logging.getLogger(__name__)
+
+
+class VMDWorker:
+    """
+    One persistent VMD (or ``tclsh``) process running the pestifer worker loop.
+
+    Parameters
+    ----------
+    command : str
+        Shell command that starts the worker loop, up to (not including) the port and token
+        arguments, e.g. ``vmd -dispdev text -startup vmdrc.tcl -e worker.tcl -args --tcl-root
+        <root>`` or ``tclsh worker.tcl``.
+    startup_timeout : float
+        Seconds to wait for the worker to connect back and report ready.
+    """
+
+    read_chunk = 1 << 16
+    """ Bytes requested per read of the worker's output. """
+
+    batch_seconds = 0.25
+    """ Longest interval between log-parser updates (and log-file flushes) during a job. """
+
+    def __init__(self, command: str, startup_timeout: float = 120.0):
+        self.command = command
+        self.token = secrets.token_hex(8)
+        self.njobs = 0
+        self._carry = ''
+        self._decoder = None
+        listener = socket.create_server(('127.0.0.1', 0))
+        try:
+            port = listener.getsockname()[1]
+            self.process = subprocess.Popen(f'{command} --worker-port {port} --worker-token {self.token}',
+                                            shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                            stdin=subprocess.DEVNULL)
+            _register_child(self.process.pid, new_session=False)
+            self._decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+            self.sock = self._accept(listener, startup_timeout)
+        finally:
+            listener.close()
+        startup = []
+        if self._pump('ready', startup.append) is None:
+            self.close()
+            raise PestiferError(f'VMD worker "{command}" exited during startup:\n' + ''.join(startup))
+        logger.debug(f'VMD worker {self.process.pid} ready')
+
+    def _accept(self, listener: socket.socket, timeout: float) -> socket.socket:
+        deadline = time.monotonic() + timeout
+        listener.settimeout(0.1)
+        while time.monotonic() < deadline:
+            try:
+                conn, _ = listener.accept()
+                return conn
+            except socket.timeout:
+                if self.process.poll() is not None:
+                    break
+        output = os.read(self.process.stdout.fileno(), self.read_chunk) if self.process.poll() is not None else b''
+        self.close()
+        raise PestiferError(f'VMD worker "{self.command}" did not connect within {timeout} s:\n'
+                            + output.decode(errors='replace'))
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _pump(self, job: str, emit, logparser: LogParser = None, log=None) -> int | None:
+        """
+        Copy worker output to ``emit`` (and ``log``/``logparser``) until the sentinel that ends
+        ``job``.  Returns the job's return code, or None if the worker's output ended first.
+        """
+        sentinel = re.compile(rf'\n?@@pestifer-worker {self.token} {re.escape(job)} (-?\d+)@@')
+        margin = len(self.token) + len(job) + 64
+        fd = self.process.stdout.fileno()
+        held = self._carry
+        pending: list[str] = []
+        last_flush = time.monotonic()
+        _pytest = running_under_pytest()
+
+        def flush():
+            nonlocal last_flush
+            if logparser and pending:
+                with telemetry.section('log parse'):
+                    logparser.update(''.join(pending))
+                if not _pytest:
+                    logparser.update_progress_bar()
+            pending.clear()
+            if log:
+                log.flush()
+            last_flush = time.monotonic()
+
+        def send(text):
+            if text:
+                emit(text)
+                if log:
+                    log.write(text)
+                pending.append(text)
+
+        while True:
+            m = sentinel.search(held)
+            if m:
+                send(held[:m.start()])
+                self._carry = held[m.end():]
+                flush()
+                return int(m.group(1))
+            ready, _, _ = select.select([fd], [], [], self.batch_seconds)
+            if ready:
+                data = os.read(fd, self.read_chunk)
+                held += self._decoder.decode(data, final=not data)
+                if not data:
+                    send(held)
+                    self._carry = ''
+                    flush()
+                    return None
+                if not sentinel.search(held) and len(held) > margin:
+                    send(held[:-margin])
+                    held = held[-margin:]
+            if time.monotonic() - last_flush >= self.batch_seconds:
+                flush()
+
+    def run(self, scriptname: str, args: list[str] = [], logfile: str = None, logparser: LogParser = None,
+            overwrite_logs: bool = False) -> int:
+        """
+        Run ``scriptname`` in the worker, in the current working directory.
+
+        Parameters
+        ----------
+        scriptname : str
+            Tcl script to source.
+        args : list of str, optional
+            The script's ``argv``: what would follow ``-args`` on a VMD command line.
+        logfile : str, optional
+            Log receiving everything the script prints; an existing one is rotated aside unless
+            ``overwrite_logs`` is True.
+        logparser : LogParser, optional
+            Parser fed the script's output as it arrives, as :meth:`Command.run
+            <pestifer.core.command.Command.run>` would.
+
+        Returns
+        -------
+        int
+            The script's return code: the argument of its ``exit``, 0 if it ran to the end, 1 if it
+            raised a Tcl error or the worker died under it.
+        """
+        self.njobs += 1
+        job = str(self.njobs)
+        log = open_logfile(logfile, overwrite=overwrite_logs, buffering=self.read_chunk) if logfile else None
+        tail: list[str] = []
+        try:
+            path = os.path.abspath(scriptname)
+            fields = ['run', job, os.getcwd(), path] + [str(a) for a in args]
+            self.sock.sendall(('\t'.join(fields) + '\n').encode())
+            rc = self._pump(job, tail.append, logparser=logparser, log=log)
+        except OSError as e:
+            logger.error(f'Lost VMD worker {self.process.pid}: {e}')
+            rc = None
+        finally:
+            if log:
+                log.close()
+        if logparser:
+            finish_logparser(logparser, running_under_pytest())
+        if rc is None:
+            self.close()
+            logger.error(f'VMD worker died while running {scriptname}; output follows\n' + ''.join(tail)[-4096:])
+            return 1
+        if rc != 0:
+            logger.error(f'{scriptname} returned {rc} in VMD worker {self.process.pid}')
+        return rc
+
+    def close(self, timeout: float = 5.0):
+        """Ask the worker to quit, and make sure it does."""
+        sock = getattr(self, 'sock', None)
+        if sock is not None:
+            try:
+                sock.sendall(b'quit\n')
+            except OSError:
+                pass
+            sock.close()
+            self.sock = None
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        _unregister_child(self.process.pid)
+        if self.process.stdout:
+            self.process.stdout.close()
+
+
+class VMDWorkerPool:
+    """
+    Up to ``size`` :class:`VMDWorker` processes shared by every caller in this process.
+
+    A worker is started the first time one is needed and none is idle.  Each worker is retired
+    after ``max_jobs`` scripts, so whatever VMD or a script leaks is bounded.  If a worker cannot
+    be started, the pool disables itself and callers go back to launching VMD per script (see
+    :attr:`available`).
+
+    Parameters
+    ----------
+    command : str
+        Worker command; see :class:`VMDWorker`.
+    size : int
+        Maximum number of concurrent workers.
+    max_jobs : int
+        Scripts a worker runs before it is replaced.
+    """
+
+    def __init__(self, command: str, size: int = 1, max_jobs: int = 100):
+        self.command = command
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.available = True
+        self._idle: list[VMDWorker] = []
+        self._busy = 0
+        self._cond = threading.Condition()
+
+    def _checkout(self) -> VMDWorker:
+        with self._cond:
+            while not self._idle and self._busy >= self.size:
+                self._cond.wait()
+            self._busy += 1
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return VMDWorker(self.command)
+        except Exception:
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify()
+            raise
+
+    def _checkin(self, worker: VMDWorker):
+        if worker.alive and worker.njobs >= self.max_jobs:
+            worker.close()
+        with self._cond:
+            self._busy -= 1
+            if worker.alive:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def run(self, scriptname: str, **kwargs) -> int | None:
+        """
+        Run ``scriptname`` on an idle worker (see :meth:`VMDWorker.run` for ``kwargs``).  Returns
+        None, and disables the pool, if no worker could be started.
+        """
+        if not self.available:
+            return None
+        try:
+            worker = self._checkout()
+        except PestiferError as e:
+            logger.warning(f'{e}\nVMD workers disabled; launching VMD for each script instead.')
+            self.available = False
+            return None
+        try:
+            return worker.run(scriptname, **kwargs)
+        finally:
+            self._checkin(worker)
+
+    def close(self):
+        """Shut down every idle worker."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+_pools: dict[str, VMDWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(command: str, size: int = 1, max_jobs: int = 100) -> VMDWorkerPool:
+    """
+    The process-wide pool for ``command``, created on first use.  Every configuration in the
+    process (a subcontroller builds its own) shares it, which is what lets a subcontroller
+    reuse the progenitor's workers.
+    """
+    with _pools_lock:
+        pool = _pools.get(command)
+        if pool is None:
+            pool = _pools[command] = VMDWorkerPool(command, size=size, max_jobs=max_jobs)
+        return pool
+
+
+def close_worker_pools():
+    """Shut down every worker of every pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_worker_pools)
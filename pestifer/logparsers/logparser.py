@@ -8,6 +8,7 @@ import time
 
 from pathlib import Path
 
+from ..core.telemetry import profiled
 from ..util.progress import PestiferProgress
 from ..util.stringthings import ByteCollector
 
@@ -154,6 +155,7 @@ class LogParser(ByteCollector):
         self.progress = 0.0
         self.progress_bar = None
 
+    @profiled('log parse')
     def static(self, filename: str):
         """
         Initialize the LogParser from an existing, static file.
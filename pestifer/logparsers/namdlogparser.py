@@ -9,14 +9,15 @@ import os
 import re 
 
 import numpy as np
-import pandas as pd
 
 from pathlib import Path
 
 from .logparser import LogParser, get_single, get_toflag, get_values
+from ..core.telemetry import profiled
 
 from ..util.progress import NAMDProgress
 from ..util.stringthings import my_logger
+from ..util.xstfile import read_xst
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ class NAMDxstParser(LogParser):
     def __init__(self, basename: str = 'namd-xstparser'):
         self.basename = basename
         self.filename = f'{basename}.xst'
-        self.dataframe: pd.DataFrame | None = None
+        self.dataframe: 'pd.DataFrame | None' = None
         super().__init__()
 
     @classmethod
@@ -46,9 +47,10 @@ class NAMDxstParser(LogParser):
             # throw a warning and return None
             logger.debug(f'FYI: No {instance.filename} exists for this run.')
             return None
-        instance.dataframe = pd.read_csv(instance.filename, skiprows=2, header=None, sep=r'\s+', index_col=None)
-        col = 'TS a_x a_y a_z b_x b_y b_z c_x c_y c_z o_x o_y o_z s_x s_y s_z s_u s_v s_w'.split()[:len(instance.dataframe.columns)]
-        instance.dataframe.columns = col
+        import pandas as pd
+        rows = read_xst(instance.filename).rows
+        col = 'TS a_x a_y a_z b_x b_y b_z c_x c_y c_z o_x o_y o_z s_x s_y s_z s_u s_v s_w'.split()[:rows.shape[1]]
+        instance.dataframe = pd.DataFrame(rows, columns=col).astype({'TS': 'int64'})
         return instance
 
 class NAMDLogParser(LogParser):
@@ -120,7 +122,7 @@ class NAMDLogParser(LogParser):
     def __init__(self, basename='namd-logparser'):
         super().__init__()
         self.line_idx = [0]  # byte offsets of lines
-        self.processed_line_idx = []
+        self.processed_line_idx = set()  # a set: membership is tested once per line
         self.time_series_data = {}
         self.metadata = {}
         self.dataframes = {}
@@ -161,6 +163,7 @@ class NAMDLogParser(LogParser):
         instance.static(filename, passfilter=passfilter)
         return instance
 
+    @profiled('log parse')
     def static(self, filename: Path | str, passfilter: list[str] = []):
         """
         Initialize the NAMDLog from an existing, static file.
@@ -578,13 +581,13 @@ class NAMDLogParser(LogParser):
                 result = self.process_line(line)
                 if result == -1:  # bail out key found, stop processing
                     return
-                self.processed_line_idx.append(i)
+                self.processed_line_idx.add(i)
         if len(addl_line_idx) > 1:
             self.line_idx.extend(addl_line_idx)
             last_line = self.byte_collector[addl_line_idx[-1]:]
             if last_line.endswith(os.linesep):
                 self.process_line(last_line)
-                self.processed_line_idx.append(addl_line_idx[-1])
+                self.processed_line_idx.add(addl_line_idx[-1])
 
     def measure_progress(self):
         """
@@ -630,6 +633,7 @@ class NAMDLogParser(LogParser):
         # parse the XST file
         logger.debug('finalize namdlog parser metadata:')
         my_logger(self.metadata, logger.debug)
+        import pandas as pd
         self.auxlogparser = NAMDxstParser.from_file(basename=os.path.splitext(self.filename)[0])
         for key in self.time_series_data:
             self.dataframes[key] = pd.DataFrame(self.time_series_data[key])
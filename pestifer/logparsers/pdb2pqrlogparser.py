@@ -8,7 +8,6 @@ import logging
 import os
 import re
 
-import pandas as pd
 
 from .logparser import LogParser
 
@@ -102,4 +101,5 @@ class PDB2PQRLogParser(LogParser):
                 resatomtype = None
             table_lines.append(dict(resname=resname, resnum=resnum, reschain=reschain, respka=respka, resmodelpka=resmodelpka, resatomtype=resatomtype))
         if len(table_lines) > 0:
+            import pandas as pd
             self.metadata['pka_table'] = pd.DataFrame(table_lines)
@@ -32,7 +32,7 @@ class PsfgenLogParser(LogParser):
     def __init__(self, basename='psfgen-logparser'):
         super().__init__()
         self.line_idx = [0]  # byte offsets of lines
-        self.processed_line_idx = []
+        self.processed_line_idx = set()  # a set: membership is tested once per line
         self.metadata = {}
         self.basename = basename
 
@@ -55,13 +55,13 @@ class PsfgenLogParser(LogParser):
             if i not in self.processed_line_idx:
                 line = self.byte_collector[i:j]
                 self.process_line(line)
-                self.processed_line_idx.append(i)
+                self.processed_line_idx.add(i)
         if len(addl_line_idx) > 1:
             self.line_idx.extend(addl_line_idx)
             last_line = self.byte_collector[addl_line_idx[-1]:]
             if last_line.endswith(os.linesep):
                 self.process_line(last_line)
-                self.processed_line_idx.append(addl_line_idx[-1])
+                self.processed_line_idx.add(addl_line_idx[-1])
 
     def process_line(self, line: str):
         """
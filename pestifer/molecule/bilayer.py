@@ -642,6 +642,16 @@ class Bilayer:
             cs, sn = np.cos(th), np.sin(th)
             return c @ np.array([[cs, -sn, 0.0], [sn, cs, 0.0], [0.0, 0.0, 1.0]]).T
 
+        def zspins(c, n):
+            # n independent random in-plane spins of c, stacked (n, len(c), 3)
+            th = rng.uniform(0, 2 * np.pi, n)
+            cs, sn = np.cos(th)[:, None], np.sin(th)[:, None]
+            out = np.empty((n,) + c.shape)
+            out[..., 0] = cs * c[:, 0] - sn * c[:, 1]
+            out[..., 1] = sn * c[:, 0] + cs * c[:, 1]
+            out[..., 2] = c[:, 2]
+            return out
+
         def bag_of(layer):
             # cache[nm] is a *list* of loaded conformers; each placed lipid draws one from
             # it (below), so the leaflet samples the whole conformer ensemble rather than
@@ -662,7 +672,7 @@ class Bilayer:
             rng.shuffle(bag)
             return cache, bag
 
-        from scipy.spatial import cKDTree
+        from ..util.linkcell import GridHash
         # When the grid PDB is later loaded (topology-free) for the psfgen split, VMD perceives
         # bonds by distance -- it bonds two heavy atoms within ~2 A (measured) -- and a single
         # spurious inter-lipid bond MERGES the two residues, scrambling the per-residue coords
@@ -672,7 +682,9 @@ class Bilayer:
         # re-spun -- new in-plane rotation + jitter, and (leveraging the per-lipid ensemble draw)
         # a fresh, possibly thinner, conformer -- until its atoms clear already-placed lipids by
         # `fusion`.  We keep the *best* attempt, escalate the search in tight pockets, and
-        # hard-fail rather than silently emit a corrupting near-coincidence.
+        # hard-fail rather than silently emit a corrupting near-coincidence.  Attempts are scored
+        # a round at a time (one conformer, `respin_batch` spins and jitters, stacked) against a
+        # GridHash of the placed atoms, which takes each accepted lipid without a rebuild.
         fusion = 1.0             # target min inter-lipid atom separation (A); >0.9 gives margin
         corruption_floor = 0.3   # only near-*coincident* atoms (gap -> 0) create the dense VMD
                                  # bond pile-up ("Exceeded maximum number of bonds") that makes
@@ -680,10 +692,17 @@ class Bilayer:
                                  # many sub-A gaps (~0.4-0.9) that build and relax fine (validated
                                  # end-to-end), so abort only below this true-coincidence floor
         respin_tries = 40
+        respin_batch = 8         # attempts scored together; the search escalates between rounds
 
         # lipids: per-leaflet 2D lattice, oriented, tails toward the midplane
-        lipid_xyz = []   # placed lipid atom coords, indexed below for solvent clash removal
-        placed_tree = None   # cKDTree over already-placed lipid atoms (refreshed per lipid)
+        lipid_xyz = []   # placed lipid atom coords
+        # placed lipid atoms, for the inter-lipid gap and (below) solvent clash removal; cells
+        # wider than either cutoff keep the grid small, and atoms outside the lipid slab are
+        # clamped into its edge cells
+        zs = [lf[z] for lf in (self.LL, self.UL) for z in ('z-lo', 'z-hi')]
+        margin = np.array([10.0, 10.0, 10.0])
+        placed = GridHash(np.array([[ll[0], ll[1], min(zs)], [ur[0], ur[1], max(zs)]]) + [-margin, margin],
+                          max(fusion, clash_cutoff), cellsize=3.0)
         n_respun = n_uncleared = 0
         worst_gap = np.inf   # closest inter-lipid approach we were forced to accept
         for leaflet, upper in ((self.LL, False), (self.UL, True)):
@@ -740,35 +759,39 @@ class Bilayer:
                     jit = jitter
                     best_c = best_lines = None
                     best_gap = -1.0
-                    coords, lines, head_i, tail_is = conformers[ci]
-                    # head-group marker to pin on the common band (see head_plane_z above and
-                    # _lipid_anchor_index): phosphate -> sterol/ceramide head hydroxyl -> head ref -> tail
-                    anchor_i = _lipid_anchor_index(coords, lines, head_i)
-                    oriented = coords * np.array([1.0, -1.0, -1.0]) if not upper else coords
-                    for attempt in range(respin_tries):
-                        cand = zspin(oriented)
+                    for attempt in range(0, respin_tries, respin_batch):
+                        coords, lines, head_i, tail_is = conformers[ci]
+                        # head-group marker to pin on the common band (see head_plane_z above and
+                        # _lipid_anchor_index): phosphate -> sterol/ceramide head hydroxyl -> head ref -> tail
+                        anchor_i = _lipid_anchor_index(coords, lines, head_i)
+                        oriented = coords * np.array([1.0, -1.0, -1.0]) if not upper else coords
+                        # a z spin leaves z alone, so every spin shares one vertical shift
                         if anchor_i is not None:
-                            cand[:, 2] += head_plane_z - cand[anchor_i, 2]
+                            dz = head_plane_z - oriented[anchor_i, 2]
                         else:
                             # headless species: fall back to tail/center anchoring
-                            cand[:, 2] += target_z - (cand[tail_is, 2].mean()
-                                                      if tail_is is not None else cand[:, 2].mean())
-                        cand[:, 0] += cx + rng.uniform(-jit, jit)
-                        cand[:, 1] += cy + rng.uniform(-jit, jit)
-                        gap = np.inf if placed_tree is None else placed_tree.query(cand)[0].min()
-                        if gap > best_gap:
-                            best_c, best_lines, best_gap = cand, lines, gap
-                        if gap >= fusion:
+                            dz = target_z - (oriented[tail_is, 2].mean()
+                                             if tail_is is not None else oriented[:, 2].mean())
+                        nb = min(respin_batch, respin_tries - attempt)
+                        cands = zspins(oriented, nb)
+                        cands[..., 2] += dz
+                        cands[..., :2] += (np.array([cx, cy]) + rng.uniform(-jit, jit, (nb, 2)))[:, None, :]
+                        gaps = placed.nearest(cands).min(axis=1)
+                        ok = np.flatnonzero(gaps >= fusion)
+                        pick = int(ok[0]) if ok.size else int(np.argmax(gaps))
+                        if gaps[pick] > best_gap:
+                            best_c, best_lines, best_gap = cands[pick], lines, float(gaps[pick])
+                        if ok.size:
+                            n_respun += pick
                             break
-                        n_respun += 1
+                        n_respun += nb
                         # escalate: widen the jitter window and redraw a (possibly thinner)
                         # ensemble conformer to fit a tight pocket
-                        if (attempt + 1) % 8 == 0:
-                            jit = min(jit * 1.5, 0.45 * min(dx, dy))
-                            ci = int(rng.integers(len(conformers)))
+                        jit = min(jit * 1.5, 0.45 * min(dx, dy))
+                        ci = int(rng.integers(len(conformers)))
                     emit(best_c, best_lines)
                     lipid_xyz.append(best_c)
-                    placed_tree = cKDTree(np.vstack(lipid_xyz))
+                    placed.insert(best_c)
                     if best_gap < fusion:
                         n_uncleared += 1
                         worst_gap = min(worst_gap, best_gap)
@@ -812,7 +835,6 @@ class Bilayer:
         # that lipid's coordinates and silently guesses them.  Index the lipid atoms so
         # such solvent molecules can be dropped (a handful of waters is negligible for
         # hydration, and the relaxation still resolves the milder overlaps).
-        lipid_tree = placed_tree   # already covers every placed lipid atom
         n_solvent_dropped = 0
 
         # Chamber solvent (+ ions).  Historically placed here on a jittered 3D lattice -- a solid-like,
@@ -834,6 +856,7 @@ class Bilayer:
                 gx_n, gy_n = max(1, int(round(Lx / cell))), max(1, int(round(Ly / cell)))
                 gz_n = max(1, int(np.ceil(n / (gx_n * gy_n))))
                 sx, sy, sz = Lx / gx_n, Ly / gy_n, Lz / gz_n
+                molecules = []
                 for k, nm in enumerate(bag):
                     conformers = cache[nm]
                     coords, lines, _h, _t = conformers[rng.integers(len(conformers))]
@@ -842,7 +865,12 @@ class Bilayer:
                     c[:, 0] += ll[0] + (i + 0.5) * sx + rng.uniform(-jitter, jitter)
                     c[:, 1] += ll[1] + (j + 0.5) * sy + rng.uniform(-jitter, jitter)
                     c[:, 2] += zlo + (m + 0.5) * sz - c[:, 2].mean()
-                    if lipid_tree is not None and lipid_tree.query(c)[0].min() < clash_cutoff:
+                    molecules.append((c, lines))
+                # one query for the whole chamber, reduced to each molecule's closest approach
+                starts = np.cumsum([0] + [len(c) for c, _ in molecules[:-1]])
+                gaps = np.minimum.reduceat(placed.nearest(np.vstack([c for c, _ in molecules])), starts)
+                for (c, lines), gap in zip(molecules, gaps):
+                    if gap < clash_cutoff:
                         n_solvent_dropped += 1
                         continue
                     emit(c, lines)
@@ -7,32 +7,99 @@ Declashing is *pre-conditioning*: it rotates rotatable bonds (pendant sub-branch
 phi angles (gap loops) to pull model-built / grafted atoms out of steric overlap with the rest of
 the structure before minimization, which then relaxes the result.  It is not structure
 prediction, so the exact poses do not matter -- only that the destabilizing heavy-atom clash
-count drops.  Both routines are the same simple greedy descent as the Tcl (accept a random move
-only if it strictly reduces the clash count), scored with a ``scipy.spatial.cKDTree`` heavy-atom
-contact counter, and driven by a caller-supplied seeded RNG so declashed builds are reproducible
-(VMD's ``rand()`` was unseeded).
+count drops.  Both routines are the greedy descent of the Tcl (accept a move only if it strictly
+reduces the clash count), scored with a ``scipy.spatial.cKDTree`` heavy-atom contact counter, and
+driven by a caller-supplied seeded RNG so declashed builds are reproducible (VMD's ``rand()`` was
+unseeded).  Where the Tcl tried one random angle per cycle, each cycle here scores a batch of
+candidate angles in one vectorized tree query and keeps the best, rescoring only the atoms that
+move.
+
+Many loops are declashed at once by :func:`declash_loops`: loops too far apart to ever touch are
+independent, so :func:`dependency_waves` groups them into waves whose members run concurrently on
+a process pool, each against one KD-tree of the static (non-loop) environment built once per
+worker.  :func:`declash_pendants` does the same for pendants (glycans, nucleic-acid loops),
+handing the workers whole clusters of neighbouring pendants (:func:`pendant_clusters`).  Each loop
+or pendant draws from its own seeded RNG, so the result does not depend on the number of workers.
 """
+import logging
+import os
+
 import numpy as np
 from scipy.spatial import cKDTree
 
 from ..util.coord import rotate_points_about_axis
 
+logger = logging.getLogger(__name__)
+
 #: discrete rotation increments (degrees) tried for a pendant bond, matching declash.tcl
 _PENDANT_DEGS = np.array([-120.0, -60.0, 60.0, 120.0, 180.0])
 
 
-def _contact_count(env_tree: cKDTree, pts: np.ndarray, clashdist: float) -> int:
-    """Number of (query point, env atom) pairs within ``clashdist`` -- the clash score."""
-    if len(pts) == 0:
-        return 0
-    return int(env_tree.query_ball_point(pts, clashdist, return_length=True).sum())
+#: a residue's reach along a chain, CA to CA (angstrom)
+_RESIDUE_REACH = 3.8
+#: the farthest a side-chain heavy atom sits from its CA (arginine's NH, with margin)
+_SIDECHAIN_REACH = 8.0
+
+
+def _atom_contacts(env_tree, pts: np.ndarray, clashdist: float) -> np.ndarray:
+    """Per query point, the number of env atoms within ``clashdist``. ``env_tree`` is one
+    ``cKDTree`` or a list of them (the counts add)."""
+    pts = np.asarray(pts, dtype=float)
+    counts = np.zeros(pts.shape[:-1], dtype=np.int64)
+    if pts.size == 0:
+        return counts
+    if isinstance(env_tree, cKDTree):
+        env_tree = [env_tree]
+    for t in env_tree:
+        counts += t.query_ball_point(pts, clashdist, return_length=True)
+    return counts
+
+
+def _contact_count(env_tree, pts: np.ndarray, clashdist: float) -> int:
+    """Number of (query point, env atom) pairs within ``clashdist`` -- the clash score.
+    ``env_tree`` is one ``cKDTree`` or a list of them (the counts add)."""
+    return int(_atom_contacts(env_tree, pts, clashdist).sum())
+
+
+def _rotation_trials(points, pivot, axis, degrees):
+    """``(T, N, 3)``: ``points`` rotated by each of the ``T`` ``degrees`` about the line through
+    ``pivot`` along ``axis`` (:func:`~pestifer.util.coord.rotate_points_about_axis`, batched)."""
+    degrees = np.atleast_1d(np.asarray(degrees, dtype=float))
+    axis = np.asarray(axis, dtype=float)
+    n = np.linalg.norm(axis)
+    p = np.asarray(points, dtype=float) - pivot
+    if n == 0.0:
+        return np.broadcast_to(p + pivot, (len(degrees),) + p.shape).copy()
+    k = axis / n
+    theta = np.radians(degrees)[:, None, None]
+    c, s = np.cos(theta), np.sin(theta)
+    kxp = np.cross(np.broadcast_to(k, p.shape), p)
+    par = np.outer(p @ k, k)
+    return p * c + kxp * s + par * (1.0 - c) + pivot
+
+
+def _best_trial(env_tree, clashdist, points, pivot, axis, degrees, current, total):
+    """Score every trial rotation of ``points`` (whose per-atom contact counts are now
+    ``current``, of ``total`` overall) in one tree query; return the best trial's index, its
+    total and its per-atom counts."""
+    trials = _rotation_trials(points, pivot, axis, degrees)
+    counts = _atom_contacts(env_tree, trials, clashdist)
+    totals = total - int(current.sum()) + counts.sum(axis=1)
+    best = int(np.argmin(totals))
+    return best, int(totals[best]), counts[best]
 
 
-def declash_pendant(coords, pendant_heavy, env_heavy, bonds, movers, maxcycles, clashdist, rng):
+def declash_pendant(coords, pendant_heavy, env_heavy, bonds, movers, maxcycles, clashdist, rng,
+                    env_tree=None, degrees=_PENDANT_DEGS):
     """
     Greedily rotate a pendant group's rotatable bonds to reduce heavy-atom clashes with the rest
     of the structure.  ``coords`` is mutated in place.
 
+    Each cycle picks a bond at random and scores every rotation in ``degrees`` about it at
+    once, with one tree query over the stacked trial positions of the heavy atoms that bond
+    moves; the best is kept if it lowers the clash count. The count is kept per pendant atom, so
+    only the moving atoms are ever rescored, and a rejected cycle moves nothing.
+
     Parameters
     ----------
     coords : numpy.ndarray
@@ -46,46 +113,66 @@ def declash_pendant(coords, pendant_heavy, env_heavy, bonds, movers, maxcycles,
     movers : list of numpy.ndarray
         Per-bond arrays of atom row indices that rotate about that bond.
     maxcycles : int
-        Maximum Monte-Carlo cycles (one bond rotation each).
+        Maximum Monte-Carlo cycles (one bond each).
     clashdist : float
         Heavy-atom clash cutoff (angstrom).
     rng : numpy.random.Generator
-        Seeded RNG driving the random bond/angle choices.
+        Seeded RNG driving the random bond choices.
+    env_tree : scipy.spatial.cKDTree, optional
+        A prebuilt tree of the environment, used instead of building one over ``env_heavy``.
+    degrees : array_like
+        The trial rotations (degrees) scored per cycle; by default the increments of
+        declash.tcl.
 
     Returns
     -------
     int
         The final clash count (0 if fully resolved).
     """
-    if not bonds or len(pendant_heavy) == 0 or len(env_heavy) == 0:
+    if env_tree is None and (env_heavy is None or len(env_heavy) == 0):
+        return 0
+    if not bonds or len(pendant_heavy) == 0:
         return 0
-    env_tree = cKDTree(coords[env_heavy])
-    ncontacts = _contact_count(env_tree, coords[pendant_heavy], clashdist)
+    if env_tree is None:
+        env_tree = cKDTree(coords[env_heavy])
+    pendant_heavy = np.asarray(pendant_heavy, dtype=int)
+    per_atom = _atom_contacts(env_tree, coords[pendant_heavy], clashdist)
+    ncontacts = int(per_atom.sum())
     if ncontacts == 0:
         return 0
+    # the pendant heavy atoms each bond moves: only their contacts change when it rotates
+    moved = [np.flatnonzero(np.isin(pendant_heavy, mv)) for mv in movers]
     nb = len(bonds)
     for _ in range(maxcycles):
         ridx = int(rng.integers(nb))
+        k = moved[ridx]
+        if not k.size:
+            continue
         bi, bj = bonds[ridx]
-        mv = movers[ridx]
-        deg = float(rng.choice(_PENDANT_DEGS))
         pivot, axis = coords[bi], coords[bj] - coords[bi]
-        coords[mv] = rotate_points_about_axis(coords[mv], pivot, axis, deg)
-        new = _contact_count(env_tree, coords[pendant_heavy], clashdist)
-        if new >= ncontacts:                       # reject: rotate back
-            coords[mv] = rotate_points_about_axis(coords[mv], pivot, axis, -deg)
-        else:
+        best, new, counts = _best_trial(env_tree, clashdist, coords[pendant_heavy[k]], pivot, axis,
+                                        degrees, per_atom[k], ncontacts)
+        if new < ncontacts:
+            mv = movers[ridx]
+            coords[mv] = rotate_points_about_axis(coords[mv], pivot, axis, float(np.atleast_1d(degrees)[best]))
             ncontacts = new
+            per_atom[k] = counts
             if ncontacts == 0:
                 break
     return ncontacts
 
 
-def declash_loop(coords, residues, env_heavy, maxcycles, clashdist, rng, jitter=120.0):
+def declash_loop(coords, residues, env_heavy, maxcycles, clashdist, rng, jitter=120.0,
+                 env_tree=None, extra_env=None, trials=8):
     """
     Greedily wiggle a model-built gap loop's backbone phi angles to reduce clashes with the
     surrounding structure.  ``coords`` is mutated in place.
 
+    Each cycle draws ``trials`` random phi perturbations for the current residue and scores them
+    all with one tree query over the stacked trial positions of the fragment's moving heavy
+    atoms; the best is kept if it lowers the clash count. As in :func:`declash_pendant`, the
+    count is kept per atom so only the moving atoms are rescored.
+
     Parameters
     ----------
     coords : numpy.ndarray
@@ -105,31 +192,345 @@ def declash_loop(coords, residues, env_heavy, maxcycles, clashdist, rng, jitter=
         Seeded RNG.
     jitter : float
         Half-width (degrees) of the uniform phi perturbation.
+    env_tree : scipy.spatial.cKDTree, optional
+        A prebuilt tree of the environment, used instead of building one over ``env_heavy``.
+    extra_env : numpy.ndarray, optional
+        ``(K, 3)`` further environment coordinates (e.g. neighbouring loops), scored alongside.
+    trials : int
+        Phi perturbations scored per cycle.
 
     Returns
     -------
     int
         The final total clash count summed over the loop residues processed.
     """
-    if len(env_heavy) == 0:
+    if env_tree is None and env_heavy is not None and len(env_heavy):
+        env_tree = cKDTree(coords[env_heavy])
+    env_tree = [t for t in (env_tree,) if t is not None]
+    if extra_env is not None and len(extra_env):
+        env_tree.append(cKDTree(np.asarray(extra_env, dtype=float)))
+    if not env_tree:
         return 0
-    env_tree = cKDTree(coords[env_heavy])
     total = 0
     for res in residues:
-        frag = res['frag_heavy']
+        frag = np.asarray(res['frag_heavy'], dtype=int)
         movers = res['movers']
-        con = _contact_count(env_tree, coords[frag], clashdist)
+        per_atom = _atom_contacts(env_tree, coords[frag], clashdist)
+        con = int(per_atom.sum())
+        moving = np.flatnonzero(np.isin(frag, movers))
         for _ in range(maxcycles):
-            if con == 0:
+            if con == 0 or not moving.size:
                 break
-            deg = float((1.0 - 2.0 * rng.random()) * jitter)
+            degs = (1.0 - 2.0 * rng.random(trials)) * jitter
             pivot, axis = coords[res['pivot']], coords[res['axis_to']] - coords[res['pivot']]
-            save = coords[movers].copy()
-            coords[movers] = rotate_points_about_axis(coords[movers], pivot, axis, deg)
-            new = _contact_count(env_tree, coords[frag], clashdist)
+            best, new, counts = _best_trial(env_tree, clashdist, coords[frag[moving]], pivot, axis,
+                                            degs, per_atom[moving], con)
             if new < con:
+                coords[movers] = rotate_points_about_axis(coords[movers], pivot, axis, float(degs[best]))
                 con = new
-            else:
-                coords[movers] = save                # reject
+                per_atom[moving] = counts
         total += con
     return total
+
+
+def loop_reach(coords, residues):
+    """
+    A sphere ``(center, radius)`` no atom of a loop can leave while :func:`declash_loop` wiggles
+    it: centered on the first pivot (which never moves), as wide as the chain can stretch --
+    or as the loop now spans, if its built coordinates are wider still.
+    """
+    if not residues:
+        return np.zeros(3), 0.0
+    center = np.asarray(coords[residues[0]['pivot']], dtype=float)
+    rows = np.concatenate([r['movers'] for r in residues] + [r['frag_heavy'] for r in residues])
+    span = float(np.linalg.norm(coords[rows.astype(int)] - center, axis=1).max()) if len(rows) else 0.0
+    return center, max(span, _RESIDUE_REACH * len(residues) + _SIDECHAIN_REACH)
+
+
+def dependency_waves(centers, radii, clashdist):
+    """
+    Schedule items that each move within a sphere into waves of mutually independent items.
+
+    Two items depend on one another when their spheres come within ``clashdist`` (one's moves
+    can then change the other's clash score). Item ``k`` runs in the wave after the latest item
+    before it that it depends on, so running the waves in order -- each wave's items in any order,
+    or concurrently -- gives every item the same surroundings as running all items one by one.
+
+    Parameters
+    ----------
+    centers : array_like
+        ``(n, 3)`` sphere centers.
+    radii : array_like
+        ``(n,)`` sphere radii.
+    clashdist : float
+        Contact cutoff (angstrom).
+
+    Returns
+    -------
+    (wave, dependent) : (numpy.ndarray (n,), numpy.ndarray (n, n) of bool)
+        Each item's 0-based wave and the symmetric dependency matrix (False on the diagonal).
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=float).reshape(-1)
+    n = len(radii)
+    d = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=-1)
+    dependent = d < radii[:, None] + radii[None, :] + clashdist
+    np.fill_diagonal(dependent, False)
+    wave = np.zeros(n, dtype=int)
+    for k in range(1, n):
+        earlier = np.flatnonzero(dependent[k, :k])
+        if earlier.size:
+            wave[k] = wave[earlier].max() + 1
+    return wave, dependent
+
+
+_static_trees = {}
+""" Environment KD-trees this worker process has built, keyed by the shared blocks' names: the
+static environment is built once per worker, however many loops it declashes. """
+
+
+def _static_tree(coords, env_heavy):
+    key = (coords.name, env_heavy.name)
+    tree = _static_trees.get(key)
+    if tree is None:
+        if len(_static_trees) >= 4:
+            _static_trees.clear()
+        rows = np.asarray(env_heavy)
+        tree = _static_trees[key] = cKDTree(np.asarray(coords)[rows]) if len(rows) else None
+    return tree
+
+
+def _declash_one_loop(coords, env_heavy, residues, extra_heavy, maxcycles, clashdist, seed,
+                      jitter=120.0, env_tree=None):
+    """
+    Declash one loop of :func:`declash_loops` on a copy of just its own atoms.
+
+    ``coords`` and ``env_heavy`` are plain arrays with a prebuilt ``env_tree`` (the serial path),
+    or :class:`~pestifer.util.shared_array.SharedArray` views from which this worker's cached
+    static tree is taken. Returns ``(rows, new_coords, clashes)``.
+    """
+    if env_tree is None and len(env_heavy):
+        env_tree = _static_tree(coords, env_heavy)
+    arr = np.asarray(coords)
+    rows = np.unique(np.concatenate(
+        [np.concatenate([r['movers'], r['frag_heavy'], [r['pivot'], r['axis_to']]]) for r in residues]
+    ).astype(int))
+    local = np.array(arr[rows], dtype=float)
+    local_residues = [{'pivot': int(np.searchsorted(rows, r['pivot'])),
+                       'axis_to': int(np.searchsorted(rows, r['axis_to'])),
+                       'movers': np.searchsorted(rows, r['movers']),
+                       'frag_heavy': np.searchsorted(rows, r['frag_heavy'])} for r in residues]
+    extra = np.array(arr[extra_heavy], dtype=float) if len(extra_heavy) else None
+    clashes = declash_loop(local, local_residues, None, maxcycles, clashdist,
+                           np.random.default_rng(seed), jitter, env_tree=env_tree, extra_env=extra)
+    return rows, local, clashes
+
+
+def declash_loops(coords, loops, env_heavy, maxcycles, clashdist, seed, jitter=120.0, nworkers=None):
+    """
+    :func:`declash_loop` over many loops of one structure, spatially independent loops in
+    parallel. ``coords`` is mutated in place.
+
+    Each loop is scored against ``env_heavy`` (one static KD-tree) plus the
+    current heavy atoms of the loops it depends on (:func:`dependency_waves` over each loop's
+    :func:`loop_reach`): the surroundings it would have if the loops ran one by one in order.
+    Loop ``i`` draws from ``default_rng(seed + i)``, so the result is the same for any
+    ``nworkers``.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        ``(N, 3)`` coordinates of the whole system.
+    loops : list of (list of dict, numpy.ndarray)
+        Per loop, its ``residues`` as for :func:`declash_loop` and the row indices of all its
+        heavy atoms.
+    env_heavy : numpy.ndarray
+        Row indices of the heavy atoms outside every loop (the static environment).
+    maxcycles, clashdist, jitter :
+        As for :func:`declash_loop`.
+    seed : int
+        Base RNG seed.
+    nworkers : int, optional
+        Worker processes (default: one per CPU, at most one per loop in the widest wave); 1
+        runs serially in this process.
+
+    Returns
+    -------
+    list of int
+        Each loop's final clash count.
+    """
+    n = len(loops)
+    clashes = [0] * n
+    if n == 0:
+        return clashes
+    env_heavy = np.asarray(env_heavy, dtype=int)
+    loop_heavy = [np.asarray(h, dtype=int) for _, h in loops]
+    reach = [loop_reach(coords, residues) for residues, _ in loops]
+    wave, dependent = dependency_waves([c for c, _ in reach], [r for _, r in reach], clashdist)
+    nwaves = int(wave.max()) + 1
+    widest = int(np.bincount(wave).max())
+    nworkers = max(1, min(widest, nworkers or os.cpu_count() or 1))
+
+    def _args(i):
+        deps = np.flatnonzero(dependent[i])
+        extra = np.concatenate([loop_heavy[j] for j in deps]) if deps.size else np.empty(0, dtype=int)
+        return (loops[i][0], extra, maxcycles, clashdist, seed + i, jitter)
+
+    if nworkers == 1:
+        env_tree = cKDTree(coords[env_heavy]) if len(env_heavy) else None
+        for w in range(nwaves):
+            for i in np.flatnonzero(wave == w):
+                rows, new, clashes[i] = _declash_one_loop(coords, env_heavy, *_args(i), env_tree=env_tree)
+                coords[rows] = new
+    else:
+        # Workers attach to one shared copy of the coordinates, which this process updates
+        # between waves; each worker builds the static-environment tree once.
+        from concurrent.futures import ProcessPoolExecutor
+        from ..util.shared_array import SharedArray
+        with SharedArray(np.asarray(coords, dtype=float)) as shared, SharedArray(env_heavy) as env:
+            with ProcessPoolExecutor(max_workers=nworkers) as ex:
+                for w in range(nwaves):
+                    members = np.flatnonzero(wave == w)
+                    futs = [ex.submit(_declash_one_loop, shared, env, *_args(i)) for i in members]
+                    for i, fut in zip(members, futs):
+                        rows, new, clashes[i] = fut.result()
+                        coords[rows] = shared.array[rows] = new
+    logger.debug(f'declashed {n} loop(s) in {nwaves} wave(s) across {nworkers} worker(s)')
+    return clashes
+
+
+def pendant_clusters(coords, pendant_heavy, cutoff):
+    """
+    Group pendants into clusters of neighbours: connected components of the graph joining two
+    pendants whose heavy atoms come within ``cutoff`` of one another.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        ``(N, 3)`` coordinates of the whole system.
+    pendant_heavy : list of numpy.ndarray
+        Per pendant, the row indices of its heavy atoms.
+    cutoff : float
+        Neighbour distance (angstrom).
+
+    Returns
+    -------
+    list of numpy.ndarray
+        Pendant indices per cluster, each ascending, clusters ordered by their first pendant.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    n = len(pendant_heavy)
+    if n == 0:
+        return []
+    owner = np.concatenate([np.full(len(h), i) for i, h in enumerate(pendant_heavy)]).astype(int)
+    rows = np.concatenate([np.asarray(h, dtype=int) for h in pendant_heavy])
+    pairs = cKDTree(coords[rows]).query_pairs(cutoff, output_type='ndarray') if len(rows) else np.empty((0, 2), int)
+    a, b = owner[pairs[:, 0]], owner[pairs[:, 1]]
+    graph = coo_matrix((np.ones(len(a)), (a, b)), shape=(n, n))
+    _, label = connected_components(graph, directed=False)
+    # relabel in order of each cluster's first pendant
+    _, first = np.unique(label, return_index=True)
+    return [np.flatnonzero(label == label[f]) for f in np.sort(first)]
+
+
+def _declash_pendant_batch(coords, env_heavy, batch, maxcycles, clashdist, seed, env_tree=None):
+    """
+    Declash a batch of :func:`declash_pendants`'s pendants on a copy of just their own atoms.
+
+    ``batch`` holds ``(i, pendant_heavy, bonds, movers)`` per pendant; pendant ``i`` draws from
+    ``default_rng(seed + i)``. ``coords``/``env_heavy`` are as for :func:`_declash_one_loop`.
+    Returns ``(rows, new_coords, {i: clashes})``.
+    """
+    if env_tree is None and len(env_heavy):
+        env_tree = _static_tree(coords, env_heavy)
+    arr = np.asarray(coords)
+    rows = np.unique(np.concatenate(
+        [np.concatenate([heavy, np.ravel(bonds)] + list(movers)) for _, heavy, bonds, movers in batch]
+    ).astype(int))
+    local = np.array(arr[rows], dtype=float)
+    clashes = {}
+    for i, heavy, bonds, movers in batch:
+        local_bonds = [tuple(int(x) for x in np.searchsorted(rows, b)) for b in bonds]
+        clashes[i] = declash_pendant(local, np.searchsorted(rows, heavy), None, local_bonds,
+                                     [np.searchsorted(rows, mv) for mv in movers], maxcycles,
+                                     clashdist, np.random.default_rng(seed + i), env_tree=env_tree)
+    return rows, local, clashes
+
+
+def declash_pendants(coords, pendants, env_heavy, maxcycles, clashdist, seed, nworkers=None):
+    """
+    :func:`declash_pendant` over many pendants of one structure, clusters of neighbouring
+    pendants in parallel. ``coords`` is mutated in place.
+
+    Every pendant is scored against ``env_heavy`` alone (one static KD-tree, built once per
+    worker), so pendants never see one another and each can be declashed in any order. The
+    workers receive whole clusters (:func:`pendant_clusters` at twice ``clashdist``), so no two
+    concurrent tasks move atoms in contact with each other. Clusters are packed into
+    size-balanced tasks. Pendant ``i`` draws from ``default_rng(seed + i)``, so the result is
+    the same for any ``nworkers``.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        ``(N, 3)`` coordinates of the whole system.
+    pendants : list of (numpy.ndarray, list, list)
+        Per pendant, ``(pendant_heavy, bonds, movers)`` as for :func:`declash_pendant`.
+    env_heavy : numpy.ndarray
+        Row indices of the heavy atoms outside every pendant (the static environment).
+    maxcycles, clashdist :
+        As for :func:`declash_pendant`.
+    seed : int
+        Base RNG seed.
+    nworkers : int, optional
+        Worker processes (default: one per CPU, at most one per cluster); 1 runs serially in
+        this process.
+
+    Returns
+    -------
+    list of int
+        Each pendant's final clash count.
+    """
+    n = len(pendants)
+    clashes = [0] * n
+    work = [i for i, (heavy, bonds, _mv) in enumerate(pendants) if bonds and len(heavy)]
+    if not work or len(env_heavy) == 0:
+        return clashes
+    env_heavy = np.asarray(env_heavy, dtype=int)
+    clusters = [[work[j] for j in c]
+                for c in pendant_clusters(coords, [pendants[i][0] for i in work], 2.0 * clashdist)]
+    nworkers = max(1, min(len(clusters), nworkers or os.cpu_count() or 1))
+
+    def _batch(members):
+        return [(i,) + tuple(pendants[i]) for i in members]
+
+    if nworkers == 1:
+        env_tree = cKDTree(coords[env_heavy])
+        for members in clusters:
+            rows, new, done = _declash_pendant_batch(coords, env_heavy, _batch(members), maxcycles,
+                                                     clashdist, seed, env_tree=env_tree)
+            coords[rows] = new
+            for i, c in done.items():
+                clashes[i] = c
+    else:
+        # largest clusters first, each onto the lightest of a few tasks per worker
+        ntasks = min(len(clusters), 4 * nworkers)
+        tasks, load = [[] for _ in range(ntasks)], np.zeros(ntasks)
+        for members in sorted(clusters, key=lambda m: -sum(len(pendants[i][0]) for i in m)):
+            t = int(np.argmin(load))
+            tasks[t] += members
+            load[t] += sum(len(pendants[i][0]) for i in members)
+        from concurrent.futures import ProcessPoolExecutor
+        from ..util.shared_array import SharedArray
+        with SharedArray(np.asarray(coords, dtype=float)) as shared, SharedArray(env_heavy) as env:
+            with ProcessPoolExecutor(max_workers=nworkers) as ex:
+                futs = [ex.submit(_declash_pendant_batch, shared, env, _batch(sorted(members)),
+                                  maxcycles, clashdist, seed) for members in tasks]
+                for fut in futs:
+                    rows, new, done = fut.result()
+                    coords[rows] = new
+                    for i, c in done.items():
+                        clashes[i] = c
+    logger.debug(f'declashed {len(work)} pendant(s) in {len(clusters)} cluster(s) '
+                 f'across {nworkers} worker(s)')
+    return clashes
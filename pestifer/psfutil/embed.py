@@ -0,0 +1,127 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Embedding a protein in a membrane, in numpy, without VMD.
+
+The ``bilayer_embed`` psfgen script finds the membrane atoms in contact with the protein with
+``measure contacts``, deletes their residues one ``delatom`` at a time, regenerates angles and
+dihedrals over the whole system and writes it back out -- slow on a membrane of a million atoms.
+Here the same *prefill* system (protein plus carved membrane) is computed on arrays:
+
+1. :func:`placement_shift` translates the protein to the membrane's lateral middle, with its
+   reference depth at the membrane's center of mass, as the script does;
+2. :func:`clashing_residues` flags each membrane residue with an atom within ``margin`` of a
+   protein heavy atom (a KD-tree query), or, for lipids, an atom inside the protein's convex
+   cross-section in its z-slab (:class:`SlabHulls`), which catches lipids left inside a
+   transmembrane bundle without touching it;
+3. the protein and the kept membrane residues are written as one PSF/PDB pair with
+   :class:`~pestifer.psfutil.psfarrays.PSFArrays`, which remaps the membrane's bonded terms
+   through a lookup vector and keeps ``segment`` records only for the segments that remain.
+
+The script then only adds the gap water above and below the membrane and neutralizes.
+"""
+import logging
+
+import numpy as np
+
+from scipy.spatial import Delaunay, QhullError, cKDTree
+
+from ..util.densityprofile import ION_RESNAMES, WATER_RESNAMES
+from .psfarrays import PSFArrays
+
+logger = logging.getLogger(__name__)
+
+
+def residue_index(atoms):
+    """Ordinal of each atom's residue (a new residue wherever segname or resid changes)."""
+    new_res = np.ones(len(atoms), dtype=bool)
+    new_res[1:] = ((atoms['segname'][1:] != atoms['segname'][:-1])
+                   | (atoms['resid'][1:] != atoms['resid'][:-1]))
+    return np.cumsum(new_res) - 1
+
+
+def placement_shift(membrane_xyz, membrane_mass, protein_xyz, protein_mass, protein_mid_z, z_value=0.0):
+    """
+    The translation that puts the protein's mass-weighted center at the membrane's lateral
+    middle (midway between its extreme atoms in x and y) and its ``protein_mid_z`` at the
+    membrane's mass-weighted center in z, less ``z_value``.
+    """
+    mid = 0.5 * (membrane_xyz.min(axis=0) + membrane_xyz.max(axis=0))
+    membrane_com_z = np.average(membrane_xyz[:, 2], weights=membrane_mass)
+    protein_com = np.average(protein_xyz, axis=0, weights=protein_mass)
+    return np.array([mid[0] - protein_com[0], mid[1] - protein_com[1],
+                     membrane_com_z - protein_mid_z - z_value])
+
+
+class SlabHulls:
+    """
+    The protein's convex cross-section in each z-slab ``thickness`` thick: the 2-D convex hull
+    (as a Delaunay triangulation) of the xy positions of its atoms in the slab.  A slab with
+    too few or collinear atoms has no hull.
+    """
+
+    def __init__(self, xyz, thickness=4.0):
+        self.thickness = float(thickness)
+        self.z0 = float(xyz[:, 2].min()) if len(xyz) else 0.0
+        slab = np.floor((xyz[:, 2] - self.z0) / self.thickness).astype(int)
+        self.hulls = {}
+        for k in np.unique(slab):
+            pts = xyz[slab == k, :2]
+            if len(pts) < 3:
+                continue
+            try:
+                self.hulls[int(k)] = Delaunay(pts)
+            except QhullError:
+                continue
+
+    def contains(self, points):
+        """Mask of ``points`` inside the hull of their slab."""
+        inside = np.zeros(len(points), dtype=bool)
+        slab = np.floor((points[:, 2] - self.z0) / self.thickness).astype(int)
+        for k, hull in self.hulls.items():
+            sel = np.flatnonzero(slab == k)
+            if len(sel):
+                inside[sel] = hull.find_simplex(points[sel, :2]) >= 0
+        return inside
+
+
+def clashing_residues(atoms, xyz, protein_heavy, margin=2.4, hull_thickness=4.0):
+    """
+    Atom mask of the membrane residues to remove around the protein: every atom of each residue
+    with an atom within ``margin`` of ``protein_heavy``, or of each lipid residue (not water or
+    ion) with an atom inside the protein's slab hulls (skipped when ``hull_thickness`` is None).
+    """
+    residue = residue_index(atoms)
+    hit = np.zeros(len(atoms), dtype=bool)
+    if len(protein_heavy) and len(atoms):
+        d, _ = cKDTree(protein_heavy).query(xyz, distance_upper_bound=margin)
+        hit = d < margin
+        if hull_thickness:
+            lipid = ~np.isin(atoms['resname'], list(WATER_RESNAMES | ION_RESNAMES))
+            hit[lipid] |= SlabHulls(protein_heavy, hull_thickness).contains(xyz[lipid])
+    drop_residue = np.bincount(residue, weights=hit, minlength=residue[-1] + 1 if len(residue) else 0) > 0
+    return drop_residue[residue]
+
+
+def embed_prefill(basename, protein_psf, protein_pdb, membrane_psf, membrane_pdb, protein_mid_z=0.0,
+                  z_value=0.0, margin=2.4, hull_thickness=4.0):
+    """
+    Place the protein in ``protein_psf``/``protein_pdb`` in the membrane in
+    ``membrane_psf``/``membrane_pdb`` (see :func:`placement_shift`), remove the membrane residues
+    :func:`clashing_residues` flags, and write the translated protein as
+    ``<basename>_embedded.pdb`` and the combined system as ``<basename>_prefill.psf``/``.pdb``,
+    the files the ``bilayer_embed`` script's ``-prefilled`` mode picks up.  Returns the
+    translation and the number of membrane residues removed.
+    """
+    protein = PSFArrays.from_files(protein_psf, protein_pdb)
+    membrane = PSFArrays.from_files(membrane_psf, membrane_pdb)
+    shift = placement_shift(membrane.xyz, membrane.atoms['mass'], protein.xyz, protein.atoms['mass'],
+                            protein_mid_z, z_value)
+    protein.xyz = protein.xyz + shift
+    protein.write_pdb(f'{basename}_embedded.pdb')
+    heavy = protein.xyz[protein.atoms['mass'] > 1.1]
+    drop = clashing_residues(membrane.atoms, membrane.xyz, heavy, margin, hull_thickness)
+    nremoved = len(np.unique(residue_index(membrane.atoms)[drop]))
+    PSFArrays.concatenate([protein, membrane.subset(~drop)]).write(f'{basename}_prefill')
+    logger.info(f'embedded protein shifted by {np.round(shift, 3).tolist()}; removed {nremoved} '
+                f'membrane residues within {margin} A of it or inside its slab hulls')
+    return shift, nremoved
@@ -102,36 +102,84 @@ def _resid_key(line):
     return f'{resseq}{icode}' if icode else resseq
 
 
-def backbone_from_pdb(pdb_path, chainID=None, segname=None):
+# One parsed ATOM/HETATM record per row. Fixed-width fields, so a parsed structure is a single
+# flat buffer that can be published to worker processes through shared memory.
+PDB_ATOM_DTYPE = np.dtype([('serial', 'i8'), ('name', 'U4'), ('resseq', 'i4'), ('icode', 'U1'),
+                           ('chainID', 'U1'), ('segname', 'U4'), ('xyz', 'f8', (3,))])
+
+
+def pdb_atoms(pdb_path):
     """
-    Parse backbone atoms (N, CA, C, O) from a PDB into ``{resid: {atomname: xyz}}``.
+    Parse every ATOM/HETATM record of a PDB, once, into a :data:`PDB_ATOM_DTYPE` array.
 
-    Selects records by ``segname`` (cols 73-76) when given, else by ``chainID`` (col 22),
-    else all. resid is the sequence number (int) or ``'<seq><icode>'`` when an insertion code
-    is present (see :func:`_resid_key`). Later records win on a duplicate (resid, atomname) --
-    callers should pass an altloc-free / single-model PDB.
+    The ``*_from_atoms`` functions below select from this array what the ``*_from_pdb``
+    functions would read from the file, so a structure whose loops are closed one after another
+    (or in parallel workers) is parsed once rather than once per query. A record whose
+    residue number or coordinates cannot be read is skipped; an unreadable serial is -1.
     """
-    out = {}
+    rows = []
     with open(pdb_path) as fh:
         for line in fh:
             if not line.startswith(('ATOM', 'HETATM')):
                 continue
-            name = line[12:16].strip()
-            if name not in _BACKBONE:
-                continue
-            if segname is not None and line[72:76].strip() != segname:
-                continue
-            if chainID is not None and line[21:22].strip() != chainID:
-                continue
             try:
-                resid = _resid_key(line)
-                xyz = np.array([float(line[30:38]), float(line[38:46]), float(line[46:54])])
+                xyz = (float(line[30:38]), float(line[38:46]), float(line[46:54]))
+                resseq = int(line[22:26])
             except ValueError:
                 continue
-            out.setdefault(resid, {})[name] = xyz
+            try:
+                serial = int(line[6:11])
+            except ValueError:
+                serial = -1
+            rows.append((serial, line[12:16].strip(), resseq, line[26].strip(),
+                         line[21:22].strip(), line[72:76].strip(), xyz))
+    return np.array(rows, dtype=PDB_ATOM_DTYPE)
+
+
+def _selection(atoms, segname=None, chainID=None):
+    """Row mask of ``atoms`` by ``segname`` when given, else by ``chainID``, else all -- the
+    selection rule of the ``*_from_pdb`` readers."""
+    mask = np.ones(len(atoms), dtype=bool)
+    if segname is not None:
+        mask &= atoms['segname'] == segname
+    if chainID is not None:
+        mask &= atoms['chainID'] == chainID
+    return mask
+
+
+def _split_resid(resid):
+    """``(resseq, icode)`` of a resid key as made by :func:`_resid_key`."""
+    if isinstance(resid, str):
+        head = resid.rstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
+        return int(head), resid[len(head):]
+    return int(resid), ''
+
+
+def _row_resid(atom):
+    return f"{atom['resseq']}{atom['icode']}" if atom['icode'] else int(atom['resseq'])
+
+
+def backbone_from_atoms(atoms, chainID=None, segname=None):
+    """:func:`backbone_from_pdb` on a structure already parsed by :func:`pdb_atoms`."""
+    out = {}
+    rows = np.flatnonzero(_selection(atoms, segname, chainID) & np.isin(atoms['name'], _BACKBONE))
+    for atom in atoms[rows]:
+        out.setdefault(_row_resid(atom), {})[str(atom['name'])] = np.array(atom['xyz'], dtype=float)
     return out
 
 
+def backbone_from_pdb(pdb_path, chainID=None, segname=None):
+    """
+    Parse backbone atoms (N, CA, C, O) from a PDB into ``{resid: {atomname: xyz}}``.
+
+    Selects records by ``segname`` (cols 73-76) when given, else by ``chainID`` (col 22),
+    else all. resid is the sequence number (int) or ``'<seq><icode>'`` when an insertion code
+    is present (see :func:`_resid_key`). Later records win on a duplicate (resid, atomname) --
+    callers should pass an altloc-free / single-model PDB.
+    """
+    return backbone_from_atoms(pdb_atoms(pdb_path), chainID=chainID, segname=segname)
+
+
 def build_loop_ccd_problem(backbone, loop_resids, n_anchor_resid):
     """
     Assemble the CCD arrays for closing one loop, from a per-residue backbone map.
@@ -192,6 +240,17 @@ def build_loop_ccd_problem(backbone, loop_resids, n_anchor_resid):
             'moving_masks': masks, 'end_idx': end_idx}
 
 
+def loop_atoms_from_atoms(atoms, resids, segname=None, chainID=None):
+    """:func:`loop_atoms_from_pdb` on a structure already parsed by :func:`pdb_atoms`."""
+    sel = _selection(atoms, segname, chainID)
+    order, coords, serials = [], [], []
+    for r in resids:
+        resseq, icode = _split_resid(r)
+        for atom in atoms[np.flatnonzero(sel & (atoms['resseq'] == resseq) & (atoms['icode'] == icode))]:
+            order.append((r, str(atom['name']))); coords.append(atom['xyz']); serials.append(int(atom['serial']))
+    return order, np.asarray(coords, dtype=float).reshape(-1, 3), serials
+
+
 def loop_atoms_from_pdb(pdb_path, resids, segname=None, chainID=None):
     """
     Parse ALL atoms of the given ``resids`` from a PDB into an ordered structure.
@@ -201,31 +260,7 @@ def loop_atoms_from_pdb(pdb_path, resids, segname=None, chainID=None):
     coordinates back with :func:`pestifer.util.coord.pdb_replace_coords`). Atoms are kept in
     file order within each residue and in ``resids`` order across residues.
     """
-    want = set(resids)
-    per = {r: [] for r in resids}
-    with open(pdb_path) as fh:
-        for line in fh:
-            if not line.startswith(('ATOM', 'HETATM')):
-                continue
-            if segname is not None and line[72:76].strip() != segname:
-                continue
-            if chainID is not None and line[21:22].strip() != chainID:
-                continue
-            try:
-                resid = _resid_key(line)
-            except ValueError:
-                continue
-            if resid not in want:
-                continue
-            name = line[12:16].strip()
-            serial = int(line[6:11])
-            xyz = np.array([float(line[30:38]), float(line[38:46]), float(line[46:54])])
-            per[resid].append((name, serial, xyz))
-    order, coords, serials = [], [], []
-    for r in resids:
-        for (name, serial, xyz) in per[r]:
-            order.append((r, name)); coords.append(xyz); serials.append(serial)
-    return order, np.asarray(coords, dtype=float), serials
+    return loop_atoms_from_atoms(pdb_atoms(pdb_path), resids, segname=segname, chainID=chainID)
 
 
 # residue-p atoms that stay fixed under a phi (N-CA) rotation: the N-side backbone
@@ -374,6 +409,9 @@ def anchor_closure_target(anchor_N, anchor_CA, anchor_C, phi_deg=-120.0):
     return np.array([CA, C, O])
 
 
+_FLAT = 1e-9    # |(A, B)| below which the CCD objective is flat in theta (A^2 units)
+
+
 def optimal_ccd_angle(moving, target, pivot, axis, weights=None):
     """
     Closed-form rotation angle (degrees, right-handed about ``axis``) that minimizes
@@ -397,7 +435,9 @@ def optimal_ccd_angle(moving, target, pivot, axis, weights=None):
     Returns
     -------
     float
-        The optimal angle in degrees.
+        The optimal angle in degrees; 0.0 when every moving atom lies on the axis (as for
+        the last residue's psi, whose CA-C axis carries the end effector), where the
+        objective is flat and ``atan2`` would return roundoff noise.
     """
     moving = np.asarray(moving, dtype=float)
     target = np.asarray(target, dtype=float)
@@ -415,6 +455,8 @@ def optimal_ccd_angle(moving, target, pivot, axis, weights=None):
     A = float(np.sum(w * np.sum(r * f, axis=1)))
     kxr = np.cross(np.broadcast_to(k, r.shape), r)
     B = float(np.sum(w * np.sum(kxr * f, axis=1)))
+    if np.hypot(A, B) < _FLAT:
+        return 0.0
     return float(np.degrees(np.arctan2(B, A)))
 
 
@@ -565,29 +607,23 @@ def _heavy_mask(order):
     return np.array([not name.startswith('H') for (_r, name) in order], dtype=bool)
 
 
+def heavy_env_mask(atoms, exclude_serials=(), segname=None, chainID=None):
+    """Row mask of the heavy-atom *environment* in a :func:`pdb_atoms` array: the rows
+    :func:`heavy_env_coords_from_pdb` keeps."""
+    mask = _selection(atoms, segname, chainID) & ~np.char.startswith(atoms['name'], 'H')
+    if len(exclude_serials):
+        mask &= ~np.isin(atoms['serial'], np.fromiter((int(x) for x in exclude_serials), dtype=np.int64))
+    return mask
+
+
 def heavy_env_coords_from_pdb(pdb_path, exclude_serials=(), segname=None, chainID=None):
     """
     Heavy-atom coordinates of the *environment* -- every atom in ``pdb_path`` except those
     whose PDB serial is in ``exclude_serials`` (typically the loop being scored). Used as the
     frozen backdrop for :func:`loop_clash_report`'s loop-vs-environment check.
     """
-    excl = set(int(s) for s in exclude_serials)
-    pts = []
-    with open(pdb_path) as fh:
-        for line in fh:
-            if not line.startswith(('ATOM', 'HETATM')):
-                continue
-            if segname is not None and line[72:76].strip() != segname:
-                continue
-            if chainID is not None and line[21:22].strip() != chainID:
-                continue
-            name = line[12:16].strip()
-            if name.startswith('H'):
-                continue
-            if int(line[6:11]) in excl:
-                continue
-            pts.append([float(line[30:38]), float(line[38:46]), float(line[46:54])])
-    return np.asarray(pts, dtype=float)
+    atoms = pdb_atoms(pdb_path)
+    return np.array(atoms['xyz'][heavy_env_mask(atoms, exclude_serials, segname, chainID)], dtype=float)
 
 
 def loop_clash_report(order, coords, loop_resids, env_coords=None,
@@ -680,85 +716,6 @@ def _clash_score(report, weight_deep=100.0):
     return weight_deep * deep + soft
 
 
-def refine_declash_ccd(coords, prob, order, loop_resids, end_idx, target, rng, clash_env_fn,
-                       n_iters=250, perturb_deg=25.0, close_tol=0.15, close_iters=400,
-                       weight_deep=100.0, T0=8.0, Tmin=0.4, clash_fn=None):
-    """
-    Iteratively declash a *closed* compact loop by perturb-and-reclose simulated annealing.
-
-    Random sampling rarely lands a crowded loop in the small clash-free region of
-    conformation space; iterative descent walks there. Each step perturbs one backbone
-    dihedral by a small random angle, re-closes the end onto ``target`` with CCD (a short move
-    because the loop stays compact), and scores the result with :func:`loop_clash_report`
-    against ``clash_env_fn(coords)`` -- a callback returning the environment coordinates for a
-    trial pose, which lets the caller fold in the loop's own symmetry images (so the mutually
-    interacting copies of an axial loop declash *together*, radially outward). Moves that lower
-    the clash score are accepted; worse moves are accepted with a Metropolis probability under
-    a geometrically annealed temperature, to escape local minima. Deterministic for a fixed
-    ``rng``.
-
-    Parameters
-    ----------
-    coords : (M, 3)   -- a closed starting pose (e.g. from :func:`ccd_close`)
-    prob : dict from :func:`build_loop_problem` (``bonds``, ``moving_masks``)
-    order : list[(resid, atomname)] per row (for :func:`loop_clash_report`)
-    loop_resids, end_idx, target : as for :func:`ccd_close`
-    rng : numpy.random.Generator
-    clash_env_fn : callable (M,3) array -> (K,3) environment coords for scoring that pose
-    n_iters, perturb_deg, close_tol, close_iters, weight_deep, T0, Tmin : tuning
-
-    Returns
-    -------
-    (best_coords, best_report) : (np.ndarray, dict)
-    """
-    bonds = prob['bonds']
-    masks = prob['moving_masks']
-    nb = len(bonds)
-
-    def evaluate(X):
-        rep = loop_clash_report(order, X, loop_resids, env_coords=clash_env_fn(X))
-        return _clash_score(rep, weight_deep), rep
-
-    cur = np.array(coords, dtype=float)
-    cur_s, cur_rep = evaluate(cur)
-    best, best_s, best_rep = np.array(cur), cur_s, cur_rep
-    if best_s == 0:
-        return best, best_rep
-    early = max(1, nb // 3)              # leading third of the bonds = longest levers
-    for it in range(n_iters):
-        T = T0 * (Tmin / T0) ** (it / max(1, n_iters - 1))
-        # Two move types: an occasional LARGE swing about a leading (long-lever) bond, which
-        # rotates the whole loop bulk (e.g. radially outward, away from an assembly axis), and
-        # otherwise a small local perturbation that refines shape. The swing supplies the big
-        # concerted motion a crowded loop needs to escape; the local move polishes.
-        if rng.random() < 0.35:
-            b = int(rng.integers(early))
-            delta = float(rng.normal(0.0, 90.0))
-        else:
-            b = int(rng.integers(nb))
-            delta = float(rng.normal(0.0, perturb_deg))
-        a, c = bonds[b]
-        mask = np.asarray(masks[b], dtype=bool)
-        trial = np.array(cur)
-        trial[mask] = rotate_points_about_axis(trial[mask], trial[a], trial[c] - trial[a], delta)
-        if clash_fn is not None:          # guarded re-close: refuse to reintroduce clashes
-            trial, rmsd, _ = ccd_close_guarded(trial, bonds, masks, end_idx, target, clash_fn,
-                                               tol=close_tol, max_iters=close_iters)
-        else:
-            trial, rmsd, _ = ccd_close(trial, bonds, masks, end_idx, target,
-                                       tol=close_tol, max_iters=close_iters)
-        if rmsd > 0.6:                    # could not re-close cleanly -> reject
-            continue
-        s, rep = evaluate(trial)
-        if s <= cur_s or rng.random() < np.exp(-(s - cur_s) / max(T, 1e-6)):
-            cur, cur_s, cur_rep = trial, s, rep
-            if s < best_s:
-                best, best_s, best_rep = np.array(trial), s, rep
-                if best_s == 0:
-                    break
-    return best, best_rep
-
-
 def ccd_close_guarded(coords, bonds, moving_masks, end_idx, target, clash_fn,
                       tol=0.15, max_iters=500, stall_tol=1e-6):
     """
@@ -796,9 +753,403 @@ def ccd_close_guarded(coords, bonds, moving_masks, end_idx, target, clash_fn,
     return X, end_rmsd(X, end_idx, target), cur_clash
 
 
+# ---------------------------------------------------------------------------------------------
+# Batched engine: an ensemble of seeds for one loop, closed simultaneously.
+#
+# The functions above move one pose at a time, so an ensemble costs a Python-level pass per
+# pivot per seed. The ``*_batch`` functions below hold the ensemble as an (S, M, 3) array and do
+# each pivot's optimal-angle solve and rotation for every seed in one vectorized step, scoring
+# clashes for the whole batch against a single shared environment KD-tree. Seeds that have
+# converged drop out of the working set, so each seed follows exactly the trajectory the serial
+# function would give it.
+# ---------------------------------------------------------------------------------------------
+
+def _cross(a, b):
+    """``np.cross`` over the last axis of broadcastable arrays, without its axis bookkeeping
+    (which dominates for the small arrays of a loop)."""
+    a0, a1, a2 = a[..., 0], a[..., 1], a[..., 2]
+    b0, b1, b2 = b[..., 0], b[..., 1], b[..., 2]
+    return np.stack([a1 * b2 - a2 * b1, a2 * b0 - a0 * b2, a0 * b1 - a1 * b0], axis=-1)
+
+
+def _rotate_batch(points, pivots, axes, degrees):
+    """:func:`~pestifer.util.coord.rotate_points_about_axis` over a batch: rotate each seed's
+    ``points[s]`` (S, N, 3) by ``degrees[s]`` about the line through ``pivots[s]`` along
+    ``axes[s]``. A zero axis leaves that seed's points unmoved."""
+    axes = np.asarray(axes, dtype=float)
+    n = np.linalg.norm(axes, axis=1)
+    k = axes / np.where(n > 0.0, n, 1.0)[:, None]
+    theta = np.radians(np.where(n > 0.0, degrees, 0.0))
+    c, s = np.cos(theta)[:, None, None], np.sin(theta)[:, None, None]
+    p = points - pivots[:, None, :]
+    kxp = _cross(k[:, None, :], p)
+    kdotp = np.einsum('snj,sj->sn', p, k)
+    return p * c + kxp * s + kdotp[:, :, None] * k[:, None, :] * (1.0 - c) + pivots[:, None, :]
+
+
+def _dihedrals_batch(p1, p2, p3, p4):
+    """:func:`dihedral_deg` over a batch of (S, 3) point sets; returns (S,) degrees."""
+    b1, b2, b3 = p2 - p1, p3 - p2, p4 - p3
+    n1 = _cross(b1, b2)
+    n2 = _cross(b2, b3)
+    m1 = _cross(n1, b2 / np.linalg.norm(b2, axis=1)[:, None])
+    x = np.sum(n1 * n2, axis=1)
+    y = np.sum(m1 * n2, axis=1)
+    return np.degrees(np.arctan2(-y, x))
+
+
+def optimal_ccd_angles(moving, target, pivots, axes, weights=None):
+    """
+    :func:`optimal_ccd_angle` for a batch of seeds.
+
+    ``moving`` is (S, K, 3); ``target`` is (K, 3), shared by every seed, or (S, K, 3);
+    ``pivots`` and ``axes`` are (S, 3). Returns the (S,) optimal angles in degrees (0.0 for a
+    seed whose axis is zero or whose moving atoms all lie on it).
+    """
+    moving = np.asarray(moving, dtype=float)
+    axes = np.asarray(axes, dtype=float)
+    n = np.linalg.norm(axes, axis=1)
+    k = (axes / np.where(n > 0.0, n, 1.0)[:, None])[:, None, :]
+    w = np.ones(moving.shape[1]) if weights is None else np.asarray(weights, dtype=float)
+    r = moving - pivots[:, None, :]
+    r = r - np.einsum('skj,sij->sk', r, k)[:, :, None] * k
+    f = np.asarray(target, dtype=float) - pivots[:, None, :]
+    f = f - np.einsum('skj,sij->sk', f, k)[:, :, None] * k
+    A = np.einsum('skj,skj,k->s', r, f, w)
+    B = np.einsum('skj,skj,k->s', _cross(k, r), f, w)
+    return np.where((n > 0.0) & (np.hypot(A, B) >= _FLAT), np.degrees(np.arctan2(B, A)), 0.0)
+
+
+def end_rmsds(coords, end_idx, target):
+    """:func:`end_rmsd` for each seed of an (S, M, 3) batch; returns (S,)."""
+    d = np.asarray(coords, dtype=float)[:, end_idx] - np.asarray(target, dtype=float)
+    return np.sqrt(np.mean(np.sum(d * d, axis=2), axis=1))
+
+
+def ccd_close_batch(coords, bonds, moving_masks, end_idx, target,
+                    weights=None, max_iters=500, tol=0.08, stall_tol=1e-6):
+    """
+    :func:`ccd_close` for an ensemble of S poses of the same loop, closed simultaneously.
+
+    ``coords`` is (S, M, 3); ``bonds``, ``moving_masks``, ``end_idx``, ``target`` and the
+    tuning arguments are as for :func:`ccd_close` and are shared by every seed. Each seed
+    stops on its own convergence test, so its result matches what :func:`ccd_close` returns
+    for it alone.
+
+    Returns
+    -------
+    (coords_closed, final_rmsd, iterations) : (np.ndarray (S, M, 3), np.ndarray (S,), np.ndarray (S,))
+    """
+    X = np.array(coords, dtype=float)
+    target = np.asarray(target, dtype=float)
+    end_idx = np.asarray(end_idx, dtype=int)
+    masks = [np.asarray(m, dtype=bool) for m in moving_masks]
+    last = end_rmsds(X, end_idx, target)
+    iters = np.full(len(X), max_iters)
+    active = np.ones(len(X), dtype=bool)
+    for it in range(1, max_iters + 1):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        Xa = X[idx]
+        for (a, b), mask in zip(bonds, masks):
+            pivots = Xa[:, a].copy()
+            axes = Xa[:, b] - pivots
+            theta = optimal_ccd_angles(Xa[:, end_idx], target, pivots, axes, weights)
+            Xa[:, mask] = _rotate_batch(Xa[:, mask], pivots, axes, theta)
+        X[idx] = Xa
+        r = end_rmsds(Xa, end_idx, target)
+        done = (r < tol) | ((last[idx] - r) < stall_tol)
+        iters[idx[done]] = it
+        active[idx[done]] = False
+        last[idx] = r
+    return X, end_rmsds(X, end_idx, target), iters
+
+
+def ccd_close_guarded_batch(coords, bonds, moving_masks, end_idx, target, clash_fn,
+                            tol=0.15, max_iters=500, stall_tol=1e-6):
+    """
+    :func:`ccd_close_guarded` for an ensemble of S poses, closed simultaneously.
+
+    ``clash_fn`` maps an (S', M, 3) batch to its (S',) deep-clash counts (e.g.
+    :meth:`LoopClashScorer.deep`); at each bond a seed commits its closure-optimal rotation
+    only if that count does not increase. Returns ``(coords, final_rmsd, final_clash)`` as
+    (S, M, 3), (S,) and (S,) arrays.
+    """
+    X = np.array(coords, dtype=float)
+    target = np.asarray(target, dtype=float)
+    end_idx = np.asarray(end_idx, dtype=int)
+    masks = [np.asarray(m, dtype=bool) for m in moving_masks]
+    cur_clash = np.asarray(clash_fn(X))
+    last = end_rmsds(X, end_idx, target)
+    active = np.ones(len(X), dtype=bool)
+    for _it in range(max_iters):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        Xa, ca = X[idx], cur_clash[idx]
+        for (a, b), mask in zip(bonds, masks):
+            pivots = Xa[:, a].copy()
+            axes = Xa[:, b] - pivots
+            theta = optimal_ccd_angles(Xa[:, end_idx], target, pivots, axes)
+            trial = Xa.copy()
+            trial[:, mask] = _rotate_batch(Xa[:, mask], pivots, axes, theta)
+            tc = np.asarray(clash_fn(trial))
+            keep = tc <= ca
+            Xa[keep] = trial[keep]
+            ca = np.where(keep, tc, ca)
+        X[idx], cur_clash[idx] = Xa, ca
+        r = end_rmsds(Xa, end_idx, target)
+        done = (r < tol) | (np.abs(last[idx] - r) < stall_tol)
+        active[idx[done]] = False
+        last[idx] = r
+    return X, end_rmsds(X, end_idx, target), cur_clash
+
+
+def apply_backbone_dihedrals_batch(coords, prob, loop_resids, phipsi, prev_C, next_N):
+    """
+    :func:`apply_backbone_dihedrals` for S sampled backbones at once.
+
+    ``coords`` is the (M, 3) starting pose shared by every seed and ``phipsi`` is
+    (S, len(loop_resids), 2). Returns the (S, M, 3) seeded poses.
+    """
+    phipsi = np.asarray(phipsi, dtype=float)
+    S = len(phipsi)
+    X = np.repeat(np.asarray(coords, dtype=float)[None], S, axis=0)
+    r = prob['row']
+    masks = [np.asarray(m, dtype=bool) for m in prob['moving_masks']]
+    prev_C = np.broadcast_to(np.asarray(prev_C, dtype=float), (S, 3))
+    next_N = np.broadcast_to(np.asarray(next_N, dtype=float), (S, 3))
+    n = len(loop_resids)
+    for p, resid in enumerate(loop_resids):
+        N, CA, C = r[(resid, 'N')], r[(resid, 'CA')], r[(resid, 'C')]
+        pC = X[:, r[(loop_resids[p - 1], 'C')]] if p > 0 else prev_C
+        cur = _dihedrals_batch(pC, X[:, N], X[:, CA], X[:, C])
+        pivots = X[:, N].copy()
+        m = masks[2 * p]
+        X[:, m] = _rotate_batch(X[:, m], pivots, X[:, CA] - pivots, phipsi[:, p, 0] - cur)
+        if p < n - 1:         # the last residue's psi is fixed by closure (see the serial form)
+            nN = X[:, r[(loop_resids[p + 1], 'N')]]
+            cur = _dihedrals_batch(X[:, N], X[:, CA], X[:, C], nN)
+            pivots = X[:, CA].copy()
+            m = masks[2 * p + 1]
+            X[:, m] = _rotate_batch(X[:, m], pivots, X[:, C] - pivots, phipsi[:, p, 1] - cur)
+    return X
+
+
+class LoopClashScorer:
+    """
+    Heavy-atom clash counts for a batch of poses of one loop against a fixed environment.
+
+    The batched counterpart of :func:`loop_clash_report`: the same two populations (intra-loop
+    pairs of non-adjacent residues, and loop-vs-environment contacts), counted for every pose
+    of an (S, M, 3) batch with one pairwise-distance pass and one query of a KD-tree over the
+    environment.
+
+    Parameters
+    ----------
+    order : list[tuple[int, str]]
+        ``(resid, atomname)`` per row, as for :func:`loop_clash_report`.
+    loop_resids : sequence[int]
+    env_coords : (K, 3) array, optional
+        The environment; a KD-tree is built over it.
+    soft_cutoff, deep_cutoff : float
+        As for :func:`loop_clash_report`.
+    env_tree : scipy.spatial.cKDTree, optional
+        A prebuilt environment tree (e.g. :attr:`LoopEnvironment.tree`), used instead of
+        ``env_coords``.
+    env_exclude : array_like[int], optional
+        Points of ``env_tree`` that are not this loop's environment (its bonded anchors);
+        contacts with them are not counted.
+    """
+
+    def __init__(self, order, loop_resids, env_coords=None, soft_cutoff=2.0, deep_cutoff=1.6,
+                 env_tree=None, env_exclude=()):
+        from scipy.spatial import cKDTree
+        self.order = order
+        self.loop_resids = loop_resids
+        self.heavy = _heavy_mask(order)
+        pos = {r: i for i, r in enumerate(loop_resids)}
+        hpos = np.array([pos[order[i][0]] for i in range(len(order)) if self.heavy[i]], dtype=int)
+        self.intra = np.triu(np.abs(hpos[:, None] - hpos[None, :]) >= 2, k=1)
+        if env_tree is None and env_coords is not None and len(env_coords):
+            env_tree = cKDTree(np.asarray(env_coords, dtype=float))
+        self.env_tree = env_tree
+        self.env_exclude = np.asarray(env_exclude, dtype=int)
+        self._excluded = (env_tree.data[self.env_exclude] if env_tree is not None
+                          else np.empty((0, 3)))
+        self.soft_cutoff = soft_cutoff
+        self.deep_cutoff = deep_cutoff
+
+    def counts(self, coords):
+        """``(deep, soft)`` contact counts, each (S,), for an (S, M, 3) batch; as in
+        :func:`loop_clash_report`, deep contacts are also counted as soft ones."""
+        H = np.asarray(coords, dtype=float)[:, self.heavy]
+        S, nh = H.shape[0], H.shape[1]
+        d = np.linalg.norm(H[:, :, None, :] - H[:, None, :, :], axis=3)
+        soft = np.sum((d <= self.soft_cutoff) & self.intra, axis=(1, 2))
+        deep = np.sum((d < self.deep_cutoff) & self.intra, axis=(1, 2))
+        if self.env_tree is not None and nh:
+            flat = H.reshape(-1, 3)
+            soft = soft + self.env_tree.query_ball_point(flat, self.soft_cutoff,
+                                                         return_length=True).reshape(S, nh).sum(axis=1)
+            deep = deep + self.env_tree.query_ball_point(flat, self.deep_cutoff,
+                                                         return_length=True).reshape(S, nh).sum(axis=1)
+            if len(self._excluded):
+                dx = np.linalg.norm(H[:, :, None, :] - self._excluded[None, None], axis=3)
+                soft = soft - np.sum(dx <= self.soft_cutoff, axis=(1, 2))
+                deep = deep - np.sum(dx <= self.deep_cutoff, axis=(1, 2))
+        return deep, soft
+
+    def deep(self, coords):
+        """(S,) deep-contact counts: the batched ``clash_fn`` for guarded closure."""
+        return self.counts(coords)[0]
+
+    def score(self, coords, weight_deep=100.0):
+        """(S,) scalar penalties, as :func:`_clash_score` gives for one pose."""
+        deep, soft = self.counts(coords)
+        return weight_deep * deep + soft
+
+    def report(self, coords):
+        """The :func:`loop_clash_report` of one (M, 3) pose against this scorer's environment,
+        using its (possibly shared) tree rather than building one."""
+        X = np.asarray(coords, dtype=float)
+        rep = loop_clash_report(self.order, X, self.loop_resids,
+                                soft_cutoff=self.soft_cutoff, deep_cutoff=self.deep_cutoff)
+        if self.env_tree is not None:
+            hX = X[self.heavy]
+            skip = set(self.env_exclude.tolist())
+            for k, hits in enumerate(self.env_tree.query_ball_point(hX, self.soft_cutoff)):
+                for h in hits:
+                    if h in skip:
+                        continue
+                    d = float(np.linalg.norm(hX[k] - self.env_tree.data[h]))
+                    rep['n_env_soft'] += 1
+                    rep['worst'] = min(rep['worst'], d)
+                    if d < self.deep_cutoff:
+                        rep['n_env_deep'] += 1
+            rep['topological'] = bool(rep['topological'] or rep['n_env_deep'])
+        return rep
+
+
+class LoopEnvironment:
+    """
+    The frozen backdrop for closing a structure's loops, built once per structure.
+
+    Every heavy atom of ``atoms`` (a :func:`pdb_atoms` array, or a
+    :class:`~pestifer.util.shared_array.SharedArray` of one) that is not in any modeled loop,
+    with a KD-tree over it. Each loop's environment is this minus the loop's own two anchors,
+    which :meth:`exclude` maps to tree points for :class:`LoopClashScorer` to skip.
+    """
+
+    def __init__(self, atoms, all_loop_serials=()):
+        from scipy.spatial import cKDTree
+        self.atoms = atoms
+        arr = np.asarray(atoms)
+        self.rows = np.flatnonzero(heavy_env_mask(arr, all_loop_serials))
+        self.serials = arr['serial'][self.rows]
+        self.coords = np.array(arr['xyz'][self.rows], dtype=float)
+        self.tree = cKDTree(self.coords) if len(self.coords) else None
+
+    def exclude(self, serials):
+        """Tree indices of the environment atoms with these PDB serials."""
+        return np.flatnonzero(np.isin(self.serials, np.asarray(list(serials), dtype=np.int64)))
+
+
+_environments = {}
+""" The :class:`LoopEnvironment` last built in this process, per structure: a worker closing
+several loops of one structure builds its tree once; emptied by :func:`forget_environments`. """
+
+
+def loop_environment(atoms, all_loop_serials=()):
+    """The (cached) :class:`LoopEnvironment` of ``atoms`` with ``all_loop_serials`` excluded.
+
+    Keyed by the shared block's name for a :class:`~pestifer.util.shared_array.SharedArray`,
+    else by the array's identity (the cached environment keeps it alive)."""
+    serials = tuple(sorted(int(x) for x in all_loop_serials))
+    key = (getattr(atoms, 'name', None) or id(atoms), hash(serials))
+    env = _environments.get(key)
+    if env is None:
+        if len(_environments) >= 4:
+            _environments.clear()
+        env = _environments[key] = LoopEnvironment(atoms, serials)
+    return env
+
+
+def forget_environments():
+    """Drop every cached :class:`LoopEnvironment` (and the parsed structure and KD-tree it keeps
+    alive); the ligate task calls this when it finishes."""
+    _environments.clear()
+
+
+def refine_declash_ccd_batch(coords, prob, end_idx, target, rng, scorer,
+                             n_iters=250, perturb_deg=25.0, close_tol=0.15, close_iters=400,
+                             weight_deep=100.0, T0=8.0, Tmin=0.4, guard=False, first_clean=False):
+    """
+    Iteratively declash an ensemble of S *closed* compact loops by perturb-and-reclose simulated
+    annealing, all seeds at once.
+
+    Random sampling rarely lands a crowded loop in the small clash-free region of conformation
+    space; iterative descent walks there. Each move rotates about one backbone bond -- an
+    occasional large swing about a leading (long-lever) bond, which carries the loop bulk away
+    from its crowd, otherwise a small local perturbation -- and re-closes the end onto
+    ``target``. Every seed runs its own Metropolis walk under the shared, geometrically
+    annealed temperature schedule: each step draws one move per seed, re-closes the whole batch with
+    :func:`ccd_close_batch` (or :func:`ccd_close_guarded_batch` if ``guard``), and scores it
+    with ``scorer`` (a :class:`LoopClashScorer`). A seed stops once it reaches a clash-free
+    pose; with ``first_clean`` the whole batch stops as soon as any seed does (all a caller
+    keeping only the best of the ensemble needs). Deterministic for a fixed ``rng``.
+
+    Returns
+    -------
+    (best_coords, best_score) : (np.ndarray (S, M, 3), np.ndarray (S,))
+    """
+    bonds = prob['bonds']
+    masks = np.array(prob['moving_masks'], dtype=bool)
+    nb = len(bonds)
+    A = np.array([a for a, _c in bonds])
+    C = np.array([c for _a, c in bonds])
+    cur = np.array(coords, dtype=float)
+    cur_s = scorer.score(cur, weight_deep)
+    best, best_s = cur.copy(), cur_s.copy()
+    active = best_s > 0
+    early = max(1, nb // 3)              # leading third of the bonds = longest levers
+    for it in range(n_iters):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0 or (first_clean and len(idx) < len(active)):
+            break
+        T = T0 * (Tmin / T0) ** (it / max(1, n_iters - 1))
+        n = len(idx)
+        swing = rng.random(n) < 0.35
+        b = np.where(swing, rng.integers(early, size=n), rng.integers(nb, size=n))
+        delta = np.where(swing, rng.normal(0.0, 90.0, n), rng.normal(0.0, perturb_deg, n))
+        trial = cur[idx]
+        rows = np.arange(n)
+        pivots = trial[rows, A[b]]
+        rotated = _rotate_batch(trial, pivots, trial[rows, C[b]] - pivots, delta)
+        trial = np.where(masks[b][:, :, None], rotated, trial)
+        if guard:
+            trial, rmsd, _ = ccd_close_guarded_batch(trial, bonds, masks, end_idx, target, scorer.deep,
+                                                     tol=close_tol, max_iters=close_iters)
+        else:
+            trial, rmsd, _ = ccd_close_batch(trial, bonds, masks, end_idx, target,
+                                             tol=close_tol, max_iters=close_iters)
+        s = scorer.score(trial, weight_deep)
+        uphill = np.exp(np.minimum(0.0, -(s - cur_s[idx]) / max(T, 1e-6)))
+        accept = (rmsd <= 0.6) & ((s <= cur_s[idx]) | (rng.random(n) < uphill))
+        cur[idx[accept]] = trial[accept]
+        cur_s[idx[accept]] = s[accept]
+        better = accept & (s < best_s[idx])
+        best[idx[better]] = trial[better]
+        best_s[idx[better]] = s[better]
+        active[idx[better & (s == 0)]] = False
+    return best, best_s
+
+
 def close_one_loop(src_pdb, segname, loop_resids, n_anchor_resid, c_anchor_resid,
                    all_loop_serials, seed, ensemble=10, refine=250, guard=False,
-                   max_iters=2000, tol=0.1, extra_env=None, progress_queue=None):
+                   max_iters=2000, tol=0.1, extra_env=None, progress_queue=None, batch=32,
+                   atoms=None):
     """
     Close one interior loop against the resolved structure and (optionally) a set of
     already-closed loops -- the standalone, picklable unit the ligate task runs in parallel
@@ -812,6 +1163,16 @@ def close_one_loop(src_pdb, segname, loop_resids, n_anchor_resid, c_anchor_resid
     (``refine`` iterations), and keeps the least-clashing of ``ensemble`` seeds. Deterministic
     for a fixed ``seed``.
 
+    ``atoms`` is ``src_pdb`` already parsed by :func:`pdb_atoms` -- a plain array, or a
+    :class:`~pestifer.util.shared_array.SharedArray` when the caller runs loops across a process
+    pool. Given it, the loop, its anchors and its environment are read from the array instead of
+    the file, and the environment KD-tree comes from the process's :func:`loop_environment`
+    cache, so every loop after the first in a process starts without parsing or tree building.
+
+    The ensemble runs through the batched engine (:func:`ccd_close_batch`,
+    :func:`refine_declash_ccd_batch`) ``batch`` seeds at a time; once a batch yields a
+    clash-free closure the remaining seeds are not run.
+
     ``progress_queue`` (optional) is a picklable queue -- a ``multiprocessing.Manager().Queue`` when
     called across a process pool -- onto which one item is pushed per ensemble candidate actually
     run, so the ligate driver can render a determinate progress bar with a time-remaining estimate.
@@ -819,76 +1180,76 @@ def close_one_loop(src_pdb, segname, loop_resids, n_anchor_resid, c_anchor_resid
     Returns a dict: ``segname``, ``loop`` (resids), ``serials``, ``order``, ``closed`` (M,3),
     ``rep`` (:func:`loop_clash_report`), ``heavy`` (heavy-atom coords), ``ca`` (Ca coords).
     """
-    from scipy.spatial import cKDTree
-    from scipy.spatial.distance import cdist
     rng = np.random.default_rng(seed)
-    bb = backbone_from_pdb(src_pdb, segname=segname)
-    order, coords, serials = loop_atoms_from_pdb(src_pdb, loop_resids, segname=segname)
+    if atoms is None:
+        atoms = pdb_atoms(src_pdb)
+        lenv = LoopEnvironment(atoms, all_loop_serials)
+    else:
+        lenv = loop_environment(atoms, all_loop_serials)
+    arr = np.asarray(atoms)
+    bb = backbone_from_atoms(arr, segname=segname)
+    order, coords, serials = loop_atoms_from_atoms(arr, loop_resids, segname=segname)
     prob = build_loop_problem(order, coords, loop_resids)
     r = prob['row']
     last = loop_resids[-1]
     end_idx = [r[(last, 'CA')], r[(last, 'C')]]
     target = anchor_closure_target(bb[c_anchor_resid]['N'], bb[c_anchor_resid]['CA'],
                                    bb[c_anchor_resid]['C'])[[0, 1]]
-    _ao, _ac, anch_ser = loop_atoms_from_pdb(src_pdb, [n_anchor_resid, c_anchor_resid], segname=segname)
-    env = heavy_env_coords_from_pdb(src_pdb, exclude_serials=list(all_loop_serials) + list(anch_ser))
+    _ao, _ac, anch_ser = loop_atoms_from_atoms(arr, [n_anchor_resid, c_anchor_resid], segname=segname)
+    del arr
+    anchors = lenv.exclude(anch_ser)
     if extra_env is not None and len(extra_env):
-        extra_env = np.asarray(extra_env, dtype=float)
-        env = np.vstack([env, extra_env]) if len(env) else extra_env
-
-    heavy_mask = np.array([not nm.startswith('H') for (_rr, nm) in order])
-    loop_pos = {rr: i for i, rr in enumerate(loop_resids)}
-    hpos = np.array([loop_pos[order[i][0]] for i in range(len(order)) if heavy_mask[i]])
-    _intra = np.triu(np.abs(hpos[:, None] - hpos[None, :]) >= 2, k=1)
-    env_tree = cKDTree(env) if len(env) else None
-
-    def clash_env_fn(_pose):
-        return env
-
-    def clash_fn(X):
-        hx = X[heavy_mask]
-        deep = 0
-        if env_tree is not None:
-            deep += int(env_tree.query_ball_point(hx, 1.6, return_length=True).sum())
-        deep += int(((cdist(hx, hx) < 1.6) & _intra).sum())
-        return deep
+        # sequential repair: loops closed so far join the environment, so it needs its own tree
+        env = np.delete(lenv.coords, anchors, axis=0)
+        env = np.vstack([env, np.asarray(extra_env, dtype=float)])
+        scorer = LoopClashScorer(order, loop_resids, env_coords=env)
+    else:
+        scorer = LoopClashScorer(order, loop_resids, env_tree=lenv.tree, env_exclude=anchors)
+
+    heavy_mask = _heavy_mask(order)
+    prev_C, next_N = bb[n_anchor_resid]['C'], bb[c_anchor_resid]['N']
 
+    ensemble = max(1, ensemble)
     best = None
-    for cand in range(max(1, ensemble)):
-        phipsi = sample_backbone_dihedrals(rng, len(loop_resids))
-        start = apply_backbone_dihedrals(prob['coords'], prob, loop_resids, phipsi,
-                                         prev_C=bb[n_anchor_resid]['C'], next_N=bb[c_anchor_resid]['N'])
+    run = 0
+    while run < ensemble:
+        k = min(max(1, batch), ensemble - run)
+        phipsi = np.stack([sample_backbone_dihedrals(rng, len(loop_resids)) for _ in range(k)])
+        start = apply_backbone_dihedrals_batch(prob['coords'], prob, loop_resids, phipsi, prev_C, next_N)
         if guard:
-            closed, _rmsd, _nc = ccd_close_guarded(start, prob['bonds'], prob['moving_masks'],
-                                                   end_idx, target, clash_fn,
-                                                   tol=max(tol, 0.15), max_iters=max_iters)
+            closed, _rmsd, _nc = ccd_close_guarded_batch(start, prob['bonds'], prob['moving_masks'],
+                                                         end_idx, target, scorer.deep,
+                                                         tol=max(tol, 0.15), max_iters=max_iters)
         else:
-            closed, _rmsd, _it = ccd_close(start, prob['bonds'], prob['moving_masks'],
-                                           end_idx, target, tol=tol, max_iters=max_iters)
+            closed, _rmsd, _it = ccd_close_batch(start, prob['bonds'], prob['moving_masks'],
+                                                 end_idx, target, tol=tol, max_iters=max_iters)
         if refine > 0:
-            closed, rep = refine_declash_ccd(closed, prob, order, loop_resids, end_idx, target,
-                                             rng, clash_env_fn, n_iters=refine, close_iters=120,
-                                             clash_fn=clash_fn if guard else None)
-        else:
-            rep = loop_clash_report(order, closed, loop_resids, env_coords=env)
-        key = (rep['n_deep'] + rep['n_env_deep'], rep['n_soft'] + rep['n_env_soft'],
-               end_rmsd(closed, end_idx, target))
+            closed, _score = refine_declash_ccd_batch(closed, prob, end_idx, target, rng, scorer,
+                                                      n_iters=refine, close_iters=120, guard=guard,
+                                                      first_clean=True)
+        deep, soft = scorer.counts(closed)
+        rmsd = end_rmsds(closed, end_idx, target)
+        j = int(np.lexsort((rmsd, soft, deep))[0])
+        key = (int(deep[j]), int(soft[j]), float(rmsd[j]))
         if best is None or key < best[0]:
-            best = (key, closed, rep)
+            best = (key, closed[j])
+        run += k
         if progress_queue is not None:
             # one tick per candidate actually run; the driver trues-up on loop completion
-            # since an early break (below) means fewer than `ensemble` ticks are emitted.
-            try:
-                progress_queue.put_nowait(1)
-            except Exception:
-                pass
-        if key[0] == 0 and key[1] == 0:
+            # since an early stop (below) means fewer than `ensemble` ticks are emitted.
+            for _ in range(k):
+                try:
+                    progress_queue.put_nowait(1)
+                except Exception:
+                    break
+        if best[0][0] == 0 and best[0][1] == 0:
             break
-    _key, closed, rep = best
+    _key, closed = best
+    rep = scorer.report(closed)
     ca = closed[[i for i, (_rr, nm) in enumerate(order) if nm == 'CA']]
     # provenance: the internal backbone rotations taking this loop from its raw guesscoord
     # conformation (bb) to the closed handoff (closed).
     rotations = loop_rotation_report(bb, extract_backbone(order, closed), loop_resids,
-                                     prev_C=bb[n_anchor_resid]['C'], next_N=bb[c_anchor_resid]['N'])
+                                     prev_C=prev_C, next_N=next_N)
     return dict(segname=segname, loop=loop_resids, serials=serials, order=order,
                 closed=closed, rep=rep, heavy=closed[heavy_mask], ca=ca, rotations=rotations)
@@ -0,0 +1,211 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Subsetting and concatenating PSF/PDB systems in numpy, without psfgen.
+
+Desolvating a trajectory's PSF, merging prebuilt systems and carving a membrane around a protein
+all come down to the same two operations on a topology: keep some of its atoms, or lay several
+topologies end to end.  psfgen does the first one ``delatom`` at a time and the second by
+``readpsf``-ing each system in turn, both slow on systems of a million atoms.  Here a system is
+held as columnar arrays (:class:`PSFArrays`) and
+
+1. :meth:`PSFArrays.subset` keeps the atoms of a mask, remapping every bonded term through a
+   lookup vector (old index -> new index, -1 for a removed atom) and dropping, with one
+   vectorized test per section, the terms that touch a removed atom;
+2. :meth:`PSFArrays.renamed` renames segments (and PDB chains), patch remarks included;
+3. :meth:`PSFArrays.concatenate` lays systems end to end, offsetting each one's terms by the
+   atoms before it.
+
+The psfgen ``REMARKS`` travel with the atoms: ``segment`` records of segments that vanish are
+dropped, as are ``patch`` and ``defaultpatch`` records naming a residue that is gone, and
+topology records are kept once each.
+"""
+import logging
+
+import numpy as np
+
+from .loop_ccd import pdb_atoms
+from .solvation import BONDED_SECTIONS, CROSSTERM_SECTION, _write_pdb, _write_psf, psf_remarks, read_psf
+
+logger = logging.getLogger(__name__)
+
+TERM_SECTIONS = tuple((key, width) for key, width, _ in (*BONDED_SECTIONS.values(), CROSSTERM_SECTION[1]))
+""" ``(key, atoms per term)`` of every bonded section a :class:`PSFArrays` carries. """
+
+PATCH_RECORDS = ('patch', 'defaultpatch')
+""" Leading words of the psfgen remarks that name residues as ``segname:resid`` tokens. """
+
+
+def remark_residues(remark):
+    """The ``(segname, resid)`` pairs a psfgen patch remark names; none for other remarks."""
+    tokens = remark.split()
+    if not tokens or tokens[0] not in PATCH_RECORDS:
+        return []
+    return [tuple(t.split(':', 1)) for t in tokens[2:] if ':' in t]
+
+
+def rename_remark(remark, segname_map):
+    """
+    ``remark`` with its segment names mapped through ``segname_map``: the segment of a
+    ``segment`` record and the ``segname`` of each ``segname:resid`` token of a patch record
+    (whose whitespace is normalized).  Other remarks are returned unchanged.
+    """
+    tokens = remark.split()
+    if len(tokens) > 1 and tokens[0] == 'segment' and tokens[1] in segname_map:
+        rest = remark.split(None, 2)[2:]
+        return ' '.join(['segment', segname_map[tokens[1]], *rest])
+    if not tokens or tokens[0] not in PATCH_RECORDS:
+        return remark
+    renamed = tokens[:2]
+    for t in tokens[2:]:
+        if ':' in t:
+            seg, resid = t.split(':', 1)
+            renamed.append(f'{segname_map.get(seg, seg)}:{resid}')
+        else:
+            renamed.append(segname_map.get(t, t))
+    return ' '.join(renamed)
+
+
+def _empty_terms():
+    return {key: np.empty((0, width), dtype=np.int64) for key, width in TERM_SECTIONS}
+
+
+class PSFArrays:
+    """
+    A PSF's atoms, bonded terms and remarks, with optional coordinates and chain IDs.
+
+    Parameters
+    ----------
+    atoms : numpy.ndarray
+        :data:`~pestifer.psfutil.solvation.PSF_ATOM_DTYPE` records in PSF order.
+    terms : dict, optional
+        Bonded terms as 0-based atom indices, as returned by
+        :func:`~pestifer.psfutil.solvation.read_psf`; missing sections are empty.
+    remarks : sequence of str, optional
+        The PSF's ``REMARKS`` texts (see :func:`~pestifer.psfutil.solvation.psf_remarks`).
+    xyz : numpy.ndarray, optional
+        ``(natom, 3)`` coordinates.
+    chainIDs : numpy.ndarray, optional
+        One PDB chain ID per atom; blank if absent.
+    """
+
+    def __init__(self, atoms, terms=None, remarks=(), xyz=None, chainIDs=None):
+        self.atoms = atoms
+        self.terms = _empty_terms()
+        for key, width in TERM_SECTIONS:
+            if terms and terms.get(key) is not None:
+                self.terms[key] = np.asarray(terms[key], dtype=np.int64).reshape(-1, width)
+        self.remarks = list(remarks)
+        if xyz is not None:
+            xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+            if len(xyz) != len(atoms):
+                raise ValueError(f'{len(atoms)} PSF atoms but {len(xyz)} coordinates')
+        self.xyz = xyz
+        self.chainIDs = (np.full(len(atoms), ' ', dtype='U1') if chainIDs is None
+                         else np.asarray(chainIDs, dtype='U1'))
+
+    @classmethod
+    def from_files(cls, psf_path, pdb_path=None):
+        """The system in ``psf_path`` and, if given, the coordinates and chains in ``pdb_path``."""
+        atoms, terms = read_psf(psf_path)
+        xyz = chainIDs = None
+        if pdb_path:
+            records = pdb_atoms(pdb_path)
+            if len(records) != len(atoms):
+                raise ValueError(f'{pdb_path} has {len(records)} atoms but {psf_path} has {len(atoms)}')
+            xyz, chainIDs = records['xyz'], records['chainID']
+        return cls(atoms, terms, psf_remarks(psf_path), xyz, chainIDs)
+
+    def __len__(self):
+        return len(self.atoms)
+
+    def segnames(self):
+        """The segment names, in order of first appearance."""
+        return list(dict.fromkeys(self.atoms['segname'].tolist()))
+
+    def residues(self):
+        """The ``(segname, resid)`` pairs present."""
+        atoms = self.atoms
+        new_res = np.ones(len(atoms), dtype=bool)
+        new_res[1:] = ((atoms['segname'][1:] != atoms['segname'][:-1])
+                       | (atoms['resid'][1:] != atoms['resid'][:-1]))
+        first = atoms[new_res]
+        return set(zip(first['segname'].tolist(), first['resid'].tolist()))
+
+    def subset(self, keep):
+        """
+        The system of the atoms ``keep`` (a boolean mask or ascending indices) selects, its
+        terms remapped and those touching a removed atom dropped.
+        """
+        keep = np.asarray(keep)
+        if keep.dtype == bool:
+            keep = np.flatnonzero(keep)
+        lookup = np.full(len(self.atoms), -1, dtype=np.int64)
+        lookup[keep] = np.arange(len(keep))
+        terms = {}
+        for key, _ in TERM_SECTIONS:
+            idx = lookup[self.terms[key]]
+            terms[key] = idx[np.all(idx >= 0, axis=1)]
+        atoms = self.atoms[keep]
+        sub = PSFArrays(atoms, terms, (), None if self.xyz is None else self.xyz[keep], self.chainIDs[keep])
+        segnames = set(sub.segnames())
+        patched = [remark_residues(r) for r in self.remarks]
+        residues = sub.residues() if any(patched) else set()
+        for r, named in zip(self.remarks, patched):
+            tokens = r.split()
+            if tokens[:1] == ['segment'] and len(tokens) > 1 and tokens[1] not in segnames:
+                continue
+            if not all(res in residues for res in named):
+                continue
+            sub.remarks.append(r)
+        logger.debug(f'kept {len(atoms)} of {len(self.atoms)} atoms')
+        return sub
+
+    def renamed(self, segname_map=None, chainID_map=None):
+        """
+        The system with segments renamed by ``segname_map`` (a renamed segment's atoms also take
+        the new name's first character as their chain, as VMD would derive it) and then chains
+        renamed by ``chainID_map``.
+        """
+        segname_map, chainID_map = dict(segname_map or {}), dict(chainID_map or {})
+        atoms, chainIDs = self.atoms.copy(), self.chainIDs.copy()
+        for old, new in segname_map.items():
+            sel = self.atoms['segname'] == old
+            atoms['segname'][sel] = new
+            chainIDs[sel] = new[:1]
+        renamed_chains = chainIDs.copy()
+        for old, new in chainID_map.items():
+            renamed_chains[chainIDs == old] = new
+        remarks = [rename_remark(r, segname_map) for r in self.remarks] if segname_map else self.remarks
+        return PSFArrays(atoms, self.terms, remarks, self.xyz, renamed_chains)
+
+    @classmethod
+    def concatenate(cls, parts):
+        """
+        The systems ``parts`` end to end, each one's terms offset by the atoms before it; the
+        remarks are joined in order without repeats.  Coordinates are kept if every part has
+        them.
+        """
+        parts = list(parts)
+        offsets = np.cumsum([0] + [len(p) for p in parts[:-1]])
+        terms = {key: np.concatenate([p.terms[key] + off for p, off in zip(parts, offsets)])
+                 for key, _ in TERM_SECTIONS}
+        xyz = None
+        if all(p.xyz is not None for p in parts):
+            xyz = np.concatenate([p.xyz for p in parts])
+        remarks = dict.fromkeys(r for p in parts for r in p.remarks)
+        return cls(np.concatenate([p.atoms for p in parts]), terms, list(remarks), xyz,
+                   np.concatenate([p.chainIDs for p in parts]))
+
+    def write_psf(self, psf_path):
+        _write_psf(psf_path, self.atoms, self.terms, self.remarks)
+
+    def write_pdb(self, pdb_path):
+        if self.xyz is None:
+            raise ValueError(f'cannot write {pdb_path}: the system has no coordinates')
+        _write_pdb(pdb_path, self.atoms, self.xyz, self.chainIDs)
+
+    def write(self, basename):
+        """Write ``<basename>.psf`` and ``<basename>.pdb``."""
+        self.write_psf(f'{basename}.psf')
+        self.write_pdb(f'{basename}.pdb')
+        logger.debug(f'wrote {len(self)} atoms to {basename}.psf/pdb')
@@ -13,6 +13,7 @@ from collections import UserList
 from dataclasses import dataclass, field
 
 from pestifer.core.labels import Labels
+from pestifer.core.telemetry import profiled
 
 from .psfangle import PSFAngleList
 from .psfatom import PSFAtom, PSFAtomList
@@ -251,6 +252,7 @@ class PSFContents:
         If provided, the class will parse the specified topology elements from the PSF file.
         Default is an empty list, which means no topology elements will be parsed.
     """
+    @profiled('psf parse')
     def __init__(self, filename: str, topology_segtypes: list[str] = [], parse_topology: list[str] = []):
         with open(filename,'r') as f:
             psflines = f.read().split('\n')
@@ -17,6 +17,7 @@ from ..psfutil.psfbond import PSFBondList
 from ..psfutil.psfcontents import PSFContents
 from ..psfutil.psftopoelement import PSFTopoElementList,PSFTopoElement
 
+from ..core.telemetry import profiled
 from ..util.coord import coorddf_from_pdb, lawofcos
 from ..util.linkcell import Linkcell
 from ..util.util import countTime, cell_from_xsc
@@ -416,6 +417,7 @@ class RingChecker:
 
 
 @countTime
+@profiled('ring check')
 def ring_check(psf, pdb, xsc=None, cutoff=4.0, segtypes=['lipid'], max_ring_size=7, only_piercees=None):
     """Convenience wrapper: build a :class:`RingChecker` and check one coordinate frame.
 
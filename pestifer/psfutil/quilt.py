@@ -0,0 +1,210 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Quilting a membrane patch into a larger membrane, in numpy, without VMD or psfgen.
+
+A quilt is an ``nx`` by ``ny`` array of copies of one equilibrated patch, each translated by
+whole box vectors.  Replicating the patch through psfgen means reading the patch once per
+replica and regenerating its topology; here the patch's atoms and bonded terms are read once and
+the quilt is written directly from them:
+
+1. the atoms are regrouped by segment *label* (the segment name less its trailing number:
+   ``L1``, ``L2`` -> ``L``), every replica's residues of a label are renumbered in one sequence
+   and dealt into segments of at most :data:`~pestifer.psfutil.solvation.MAX_SEGMENT_RESIDUES`
+   residues (``L1``, ``L2``, ...), as the ``bilayer_patch`` psfgen script names them;
+2. each replica's coordinates are the patch's plus a translation, and its bonded terms are the
+   patch's offset by the replica's first atom and mapped through the regrouping;
+3. the PSF and PDB are written replica by replica, so the whole quilt is never formatted in
+   memory and the time taken is linear in its size.
+"""
+import logging
+
+import numpy as np
+
+from .loop_ccd import pdb_atoms
+from .solvation import (BONDED_SECTIONS, CROSSTERM_SECTION, MAX_SEGMENT_RESIDUES, _pdb_atom_text,
+                        _psf_atom_text, _segment_remarks, _write_indices, psf_remarks, read_psf)
+
+logger = logging.getLogger(__name__)
+
+
+def segment_label(segname):
+    """``segname`` less its trailing digits (``'WT12'`` -> ``'WT'``); all of it if that is empty."""
+    return segname.rstrip('0123456789') or segname
+
+
+class Quilt:
+    """
+    An ``nx`` by ``ny`` tiling of a membrane patch.
+
+    Parameters
+    ----------
+    atoms : numpy.ndarray
+        The patch PSF's atoms (:data:`~pestifer.psfutil.solvation.PSF_ATOM_DTYPE`).
+    xyz : numpy.ndarray
+        ``(natom, 3)`` patch coordinates in the same order.
+    terms : dict
+        The patch PSF's bonded terms, as returned by :func:`~pestifer.psfutil.solvation.read_psf`.
+    box : numpy.ndarray
+        The patch's 3x3 box, one vector per row.
+    npatch : sequence of int
+        Copies of the patch along the first and second box vectors.
+    origin : numpy.ndarray, optional
+        The patch's box origin; the quilt is centered on it.
+
+    Attributes
+    ----------
+    order : numpy.ndarray
+        Patch atom indices in quilt order within one replica block (see :meth:`blocks`).
+    box : numpy.ndarray
+        The quilt's 3x3 box.
+    """
+
+    def __init__(self, atoms, xyz, terms, box, npatch, origin=None):
+        self.atoms = atoms
+        self.xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        if len(self.xyz) != len(atoms):
+            raise ValueError(f'{len(atoms)} PSF atoms but {len(self.xyz)} coordinates')
+        self.terms = {key: terms.get(key, np.empty((0, width), dtype=np.int64))
+                      for key, width, _ in (*BONDED_SECTIONS.values(), CROSSTERM_SECTION[1])}
+        self.npatch = tuple(int(n) for n in npatch)
+        if len(self.npatch) != 2 or min(self.npatch) < 1:
+            raise ValueError(f'npatch must be two positive integers, not {npatch}')
+        patch_box = np.asarray(box, dtype=float)
+        self.origin = np.zeros(3) if origin is None else np.asarray(origin, dtype=float)
+        self.box = patch_box.copy()
+        self.box[0] *= self.npatch[0]
+        self.box[1] *= self.npatch[1]
+        nx, ny = self.npatch
+        i, j = np.meshgrid(np.arange(nx) - (nx - 1) / 2, np.arange(ny) - (ny - 1) / 2, indexing='ij')
+        self.shifts = i.reshape(-1, 1) * patch_box[0] + j.reshape(-1, 1) * patch_box[1]
+        # residue ordinal of each patch atom, and the label each atom's segment belongs to
+        natom = len(atoms)
+        new_res = np.ones(natom, dtype=bool)
+        new_res[1:] = ((atoms['segname'][1:] != atoms['segname'][:-1])
+                       | (atoms['resid'][1:] != atoms['resid'][:-1]))
+        residue = np.cumsum(new_res) - 1
+        labels = np.array([segment_label(s) for s in atoms['segname'].tolist()], dtype='U8')
+        self.labels = list(dict.fromkeys(labels.tolist()))
+        # group -> patch atom indices, in patch order; their concatenation is the block order
+        self._groups = [np.flatnonzero(labels == lab) for lab in self.labels]
+        self.order = np.concatenate(self._groups) if natom else np.empty(0, dtype=np.int64)
+        self._group_residues = []
+        for idx in self._groups:
+            r = residue[idx]
+            _, rank = np.unique(r, return_inverse=True)
+            self._group_residues.append((rank, int(rank.max()) + 1 if len(rank) else 0))
+
+    @classmethod
+    def from_files(cls, psf_path, pdb_path, box, npatch, origin=None):
+        """The quilt of the patch in ``psf_path``/``pdb_path``."""
+        atoms, terms = read_psf(psf_path)
+        return cls(atoms, pdb_atoms(pdb_path)['xyz'], terms, box, npatch, origin)
+
+    @property
+    def nreplicas(self):
+        return self.npatch[0] * self.npatch[1]
+
+    @property
+    def natom(self):
+        return self.nreplicas * len(self.atoms)
+
+    def segnames(self):
+        """The quilt's segment names, label by label."""
+        names = []
+        for lab, (_, nres) in zip(self.labels, self._group_residues):
+            nseg = -(-nres * self.nreplicas // MAX_SEGMENT_RESIDUES)
+            names.extend(f'{lab}{k}' for k in range(1, nseg + 1))
+        return names
+
+    def blocks(self):
+        """
+        Yield the quilt's atoms as ``(atoms, xyz)`` blocks in output order: for each segment
+        label, for each replica, that replica's atoms of the label, renamed and renumbered.
+        """
+        R = self.nreplicas
+        for lab, idx, (rank, nres) in zip(self.labels, self._groups, self._group_residues):
+            template = self.atoms[idx]
+            for r in range(R):
+                ordinal = r * nres + rank
+                block = template.copy()
+                block['segname'] = np.char.add(lab, (ordinal // MAX_SEGMENT_RESIDUES + 1).astype('U8'))
+                block['resid'] = (ordinal % MAX_SEGMENT_RESIDUES + 1).astype('U8')
+                yield block, self.xyz[idx] + self.shifts[r]
+
+    def _position(self):
+        """Quilt index of atom ``i`` of replica ``r``, as an ``(R, natom)`` array."""
+        natom, R = len(self.atoms), self.nreplicas
+        pos = np.empty((R, natom), dtype=np.int64)
+        start = 0
+        for idx in self._groups:
+            pos[:, idx] = start + np.arange(R)[:, None] * len(idx) + np.arange(len(idx))[None, :]
+            start += R * len(idx)
+        return pos
+
+    def term_blocks(self, key):
+        """Yield each replica's ``key`` terms (0-based quilt indices)."""
+        pos = self._position()
+        for r in range(self.nreplicas):
+            yield pos[r][self.terms[key]]
+
+    def write(self, basename, remarks=()):
+        """
+        Write ``<basename>.psf`` and ``<basename>.pdb``, streaming one replica block at a time.
+        ``remarks`` (e.g. the patch's topology records, from
+        :func:`~pestifer.psfutil.solvation.psf_remarks`) head the PSF.
+        """
+        natom = self.natom
+        remarks = list(remarks) + _segment_remarks(self.segnames())
+        with open(f'{basename}.psf', 'w') as f:
+            f.write('PSF EXT CMAP\n\n')
+            f.write(f'{len(remarks):10d} !NTITLE\n')
+            for r in remarks:
+                f.write(f' REMARKS {r}\n')
+            f.write(f'\n{natom:10d} !NATOM\n')
+            serial = 0
+            for block, _ in self.blocks():
+                f.write(_psf_atom_text(block, serial + 1))
+                serial += len(block)
+            for tag, (key, width, per_line) in BONDED_SECTIONS.items():
+                f.write(f'\n{self.nreplicas * len(self.terms[key]):10d} !{tag}: {key}\n')
+                _stream_indices(f, (t.reshape(-1) + 1 for t in self.term_blocks(key)), width * per_line)
+            f.write(f'\n{0:10d} !NDON: donors\n\n\n{0:10d} !NACC: acceptors\n\n\n{0:10d} !NNB\n\n')
+            _stream_indices(f, (np.zeros(len(self.atoms), dtype=np.int64) for _ in range(self.nreplicas)), 8)
+            f.write(f'\n{1:10d}{0:10d} !NGRP\n{0:10d}{0:10d}{0:10d}\n')
+            tag, (key, width, per_line) = CROSSTERM_SECTION
+            f.write(f'\n{self.nreplicas * len(self.terms[key]):10d} !{tag}: cross-terms\n')
+            _stream_indices(f, (t.reshape(-1) + 1 for t in self.term_blocks(key)), width * per_line)
+            f.write('\n')
+        with open(f'{basename}.pdb', 'w') as f:
+            serial = 0
+            for block, xyz in self.blocks():
+                f.write(_pdb_atom_text(block, xyz, ' ', serial + 1))
+                serial += len(block)
+            f.write('END\n')
+        logger.debug(f'wrote a {self.npatch[0]}x{self.npatch[1]} quilt of {natom} atoms to {basename}.psf/pdb')
+
+
+def _stream_indices(f, chunks, per_line):
+    """
+    Write the concatenation of the flat integer arrays ``chunks`` in the PSF's fixed 10-column
+    fields, ``per_line`` to a line, holding back each chunk's partial last line for the next.
+    """
+    carry = np.empty(0, dtype=np.int64)
+    for chunk in chunks:
+        flat = np.concatenate([carry, chunk]) if len(carry) else chunk
+        full = len(flat) // per_line * per_line
+        _write_indices(f, flat[:full], per_line)
+        carry = flat[full:]
+    _write_indices(f, carry, per_line)
+
+
+def quilt_patch(psf_path, pdb_path, box, npatch, basename, origin=None):
+    """
+    Tile the patch in ``psf_path``/``pdb_path`` (box ``box``, origin ``origin``) ``npatch[0]`` by
+    ``npatch[1]`` times and write ``<basename>.psf``/``<basename>.pdb``.  The patch's topology
+    remarks carry over to the quilt's PSF.  Returns the :class:`Quilt`; its ``box`` and
+    ``origin`` are the quilt's cell.
+    """
+    q = Quilt.from_files(psf_path, pdb_path, box, npatch, origin)
+    q.write(basename, remarks=psf_remarks(psf_path, segments=False))
+    return q
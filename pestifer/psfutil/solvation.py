@@ -0,0 +1,533 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Solvation and ionization in numpy, without VMD.
+
+VMD's ``solvate`` tiles its solvent box and then deletes overlapping and out-of-cell molecules
+with atom selections, and ``autoionize`` (or ``PestiferIonize``) picks ion sites one random
+trial at a time; both slow to a crawl on boxes of a million atoms.  The functions here do the
+same job on arrays:
+
+1. :class:`SolventBox` holds one pre-equilibrated solvent box (a PDB-repository ``kind: box``
+   entry) as a per-molecule template and :meth:`~SolventBox.fill` tiles it over a cell, keeping
+   the molecules that lie wholly inside (as ``solvate`` does);
+2. :func:`overlapping` flags tiled molecules within a cutoff of any solute heavy atom, with a
+   KD-tree;
+3. :func:`choose_ion_sites` picks solvent molecules to replace by ions, at least ``from_solute``
+   from the solute and ``between`` from one another, in vectorized rounds;
+4. :func:`write_solvent_fragment` and :func:`write_ion_fragment` write the new solvent and ion
+   segments as PSF/PDB pairs, which psfgen ``readpsf`` appends to the solute.
+
+Defaults follow the VMD tools: a 2.4 Å solute boundary (``solvate -b``) and 5 Å ion spacing
+(``autoionize -from/-between``).
+"""
+import logging
+
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+PSF_ATOM_DTYPE = np.dtype([('segname', 'U8'), ('resid', 'U8'), ('resname', 'U8'), ('name', 'U8'),
+                           ('type', 'U8'), ('charge', 'f8'), ('mass', 'f8')])
+""" One PSF ``!NATOM`` record. """
+
+BONDED_SECTIONS = {'NBOND': ('bonds', 2, 4), 'NTHETA': ('angles', 3, 3),
+                   'NPHI': ('dihedrals', 4, 2), 'NIMPHI': ('impropers', 4, 2)}
+""" PSF bonded sections read and written here: ``tag: (key, atoms per term, terms per line)``. """
+
+CROSSTERM_SECTION = ('NCRTERM', ('crossterms', 8, 1))
+""" The PSF's CMAP cross-term section, in the form of :data:`BONDED_SECTIONS`; it follows the
+donor, acceptor, exclusion and group sections rather than the other bonded terms. """
+
+MAX_SEGMENT_RESIDUES = 9999
+""" The most residues a segment may hold and still number within the PDB's 4-digit resSeq. """
+
+
+def read_psf(psf_path, bonded=True):
+    """
+    Read a PSF's atoms and (when ``bonded``) its bonds, angles, dihedrals and impropers.
+
+    Returns ``(atoms, terms)``: a :data:`PSF_ATOM_DTYPE` array in PSF order and a dict
+    ``{'bonds': (n, 2), 'angles': (n, 3), 'dihedrals': (n, 4), 'impropers': (n, 4),
+    'crossterms': (n, 8)}`` of 0-based atom indices (empty when ``bonded`` is False).
+    """
+    with open(psf_path) as f:
+        lines = f.readlines()
+    i = 0
+    while i < len(lines) and '!NATOM' not in lines[i]:
+        i += 1
+    if i == len(lines):
+        raise ValueError(f'{psf_path}: no !NATOM record found; not a PSF?')
+    natom = int(lines[i].split()[0])
+    atoms = _atom_records(lines[i + 1:i + 1 + natom])
+    terms = {}
+    if not bonded:
+        return atoms, terms
+    sections = dict([*BONDED_SECTIONS.items(), CROSSTERM_SECTION])
+    i += 1 + natom
+    while i < len(lines):
+        head = lines[i].split('!')
+        tag = head[1].split(':')[0].strip() if len(head) > 1 else ''
+        i += 1
+        if tag not in sections:
+            continue
+        key, width, per_line = sections[tag]
+        count = int(head[0].split()[0])
+        nlines = -(-count // per_line)
+        values = np.fromstring(''.join(lines[i:i + nlines]), dtype=np.int64, sep=' ')
+        i += nlines
+        terms[key] = values[:count * width].reshape(count, width) - 1
+    for key, width, _ in sections.values():
+        terms.setdefault(key, np.empty((0, width), dtype=np.int64))
+    return atoms, terms
+
+
+def _atom_records(lines):
+    """
+    The :data:`PSF_ATOM_DTYPE` array of a PSF's ``!NATOM`` lines.  The lines are split in one
+    pass and each field is filled from a strided slice of the tokens; lines with more fields
+    than others (Drude polarizabilities, say) are cut to the eight read here, line by line.
+    """
+    natom = len(lines)
+    atoms = np.empty(natom, dtype=PSF_ATOM_DTYPE)
+    if natom == 0:
+        return atoms
+    tokens = ''.join(lines).split()
+    ncol = len(lines[0].split())
+    if ncol < 8 or len(tokens) != ncol * natom:
+        tokens = [t for line in lines for t in line.split()[:8]]
+        ncol = 8
+    for k, name in enumerate(PSF_ATOM_DTYPE.names, start=1):
+        atoms[name] = tokens[k::ncol]
+    return atoms
+
+
+def psf_remarks(psf_path, segments=True):
+    """The ``REMARKS`` records of ``psf_path``, psfgen ``segment`` records included only if
+    ``segments``."""
+    remarks = []
+    with open(psf_path) as f:
+        for line in f:
+            if '!NATOM' in line:
+                break
+            if line.strip().startswith('REMARKS'):
+                r = line.strip()[len('REMARKS'):].strip()
+                if segments or not r.startswith('segment '):
+                    remarks.append(r)
+    return remarks
+
+
+def net_charge(psf_path):
+    """Total charge of the atoms in ``psf_path``."""
+    atoms, _ = read_psf(psf_path, bonded=False)
+    return float(atoms['charge'].sum())
+
+
+class SolventBox:
+    """
+    A cubic, periodic, pre-equilibrated box of identical solvent molecules.
+
+    Parameters
+    ----------
+    atoms : numpy.ndarray
+        The box PSF's atoms (:data:`PSF_ATOM_DTYPE`), molecule after molecule.
+    xyz : numpy.ndarray
+        ``(natom, 3)`` box coordinates in the same order.
+    terms : dict
+        The box PSF's bonded terms, as returned by :func:`read_psf`.
+    edge : float
+        The box's edge length (Å).
+    key_atom : str, optional
+        The atom name occurring once per molecule; it marks where a molecule sits (the tile a
+        molecule belongs to, an ion site).  The molecule's centroid is used if absent.
+
+    Attributes
+    ----------
+    template : numpy.ndarray
+        The atoms of one molecule.
+    molecules : numpy.ndarray
+        ``(nmol, natom_per_molecule, 3)`` coordinates, each molecule shifted by whole box edges
+        so its key position lies in ``[0, edge)``.
+    terms : dict
+        The bonded terms of one molecule, as 0-based indices into :attr:`template`.
+    """
+
+    def __init__(self, atoms, xyz, terms, edge, key_atom=None):
+        resid_change = np.ones(len(atoms), dtype=bool)
+        resid_change[1:] = ((atoms['segname'][1:] != atoms['segname'][:-1])
+                            | (atoms['resid'][1:] != atoms['resid'][:-1]))
+        starts = np.flatnonzero(resid_change)
+        nmol = len(starts)
+        if nmol == 0 or len(atoms) % nmol or np.any(np.diff(starts) != len(atoms) // nmol):
+            raise ValueError('a solvent box must hold molecules of one species, one residue each')
+        per = len(atoms) // nmol
+        self.edge = float(edge)
+        self.template = atoms[:per].copy()
+        self.template['segname'] = ''
+        self.template['resid'] = ''
+        self.terms = {}
+        for key, idx in terms.items():
+            first = idx[np.all(idx < per, axis=1)] if len(idx) else idx
+            if len(idx) != nmol * len(first):
+                raise ValueError(f'the box {key} are not the same for every molecule')
+            self.terms[key] = first
+        self.key = None
+        if key_atom:
+            hits = np.flatnonzero(self.template['name'] == key_atom)
+            if len(hits) != 1:
+                raise ValueError(f'key atom {key_atom} does not occur exactly once per molecule')
+            self.key = int(hits[0])
+        molecules = np.asarray(xyz, dtype=float).reshape(nmol, per, 3)
+        self.molecules = molecules - np.floor(self._keys(molecules) / self.edge)[:, None, :] * self.edge
+
+    @classmethod
+    def from_files(cls, psf_path, pdb_path, edge, key_atom=None):
+        """Read the box from its PSF and PDB (e.g. a repository entry's ``get_box_psf()`` and
+        ``get_box_pdb()``)."""
+        from .loop_ccd import pdb_atoms
+        atoms, terms = read_psf(psf_path)
+        xyz = pdb_atoms(pdb_path)['xyz']
+        if len(xyz) != len(atoms):
+            raise ValueError(f'{pdb_path} has {len(xyz)} atoms but {psf_path} has {len(atoms)}')
+        return cls(atoms, xyz, terms, edge, key_atom)
+
+    @classmethod
+    def lattice(cls, atoms, xyz, terms, number_density, n=8, key_atom=None, seed=0):
+        """
+        A box of ``n**3`` copies of one molecule -- its ``atoms`` (:data:`PSF_ATOM_DTYPE`),
+        ``xyz`` and ``terms`` (0-based indices into ``atoms``) -- centered on the sites of a
+        cubic lattice at ``number_density`` molecules per Å³, each turned by its own random
+        rotation about its key atom (its centroid if ``key_atom`` is None).  The lattice is
+        periodic, so the tiled box has no seams; it is not equilibrated, which the minimization
+        that follows solvation takes care of.
+        """
+        from scipy.spatial.transform import Rotation
+        atoms = np.asarray(atoms, dtype=PSF_ATOM_DTYPE)
+        xyz = np.asarray(xyz, dtype=float).reshape(len(atoms), 3)
+        nmol = n ** 3
+        edge = (nmol / number_density) ** (1 / 3)
+        g = (np.arange(n) + 0.5) * (edge / n)
+        sites = np.stack(np.meshgrid(g, g, g, indexing='ij'), -1).reshape(-1, 3)
+        center = xyz[atoms['name'] == key_atom][0] if key_atom else xyz.mean(axis=0)
+        rotations = Rotation.random(nmol, random_state=seed).as_matrix()
+        coords = np.einsum('mij,aj->mai', rotations, xyz - center) + sites[:, None, :]
+        box_atoms = np.tile(atoms, nmol)
+        box_atoms['segname'] = 'QQQ'
+        box_atoms['resid'] = np.repeat(np.arange(1, nmol + 1).astype('U8'), len(atoms))
+        offsets = (len(atoms) * np.arange(nmol))[:, None, None]
+        box_terms = {}
+        for key, width, _ in BONDED_SECTIONS.values():
+            idx = np.asarray(terms.get(key, ()), dtype=np.int64).reshape(-1, width)
+            box_terms[key] = (idx[None] + offsets).reshape(-1, width)
+        return cls(box_atoms, coords.reshape(-1, 3), box_terms, edge, key_atom)
+
+    @property
+    def natom(self):
+        """Atoms per molecule."""
+        return len(self.template)
+
+    @property
+    def molecule_volume(self):
+        """The volume one molecule occupies in the box (Å³)."""
+        return self.edge ** 3 / len(self.molecules)
+
+    def _keys(self, molecules):
+        return molecules[:, self.key] if self.key is not None else molecules.mean(axis=1)
+
+    def keys(self, molecules):
+        """Key positions ``(n, 3)`` of ``(n, natom, 3)`` molecule coordinates."""
+        return self._keys(np.asarray(molecules))
+
+    def fill(self, LL, UR):
+        """
+        Tile the box over the cell ``[LL, UR]`` and return the ``(n, natom, 3)`` coordinates of
+        the molecules lying wholly inside it.
+        """
+        LL, UR = np.asarray(LL, dtype=float), np.asarray(UR, dtype=float)
+        lo = np.floor(LL / self.edge).astype(int)
+        hi = np.floor(UR / self.edge).astype(int)
+        grid = np.stack(np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(lo, hi)], indexing='ij'), -1)
+        shifts = grid.reshape(-1, 3) * self.edge
+        keys = self._keys(self.molecules)
+        # a molecule whose key lies outside the cell has at least that atom outside
+        where = keys[None, :, :] + shifts[:, None, :]
+        tile, mol = np.nonzero(np.all((where >= LL) & (where <= UR), axis=2))
+        placed = self.molecules[mol] + shifts[tile][:, None, :]
+        inside = np.all((placed >= LL) & (placed <= UR), axis=(1, 2))
+        return placed[inside]
+
+
+def overlapping(molecules, solute_xyz, cutoff=2.4):
+    """
+    Flag the molecules (``(n, natom, 3)``) with any atom within ``cutoff`` of a point of
+    ``solute_xyz`` (typically the solute's heavy atoms).
+    """
+    molecules = np.asarray(molecules, dtype=float)
+    if len(molecules) == 0 or len(solute_xyz) == 0:
+        return np.zeros(len(molecules), dtype=bool)
+    d, _ = cKDTree(solute_xyz).query(molecules.reshape(-1, 3), distance_upper_bound=cutoff)
+    return np.isfinite(d).reshape(molecules.shape[:2]).any(axis=1)
+
+
+def choose_ion_sites(sites, n, solute_xyz=None, from_solute=5.0, between=5.0, rng=None):
+    """
+    Choose ``n`` of ``sites`` (``(m, 3)``, e.g. solvent key positions) for ions: each at least
+    ``from_solute`` from every point of ``solute_xyz`` and ``between`` from every other choice.
+
+    Candidates are ranked by a random permutation and accepted in rounds: a candidate whose
+    conflicting neighbors all rank below it is taken, and whoever conflicts with a taken site
+    is dropped, so every round is a handful of KD-tree queries however many ions are placed.
+    Returns the chosen indices into ``sites``; raises :class:`ValueError` if fewer than ``n``
+    sites can satisfy the spacing.
+    """
+    rng = np.random.default_rng(rng)
+    sites = np.asarray(sites, dtype=float)
+    candidates = np.arange(len(sites))
+    if n <= 0:
+        return candidates[:0]
+    if solute_xyz is not None and len(solute_xyz) and from_solute > 0:
+        d, _ = cKDTree(solute_xyz).query(sites, distance_upper_bound=from_solute)
+        candidates = candidates[~np.isfinite(d)]
+    candidates = rng.permutation(candidates)
+    chosen = []
+    nchosen = 0
+    while nchosen < n and len(candidates):
+        if chosen:
+            d, _ = cKDTree(sites[np.concatenate(chosen)]).query(sites[candidates], distance_upper_bound=between)
+            candidates = candidates[~np.isfinite(d)]
+        head = candidates[:4 * (n - nchosen) + 16]
+        pairs = cKDTree(sites[head]).query_pairs(between, output_type='ndarray')
+        blocked = np.zeros(len(head), dtype=bool)
+        blocked[pairs.max(axis=1)] = True
+        taken = head[~blocked][:n - nchosen]
+        chosen.append(taken)
+        nchosen += len(taken)
+        candidates = candidates[~np.isin(candidates, taken)]
+    if nchosen < n:
+        raise ValueError(f'only {nchosen} of {n} ion sites are at least {from_solute} Å from the '
+                         f'solute and {between} Å from one another')
+    return np.concatenate(chosen)
+
+
+def free_segnames(prefix, count, taken=()):
+    """``count`` segment names ``<prefix>1``, ``<prefix>2``, ... skipping those in ``taken``."""
+    taken = set(taken)
+    names, k = [], 0
+    while len(names) < count:
+        k += 1
+        if f'{prefix}{k}' not in taken:
+            names.append(f'{prefix}{k}')
+    return names
+
+
+def _columns(atoms, *names):
+    return zip(*(atoms[n].tolist() for n in names))
+
+
+def _write_psf(psf_path, atoms, terms, remarks):
+    natom = len(atoms)
+    with open(psf_path, 'w') as f:
+        f.write('PSF EXT CMAP\n\n')
+        f.write(f'{len(remarks):10d} !NTITLE\n')
+        for r in remarks:
+            f.write(f' REMARKS {r}\n')
+        f.write(f'\n{natom:10d} !NATOM\n')
+        f.write(_psf_atom_text(atoms))
+        for tag, (key, width, per_line) in BONDED_SECTIONS.items():
+            idx = terms[key]
+            f.write(f'\n{len(idx):10d} !{tag}: {key}\n')
+            _write_indices(f, idx.reshape(-1) + 1, width * per_line)
+        f.write(f'\n{0:10d} !NDON: donors\n\n\n{0:10d} !NACC: acceptors\n\n\n{0:10d} !NNB\n\n')
+        _write_indices(f, np.zeros(natom, dtype=np.int64), 8)
+        f.write(f'\n{1:10d}{0:10d} !NGRP\n{0:10d}{0:10d}{0:10d}\n')
+        tag, (key, width, per_line) = CROSSTERM_SECTION
+        idx = terms.get(key, np.empty((0, width), dtype=np.int64))
+        f.write(f'\n{len(idx):10d} !{tag}: cross-terms\n')
+        _write_indices(f, idx.reshape(-1) + 1, width * per_line)
+        f.write('\n')
+
+
+# Fixed-width records are formatted column-wise: each field of every record at once, as an
+# ``(n, width)`` matrix of ASCII bytes, the fields side by side, the whole block decoded once.
+# A field helper returns None when a value does not fit its width; the writer then falls back
+# to %-formatting, which widens the field as the original writers did.
+
+def _const(n, text):
+    return np.broadcast_to(np.frombuffer(text.encode('ascii'), dtype=np.uint8), (n, len(text)))
+
+
+def _int_field(values, width, negative=None):
+    """``%<width>d`` fields of the non-negative ``values``, a ``-`` ahead of those ``negative``."""
+    rest = np.array(values, dtype=np.int64)
+    out = np.full((len(rest), width), 48, dtype=np.uint8)
+    ndigit = np.ones(len(rest), dtype=np.int64)
+    for k in range(width):
+        if k and not rest.any():
+            break
+        ndigit[rest > 0] = k + 1
+        out[:, width - 1 - k] += (rest % 10).astype(np.uint8)
+        rest //= 10
+    sign = np.zeros(len(out), dtype=bool) if negative is None else negative
+    if rest.any() or np.any(ndigit + sign > width):
+        return None
+    out[np.arange(width)[None, :] < (width - ndigit)[:, None]] = 32
+    rows = np.flatnonzero(sign)
+    out[rows, width - 1 - ndigit[rows]] = ord('-')
+    return out
+
+
+def _fixed_field(values, width, decimals):
+    """``%<width>.<decimals>f`` fields of ``values``."""
+    values = np.asarray(values, dtype=float)
+    scaled = np.rint(np.abs(values) * 10 ** decimals).astype(np.int64)
+    whole, frac = np.divmod(scaled, 10 ** decimals)
+    head = _int_field(whole, width - decimals - 1, (values < 0) & (scaled > 0))
+    if head is None:
+        return None
+    tail = (48 + frac[:, None] // 10 ** np.arange(decimals - 1, -1, -1) % 10).astype(np.uint8)
+    return np.hstack([head, _const(len(values), '.'), tail])
+
+
+def _text_field(strings, width, right=False):
+    """``%-<width>s`` (``%<width>s`` if ``right``) fields of the ASCII ``strings``."""
+    raw = np.ascontiguousarray(strings, dtype=np.str_)
+    size = raw.dtype.itemsize // 4
+    codes = raw.view(np.uint32).reshape(len(raw), size)
+    if size > width and codes[:, width:].any() or len(raw) and size and codes.max() > 127:
+        return None
+    out = np.zeros((len(raw), width), dtype=np.uint8)
+    out[:, :min(size, width)] = codes[:, :width]
+    if right:
+        src = np.arange(width)[None, :] - (width - np.count_nonzero(out, axis=1))[:, None]
+        out = np.where(src >= 0, np.take_along_axis(out, np.maximum(src, 0), axis=1), 0).astype(np.uint8)
+    out[out == 0] = 32
+    return out
+
+
+def _join_fields(fields):
+    if not len(fields[0]):
+        return ''
+    return np.hstack(fields + [_const(len(fields[0]), '\n')]).tobytes().decode('ascii')
+
+
+def _psf_atom_text(atoms, start=1):
+    """The ``!NATOM`` records of ``atoms``, numbered from ``start``."""
+    n = len(atoms)
+    fields = [_int_field(np.arange(start, start + n), 10)]
+    for name in PSF_ATOM_DTYPE.names[:5]:
+        fields += [_const(n, ' '), _text_field(atoms[name], 8)]
+    fields += [_fixed_field(atoms['charge'], 9, 6), _fixed_field(atoms['mass'], 14, 4), _int_field(np.zeros(n), 12)]
+    if all(f is not None for f in fields):
+        return _join_fields(fields)
+    return ''.join(['%10d %-8s %-8s %-8s %-8s %-8s%9.6f%14.4f%12d\n' % (i, *row, 0)
+                    for i, row in enumerate(_columns(atoms, *PSF_ATOM_DTYPE.names), start=start)])
+
+
+def _write_indices(f, flat, per_line):
+    """Write ``flat`` in the PSF's fixed 10-column integer fields, ``per_line`` to a line."""
+    full = len(flat) // per_line * per_line
+    digits = _int_field(flat[:full], 10)
+    if digits is None:
+        fmt = '%10d' * per_line + '\n'
+        f.writelines([fmt % tuple(row) for row in flat[:full].reshape(-1, per_line).tolist()])
+    else:
+        f.write(_join_fields([digits.reshape(-1, 10 * per_line)]))
+    if full < len(flat):
+        f.write('%10d' * (len(flat) - full) % tuple(flat[full:].tolist()) + '\n')
+
+
+def _resseq_icode(resid):
+    """Split a PSF resid such as ``'100A'`` into the PDB's resSeq and insertion code."""
+    return (resid[:-1], resid[-1]) if resid[-1:].isalpha() else (resid, ' ')
+
+
+def _pdb_atom_text(atoms, xyz, chainID, start=1):
+    """
+    ATOM records of ``atoms`` at ``xyz``, numbered from ``start``; ``chainID`` is one chain for
+    all or one per atom.  An atom name shorter than four characters starts in column 14; residue
+    and segment names are cut to their four columns, as psfgen does.
+    """
+    n = len(atoms)
+    resnames, segnames = atoms['resname'].astype('U4'), atoms['segname'].astype('U4')
+    chains = np.broadcast_to(np.asarray(chainID, dtype='U1'), (n,))
+    xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+    name = _text_field(atoms['name'], 4)
+    if name is not None:
+        short = name[:, 3] == 32
+        name[short, 1:] = name[short, :3]
+        name[short, 0] = 32
+    # a resid right-justified in five columns ends in its insertion code, if it has one
+    resid = _text_field(atoms['resid'], 5, right=True)
+    if resid is not None:
+        icode = ((resid[:, 4] | 32) >= ord('a')) & ((resid[:, 4] | 32) <= ord('z'))
+        resseq = np.where(icode[:, None], resid[:, :4], resid[:, 1:])
+        if np.any(resid[~icode, 0] != 32):
+            resid = None
+        else:
+            resid = [resseq, np.where(icode[:, None], resid[:, 4:], 32).astype(np.uint8)]
+    fields = [_const(n, 'ATOM  '), _int_field(np.arange(start, start + n) % 100000, 5), _const(n, ' '), name,
+              _const(n, ' '), _text_field(resnames, 4), _text_field(chains, 1),
+              *(resid or [None]), _const(n, '   '), *(_fixed_field(xyz[:, k], 8, 3) for k in range(3)),
+              _const(n, '  1.00  0.00      '), _text_field(segnames, 4)]
+    if all(f is not None for f in fields):
+        return _join_fields(fields)
+    names = [n if len(n) == 4 else ' ' + n for n in atoms['name'].tolist()]
+    return ''.join(['ATOM  %5d %-4s %-4s%s%4s%s   %8.3f%8.3f%8.3f  1.00  0.00      %-4s\n'
+                    % (i % 100000, name, resname, chain, *_resseq_icode(resid), x, y, z, seg)
+                    for i, (name, chain, (seg, resid, resname), (x, y, z))
+                    in enumerate(zip(names, chains.tolist(), zip(segnames.tolist(), atoms['resid'].tolist(),
+                                                                 resnames.tolist()), xyz.tolist()), start=start)])
+
+
+def _write_pdb(pdb_path, atoms, xyz, chainID):
+    with open(pdb_path, 'w') as f:
+        f.write(_pdb_atom_text(atoms, xyz, chainID))
+        f.write('END\n')
+
+
+def _segment_remarks(segnames):
+    return [f'segment {s} {{ first NONE; last NONE; auto none }}' for s in segnames]
+
+
+def write_solvent_fragment(basename, box, molecules, prefix='WT', taken=()):
+    """
+    Write ``molecules`` (``(n, natom, 3)``, from :meth:`SolventBox.fill`) as
+    ``<basename>.psf``/``<basename>.pdb``: segments ``<prefix>1``, ``<prefix>2``, ... (skipping
+    names in ``taken``) of at most :data:`MAX_SEGMENT_RESIDUES` molecules each, with the box's
+    bonded terms replicated per molecule.  Returns the segment names.
+    """
+    n, per = len(molecules), box.natom
+    nseg = -(-n // MAX_SEGMENT_RESIDUES)
+    segnames = free_segnames(prefix, nseg, taken)
+    atoms = np.tile(box.template, n)
+    mol = np.arange(n)
+    atoms['segname'] = np.repeat(np.array(segnames, dtype='U8')[mol // MAX_SEGMENT_RESIDUES], per)
+    atoms['resid'] = np.repeat((mol % MAX_SEGMENT_RESIDUES + 1).astype('U8'), per)
+    offsets = (mol * per)[:, None, None]
+    terms = {key: (idx[None, :, :] + offsets).reshape(-1, idx.shape[1]) for key, idx in box.terms.items()}
+    _write_psf(f'{basename}.psf', atoms, terms, _segment_remarks(segnames))
+    _write_pdb(f'{basename}.pdb', atoms, np.asarray(molecules).reshape(-1, 3), 'W')
+    logger.debug(f'wrote {n} solvent molecules in {nseg} segment(s) to {basename}.psf/pdb')
+    return segnames
+
+
+def write_ion_fragment(basename, resnames, xyz, ion_atoms, segname='ION', taken=()):
+    """
+    Write monatomic ions as ``<basename>.psf``/``<basename>.pdb``: one segment ``segname``
+    (``<segname>1``, ``<segname>2``, ... if ``segname`` is in ``taken``), residue ``i + 1``
+    being ``resnames[i]`` at ``xyz[i]``.  ``ion_atoms`` maps each resname to its atom's
+    ``(name, type, charge, mass)``.  Returns the segment name.
+    """
+    if len(resnames) > MAX_SEGMENT_RESIDUES:
+        raise ValueError(f'{len(resnames)} ions exceed one segment ({MAX_SEGMENT_RESIDUES} residues)')
+    if segname in set(taken):
+        segname = free_segnames(segname, 1, taken)[0]
+    atoms = np.zeros(len(resnames), dtype=PSF_ATOM_DTYPE)
+    for i, rn in enumerate(resnames):
+        name, typ, charge, mass = ion_atoms[rn]
+        atoms[i] = (segname, str(i + 1), rn, name, typ, charge, mass)
+    terms = {key: np.empty((0, width), dtype=np.int64) for key, width, _ in BONDED_SECTIONS.values()}
+    _write_psf(f'{basename}.psf', atoms, terms, _segment_remarks([segname]))
+    _write_pdb(f'{basename}.pdb', atoms, np.asarray(xyz, dtype=float).reshape(-1, 3), 'I')
+    return segname
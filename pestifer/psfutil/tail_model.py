@@ -18,7 +18,7 @@ Per tail, per ensemble member:
 2. **Place the junction** -- Kabsch-superpose the three backbone atoms of the tail's anchored
    residue onto an ideal trans-peptide target built off the resolved anchor, carrying the whole
    tail rigidly. The free end is unconstrained (correctly), so no closure is needed.
-3. **Score** the pose's steric overlap with the frozen environment (:func:`loop_clash_report`)
+3. **Score** the pose's steric overlap with the frozen environment (:func:`~.loop_ccd.loop_clash_report`)
    and keep the least-clashing member.
 
 Everything operates on numpy arrays; deterministic for a fixed seed. A downstream ``minimize``
@@ -28,11 +28,12 @@ import numpy as np
 
 from ..util.coord import kabsch, rotate_points_about_axis
 from .loop_ccd import (
-    backbone_from_pdb, loop_atoms_from_pdb, build_loop_problem, apply_backbone_dihedrals,
-    sample_backbone_dihedrals, place_atom_nerf, anchor_closure_target,
-    heavy_env_coords_from_pdb, loop_clash_report, _clash_score,
+    backbone_from_atoms, loop_atoms_from_atoms, build_loop_problem, apply_backbone_dihedrals,
+    sample_backbone_dihedrals, place_atom_nerf, anchor_closure_target, pdb_atoms,
+    LoopClashScorer, LoopEnvironment, loop_environment, _clash_score,
     extract_backbone, loop_rotation_report,
 )
+from .declash import _RESIDUE_REACH, _SIDECHAIN_REACH
 
 # Standard trans-peptide internal coordinates for building a junction target.
 _PEP = dict(C_N=1.33, N_CA=1.45, CA_C=1.52,
@@ -53,6 +54,24 @@ def _selection_key(pdb_path, segname):
     return {'chainID': segname}
 
 
+def _atoms_selection_key(atoms, segname):
+    """:func:`_selection_key` on a structure already parsed by :func:`~.loop_ccd.pdb_atoms`."""
+    return {'segname': segname} if np.any(atoms['segname'] == segname) else {'chainID': segname}
+
+
+def tail_reach(atoms, segname, tail_resids, anchor_resid):
+    """
+    A sphere ``(center, radius)`` a modeled tail cannot leave: centered on its anchor residue
+    (its CA, else any atom), as wide as the tail's chain can stretch from there. Used to find
+    which tails can touch one another (:func:`~.declash.dependency_waves`).
+    """
+    arr = np.asarray(atoms)
+    _o, xyz, _s = loop_atoms_from_atoms(arr, [anchor_resid], **_atoms_selection_key(arr, segname))
+    ca = [k for k, (_r, name) in enumerate(_o) if name == 'CA']
+    center = xyz[ca[0] if ca else 0] if len(xyz) else np.zeros(3)
+    return center, _RESIDUE_REACH * (len(tail_resids) + 1) + _SIDECHAIN_REACH
+
+
 def downstream_anchor_target(anchor_N, anchor_CA, anchor_C, psi_deg=150.0, phi_deg=-120.0):
     """
     Ideal target positions for a C-terminal tail's *first* residue backbone atoms ``(N, CA, C)``
@@ -79,16 +98,17 @@ def _place_junction(shaped, junction_rows, target):
     return shaped @ R.T + t
 
 
-def _refine_tail(shaped, prob, order, tail_resids, junction_rows, target, env, rng,
+def _refine_tail(shaped, prob, order, tail_resids, junction_rows, target, scorer, rng,
                  n_iters, perturb_deg=25.0, T0=8.0, Tmin=0.4):
     """
     Iteratively declash a placed tail by perturb-and-replace simulated annealing -- the free-tail
-    analogue of :func:`pestifer.psfutil.loop_ccd.refine_declash_ccd` (which perturbs-and-recloses).
+    analogue of :func:`pestifer.psfutil.loop_ccd.refine_declash_ccd_batch` (which perturbs-and-recloses).
 
     Each step perturbs one backbone dihedral, re-places the junction by rigid superposition (a
     tail has no closure target, so re-anchoring replaces re-closure), and scores steric overlap
-    with the frozen environment. Moves lowering the clash score are accepted; worse moves pass a
-    Metropolis test under a geometrically annealed temperature. An occasional large swing about a
+    with the frozen environment (``scorer``, a :class:`~.loop_ccd.LoopClashScorer`, whose tree is
+    built once per tail rather than once per step). Moves lowering the clash score are accepted;
+    worse moves pass a Metropolis test under a geometrically annealed temperature. An occasional large swing about a
     leading (long-lever) bond rotates the tail bulk (e.g. away from a crowded axis); local moves
     polish. Deterministic for a fixed ``rng``.
     """
@@ -97,7 +117,7 @@ def _refine_tail(shaped, prob, order, tail_resids, junction_rows, target, env, r
 
     def evaluate(shaped_pose):
         placed = _place_junction(shaped_pose, junction_rows, target)
-        rep = loop_clash_report(order, placed, tail_resids, env_coords=env)
+        rep = scorer.report(placed)
         return _clash_score(rep), rep, placed
 
     cur = np.array(shaped, dtype=float)
@@ -127,13 +147,13 @@ def _refine_tail(shaped, prob, order, tail_resids, junction_rows, target, env, r
 
 
 def model_one_tail(src_pdb, segname, tail_resids, anchor_resid, end,
-                   all_modeled_serials, seed, ensemble=10, refine=200, extra_env=None):
+                   all_modeled_serials, seed, ensemble=10, refine=200, extra_env=None, atoms=None):
     """
     Model one built terminal tail against the resolved structure -- the standalone unit the
     psfgen declash step runs per tail (parallel to
     :func:`pestifer.psfutil.loop_ccd.close_one_loop`).
 
-    Reads the tail and its environment from ``src_pdb``: the environment is every heavy atom NOT
+    Reads the tail and its environment from ``src_pdb`` (or ``atoms``): the environment is every heavy atom NOT
     in ``all_modeled_serials`` (all model-built loops/tails hold throwaway coords) and NOT in the
     tail's own anchor (the bonded junction residue). Samples each residue's Ramachandran (phi,
     psi), places the anchored junction by rigid superposition, and keeps the least-clashing of
@@ -162,28 +182,43 @@ def model_one_tail(src_pdb, segname, tail_resids, anchor_resid, end,
         Extra heavy-atom coordinates to treat as fixed environment -- e.g. tails already modeled
         this pass, so converging tails (a trimer's C-termini near the assembly axis) declash
         against one another instead of interpenetrating.
+    atoms : numpy.ndarray or SharedArray, optional
+        ``src_pdb`` already parsed by :func:`~.loop_ccd.pdb_atoms`, as for
+        :func:`~.loop_ccd.close_one_loop`: the tail, its anchor and its environment are read from
+        it, and the environment tree comes from the process's
+        :func:`~.loop_ccd.loop_environment` cache.
 
     Returns
     -------
     dict : ``segname``, ``tail`` (resids), ``serials``, ``order``, ``modeled`` (M,3),
-    ``rep`` (:func:`loop_clash_report`).
+    ``rep`` (:func:`~.loop_ccd.loop_clash_report`).
     """
     rng = np.random.default_rng(seed)
+    if atoms is None:
+        atoms = pdb_atoms(src_pdb)
+        lenv = LoopEnvironment(atoms, all_modeled_serials)
+    else:
+        lenv = loop_environment(atoms, all_modeled_serials)
+    arr = np.asarray(atoms)
     # Select this tail's atoms by segid, but fall back to the chain column when the source PDB
     # has a blank segid column -- e.g. a post-crotation state PDB written in the standard dialect.
-    sel = _selection_key(src_pdb, segname)
-    bb = backbone_from_pdb(src_pdb, **sel)
-    order, coords, serials = loop_atoms_from_pdb(src_pdb, tail_resids, **sel)
+    sel = _atoms_selection_key(arr, segname)
+    bb = backbone_from_atoms(arr, **sel)
+    order, coords, serials = loop_atoms_from_atoms(arr, tail_resids, **sel)
     prob = build_loop_problem(order, coords, tail_resids)
     row = prob['row']
 
     # environment: everything heavy except all modeled loops/tails and this tail's anchor,
     # plus any already-modeled tails passed as extra_env.
-    _ao, _ac, anch_ser = loop_atoms_from_pdb(src_pdb, [anchor_resid], **sel)
-    env = heavy_env_coords_from_pdb(src_pdb, exclude_serials=list(all_modeled_serials) + list(anch_ser))
+    _ao, _ac, anch_ser = loop_atoms_from_atoms(arr, [anchor_resid], **sel)
+    del arr
+    anchor = lenv.exclude(anch_ser)
     if extra_env is not None and len(extra_env):
-        extra_env = np.asarray(extra_env, dtype=float)
-        env = np.vstack([env, extra_env]) if len(env) else extra_env
+        # tails modeled before this one join the environment, so it needs its own tree
+        env = np.vstack([np.delete(lenv.coords, anchor, axis=0), np.asarray(extra_env, dtype=float)])
+        scorer = LoopClashScorer(order, tail_resids, env_coords=env)
+    else:
+        scorer = LoopClashScorer(order, tail_resids, env_tree=lenv.tree, env_exclude=anchor)
 
     # which of the anchored residue's backbone atoms the junction target constrains. The target
     # itself is rebuilt per candidate below with a *sampled* junction torsion, because the
@@ -214,10 +249,10 @@ def model_one_tail(src_pdb, segname, tail_resids, anchor_resid, end,
         target = make_target(float(rng.uniform(-180.0, 180.0)))     # sampled emanation direction
         if refine > 0:
             placed, rep = _refine_tail(shaped, prob, order, tail_resids, junction_rows, target,
-                                       env, rng, n_iters=refine)
+                                       scorer, rng, n_iters=refine)
         else:
             placed = _place_junction(shaped, junction_rows, target)
-            rep = loop_clash_report(order, placed, tail_resids, env_coords=env)
+            rep = scorer.report(placed)
         key = (rep['n_deep'] + rep['n_env_deep'], rep['n_soft'] + rep['n_env_soft'])
         if best is None or key < best[0]:
             best = (key, placed, rep)
@@ -25,9 +25,12 @@ set z_hi_dum 0.0 ; # upper z of the dummy atoms from an OPM pdb file
 set z_value 0.0 ; # offset of the protein center of mass from the bilayer midplane
 set outbasename "embedded"
 set zdist 10.0; # distance between z-extremal protein atoms and z-boundaries of box
+set margin 2.4; # membrane atoms within this distance of a protein atom are removed
 set sc 0.0
 set cation POT
 set anion CLA
+set prefilled 0; # 1 if pestifer already placed the protein (-pdb is then the placed protein) and
+                 # wrote ${outbasename}_prefill.psf/pdb, the membrane carved around it
 
 for { set i 0 } { $i < [llength $argv] } { incr i } {
    if { [lindex $argv $i] == "-psf"} {
@@ -70,6 +73,10 @@ for { set i 0 } { $i < [llength $argv] } { incr i } {
       incr i
       set zdist [lindex $argv $i]
    }
+   if { [lindex $argv $i] == "-margin"} {
+      incr i
+      set margin [lindex $argv $i]
+   }
    if { [lindex $argv $i] == "-sc"} {
       incr i
       set sc [lindex $argv $i]
@@ -82,6 +89,10 @@ for { set i 0 } { $i < [llength $argv] } { incr i } {
       incr i
       set anion [lindex $argv $i]
    }
+   if { [lindex $argv $i] == "-prefilled"} {
+      incr i
+      set prefilled [lindex $argv $i]
+   }
    if { [lindex $argv $i] == "-o"} {
       incr i
       set outbasename [lindex $argv $i]
@@ -147,21 +158,25 @@ set bilayer_com [measure center $bilayer_sel weight mass]
 set bilayer_com_z [lindex $bilayer_com 2]
 
 # perform a translation of the protein to the middle of the bilayer
-if { $z_ref_group != ""} {
-   set pro_mid_z_ref_sel [atomselect $protein "$z_ref_group"]
-   set pro_embed_mid_z [lindex [measure center $pro_mid_z_ref_sel weight mass] 2]
+if { $prefilled } {
+   vmdcon -info "protein already placed in $pdb; membrane already carved into ${outbasename}_prefill.psf/pdb"
 } else {
-   vmdcon -info "no z_ref_group specified; using z_lo_dum $z_lo_dum and z_hi_dum $z_hi_dum to define protein embedding depth"
-   set pro_embed_mid_z [expr 0.5*($z_lo_dum + $z_hi_dum)]
+   if { $z_ref_group != ""} {
+      set pro_mid_z_ref_sel [atomselect $protein "$z_ref_group"]
+      set pro_embed_mid_z [lindex [measure center $pro_mid_z_ref_sel weight mass] 2]
+   } else {
+      vmdcon -info "no z_ref_group specified; using z_lo_dum $z_lo_dum and z_hi_dum $z_hi_dum to define protein embedding depth"
+      set pro_embed_mid_z [expr 0.5*($z_lo_dum + $z_hi_dum)]
+   }
+   set pro_com [measure center $pro_sel weight mass]
+   set pro_x [lindex $pro_com 0]
+   set pro_y [lindex $pro_com 1]
+   set pro_x_shift [expr $bilayer_mid_x - $pro_x]
+   set pro_y_shift [expr $bilayer_mid_y - $pro_y]
+   set pro_z_shift [expr $bilayer_com_z - $pro_embed_mid_z - $z_value]
+   $pro_sel moveby [list $pro_x_shift $pro_y_shift $pro_z_shift]
+   $pro_sel writepdb "${outbasename}_embedded.pdb"
 }
-set pro_com [measure center $pro_sel weight mass]
-set pro_x [lindex $pro_com 0]
-set pro_y [lindex $pro_com 1]
-set pro_x_shift [expr $bilayer_mid_x - $pro_x]
-set pro_y_shift [expr $bilayer_mid_y - $pro_y]
-set pro_z_shift [expr $bilayer_com_z - $pro_embed_mid_z - $z_value]
-$pro_sel moveby [list $pro_x_shift $pro_y_shift $pro_z_shift]
-$pro_sel writepdb "${outbasename}_embedded.pdb"
 lappend tmp_files "${outbasename}_embedded.pdb"
 
 set pro_minmax [measure minmax $pro_sel]
@@ -176,41 +191,43 @@ set pro_max_z [lindex $pro_max 2]
 set box_min_z [expr $pro_min_z - $zdist]
 set box_max_z [expr $pro_max_z + $zdist]
 
-# delete atoms that are in conflict with the protein
-set bad_atoms [measure contacts 2.4 $bilayer_sel $pro_sel]
-set bad_membrane_idx [lindex $bad_atoms 0]
-
-readpsf $psf pdb ${outbasename}_embedded.pdb
-readpsf $bilayer_psf pdb $bilayer_pdb
-
-# Map contacting atom indices -> (segname,resid) by reading straight from the parent
-# "all" selection ($bilayer_sel), NOT via [atomselect $bilayer "index <list>"].
-# VMD's atom-selection parse tree has one node per index and its destructor
-# (atomparser_node::~atomparser_node) is recursive, so an "index ..." selection over
-# ~10^5 contacting atoms recurses ~10^5 frames deep and overflows the stack when the
-# selection is freed at interpreter teardown -- a hard SIGSEGV at VMD exit.
-#
-# 'measure contacts' returns per-atom indices, but 'delatom $seg $resid' deletes the
-# whole residue, so also deduplicate (segname,resid) and delete each residue once
-# (otherwise delatom is re-invoked per contacting atom -> "no residue ..." spam).
-set _mem_seg [$bilayer_sel get segname]
-set _mem_res [$bilayer_sel get resid]
-catch {
-   array unset _seen_membrane
-   array set _seen_membrane {}
-   foreach idx $bad_membrane_idx {
-      set seg [lindex $_mem_seg $idx]
-      set resid [lindex $_mem_res $idx]
-      if {![info exists _seen_membrane($seg,$resid)]} {
-         set _seen_membrane($seg,$resid) 1
-         delatom $seg $resid
+# delete atoms that are in conflict with the protein (unless pestifer already did)
+if { !$prefilled } {
+   set bad_atoms [measure contacts $margin $bilayer_sel $pro_sel]
+   set bad_membrane_idx [lindex $bad_atoms 0]
+
+   readpsf $psf pdb ${outbasename}_embedded.pdb
+   readpsf $bilayer_psf pdb $bilayer_pdb
+
+   # Map contacting atom indices -> (segname,resid) by reading straight from the parent
+   # "all" selection ($bilayer_sel), NOT via [atomselect $bilayer "index <list>"].
+   # VMD's atom-selection parse tree has one node per index and its destructor
+   # (atomparser_node::~atomparser_node) is recursive, so an "index ..." selection over
+   # ~10^5 contacting atoms recurses ~10^5 frames deep and overflows the stack when the
+   # selection is freed at interpreter teardown -- a hard SIGSEGV at VMD exit.
+   #
+   # 'measure contacts' returns per-atom indices, but 'delatom $seg $resid' deletes the
+   # whole residue, so also deduplicate (segname,resid) and delete each residue once
+   # (otherwise delatom is re-invoked per contacting atom -> "no residue ..." spam).
+   set _mem_seg [$bilayer_sel get segname]
+   set _mem_res [$bilayer_sel get resid]
+   catch {
+      array unset _seen_membrane
+      array set _seen_membrane {}
+      foreach idx $bad_membrane_idx {
+         set seg [lindex $_mem_seg $idx]
+         set resid [lindex $_mem_res $idx]
+         if {![info exists _seen_membrane($seg,$resid)]} {
+            set _seen_membrane($seg,$resid) 1
+            delatom $seg $resid
+         }
       }
-   }
-} result
-regenerate angles dihedrals
+   } result
+   regenerate angles dihedrals
 
-writepsf cmap ${outbasename}_prefill.psf
-writepdb ${outbasename}_prefill.pdb
+   writepsf cmap ${outbasename}_prefill.psf
+   writepdb ${outbasename}_prefill.pdb
+}
 lappend tmp_files ${outbasename}_prefill.psf
 lappend tmp_files ${outbasename}_prefill.pdb
 
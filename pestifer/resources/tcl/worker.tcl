@@ -0,0 +1,125 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+#
+# Lines beginning with `##` are considered docstrings to be processed
+# by Sphinx and included in the HTML documentation.
+#
+## Command loop for a persistent pestifer VMD worker.
+##
+## Launched by ``pestifer.core.vmdworker`` as
+##
+## ``vmd -dispdev text -startup vmdrc.tcl -e worker.tcl -args --tcl-root <root> --worker-port <port>``
+##
+## (or, as a stand-in for testing, ``tclsh worker.tcl --worker-port <port>``).  The worker
+## connects back to pestifer on ``127.0.0.1:<port>`` and then runs one job per line it reads
+## there: a tab-separated ``run``, job id, working directory, script and the script's arguments,
+## which it sees in ``argv`` as it would after ``-args``.  Each script is sourced at global
+## level in that directory; everything it prints goes to the worker's stdout, which
+## pestifer copies into the job's log, and the job ends with a sentinel line carrying its return
+## code.  ``exit`` inside a job ends the job, not the worker.  ``quit`` (or EOF on the socket)
+## ends the worker.
+##
+## Between jobs all molecules are deleted, the psfgen structure is reset, and globals created by
+## the job are unset, so each script starts from the state a fresh VMD would give it -- except
+## that packages stay loaded and each topology file is read only once per worker (psfgen keeps
+## topologies across ``resetpsf``; a file is recognized by its size and CRC-32).
+
+namespace eval ::pestifer_worker {
+    variable port ""
+    variable token ""
+    variable topologies
+    array set topologies {}
+    variable baseline_globals {}
+}
+
+if {[info exists argv]} {
+    for {set a 0} {$a < [llength $argv]} {incr a} {
+        switch -- [lindex $argv $a] {
+            --worker-port  { incr a; set ::pestifer_worker::port [lindex $argv $a] }
+            --worker-token { incr a; set ::pestifer_worker::token [lindex $argv $a] }
+        }
+    }
+}
+
+# ``exit`` from a job script unwinds to the job loop as an error with a recognizable code
+rename exit ::pestifer_worker::real_exit
+proc exit {{code 0}} {
+    return -code error -errorcode [list PESTIFER_WORKER_EXIT $code] "exit $code"
+}
+
+# psfgen is loaded here rather than by the first job so that its ``topology`` command can be
+# wrapped before anything is read (under plain tclsh there is no psfgen and nothing to wrap)
+if {![catch {package require psfgen}]} {
+    rename ::topology ::pestifer_worker::psfgen_topology
+    proc ::topology {args} {
+        variable ::pestifer_worker::topologies
+        if {[llength $args] == 1 && [file isfile [lindex $args 0]]} {
+            set fp [open [lindex $args 0] rb]
+            set key "[file size [lindex $args 0]]:[zlib crc32 [read $fp]]"
+            close $fp
+            if {[info exists topologies($key)]} {
+                return
+            }
+            set topologies($key) [lindex $args 0]
+        }
+        return [uplevel 1 [list ::pestifer_worker::psfgen_topology {*}$args]]
+    }
+}
+
+proc ::pestifer_worker::reset {} {
+    variable baseline_globals
+    if {[info commands ::mol] ne ""} {
+        catch {mol delete all}
+    }
+    if {[info commands ::resetpsf] ne ""} {
+        catch {resetpsf}
+    }
+    foreach g [info globals] {
+        if {[lsearch -exact $baseline_globals $g] < 0} {
+            catch {unset ::$g}
+        }
+    }
+}
+
+proc ::pestifer_worker::run_job {id dir script args} {
+    variable token
+    set home [pwd]
+    set saved_argv $::argv
+    set ::argv $args
+    set ::argc [llength $args]
+    set rc 0
+    if {[catch {cd $dir; uplevel #0 [list source $script]} msg opts]} {
+        set ecode [dict get $opts -errorcode]
+        if {[lindex $ecode 0] eq "PESTIFER_WORKER_EXIT"} {
+            set rc [lindex $ecode 1]
+        } else {
+            puts "ERROR) $script: [dict get $opts -errorinfo]"
+            set rc 1
+        }
+    }
+    catch {cd $home}
+    set ::argv $saved_argv
+    set ::argc [llength $saved_argv]
+    reset
+    puts -nonewline "\n@@pestifer-worker $token $id $rc@@"
+    flush stdout
+}
+
+if {![info exists argv]} {
+    set argv {}
+}
+set ::pestifer_worker::sock [socket 127.0.0.1 $::pestifer_worker::port]
+fconfigure $::pestifer_worker::sock -buffering line -translation lf -encoding utf-8
+set ::pestifer_worker::baseline_globals [info globals]
+lappend ::pestifer_worker::baseline_globals argv argc argv0 line fields
+puts -nonewline "\n@@pestifer-worker $::pestifer_worker::token ready 0@@"
+flush stdout
+
+while {[gets $::pestifer_worker::sock line] >= 0} {
+    set fields [split $line "\t"]
+    switch -- [lindex $fields 0] {
+        run  { ::pestifer_worker::run_job {*}[lrange $fields 1 end] }
+        quit { break }
+    }
+}
+close $::pestifer_worker::sock
+::pestifer_worker::real_exit 0
@@ -8,6 +8,7 @@ import tempfile
 from .tcl import TcLScripter
 from ..charmmff.charmmffprm import CharmmParamFile
 from ..core.command import Command
+from ..core.telemetry import profiled
 from ..util.provenance import stamp as provenance_stamp
 from ..logparsers import NAMDLogParser, NAMDxstParser
 from ..psfutil.psfcontents import PSFContents
@@ -162,6 +163,7 @@ class NAMDScripter(TcLScripter):
         with open(self.scriptname, 'w') as fh:
             fh.writelines(new_lines)
 
+    @profiled('param consolidation')
     def consolidate_params(self, psf_path: str) -> str | None:
         """Replace the full parameter file set with a single minimal .prm for this PSF.
 
@@ -196,12 +198,12 @@ class NAMDScripter(TcLScripter):
 
         combined = CharmmParamFile()
         n_parsed = 0
-        for fname in self.parameters:
-            try:
-                combined.merge(CharmmParamFile.from_file(fname))
-                n_parsed += 1
-            except Exception as exc:
-                logger.warning(f'consolidate_params: could not parse {fname}: {exc}')
+        for fname, parsed in zip(self.parameters, CharmmParamFile.from_files(self.parameters)):
+            if isinstance(parsed, Exception):
+                logger.warning(f'consolidate_params: could not parse {fname}: {parsed}')
+                continue
+            combined.merge(parsed)
+            n_parsed += 1
         if n_parsed == 0:
             return None
 
@@ -924,8 +924,10 @@ class PsfgenScripter(VMDScripter):
         # Same launch conditions as VMDScripter.runscript: VMD stays in pestifer's session and
         # gets /dev/null on stdin, or an rlwrap-wrapping VMD launcher exits immediately with
         # rc 0 and no output, never running the psfgen script (see the guard below).
-        result = c.run(logfile=self.logname, logparser=self.logparser,
-                       new_session=False, stdin=subprocess.DEVNULL)
+        result = self.run_in_worker(clean_options)
+        if result is None:
+            result = c.run(logfile=self.logname, logparser=self.logparser,
+                           new_session=False, stdin=subprocess.DEVNULL)
         logger.debug(f'FileCollector:')
         my_logger(self.F, logger.debug)
         # psfgen writes wide (column-shifted) coordinate records for 6-char CHARMM carbohydrate
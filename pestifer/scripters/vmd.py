@@ -7,7 +7,9 @@ import subprocess
 
 from .tcl import TcLScripter
 
+from ..core import telemetry
 from ..core.command import Command
+from ..core.vmdworker import get_worker_pool
 
 from ..logparsers import VMDLogParser
 
@@ -41,6 +43,8 @@ class VMDScripter(TcLScripter):
         self.tcl_pkg_path = kwargs.get('tcl_pkg_path')
         self.tcl_script_path = kwargs.get('tcl_script_path')
         self.vmd_startup = kwargs.get('vmd_startup_script')
+        self.vmd_workers = kwargs.get('vmd_workers', 0)
+        self.vmd_worker_max_jobs = kwargs.get('vmd_worker_max_jobs', 100)
         self.indent = ' ' * 4
 
     def newscript(self, basename=None, packages=[]):
@@ -267,6 +271,9 @@ class VMDScripter(TcLScripter):
         if self.progress and progress_title != '':
             progress_struct = PestiferProgress(name=progress_title, color=options.get('progress_color','fuchsia'))
             self.logparser.enable_progress_bar(progress_struct)
+        result = self.run_in_worker(options)
+        if result is not None:
+            return result
         # VMD runs in pestifer's own session (not a new one): a detached session strips
         # the controlling terminal, and an rlwrap-wrapping VMD launcher then exits without
         # running the script.  Feeding /dev/null on stdin also keeps such a launcher from
@@ -274,6 +281,33 @@ class VMDScripter(TcLScripter):
         return c.run(logfile=self.logname, logparser=self.logparser,
                      new_session=False, stdin=subprocess.DEVNULL)
 
+    def run_in_worker(self, options: dict | None = None) -> int | None:
+        """
+        Run the current script in a persistent VMD worker (see :mod:`pestifer.core.vmdworker`)
+        instead of a VMD process of its own, if workers are enabled (``vmd.workers`` in the
+        configuration).  ``options`` become the script's arguments, just as they would follow
+        ``-args`` on a VMD command line.
+
+        Returns
+        -------
+        int or None
+            The script's return code, or None if workers are disabled or none could be started,
+            in which case the caller launches VMD itself.
+        """
+        if self.vmd_workers < 1:
+            return None
+        worker_script = os.path.join(self.tcl_root, 'worker.tcl')
+        pool = get_worker_pool(f'{self.vmd} -dispdev text -startup {self.vmd_startup} -e {worker_script} -args --tcl-root {self.tcl_root}',
+                               size=self.vmd_workers, max_jobs=self.vmd_worker_max_jobs)
+        args = ['--tcl-root', self.tcl_root]
+        for k, v in (options or {}).items():
+            args += [f'-{k}', v]
+        probe = telemetry.command_probe(f'vmd-worker {self.scriptname}')
+        rc = pool.run(self.scriptname, args=args, logfile=self.logname, logparser=self.logparser)
+        if probe is not None:
+            probe.finish(rc)
+        return rc
+
     def cleanup(self, cleanup=False):
         """
         Perform post-execution clean-up by flushing the file collector.
@@ -1,26 +1,8 @@
+import importlib
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from ..cli.subcommand import Subcommand
-from .build import RunSubcommand
-from .fetch_example import FetchExampleSubcommand
-from .build_example import RunExampleSubcommand
-from .follow_namd_log import FollowNAMDLogSubcommand
-from .make_namd_restart import MakeNAMDRestartSubcommand
-from .config_help import ConfigHelpSubcommand
-from .config_default import ConfigDefaultSubcommand
-from .new_system import NewSystemSubcommand
-from .show_resources import ShowResourcesSubcommand
-from .report_methods import ReportMethodsSubcommand
-from .wheretcl import WhereTCLSubcommand
-from .desolvate import DesolvateSubcommand
-from .modify_package import ModifyPackageSubcommand
-from .make_ligand_mol2 import MakeLigandMol2Subcommand
-from .make_pdbcollection import MakePDBCollectionSubcommand
-from .cache import CacheSubcommand
-from .mdplot import MDPlotSubcommand
-from .density_profile import DensityProfileSubcommand
-from .setup_vmd import SetupVMDSubcommand
-from .setup_claude import SetupClaudeSubcommand
 
 GROUPS: tuple[str, ...] = (
     'Build a system',
@@ -46,38 +28,85 @@ and naming it is the point -- see ``docs/design/namd-layer-extraction.md``.
 package_path = Path(__file__).resolve().parent.parent.parent
 is_source_package_with_git = os.path.isdir(os.path.join(package_path, '.git'))
 
+
+@dataclass(frozen=True)
+class SubcommandEntry:
+    """A registry entry naming a subcommand without importing it.
+
+    Importing every subcommand module up front pulled the whole task registry -- and with it
+    pandas, matplotlib, scipy, networkx, pidibble and the pydantic models -- into every
+    invocation, so ``pestifer --help`` or ``pestifer wheretcl`` paid well over a second before
+    doing anything.  An entry carries what the top-level parser needs to list the command
+    (name, aliases, group, one-line help) and the location of the :class:`Subcommand` subclass;
+    :meth:`load` imports it only when the command is actually run.  The duplicated metadata is
+    checked against the real classes by the unit tests.
+    """
+    name: str
+    module: str
+    """ module within :mod:`pestifer.subcommands` that defines the subcommand """
+    classname: str
+    group: str
+    short_help: str
+    aliases: tuple[str, ...] = ()
+
+    def load(self) -> Subcommand:
+        """Import the defining module and return an instance of the subcommand."""
+        module = importlib.import_module(f'.{self.module}', __name__)
+        return getattr(module, self.classname)()
+
+
 # Declared in presentation order within each group; the stable sort below only orders the groups
 # themselves, so this list decides what comes first inside one.
-_subcommands: list[Subcommand] = [
+_subcommands: list[SubcommandEntry] = [
     # Build a system
-    RunSubcommand(),
-    RunExampleSubcommand(),
-    FetchExampleSubcommand(),
-    NewSystemSubcommand(),
+    SubcommandEntry('build', 'build', 'RunSubcommand', 'Build a system',
+                    'prepare a system', ('run',)),
+    SubcommandEntry('build-example', 'build_example', 'RunExampleSubcommand', 'Build a system',
+                    'build a specific example system', ('run-example',)),
+    SubcommandEntry('fetch-example', 'fetch_example', 'FetchExampleSubcommand', 'Build a system',
+                    "copy the example's YAML config file to the CWD"),
+    SubcommandEntry('new-system', 'new_system', 'NewSystemSubcommand', 'Build a system',
+                    'create a new system script from scratch'),
     # Configure a build
-    ConfigHelpSubcommand(),
-    ConfigDefaultSubcommand(),
-    ShowResourcesSubcommand(),
+    SubcommandEntry('config-help', 'config_help', 'ConfigHelpSubcommand', 'Configure a build',
+                    'show help for configuration options'),
+    SubcommandEntry('config-default', 'config_default', 'ConfigDefaultSubcommand', 'Configure a build',
+                    'show default configuration options'),
+    SubcommandEntry('show-resources', 'show_resources', 'ShowResourcesSubcommand', 'Configure a build',
+                    'show available resources for the current configuration'),
     # Work with structures
-    DesolvateSubcommand(),
-    MakeLigandMol2Subcommand(),
-    MakePDBCollectionSubcommand(),
+    SubcommandEntry('desolvate', 'desolvate', 'DesolvateSubcommand', 'Work with structures',
+                    'desolvate a system'),
+    SubcommandEntry('make-ligand-mol2', 'make_ligand_mol2', 'MakeLigandMol2Subcommand', 'Work with structures',
+                    'generate CGenFF-ready mol2 files for unknown HETATM ligands in a PDB'),
+    SubcommandEntry('make-pdb-collection', 'make_pdbcollection', 'MakePDBCollectionSubcommand', 'Work with structures',
+                    'create a PDB collection from a set of input files'),
     # After the run
-    MDPlotSubcommand(),
-    DensityProfileSubcommand(),
-    FollowNAMDLogSubcommand(),
-    MakeNAMDRestartSubcommand(),
-    ReportMethodsSubcommand(),
+    SubcommandEntry('mdplot', 'mdplot', 'MDPlotSubcommand', 'After the run',
+                    'generate plots from MD simulation data'),
+    SubcommandEntry('density-profile', 'density_profile', 'DensityProfileSubcommand', 'After the run',
+                    'plot species-resolved density profiles along z'),
+    SubcommandEntry('follow-namd-log', 'follow_namd_log', 'FollowNAMDLogSubcommand', 'After the run',
+                    'follow and parse an actively updating NAMD log file'),
+    SubcommandEntry('make-namd-restart', 'make_namd_restart', 'MakeNAMDRestartSubcommand', 'After the run',
+                    'generate a restart NAMD config file based on current checkpoint'),
+    SubcommandEntry('report-methods', 'report_methods', 'ReportMethodsSubcommand', 'After the run',
+                    'draft a Methods section from one or more completed builds'),
     # Manage the installation
-    CacheSubcommand(),
-    WhereTCLSubcommand(),
-    SetupVMDSubcommand(),
-    SetupClaudeSubcommand(),
+    SubcommandEntry('cache', 'cache', 'CacheSubcommand', 'Manage the installation',
+                    "inspect, clear, or rebuild pestifer's on-disk caches"),
+    SubcommandEntry('wheretcl', 'wheretcl', 'WhereTCLSubcommand', 'Manage the installation',
+                    'provides path of TcL scripts for sourcing in interactive VMD'),
+    SubcommandEntry('setup-vmd', 'setup_vmd', 'SetupVMDSubcommand', 'Manage the installation',
+                    "install pestifer's Tcl library into your VMD startup environment"),
+    SubcommandEntry('setup-claude', 'setup_claude', 'SetupClaudeSubcommand', 'Manage the installation',
+                    "install pestifer's Claude Code skill so an agent can drive pestifer"),
     ]
 
 if is_source_package_with_git:
     # a maintainer tool; it does not exist for a pip-installed pestifer
-    _subcommands.append(ModifyPackageSubcommand())
+    _subcommands.append(SubcommandEntry('modify-package', 'modify_package', 'ModifyPackageSubcommand',
+                                        'Manage the installation', 'modify the pestifer package'))
 
 # Present in group order.  Sorting here rather than by hand keeps the declaration list above free
 # to stay in import order, and makes a subcommand added without a group loud rather than silent:
@@ -85,7 +114,15 @@ if is_source_package_with_git:
 _subcommands.sort(key=lambda s: (GROUPS.index(s.group) if s.group in GROUPS else len(GROUPS),))
 
 
-def grouped_subcommands() -> list[tuple[str, list[Subcommand]]]:
+def find_subcommand(name: str) -> SubcommandEntry | None:
+    """The registry entry invoked as ``name`` (its name or one of its aliases), if any."""
+    for s in _subcommands:
+        if name == s.name or name in s.aliases:
+            return s
+    return None
+
+
+def grouped_subcommands() -> list[tuple[str, list[SubcommandEntry]]]:
     """``[(group title, [subcommand, ...]), ...]`` in presentation order."""
     out = []
     for g in GROUPS:
@@ -193,6 +193,18 @@ class RunSubcommand(Subcommand):
         self.parser.add_argument('--from', dest='from_task', type=str, default=None, metavar='TASK',
                                  help='resume explicitly from this task (index or taskname), overriding '
                                       'auto-detection (implies --restart)')
+        self.parser.add_argument('--build-cache', default=False, action='store_true',
+                                 help='reuse the results of tasks an earlier build already ran on the same '
+                                      'inputs, and store this build\'s results for later builds')
+        self.parser.add_argument('--build-cache-size', type=float, default=20.0, metavar='GB',
+                                 help='size limit of the build cache; least recently used results are '
+                                      'dropped beyond it (default: %(default)s)')
+        self.parser.add_argument('--profile', default=False, action='store_true',
+                                 help='record per-task wall/CPU time, memory, I/O, external-command and '
+                                      'hot-section timings into run-record.json')
+        self.parser.add_argument('--profile-trace', type=str, default=None, metavar='FILE',
+                                 help='with --profile, also write the timings as a Chrome trace (opens in '
+                                      'chrome://tracing, Perfetto or speedscope); implies --profile')
         self.parser.add_argument('--check', default=False, action='store_true',
                                  help='validate the config, the toolchain and the task pipeline, print '
                                       'the plan, and exit without building (exit 1 if it would not build)')
@@ -249,6 +261,10 @@ class RunSubcommand(Subcommand):
                 os.chdir(exec_dir)
             return 0 if report['ok'] else 1
 
+        profile = None
+        if getattr(args, 'profile', False) or getattr(args, 'profile_trace', None):
+            from ..core import telemetry
+            profile = telemetry.enable()
         config = Config(userfile=configname, ncpus_override=args.ncpus,
                         processor_type_override=('gpu' if getattr(args, 'gpu', False) else ''),
                         seed_override=getattr(args, 'seed', None),
@@ -260,9 +276,21 @@ class RunSubcommand(Subcommand):
         C.restart = getattr(args, 'restart', False)
         C.fresh = getattr(args, 'fresh', False)
         C.from_task = getattr(args, 'from_task', None)
+        if getattr(args, 'build_cache', False):
+            from ..core.build_cache import BuildCache
+            from ..util.provenance import charmmff_release
+            C.build_cache = BuildCache(max_bytes=int(args.build_cache_size * 1024**3),
+                                       pestifer_version=__pestifer_version__,
+                                       charmmff_release=charmmff_release(config) or '')
         if args.complete_config:
             C.write_complete_config(f'{cbase}-complete.yaml')
-        report = C.do_tasks()
+        try:
+            report = C.do_tasks()
+        finally:
+            if profile is not None:
+                telemetry.disable()
+                if getattr(args, 'profile_trace', None):
+                    profile.write_trace(args.profile_trace)
         end_time = time.time()
         elapsed_time_s = datetime.timedelta(seconds=(end_time - begin_time))
         logger.info(f'pestifer ends. Elapsed time {time.strftime("%H:%M:%S", time.gmtime(elapsed_time_s.seconds))}.')
@@ -286,7 +314,8 @@ class RunSubcommand(Subcommand):
                 citations={'entries': [
                     {'subject': c.subject, 'text': c.text, 'doi': c.doi,
                      'reason': c.reason, 'key': c.key}
-                    for c in (cites or [])]}))
+                    for c in (cites or [])]},
+                telemetry=profile.report() if profile is not None else None))
         if args.output_dir != './':
             os.chdir(exec_dir)
         return C
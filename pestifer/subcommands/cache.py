@@ -1,16 +1,22 @@
 # Author: Cameron F. Abrams <cfa22@drexel.edu>
 """
 The cache subcommand.  Inspect, clear, or rebuild pestifer's on-disk caches (the parsed
-CHARMM force field, the PDB repository, and the residue-name lookup index).
+CHARMM force field, the PDB repository and its collection indices, the residue-name lookup
+index, the parsed parameter files, the external-program versions, and the build cache).
 """
 import argparse as ap
+import shutil
 
 from dataclasses import dataclass
 from datetime import datetime
 
 from . import Subcommand
 
+from ..charmmff.charmmffprm import default_parse_cache
+from ..charmmff.pdbrepository import default_index_directory
+from ..core.build_cache import BuildCache
 from ..util.cacheable_object import CacheableObject
+from ..util.provenance import version_cache_file
 
 
 def _human(nbytes: int) -> str:
@@ -27,6 +33,10 @@ def _cache_status(out=print):
     out(f'pestifer cache directory: {d}')
     if not files:
         out('  (empty -- no caches have been built yet)')
+        _param_cache_status(out)
+        _pdbindex_status(out)
+        _version_cache_status(out)
+        _build_cache_status(out)
         return
     total = 0
     for f in files:
@@ -38,11 +48,59 @@ def _cache_status(out=print):
         when = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M')
         out(f'  {kind:<26s} {_human(st.st_size):>9s}  {when}')
     out(f'  {len(files)} file(s), {_human(total)} total')
+    _param_cache_status(out)
+    _pdbindex_status(out)
+    _version_cache_status(out)
+    _build_cache_status(out)
+
+
+def _param_cache_status(out=print):
+    pdir = default_parse_cache().directory
+    entries = sorted(pdir.glob('*.pkl')) if pdir.is_dir() else []
+    if entries:
+        out(f'  {"parsed parameter files":<26s} {_human(sum(f.stat().st_size for f in entries)):>9s}'
+            f'  ({len(entries)} in {pdir.name}/)')
+
+
+def _pdbindex_status(out=print):
+    idir = default_index_directory()
+    indices = sorted(idir.glob('*/index.json')) if idir.is_dir() else []
+    if indices:
+        size = sum(f.stat().st_size for f in idir.rglob('*') if f.is_file())
+        out(f'  {"PDB collection indices":<26s} {_human(size):>9s}  ({len(indices)} in {idir.name}/)')
+
+
+def _version_cache_status(out=print):
+    vfile = version_cache_file()
+    if vfile.is_file():
+        out(f'  {"external program versions":<26s} {_human(vfile.stat().st_size):>9s}  ({vfile.name})')
+
+
+def _build_cache_status(out=print):
+    bc = BuildCache()
+    entries = bc.entries()
+    if entries:
+        out(f'  {"build cache":<26s} {_human(bc.size()):>9s}  ({len(entries)} task result(s) in {bc.directory.name}/)')
 
 
 def _cache_clear(out=print):
     removed = CacheableObject.clear_cache()
     out(f'Removed {len(removed)} cache file(s) from {CacheableObject.cache_directory()}')
+    removed = default_parse_cache().clear()
+    if removed:
+        out(f'Removed {len(removed)} parsed parameter file(s) from {default_parse_cache().directory}')
+    idir = default_index_directory()
+    if idir.is_dir():
+        shutil.rmtree(idir, ignore_errors=True)
+        out(f'Removed PDB collection indices from {idir}')
+    vfile = version_cache_file()
+    if vfile.is_file():
+        vfile.unlink()
+        out(f'Removed remembered external program versions ({vfile})')
+    bc = BuildCache()
+    if bc.directory.is_dir():
+        n = bc.clear()
+        out(f'Removed {n} cached task result(s) from {bc.directory}')
 
 
 def _cache_rebuild(out=print):
@@ -63,7 +121,9 @@ class CacheSubcommand(Subcommand):
     group: str = 'Manage the installation'
     short_help: str = "inspect, clear, or rebuild pestifer's on-disk caches"
     long_help: str = ("Manage pestifer's per-user caches (the parsed CHARMM force field, the PDB "
-                      "repository, and the residue-name lookup index): 'status' lists them, 'clear' "
+                      "repository and its collection indices, the residue-name lookup index, the "
+                      "parsed parameter files, the external-program versions, and the build cache): "
+                      "'status' lists them, 'clear' "
                       "deletes them, and 'rebuild' force-rebuilds them.")
 
     @staticmethod
@@ -18,6 +18,14 @@ Example:
 
 This reads ``my_system.psf``, ``my_system.coor`` (or ``my_system.pdb``), and
 ``my_system.xsc`` and writes ``my_system-density-profile.png``.
+
+Given ``--dcd``, the profile is instead averaged over the frames of one or more DCD
+trajectories, with per-frame cells from ``--xst`` (or the DCDs' own unit cells) and a
+band of one standard error from ``--blocks`` block averages:
+
+.. code-block:: bash
+
+   $ pestifer density-profile --psf sys.psf --dcd prod1.dcd prod2.dcd --xst prod1.xst prod2.xst
 """
 import logging
 import os
@@ -40,32 +48,41 @@ class DensityProfileSubcommand(Subcommand):
     log_file: str = 'density-profile.log'
     short_help: str = "plot species-resolved density profiles along z"
     long_help: str = ("Compute and plot water/lipid/protein/ion mass-density profiles "
-                      "along the bilayer normal from a PSF, a coordinate frame, and an XSC.")
+                      "along the bilayer normal from a PSF, a coordinate frame, and an XSC, "
+                      "or averaged over DCD trajectories.")
     func_returns_type: type = bool
 
     @staticmethod
     def func(args: ap.Namespace, **kwargs):
         psf, coor, xsc = args.psf, args.coor, args.xsc
+        if not args.dcd:
+            stray = [f'--{n}' for n in ('xst', 'blocks', 'stride') if getattr(args, n) is not None]
+            if stray:
+                raise ValueError(f'{", ".join(stray)} only apply to a trajectory profile (give --dcd)')
         if args.basename:
             psf = psf or f'{args.basename}.psf'
-            xsc = xsc or f'{args.basename}.xsc'
-            if not coor:
+            if not args.dcd:
+                xsc = xsc or f'{args.basename}.xsc'
+            if not coor and not args.dcd:
                 for ext in ('.coor', '.pdb'):
                     if os.path.exists(f'{args.basename}{ext}'):
                         coor = f'{args.basename}{ext}'
                         break
-        missing = [n for n, v in (('psf', psf), ('coor', coor), ('xsc', xsc)) if not v]
+        required = (('psf', psf),) if args.dcd else (('psf', psf), ('coor', coor), ('xsc', xsc))
+        missing = [n for n, v in required if not v]
         if missing:
             raise ValueError(f'missing input(s): {", ".join(missing)} '
-                             '(give --basename or --psf/--coor/--xsc)')
+                             '(give --basename or --psf/--coor/--xsc, or --psf/--dcd)')
         out = args.out or (f'{args.basename}-density-profile.png' if args.basename
                            else 'density-profile.png')
-        dp = DensityProfile(psf, coor, xsc)
+        dp = DensityProfile(psf, None if args.dcd else coor, None if args.dcd else xsc)
         if args.lipid_components and len(dp.lipid_resnames) > 1:
             logger.info(f'lipid components: {", ".join(dp.lipid_resnames)}')
         dp.plot(out, title=args.title, dz=args.dz,
                 lipid_components=args.lipid_components, figsize=tuple(args.figsize),
-                stamp=provenance_stamp())
+                stamp=provenance_stamp(), dcds=args.dcd, xst=args.xst,
+                nblocks=5 if args.blocks is None else args.blocks,
+                stride=args.stride or 1, nworkers=args.nworkers)
         logger.info(f'wrote {out}')
         print(out)
         return True
@@ -78,6 +95,19 @@ class DensityProfileSubcommand(Subcommand):
         self.parser.add_argument('--coor', type=str, default=None,
                                  help='input coordinate frame (PDB or NAMD binary .coor)')
         self.parser.add_argument('--xsc', type=str, default=None, help='input XSC cell file')
+        self.parser.add_argument('--dcd', type=str, nargs='+', default=None,
+                                 help='DCD trajectories to average over, in order '
+                                      '(instead of a single coordinate frame)')
+        self.parser.add_argument('--xst', type=str, nargs='+', default=None,
+                                 help='XST files giving each DCD frame its cell, one per DCD '
+                                      'or merged by timestep (default: the DCD unit cells)')
+        self.parser.add_argument('--blocks', type=int, default=None,
+                                 help='blocks for the standard-error band of a trajectory '
+                                      'profile (default: 5)')
+        self.parser.add_argument('--stride', type=int, default=None,
+                                 help='profile every stride-th DCD frame (default: 1)')
+        self.parser.add_argument('--nworkers', type=int, default=1,
+                                 help='processes to profile DCDs in parallel (default: %(default)s)')
         self.parser.add_argument('--out', type=str, default=None,
                                  help='output PNG (default: <basename>-density-profile.png)')
         self.parser.add_argument('--title', type=str, default='', help='plot title')
@@ -19,8 +19,10 @@ _SOURCE_LABEL = {
 }
 
 
-def _report_resname(info: dict, out_stream=print):
-    """Format one :meth:`ResourceManager.lookup_resname` result as a short block."""
+def _report_resname(info: dict, out_stream=print, suggestions: list | None = None):
+    """Format one :meth:`ResourceManager.lookup_resname` result as a short block, ending with
+    any "did you mean" ``suggestions`` (see :meth:`ResourceManager.suggest_resnames`)."""
+    suggestions = suggestions or []
     out_stream(info['resname'])
     if info['in_topology']:
         line = f"  topology: {info['kind']} defined in {info['topfile']}"
@@ -50,6 +52,8 @@ def _report_resname(info: dict, out_stream=print):
             out_stream(f"            ({', '.join(detail)})")
     else:
         out_stream('  PDB repo: no coordinates in the built-in PDB repository')
+    if suggestions:
+        out_stream(f"  did you mean: {', '.join(suggestions)}?")
     out_stream('')
 
 
@@ -106,8 +110,10 @@ class ShowResourcesSubcommand(Subcommand):
             contains = getattr(args, 'contains', None)
             names = getattr(args, 'query', []) or []
             if contains:
-                matches = r.search_resnames(contains)
-                print(f'{len(matches)} residue name(s) contain "{contains}":')
+                synonyms = getattr(args, 'synonyms', False)
+                matches = r.search_resnames(contains, synonyms=synonyms)
+                where = 'or synonym(s) contain' if synonyms else 'contain'
+                print(f'{len(matches)} residue name(s) {where} "{contains}":')
                 for name in matches:
                     _report_resname_compact(r.lookup_resname(name), out_stream=print)
                 return True
@@ -115,7 +121,10 @@ class ShowResourcesSubcommand(Subcommand):
                 print('Usage: pestifer show-resources resname RESNAME [RESNAME ...]  (or --contains SUBSTRING)')
                 return True
             for name in names:
-                _report_resname(r.lookup_resname(name), out_stream=print)
+                info = r.lookup_resname(name)
+                unknown = not info['in_topology'] and not info['in_pdbrepository']
+                _report_resname(info, out_stream=print,
+                                suggestions=r.suggest_resnames(name) if unknown else [])
             return True
         if resource_type == 'pdb-repo':
             r.charmmff_content.provision_pdbrepository()
@@ -137,6 +146,9 @@ class ShowResourcesSubcommand(Subcommand):
         self.parser.add_argument('--contains', type=str, default=None,
                                  help='with resource_type=resname: list all known residue names '
                                       'containing this substring (case-insensitive)')
+        self.parser.add_argument('--synonyms', default=False, action='store_true',
+                                 help='with --contains: also match the descriptive synonyms of residues '
+                                      '(e.g. "phosphocholine")')
         self.parser.add_argument('--fullnames', default=False, action='store_true', help='with pdb-repo: show the full descriptive name of each residue')
         self.parser.add_argument('--user-pdbcollection', type=str, nargs='+', default=[], help='additional collections of PDB files outside pestifer installation')
         self.parser.add_argument('--charmmff-release', type=str, default='', help='CHARMMFF release to use (e.g. "February2026"); defaults to the newest available')
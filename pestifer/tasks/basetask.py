@@ -22,6 +22,7 @@ from abc import ABC, abstractmethod
 from time import perf_counter
 from typing import TYPE_CHECKING
 
+from ..core import telemetry
 from ..core.artifacts import *
 from ..core.command import Command
 from ..core.errors import PestiferBuildError
@@ -30,6 +31,7 @@ from ..core.pipeline import PipelineContext
 
 from ..scripters import GenericScripter, VMDScripter
 from ..util.util import hmsf
+from ..util.xstfile import forget_xst
 from ..util.provenance import stamp as provenance_stamp
 
 if TYPE_CHECKING:
@@ -226,11 +228,24 @@ class BaseTask(ABC):
         from .pipeline_contract import TaskContract
         return TaskContract()
 
+    def cache_inputs(self) -> list[str]:
+        """Files this task reads besides its input STATE and the files its specs name, whose
+        content its build-cache key must cover (see :mod:`pestifer.core.build_cache`)."""
+        return []
+
+    def resource_demand(self, ncpus: int, ngpus: int) -> tuple[int, int]:
+        """The CPUs and GPUs this task occupies while it runs, given the controller's ``ncpus``
+        and ``ngpus`` (see :mod:`pestifer.core.scheduler`).  The default is all of them, so the
+        task never overlaps another; a light task that can share the machine overrides this."""
+        return ncpus, ngpus
+
     def execute(self) -> int:
         """
         Execute the task.
         This method calls the `do` method, which should be implemented by subclasses to perform the task's operations.
-        It also logs the initiation and completion of the task.
+        It also logs the initiation and completion of the task, profiles it when profiling is
+        on (see :mod:`pestifer.core.telemetry`), and empties the
+        :func:`~pestifer.util.xstfile.read_xst` cache when it finishes.
         """
         if not self.is_provisioned:
             logger.warning(f'Task {self.taskname} is not provisioned.')
@@ -240,9 +255,13 @@ class BaseTask(ABC):
         if self.extra_message:
             msg += f' ({self.extra_message})'
         self.log_message(msg)
-        t1 = perf_counter()
-        self.result = self.do()
-        t2 = perf_counter()
+        with telemetry.task_span(self):
+            t1 = perf_counter()
+            try:
+                self.result = self.do()
+            finally:
+                forget_xst()    # the .xst files this task's runs wrote are not read again
+            t2 = perf_counter()
         if self.result == 0:
             msg = 'completed'
         else:
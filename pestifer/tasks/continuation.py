@@ -151,13 +151,12 @@ class ContinuationTask(PsfgenTask):
                 logger.warning(f'continuation: could not stage standard parameters for the '
                                f'consistency check: {exc}')
         combined = CharmmParamFile()
-        for fname in param_files:
-            if not os.path.exists(fname):
+        param_files = [fname for fname in param_files if os.path.exists(fname)]
+        for fname, parsed in zip(param_files, CharmmParamFile.from_files(param_files)):
+            if isinstance(parsed, Exception):
+                logger.warning(f'continuation: failed to parse parameter file {fname}: {parsed}')
                 continue
-            try:
-                combined.merge(CharmmParamFile.from_file(fname))
-            except Exception as exc:
-                logger.warning(f'continuation: failed to parse parameter file {fname}: {exc}')
+            combined.merge(parsed)
         if not combined.nonbonded:
             logger.warning('continuation: no nonbonded parameters were loaded; skipping the '
                            'force-field-consistency check (cannot verify without a parameter set).')
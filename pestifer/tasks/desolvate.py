@@ -10,14 +10,22 @@ Usage is described in the :ref:`subs_desolvate` documentation.
 import logging
 import os
 
+import numpy as np
+
 from .basetask import VMDTask
 from ..core.command import Command
 from ..core.errors import PestiferError
+from ..psfutil.psfarrays import PSFArrays
 from ..scripters import VMDScripter
 from ..util.progress import PestiferProgress
 
 logger = logging.getLogger(__name__)
 
+_VMD_NO_OUTPUT = ("VMD exited cleanly (returncode 0) but wrote no output -- its script "
+                  "did not run to completion; check the log for a Tcl error, and note "
+                  "that some site VMD launchers wrap the binary in rlwrap and exit "
+                  "without running the script when detached from a terminal")
+
 class DesolvateTask(VMDTask):
     """
     DesolvateTask class for processing DCD files and generating index and PSF files.
@@ -55,10 +63,7 @@ class DesolvateTask(VMDTask):
                 cause = (f"VMD exited with returncode {self.result} -- confirm 'vmd' is on "
                          f"PATH and launchable (e.g. `vmd -dispdev text -e /dev/null`)")
             else:
-                cause = ("VMD exited cleanly (returncode 0) but wrote no output -- its script "
-                         "did not run to completion; check the log for a Tcl error, and note "
-                         "that some site VMD launchers wrap the binary in rlwrap and exit "
-                         "without running the script when detached from a terminal")
+                cause = _VMD_NO_OUTPUT
             raise PestiferError(
                 f"desolvate: the index/PSF-generation step failed; expected outputs "
                 f"'{idx_outfile}' and '{psf_outfile}' were not produced. {cause}. "
@@ -70,9 +75,10 @@ class DesolvateTask(VMDTask):
     def do_idx_psf_gen(self):
         """
         Generate an index file and a PSF file from the given PSF and PDB files.
-        This method uses the VMD scripter to create a script that performs the necessary operations
-        to generate the index file and the PSF file based on the specified selection criteria.
-        The generated script is then executed to produce the output files.
+        VMD evaluates the selection and writes the index file (and the kept atoms' PDB); the
+        PSF is then cut to the indexed atoms by :class:`~pestifer.psfutil.psfarrays.PSFArrays`,
+        which remaps the bonded terms and keeps the patch remarks of the residues that remain,
+        instead of by psfgen ``delatom``-ing the discarded residues one at a time.
 
         This is not a pipelined task (for now)
 
@@ -87,7 +93,6 @@ class DesolvateTask(VMDTask):
             pdb_outfile: str = os.path.splitext(psf_outfile)[0]+'.pdb'
         vt: VMDScripter = self.get_scripter('vmd')
         vt.newscript(self.basename)
-        vt.addline( 'package require psfgen')
         vt.addline(f'mol new {psf}')
         if pdb:
             vt.addline(f'mol addfile {pdb}')
@@ -104,39 +109,30 @@ class DesolvateTask(VMDTask):
         vt.addline( 'close $fp')
         if pdb:
             vt.addline(f'$keepsel writepdb {pdb_outfile}')
-        vt.addline(f'readpsf {psf}')
-        vt.addline(f'vmdcon -info "Read {psf}"')
-        vt.addline(f'set delsegres [list]')
-        vt.addline(f'set sentinel 0')
-        vt.addline(f'set lasttoken ""')
-        vt.addline(r'foreach badsegname [$dumpsel get segname] badresid [$dumpsel get resid] {')
-        vt.addline( '    set token "$badsegname-$badresid"')
-        vt.addline( '    if { $token != $lasttoken } {')
-        vt.addline( '        lappend delsegres $token')
-        vt.addline(f'        set sentinel [expr $sentinel + 1]')
-        # vt.addline( '        if { $sentinel % 1000 == 0 } {')
-        # vt.addline(f'            vmdcon -info "Marked $sentinel segment-residues for deletion so far..."')
-        # vt.addline( '        }')
-        # vt.addline(f'        vmdcon -info "Marking segment-residue $token for deletion"')
-        vt.addline( '    }')
-        vt.addline( '    set lasttoken $token')
-        vt.addline(r'}')
-
-        vt.addline(f'vmdcon -info "[llength $delsegres] segment-residues marked for deletion"')
-
-        vt.addline(r'foreach badtoken $delsegres {')
-        # vt.addline( '    puts "Deleting segment-residue $badtoken"')
-        # split token into segname and resid
-        vt.addline(f'    set tokens [split $badtoken "-"]')
-        vt.addline( '    set badsegname [lindex $tokens 0]')
-        vt.addline( '    set badresid [lindex $tokens 1]')
-        vt.addline( '    delatom $badsegname $badresid')
-        vt.addline(r'}')
-        vt.addline(f'vmdcon -info "Writing {psf_outfile}"')
-        vt.addline(f'writepsf {psf_outfile}')
         vt.writescript()
         self.result = vt.runscript(progress_title='psfidx')
-        
+        if self.result == 0:
+            self.write_kept_psf(psf, idx_outfile, psf_outfile, keepatselstr)
+
+    def write_kept_psf(self, psf: str, idx_outfile: str, psf_outfile: str, keepatselstr: str = ''):
+        """
+        Write ``psf_outfile``, the atoms of ``psf`` whose 0-based indices VMD listed in
+        ``idx_outfile``, with every bonded term and remark among them (see
+        :meth:`~pestifer.psfutil.psfarrays.PSFArrays.subset`).  Raises :class:`PestiferError`
+        if the index file is missing or the keep selection ``keepatselstr`` matched no atoms.
+        """
+        if not os.path.isfile(idx_outfile):
+            raise PestiferError(f"desolvate: no index file '{idx_outfile}'. {_VMD_NO_OUTPUT}. "
+                                f"See '{self.basename}.log'.")
+        with open(idx_outfile) as f:
+            keep = np.array(f.read().split(), dtype=np.int64)
+        if len(keep) == 0:
+            raise PestiferError(f"desolvate: the keep selection '{keepatselstr}' matched no atoms "
+                                f"of {psf}; nothing to write to '{psf_outfile}'")
+        dry = PSFArrays.from_files(psf).subset(keep)
+        dry.write_psf(psf_outfile)
+        logger.info(f'Wrote {psf_outfile} ({len(dry)} atoms)')
+
     def do_dcd_prune(self):
         """
         Prune a DCD file based on the generated index file.
@@ -30,6 +30,13 @@ class FetchTask(BaseTask):
         # provides raw source coordinates (for psfgen); does not build a system
         return TaskContract(requires=(), provides=(SOURCE,))
 
+    def cache_inputs(self):
+        # a local source is read from the build directory; a database source is named by its ID
+        if self.specs.get('source', 'rcsb') == 'local':
+            sourceID = self.specs.get('sourceID', '')
+            return [f'{sourceID}.pdb', f'{sourceID}.cif']
+        return []
+
     def do(self):
         """ Execute the fetch task. """
         source: str = self.specs.get('source', 'rcsb')
@@ -72,8 +72,12 @@ class LigateTask(MDTask):
             logger.debug('Steering loop C-termini toward their partner N-termini')
             self.result = self.do_steered_md(self.specs['steer'])
         else:
+            from ..psfutil.loop_ccd import forget_environments
             logger.debug('Closing loops onto their downstream anchors by cyclic coordinate descent')
-            self.result = self.close_loops_ccd(self.specs.get('ccd', {}))
+            try:
+                self.result = self.close_loops_ccd(self.specs.get('ccd', {}))
+            finally:
+                forget_environments()    # the structure and its KD-tree are not queried again
         if self.result != 0:
             return self.result
         logger.debug('Connecting loop C-termini to their partner N-termini')
@@ -108,9 +112,10 @@ class LigateTask(MDTask):
         import multiprocessing as mp
         from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
         from scipy.spatial.distance import cdist
-        from ..psfutil.loop_ccd import loop_atoms_from_pdb, close_one_loop
+        from ..psfutil.loop_ccd import close_one_loop, loop_atoms_from_atoms, pdb_atoms
         from ..util.coord import pdb_replace_coords
         from ..util.progress import PestiferProgress
+        from ..util.shared_array import SharedArray
 
         self.next_basename('ccd')
         state: StateArtifacts = self.get_current_artifact('state')
@@ -128,21 +133,23 @@ class LigateTask(MDTask):
         guard = bool(ccd_specs.get('guard', False))
         on_clash = str(ccd_specs.get('on_clash', 'warn')).casefold()
 
+        # The structure is parsed once, here; workers read it from shared memory (see below).
+        atoms = pdb_atoms(src_pdb)
         # Serials of EVERY modeled loop copy: while unclosed they hold throwaway guesscoord
         # positions, so all are excluded from every loop's closure environment.
         all_loop_serials = set()
         for gap in gaps:
-            _o, _c, gser = loop_atoms_from_pdb(src_pdb, gap['loop_resids'], segname=gap['segname'])
+            _o, _c, gser = loop_atoms_from_atoms(atoms, gap['loop_resids'], segname=gap['segname'])
             all_loop_serials.update(gser)
         all_loop_serials = sorted(all_loop_serials)
 
-        def _args(i, extra_env=None):
+        def _args(i, extra_env=None, atoms=atoms):
             g = gaps[i]
             return dict(src_pdb=src_pdb, segname=g['segname'], loop_resids=g['loop_resids'],
                         n_anchor_resid=g['n_anchor_resid'], c_anchor_resid=g['c_anchor_resid'],
                         all_loop_serials=all_loop_serials, seed=seed + i, ensemble=ensemble,
                         refine=refine_iters, guard=guard, max_iters=max_iters, tol=tol,
-                        extra_env=extra_env)
+                        extra_env=extra_env, atoms=atoms)
 
         # Loops that do not interfere can be closed at once (steering closes all loops
         # simultaneously too). Close every loop CONCURRENTLY against the resolved structure only;
@@ -185,10 +192,12 @@ class LigateTask(MDTask):
                 if bar:
                     bar.go()
         else:
-            with mp.Manager() as mgr:
+            # Workers attach to one shared copy of the parsed structure instead of each re-reading
+            # src_pdb, and each builds the environment KD-tree once for all the loops it closes.
+            with mp.Manager() as mgr, SharedArray(atoms) as shared:
                 q = mgr.Queue()
                 with ProcessPoolExecutor(max_workers=nworkers) as ex:
-                    futs = {ex.submit(close_one_loop, progress_queue=q, **_args(i)): i
+                    futs = {ex.submit(close_one_loop, progress_queue=q, **_args(i, atoms=shared)): i
                             for i in range(n)}
                     pending = set(futs)
                     while pending:
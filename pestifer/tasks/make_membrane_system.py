@@ -20,7 +20,9 @@ from ..core.errors import PestiferBuildError
 
 from ..molecule.bilayer import Bilayer, BilayerSpecString, specstrings_builddict
 
+from ..psfutil.embed import embed_prefill
 from ..psfutil.psfcontents import get_toppar_from_psf
+from ..psfutil.quilt import quilt_patch
 
 from ..scripters import PsfgenScripter, VMDScripter
 
@@ -290,6 +292,8 @@ class MakeMembraneSystemTask(BaseTask):
             else:
                 self.build_patch()
                 self.build_grid_membrane_asymmetric()
+        elif self._npatch() != [1, 1]:
+            self.quilt_prebuilt()
         if self.embedding:
             self.embed_protein()
         else:
@@ -380,20 +384,82 @@ class MakeMembraneSystemTask(BaseTask):
         half_mid_zgap = self._grid_half_mid_zgap(half_mid_zgap)
         patch_protocol = relaxation_protocol or []
         # we now build the patch, or if asymmetric, two patches
-        for patch, specbyte in zip([self.patch, self.patchA, self.patchB], ['', 'A', 'B']):
-            if patch is None:
-                continue
+        patches = [(patch, f'patch{specbyte}') for patch, specbyte in
+                   zip([self.patch, self.patchA, self.patchB], ['', 'A', 'B']) if patch is not None]
+        shares = self._patch_cpu_shares(len(patches))
+        for patch, patch_name in patches:
             patch.spec_out(SAPL=SAPL, xy_aspect_ratio=xy_aspect_ratio,
                             rotation_pm=rotation_pm, solution_gcc=solution_gcc,
                             half_mid_zgap=half_mid_zgap)
-            self.grid_patch(patch, patch_name=f'patch{specbyte}', seed=seed,
+            self.grid_patch(patch, patch_name=patch_name, seed=seed,
                             half_mid_zgap=half_mid_zgap)
-            self.do_psfgen(patch, bilayer_name=f'patch{specbyte}')
+            self.do_psfgen(patch, bilayer_name=patch_name)
+            if shares:
+                continue    # all patches are equilibrated together below
             # deepcopy per patch: equilibrate_bilayer/the MD task mutate the stage dicts in place
             # (e.g. inject ensemble=NPgT during a membrane_equilibrate stage's do()), so a shared
             # protocol would leak patchA's mutations into patchB and fail patchB's schema re-validation.
-            self.equilibrate_bilayer(patch, bilayer_name=f'patch{specbyte}',
+            self.equilibrate_bilayer(patch, bilayer_name=patch_name,
                                      relaxation_protocol=copy.deepcopy(patch_protocol))
+        if shares:
+            self.equilibrate_patches(patches, patch_protocol, shares)
+
+    def _patch_cpu_shares(self, npatches: int) -> list[int] | None:
+        """CPUs for each of ``npatches`` calibration patches equilibrated side by side, or None if
+        they should be equilibrated one after the other.
+
+        A calibration patch is small, and NAMD on all of a many-core node scales poorly on it, so
+        the two patches of an asymmetric build each get half the CPUs (NAMD ``+p``) and run at the
+        same time.  That requires a CPU build launched on one node, where ``+p`` sets the PE count;
+        a GPU build, or an MPI/charmrun launch that takes its PEs from the SLURM allocation, runs
+        the patches in turn."""
+        if npatches < 2 or self.provisions.get('processor-type') != 'cpu' or self.subcontroller is None:
+            return None
+        config = self.subcontroller.config
+        ncpus = getattr(config, 'ncpus', 0) or 0
+        if ncpus < npatches:
+            return None
+        if getattr(config, 'slurmvars', None):
+            launcher = config['user']['namd'].get('cpu-parallel-launcher', 'auto')
+            if launcher == 'auto':
+                launcher = 'srun' if int(config.slurmvars.get('SLURM_NNODES', 1)) > 1 else 'numactl'
+            if launcher != 'numactl':
+                return None
+        return [ncpus // npatches + (1 if i < ncpus % npatches else 0) for i in range(npatches)]
+
+    def equilibrate_patches(self, patches: list[tuple[Bilayer, str]], relaxation_protocol: list[dict],
+                            shares: list[int]):
+        """
+        Equilibrate several gridded calibration patches at the same time, each in a subcontroller
+        of its own limited to its share of the CPUs.  Output files of the two patches cannot
+        collide, since every file a relaxation writes is named for its patch.  Each patch's results
+        are merged back in patch order once all have finished, as :meth:`equilibrate_bilayer` would
+        have merged them.
+
+        Parameters
+        ----------
+        patches : list of (Bilayer, str)
+            Each patch and its name (``patchA``, ``patchB``).
+        relaxation_protocol : list
+            Relaxation stages; each patch gets its own copy.
+        shares : list of int
+            CPUs for each patch.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        jobs = []
+        for (patch, patch_name), ncpus in zip(patches, shares):
+            self.next_basename(f'equilibration-{patch_name}')
+            subcontroller = self.subcontroller.spawn_subcontroller(self.subcontroller.parent, ncpus=ncpus)
+            jobs.append((patch, patch_name, self.basename, subcontroller))
+        logger.info(f'Equilibrating {len(jobs)} calibration patches side by side '
+                    f'({" + ".join(str(n) for n in shares)} CPUs)')
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='pestifer-patch') as pool:
+            futures = [pool.submit(self._run_bilayer_equilibration, patch, patch_name, basename,
+                                   copy.deepcopy(relaxation_protocol), subcontroller)
+                       for patch, patch_name, basename, subcontroller in jobs]
+            last_tasks = [future.result() for future in futures]
+        for (patch, patch_name, _, subcontroller), last_task in zip(jobs, last_tasks):
+            self._merge_bilayer_equilibration(patch, patch_name, subcontroller, last_task)
 
     def _guard_pierced_lipids(self, protocol):
         """Insert a lipid ``ring_check`` (and a follow-up minimize) before the first dynamics
@@ -506,6 +572,26 @@ class MakeMembraneSystemTask(BaseTask):
             npatch = [1, 1]
         return npatch
 
+    def quilt_prebuilt(self):
+        """Tile the prebuilt bilayer ``npatch`` times in x and y, in Python
+        (:mod:`pestifer.psfutil.quilt`): the patch's coordinates are translated by whole box
+        vectors and the quilt's PSF is written straight from the patch's topology, with no
+        psfgen run per replica.  The quilt replaces the prebuilt bilayer as ``quilt_state``."""
+        npatch = self._npatch()
+        self.next_basename('quilt')
+        quilt_state: StateArtifacts = self.get_current_artifact('quilt_state')
+        logger.info(f'Quilting prebuilt bilayer {quilt_state.psf.name} {npatch[0]} x {npatch[1]}')
+        q = quilt_patch(quilt_state.psf.name, quilt_state.pdb.name, self.quilt.box, npatch,
+                        self.basename, origin=self.quilt.origin)
+        self.quilt.box, self.quilt.origin = q.box, q.origin
+        self.quilt.area = self.quilt.box[0][0] * self.quilt.box[1][1]
+        cell_to_xsc(self.quilt.box, self.quilt.origin, f'{self.basename}.xsc')
+        self.register(dict(
+                        psf=PSFFileArtifact(self.basename, pytestable=True),
+                        pdb=PDBFileArtifact(self.basename, pytestable=True),
+                        xsc=NAMDXscFileArtifact(self.basename)),
+                        key='quilt_state', artifact_type=StateArtifacts)
+
     def build_grid_membrane(self):
         """Build a symmetric full-size membrane directly by grid placement, bypassing the
         patch -> quilt tiling.  When embedding a protein the box is sized to the protein
@@ -807,11 +893,19 @@ class MakeMembraneSystemTask(BaseTask):
             If not provided, a hard-coded relaxation protocol will be used. 
         """
         self.next_basename(f'equilibration-{bilayer_name}')
+        last_task = self._run_bilayer_equilibration(bilayer, bilayer_name, self.basename,
+                                                    relaxation_protocol, self.subcontroller)
+        self._merge_bilayer_equilibration(bilayer, bilayer_name, self.subcontroller, last_task)
+
+    def _run_bilayer_equilibration(self, bilayer: Bilayer, bilayer_name: str, basename: str,
+                                   relaxation_protocol: list[dict], subcontroller):
+        """Run ``bilayer``'s relaxation in ``subcontroller`` and return its last task.  Touches no
+        attribute of this task, so several may run at once (see :meth:`equilibrate_patches`)."""
         # user_dict=deepcopy(self.config['user'])
         state: StateArtifacts = self.get_current_artifact(f'{bilayer_name}_state')
         logger.debug(f'Bilayer area before equilibration: {bilayer.area:.3f} {sA2_}')
         if not relaxation_protocol:
-            logger.debug(f'Using hard-coded relaxation protocol for {self.basename}!!')
+            logger.debug(f'Using hard-coded relaxation protocol for {basename}!!')
             relaxation_protocol=[
                 {'md': dict(ensemble='minimize', minimize=1000)},
                 {'md': dict(ensemble='NVT', nsteps=1000)},
@@ -885,11 +979,10 @@ class MakeMembraneSystemTask(BaseTask):
             anion=bs.get('anion', 'CLA'), solvent=bs.get('solvents', 'TIP3'))})
         tasklist_user.extend(guarded_protocol)
         tasklist_user.extend([
-            {'mdplot': dict(timeseries=timeseries, profiles=profiles, legend=True, grid=True, basename=self.basename)},
-            # {'terminate': dict(basename=self.basename, cleanup=False, chainmapfile=f'{self.basename}-chainmap.yaml', statefile=f'{self.basename}-state.yaml')}
+            {'mdplot': dict(timeseries=timeseries, profiles=profiles, legend=True, grid=True, basename=basename)},
+            # {'terminate': dict(basename=basename, cleanup=False, chainmapfile=f'{basename}-chainmap.yaml', statefile=f'{basename}-state.yaml')}
         ])
-        subcontroller = self.subcontroller
-        subcontroller.config['user']['title'] = f'Bilayer equilibration from {self.basename}'
+        subcontroller.config['user']['title'] = f'Bilayer equilibration from {basename}'
         subcontroller.reconfigure_tasks(tasklist_user)
         for task in subcontroller.tasks:
             save_task_name = task.taskname
@@ -905,11 +998,16 @@ class MakeMembraneSystemTask(BaseTask):
         assert bilayer_state.vel.exists()
         assert bilayer_state.xsc.exists()
         assert bilayer_state.coor.exists()
-        self.subcontroller.pipeline.rekey('state', f'{bilayer_name}_state')
+        return last_task
+
+    def _merge_bilayer_equilibration(self, bilayer: Bilayer, bilayer_name: str, subcontroller, last_task):
+        """Take the relaxed ``bilayer``'s state and area back from ``subcontroller``."""
+        bilayer_state: StateArtifacts = last_task.get_current_artifact('state')
+        subcontroller.pipeline.rekey('state', f'{bilayer_name}_state')
         self.import_artifacts(subcontroller.pipeline)
         bilayer.box, bilayer.origin = cell_from_xsc(bilayer_state.xsc.name)
         bilayer.area = bilayer.box[0][0] * bilayer.box[1][1]
-        logger.debug(f'{self.basename} area after equilibration: {bilayer.area:.3f} {sA2_}')
+        logger.debug(f'{bilayer_name} area after equilibration: {bilayer.area:.3f} {sA2_}')
         # flag (and record on the bilayer) whether its area actually equilibrated, so an
         # asymmetric build can tell whether the preferred APLs it calibrates are trustworthy.
         # A plateau-gated membrane_equilibrate is the authoritative "the lateral area has flattened"
@@ -982,6 +1080,20 @@ class MakeMembraneSystemTask(BaseTask):
             z_ref_group = self.embed_specs.get('z_ref_group', {}).get('text', None)
             z_value = self.embed_specs.get('z_ref_group', {}).get('z_value', 0.0)
         self.next_basename('embed')
+        quilt_state: StateArtifacts = self.get_current_artifact('quilt_state')
+        protein_state: StateArtifacts = self.get_current_artifact('state')
+        prefilled = 0
+        margin = float(self.embed_specs.get('margin', 2.4))
+        if self.embed_specs.get('backend', 'vmd') == 'python':
+            if z_ref_group:
+                logger.info('the python embed backend cannot evaluate the z_ref_group atomselection; '
+                            'embedding with VMD')
+            else:
+                embed_prefill(self.basename, protein_state.psf.name, protein_state.pdb.name,
+                              quilt_state.psf.name, quilt_state.pdb.name,
+                              protein_mid_z=float(zvals.mean()), z_value=z_value,
+                              margin=margin)
+                prefilled = 1
         pg: PsfgenScripter = self.scripters['psfgen']
         pg.newscript(self.basename, additional_topologies=self.quilt.addl_streamfiles)
         pg.usescript('bilayer_embed')
@@ -992,13 +1104,12 @@ class MakeMembraneSystemTask(BaseTask):
         # psfgen context.
         pg.writescript(self.basename, guesscoord=False, regenerate=False, force_exit=True, writepsf=False, writepdb=False)
         self.register(self.basename, key='tcl', artifact_type=PsfgenInputScriptArtifact)
-        quilt_state: StateArtifacts = self.get_current_artifact('quilt_state')
         bilayer_psf: str = quilt_state.psf.name
         bilayer_pdb: str = quilt_state.pdb.name
         bilayer_xsc: str = quilt_state.xsc.name
-        protein_state: StateArtifacts = self.get_current_artifact('state')
         protein_psf: str = protein_state.psf.name
-        protein_pdb: str = protein_state.pdb.name
+        # with the python backend the protein is already placed, in <basename>_embedded.pdb
+        protein_pdb: str = f'{self.basename}_embedded.pdb' if prefilled else protein_state.pdb.name
         logger.debug(f'Embedding {protein_pdb} with z_ref_group {z_ref_group} at z={z_value:.3f} into bilayer {bilayer_pdb}')
         result = pg.runscript(psf=protein_psf,
                               pdb=protein_pdb,
@@ -1009,6 +1120,8 @@ class MakeMembraneSystemTask(BaseTask):
                               z_lo_dum=zvals[0],
                               z_hi_dum=zvals[1],
                               z_value=z_value,
+                              margin=margin,
+                              prefilled=prefilled,
                               o=self.basename)
         if result != 0:
             raise PestiferBuildError(f'psfgen failed with result {result} for {self.basename}')
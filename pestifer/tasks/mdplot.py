@@ -14,6 +14,7 @@ Usage as a task in a build workflow is described in the :ref:`config_ref tasks m
 import logging
 import os
 import re
+import threading
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -119,12 +120,18 @@ class MDPlotTask(BaseTask):
     YAML header for the MDPlotTask, used to identify the task in configuration files as part of a ``tasks`` list.
     """
 
+    _pyplot_lock = threading.Lock()
+
     @classmethod
     def pipeline_contract(cls, specs):
         from .pipeline_contract import TaskContract, MD_OUTPUT
         # plots molecular-dynamics output; needs an md task to have run
         return TaskContract(requires=(MD_OUTPUT,), provides=())
 
+    def resource_demand(self, ncpus, ngpus):
+        # reads logs and draws plots on one core
+        return 1, 0
+
 
 
 
@@ -701,6 +708,12 @@ class MDPlotTask(BaseTask):
         return super().build_stamp()
 
     def do(self):
+        # pyplot draws on one process-wide current figure, so mdplot tasks running at the same
+        # time (in subcontrollers run side by side) take turns
+        with MDPlotTask._pyplot_lock:
+            return self._plot()
+
+    def _plot(self):
         self.next_basename()
         my_logger(self.specs, logger.debug)
         output_dir = self.specs.get('output_dir', 'mdplots')
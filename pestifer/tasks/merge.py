@@ -14,6 +14,11 @@ The task uses a two-step VMD/psfgen approach executed in a single script:
    files are merged by loading them sequentially into psfgen, which handles
    serial-number renumbering and topology-table reconstruction automatically.
 
+With ``backend: python`` both steps run in numpy instead
+(:class:`~pestifer.psfutil.psfarrays.PSFArrays`): each system is renamed in memory
+and the systems are concatenated with their bonded terms renumbered, so no VMD or
+psfgen process is launched and no temporary files are written.
+
 Segment-name collisions are resolved according to ``collision_strategy``:
 
 * ``'enumerate'`` *(default)*: rename the conflicting segment to a fresh
@@ -37,6 +42,7 @@ import os
 from .psfgen import PsfgenTask
 from ..core.artifacts import *
 from ..core.errors import PestiferBuildError
+from ..psfutil.psfarrays import PSFArrays
 from ..psfutil.psfcontents import PSFContents
 
 logger = logging.getLogger(__name__)
@@ -62,6 +68,8 @@ class MergeTask(PsfgenTask):
         system's PSF segment names (``{old_segname: new_segname}``).
         An optional ``chainID_map`` dict renames PDB chain IDs for that
         system (``{old_chainID: new_chainID}``).
+    backend : str, optional
+        ``'vmd'`` *(default)* or ``'python'`` (see the module docstring).
     collision_strategy : str, optional
         ``'enumerate'`` *(default)* or ``'error'``.  Under ``'enumerate'`` a colliding segment
         is renamed to a fresh single-character segid whose leading character is unused, so its
@@ -154,81 +162,88 @@ class MergeTask(PsfgenTask):
                     f'skipping it (the merged structure is read from the input PSFs).')
         all_streamfiles = available_streamfiles
 
-        # Build a single VMD/psfgen script that (a) renames segments where
-        # needed, then (b) merges all systems via readpsf.
-        pg = self.get_scripter('psfgen')
-        pg.newscript(self.basename, additional_topologies=all_streamfiles)
-
-        # Step A: rename segments in each system that requires it.
-        tmp_psfs = []
-        tmp_pdbs = []
-        for i, sys in enumerate(resolved):
-            rename_map = sys['effective_segname_map']
-            chain_map = sys.get('chainID_map', {})
-            if rename_map or chain_map:
-                tmp_psf = f'_merge_tmp_{i}.psf'
-                tmp_pdb = f'_merge_tmp_{i}.pdb'
-                pg.comment(f'Rename segments/chains in system {i}: segnames={rename_map} chains={chain_map}')
-                pg.addline(f'mol load psf {sys["psf"]} pdb {sys["pdb"]}')
-                for old_name, new_name in rename_map.items():
-                    pg.addline(f'set _ms [atomselect top "segname {old_name}"]')
-                    pg.addline(f'$_ms set segname {new_name}')
-                    # new_name is a single character, so it is also a valid chainID; set it here
-                    # so the merged PDB carries the distinct chain immediately (readpsf/coordpdb
-                    # preserves input chains, so without this the renamed segment would keep its
-                    # old chain until a later PSF round-trip re-derives it from the segid).
-                    pg.addline(f'$_ms set chain {new_name}')
-                    pg.addline(f'$_ms delete')
-                for old_chain, new_chain in chain_map.items():
-                    pg.addline(f'set _mc [atomselect top "chain {old_chain}"]')
-                    pg.addline(f'$_mc set chain {new_chain}')
-                    pg.addline(f'$_mc delete')
-                pg.addline(f'set _ma [atomselect top all]')
-                pg.addline(f'$_ma writepsf {tmp_psf}')
-                pg.addline(f'$_ma writepdb {tmp_pdb}')
-                pg.addline(f'$_ma delete')
-                pg.addline(f'mol delete top')
-                sys['_use_psf'] = tmp_psf
-                sys['_use_pdb'] = tmp_pdb
-                tmp_psfs.append(tmp_psf)
-                tmp_pdbs.append(tmp_pdb)
-            else:
-                sys['_use_psf'] = sys['psf']
-                sys['_use_pdb'] = sys['pdb']
-
-        # Step B: merge with psfgen readpsf (no coord guessing or regen needed
-        # because all topology comes directly from the input PSF files).
-        pg.comment('Merge all systems via psfgen readpsf')
-        for sys in resolved:
-            pg.load_project(sys['_use_psf'], sys['_use_pdb'])
-
-        pg.writescript(self.basename, guesscoord=False, regenerate=False)
-        self.result = pg.runscript(keep_tempfiles=False)
-        if self.result != 0:
-            return self.result
-
-        # psfgen's readpsf carries remarks from input PSFs, but only for
-        # unmodified segment names.  Inject any missing renamed patch remarks
-        # directly into the merged PSF now that it has been written.
-        expected_remarks: list[str] = []
-        seen_remarks: set[str] = set()
-        for sys in resolved:
-            rename_map = sys['effective_segname_map']
-            for remark in self._patch_remarks_from_psf(sys['psf']):
-                if rename_map:
-                    remark = self._rename_patch_remark(remark, rename_map)
-                if remark not in seen_remarks:
-                    expected_remarks.append(remark)
-                    seen_remarks.add(remark)
-        if expected_remarks:
-            self._inject_patch_remarks(f'{self.basename}.psf', expected_remarks)
-
-        # readpsf carries the input PSFs' topology remarks verbatim, including any
-        # unavailable stream file we dropped above; strip those so the merged PSF does not
-        # advertise a topology file pestifer cannot open (which would re-trigger the same
-        # failure in a downstream task that reads this PSF).
-        if dropped_streamfiles:
-            self._strip_topology_remarks(f'{self.basename}.psf', dropped_streamfiles)
+        backend: str = self.specs.get('backend', 'vmd')
+        tmp_psfs: list[str] = []
+        tmp_pdbs: list[str] = []
+        if backend == 'python':
+            merged = self._write_merged(resolved, dropped_streamfiles)
+            topologies = [os.path.basename(r.split()[-1]) for r in merged.remarks if r.startswith('topology ')]
+            self.result = 0
+        else:
+            # Build a single VMD/psfgen script that (a) renames segments where
+            # needed, then (b) merges all systems via readpsf.
+            pg = self.get_scripter('psfgen')
+            pg.newscript(self.basename, additional_topologies=all_streamfiles)
+
+            # Step A: rename segments in each system that requires it.
+            for i, sys in enumerate(resolved):
+                rename_map = sys['effective_segname_map']
+                chain_map = sys.get('chainID_map', {})
+                if rename_map or chain_map:
+                    tmp_psf = f'_merge_tmp_{i}.psf'
+                    tmp_pdb = f'_merge_tmp_{i}.pdb'
+                    pg.comment(f'Rename segments/chains in system {i}: segnames={rename_map} chains={chain_map}')
+                    pg.addline(f'mol load psf {sys["psf"]} pdb {sys["pdb"]}')
+                    for old_name, new_name in rename_map.items():
+                        pg.addline(f'set _ms [atomselect top "segname {old_name}"]')
+                        pg.addline(f'$_ms set segname {new_name}')
+                        # new_name is a single character, so it is also a valid chainID; set it here
+                        # so the merged PDB carries the distinct chain immediately (readpsf/coordpdb
+                        # preserves input chains, so without this the renamed segment would keep its
+                        # old chain until a later PSF round-trip re-derives it from the segid).
+                        pg.addline(f'$_ms set chain {new_name}')
+                        pg.addline(f'$_ms delete')
+                    for old_chain, new_chain in chain_map.items():
+                        pg.addline(f'set _mc [atomselect top "chain {old_chain}"]')
+                        pg.addline(f'$_mc set chain {new_chain}')
+                        pg.addline(f'$_mc delete')
+                    pg.addline(f'set _ma [atomselect top all]')
+                    pg.addline(f'$_ma writepsf {tmp_psf}')
+                    pg.addline(f'$_ma writepdb {tmp_pdb}')
+                    pg.addline(f'$_ma delete')
+                    pg.addline(f'mol delete top')
+                    sys['_use_psf'] = tmp_psf
+                    sys['_use_pdb'] = tmp_pdb
+                    tmp_psfs.append(tmp_psf)
+                    tmp_pdbs.append(tmp_pdb)
+                else:
+                    sys['_use_psf'] = sys['psf']
+                    sys['_use_pdb'] = sys['pdb']
+
+            # Step B: merge with psfgen readpsf (no coord guessing or regen needed
+            # because all topology comes directly from the input PSF files).
+            pg.comment('Merge all systems via psfgen readpsf')
+            for sys in resolved:
+                pg.load_project(sys['_use_psf'], sys['_use_pdb'])
+
+            pg.writescript(self.basename, guesscoord=False, regenerate=False)
+            self.result = pg.runscript(keep_tempfiles=False)
+            if self.result != 0:
+                return self.result
+            topologies = pg.topologies
+
+            # psfgen's readpsf carries remarks from input PSFs, but only for
+            # unmodified segment names.  Inject any missing renamed patch remarks
+            # directly into the merged PSF now that it has been written.
+            expected_remarks: list[str] = []
+            seen_remarks: set[str] = set()
+            for sys in resolved:
+                rename_map = sys['effective_segname_map']
+                for remark in self._patch_remarks_from_psf(sys['psf']):
+                    if rename_map:
+                        remark = self._rename_patch_remark(remark, rename_map)
+                    if remark not in seen_remarks:
+                        expected_remarks.append(remark)
+                        seen_remarks.add(remark)
+            if expected_remarks:
+                self._inject_patch_remarks(f'{self.basename}.psf', expected_remarks)
+
+            # readpsf carries the input PSFs' topology remarks verbatim, including any
+            # unavailable stream file we dropped above; strip those so the merged PSF does not
+            # advertise a topology file pestifer cannot open (which would re-trigger the same
+            # failure in a downstream task that reads this PSF).
+            if dropped_streamfiles:
+                self._strip_topology_remarks(f'{self.basename}.psf', dropped_streamfiles)
 
         # Register temporary segment-rename intermediates (written by VMD in Step A).
         if tmp_psfs:
@@ -237,8 +252,9 @@ class MergeTask(PsfgenTask):
             self.register([PDBFileArtifact(p) for p in tmp_pdbs], key='merge_tmp_pdbs', artifact_type=PDBFileArtifactList)
 
         # Register pipeline artifacts.
-        self.register(self.basename, key='tcl', artifact_type=PsfgenInputScriptArtifact)
-        self.register(self.basename, key='log', artifact_type=PsfgenLogFileArtifact)
+        if backend != 'python':
+            self.register(self.basename, key='tcl', artifact_type=PsfgenInputScriptArtifact)
+            self.register(self.basename, key='log', artifact_type=PsfgenLogFileArtifact)
         self.register(
             dict(
                 pdb=PDBFileArtifact(self.basename, pytestable=True),
@@ -248,7 +264,7 @@ class MergeTask(PsfgenTask):
             artifact_type=StateArtifacts,
         )
         self.register(
-            [CharmmffTopFileArtifact(x) for x in pg.topologies if x.endswith('.rtf')],
+            [CharmmffTopFileArtifact(x) for x in topologies if x.endswith('.rtf')],
             key='charmmff_topfiles',
             artifact_type=CharmmffTopFileArtifacts,
         )
@@ -271,6 +287,21 @@ class MergeTask(PsfgenTask):
 
         return self.result
 
+    def _write_merged(self, resolved: list[dict], dropped_streamfiles: list[str]) -> PSFArrays:
+        """Write ``<basename>.psf``/``.pdb`` without psfgen: each system renamed by its
+        effective segment map and ``chainID_map``, then all of them laid end to end (see
+        :class:`~pestifer.psfutil.psfarrays.PSFArrays`).  Patch and segment remarks are renamed
+        with the segments; topology remarks naming a dropped stream file are left out."""
+        parts = [PSFArrays.from_files(sys['psf'], sys['pdb']).renamed(sys['effective_segname_map'],
+                                                                      sys.get('chainID_map', {}))
+                 for sys in resolved]
+        merged = PSFArrays.concatenate(parts)
+        dropped = set(dropped_streamfiles)
+        merged.remarks = [r for r in merged.remarks
+                          if not (r.startswith('topology ') and os.path.basename(r.split()[-1]) in dropped)]
+        merged.write(self.basename)
+        return merged
+
     # ------------------------------------------------------------------
     # Collision resolution
     # ------------------------------------------------------------------
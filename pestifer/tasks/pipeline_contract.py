@@ -86,6 +86,76 @@ _HINT = {
 }
 
 
+def _contract(task, available):
+    """``task``'s contract given the currencies ``available`` ahead of it.
+
+    Most contracts depend only on the task's own specs, but a pipeline-aware contract may also
+    need to know what currencies precede it (e.g. psfgen preserves an incoming STATE vs. builds
+    from a fetched SOURCE).  Pass `available` only to contracts that declare the parameter, so
+    the common `pipeline_contract(cls, specs)` signature is untouched.
+    """
+    import inspect
+    try:
+        _accepts_available = 'available' in inspect.signature(task.pipeline_contract).parameters
+    except (TypeError, ValueError):
+        _accepts_available = False
+    if _accepts_available:
+        return task.pipeline_contract(task.specs, available=frozenset(available))
+    return task.pipeline_contract(task.specs)
+
+
+def resolve_contracts(tasks):
+    """The contract of each task in ``tasks``, in order, each resolved against the currencies
+    the tasks before it provide."""
+    available = set()
+    contracts = []
+    for task in tasks:
+        contract = _contract(task, available)
+        contracts.append(contract)
+        if not contract.standalone:
+            available |= contract.provides
+    return contracts
+
+
+def task_dependencies(tasks):
+    """The earlier tasks each task must wait for, derived from the contracts.
+
+    Currencies are treated as shared variables, with the list order as the reference serial
+    order.  A task waits for the last earlier task that provides a currency it requires
+    (read-after-write).  A task that provides a currency waits for that currency's last earlier
+    provider (write-after-write) and for every earlier task that requires it from that provider
+    (write-after-read), so a reader never sees a later task's result.  A terminal task waits for
+    everything before it.  Two tasks with no such relation can run in either order, or together,
+    with the same result.
+
+    Returns
+    -------
+    dict
+        ``{task.index: set of earlier task indices}``
+    """
+    deps = {}
+    last_provider = {}
+    readers = {}
+    seen = []
+    for task, contract in zip(tasks, resolve_contracts(tasks)):
+        wait = set(seen) if contract.terminal else set()
+        for currency in contract.requires:
+            if currency in last_provider:
+                wait.add(last_provider[currency])
+        for currency in contract.provides:
+            if currency in last_provider:
+                wait.add(last_provider[currency])
+            wait |= readers.get(currency, set())
+        deps[task.index] = wait
+        for currency in contract.requires:
+            readers.setdefault(currency, set()).add(task.index)
+        for currency in contract.provides:
+            last_provider[currency] = task.index
+            readers[currency] = set()
+        seen.append(task.index)
+    return deps
+
+
 def validate_pipeline(tasks):
     """Statically check a task list for malformed hand-offs before execution.
 
@@ -94,23 +164,11 @@ def validate_pipeline(tasks):
     ``tasks`` is any sequence of objects exposing ``index``, ``taskname``,
     ``specs``, and ``pipeline_contract(specs)``.
     """
-    import inspect
     available = set()
     errors, warnings = [], []
     terminal_task = None
     for task in tasks:
-        # Most contracts depend only on the task's own specs, but a pipeline-aware contract may also
-        # need to know what currencies precede it (e.g. psfgen preserves an incoming STATE vs. builds
-        # from a fetched SOURCE).  Pass `available` only to contracts that declare the parameter, so
-        # the common `pipeline_contract(cls, specs)` signature is untouched.
-        try:
-            _accepts_available = 'available' in inspect.signature(task.pipeline_contract).parameters
-        except (TypeError, ValueError):
-            _accepts_available = False
-        if _accepts_available:
-            contract = task.pipeline_contract(task.specs, available=frozenset(available))
-        else:
-            contract = task.pipeline_contract(task.specs)
+        contract = _contract(task, available)
         label = f"task {task.index:02d} '{task.taskname}'"
         if contract.standalone:
             errors.append(f"{label} is a standalone utility that operates on explicit file inputs "
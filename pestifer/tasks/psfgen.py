@@ -517,13 +517,15 @@ class PsfgenTask(VMDTask):
         if not tails:
             return
         import numpy as np
-        from ..psfutil.tail_model import model_one_tail
-        from ..psfutil.loop_ccd import loop_atoms_from_pdb
+        from ..psfutil.declash import dependency_waves
+        from ..psfutil.tail_model import model_one_tail, tail_reach
+        from ..psfutil.loop_ccd import loop_atoms_from_atoms, pdb_atoms
         from ..util.coord import pdb_replace_coords
         self.next_basename('model-tails')
         state: StateArtifacts = self.get_current_artifact('state')
         src_pdb = state.pdb.name
         ensemble = int(specs.get('tail_ensemble', 10))
+        atoms = pdb_atoms(src_pdb)
         # Every model-built residue (interior loops + all tails) holds throwaway guesscoord
         # coords at this point, so exclude all of them from every tail's clash environment --
         # only the resolved structure is a real steric backdrop.
@@ -531,19 +533,43 @@ class PsfgenTask(VMDTask):
         modeled_specs += [(t['segname'], t['tail_resids']) for t in tails]
         all_modeled_serials = set()
         for segname, resids in modeled_specs:
-            _o, _c, ser = loop_atoms_from_pdb(src_pdb, resids, segname=segname)
+            _o, _c, ser = loop_atoms_from_atoms(atoms, resids, segname=segname)
             all_modeled_serials.update(ser)
         all_modeled_serials = sorted(all_modeled_serials)
+        # Each tail avoids the tails modeled before it that it can reach (converging tails then
+        # declash against one another); tails out of one another's reach are modeled in parallel.
+        n = len(tails)
+        reach = [tail_reach(atoms, t['segname'], t['tail_resids'], t['anchor_resid']) for t in tails]
+        wave, dependent = dependency_waves([c for c, _ in reach], [r for _, r in reach], 2.0)
+        nworkers = max(1, min(int(np.bincount(wave).max()), os.cpu_count() or 1))
+        results = [None] * n
+
+        def _args(k, atoms):
+            earlier = [results[j]['heavy'] for j in np.flatnonzero(dependent[k, :k])]
+            t = tails[k]
+            return ((src_pdb, t['segname'], t['tail_resids'], t['anchor_resid'], t['end'],
+                     all_modeled_serials),
+                    dict(seed=self._DECLASH_SEED + k, ensemble=ensemble, atoms=atoms,
+                         extra_env=np.vstack(earlier) if earlier else None))
+
+        if nworkers == 1:
+            for k in range(n):
+                a, kw = _args(k, atoms)
+                results[k] = model_one_tail(*a, **kw)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            from ..util.shared_array import SharedArray
+            with SharedArray(atoms) as shared, ProcessPoolExecutor(max_workers=nworkers) as ex:
+                for w in range(int(wave.max()) + 1):
+                    members = np.flatnonzero(wave == w)
+                    futs = [ex.submit(model_one_tail, *a, **kw)
+                            for a, kw in (_args(k, shared) for k in members)]
+                    for k, fut in zip(members, futs):
+                        results[k] = fut.result()
         new_coords = {}
-        placed_tails = []      # heavy coords of tails already modeled this pass
         rotation_report = []   # (tag, segname, rotation rows) per tail, for the provenance file
         tail_serials = set()   # all model-built tail atom serials (movers for piercing resolution)
-        for k, t in enumerate(tails):
-            extra_env = np.vstack(placed_tails) if placed_tails else None
-            res = model_one_tail(src_pdb, t['segname'], t['tail_resids'], t['anchor_resid'],
-                                 t['end'], all_modeled_serials,
-                                 seed=self._DECLASH_SEED + k, ensemble=ensemble, extra_env=extra_env)
-            placed_tails.append(res['heavy'])
+        for t, res in zip(tails, results):
             rep = res['rep']
             tag = (f"{t['segname']}:{t['tail_resids'][0]}-{t['tail_resids'][-1]} "
                    f"({t['end']}-term, len {len(t['tail_resids'])})")
@@ -920,37 +946,57 @@ class PsfgenTask(VMDTask):
 
     def _run_loop_declash(self, state, loops, cycles):
         """Load the current psf/pdb and run the numpy phi-wiggle loop declasher over each
-        ``(segname, resids)`` loop against its static (non-loop) environment; write ``{basename}.pdb``."""
-        from ..molecule.coordmanip import CoordManipulator, CoordManipulateError
-        from ..psfutil.declash import declash_loop
+        ``(segname, resids)`` loop against its static (non-loop) environment; write ``{basename}.pdb``.
+        Spatially independent loops are declashed in parallel (:func:`~..psfutil.declash.declash_loops`)."""
+        from ..molecule.coordmanip import CoordManipulator
+        from ..psfutil.declash import declash_loops
         cm = CoordManipulator(state.psf.name, state.pdb.name)
         coords = cm.coords
         heavy = cm._mass > 1.1
         ridx = cm._residue_index()
         names = cm._names
         seg = np.array([a.segname for a in cm.atoms.data])
-        rng = np.random.default_rng(self._DECLASH_SEED)
+        resseq = np.array([a.resid.resseqnum for a in cm.atoms.data])
         not_nhn = ~np.isin(names, ['N', 'HN'])
+        seg_rows = {}
+        in_loop = np.zeros(len(coords), dtype=bool)
+        work = []
         for segname, resids in loops:
-            seg_mask = seg == segname
-            loop_mask = seg_mask & np.isin([a.resid.resseqnum for a in cm.atoms.data], resids)
-            env_heavy = np.nonzero(heavy & ~loop_mask)[0]
-            try:
-                r_end = cm.residue_of_segname(segname, resids[-1])
-            except CoordManipulateError:
+            rows = seg_rows.get(segname)
+            if rows is None:
+                rows = seg_rows[segname] = np.flatnonzero(seg == segname)
+
+            def _residue(resid):
+                # VMD residue index of segname/resid, matched at its CA, else any atom
+                at = rows[resseq[rows] == resid]
+                if not at.size:
+                    return None
+                ca = at[names[at] == 'CA']
+                return int(ridx[ca[0] if ca.size else at[0]])
+
+            r_end = _residue(resids[-1])
+            if r_end is None:
                 continue
+            loop_rows = rows[np.isin(resseq[rows], resids)]
             residues = []
             for ri in resids:
-                r0 = cm.residue_of_segname(segname, ri)
-                n_i = np.nonzero(seg_mask & (ridx == r0) & (names == 'N'))[0]
-                ca_i = np.nonzero(seg_mask & (ridx == r0) & (names == 'CA'))[0]
+                r0 = _residue(ri)
+                if r0 is None:
+                    continue
+                res = rows[ridx[rows] == r0]
+                n_i = res[names[res] == 'N']
+                ca_i = res[names[res] == 'CA']
                 if not n_i.size or not ca_i.size:
                     continue
-                movers = np.nonzero(seg_mask & (((ridx == r0) & not_nhn) | ((ridx > r0) & (ridx <= r_end))))[0]
-                frag_heavy = np.nonzero(seg_mask & heavy & (ridx >= r0) & (ridx <= r_end))[0]
+                span = rows[(ridx[rows] >= r0) & (ridx[rows] <= r_end)]
+                movers = span[(ridx[span] > r0) | not_nhn[span]]
                 residues.append({'pivot': int(n_i[0]), 'axis_to': int(ca_i[0]),
-                                 'movers': movers, 'frag_heavy': frag_heavy})
-            declash_loop(coords, residues, env_heavy, cycles, 2.0, rng)
+                                 'movers': movers, 'frag_heavy': span[heavy[span]]})
+            if residues:
+                in_loop[loop_rows] = True
+                work.append((residues, loop_rows[heavy[loop_rows]]))
+        declash_loops(coords, work, np.flatnonzero(heavy & ~in_loop),
+                      cycles, 2.0, self._DECLASH_SEED)
         cm.coords = coords
         cm.write_pdb(f'{self.basename}.pdb')
 
@@ -1074,15 +1120,18 @@ class PsfgenTask(VMDTask):
 
     def _run_pendant_declash(self, state, pendants, cycles, clashdist):
         """Load the current psf/pdb, run the numpy pendant declasher over each ``(indices, bonds,
-        movers)`` entry (sharing one seeded RNG), and write ``{basename}.pdb``.
+        movers)`` entry, and write ``{basename}.pdb``.
 
         The clash environment is the *static* set of heavy atoms outside every pendant in the batch
-        (e.g. the protein, for glycans).  Excluding the other movable pendants keeps the sequential
-        greedy from chasing them into each other; the destabilizing overlaps that matter for the
+        (e.g. the protein, for glycans).  Excluding the other movable pendants keeps the greedy
+        from chasing them into each other; the destabilizing overlaps that matter for the
         downstream minimization are pendant-vs-structure, and inter-pendant contacts relax out.
+        It also makes the pendants independent, so clusters of neighbouring pendants are
+        declashed in parallel, each pendant with its own seed
+        (:func:`~..psfutil.declash.declash_pendants`).
         """
         from ..molecule.coordmanip import CoordManipulator
-        from ..psfutil.declash import declash_pendant
+        from ..psfutil.declash import declash_pendants
         cm = CoordManipulator(state.psf.name, state.pdb.name)
         coords = cm.coords
         heavy = cm._mass > 1.1                        # PSF masses: hydrogens ~1.008
@@ -1090,12 +1139,9 @@ class PsfgenTask(VMDTask):
         for indices, _bonds, _movers in pendants:
             batch[indices] = True
         env_heavy = np.nonzero(heavy & ~batch)[0]
-        rng = np.random.default_rng(self._DECLASH_SEED)
-        for indices, bonds, movers in pendants:
-            pend = np.zeros(len(coords), dtype=bool)
-            pend[indices] = True
-            pendant_heavy = np.nonzero(heavy & pend)[0]
-            declash_pendant(coords, pendant_heavy, env_heavy, bonds, movers, cycles, clashdist, rng)
+        work = [(np.sort(np.asarray(indices)[heavy[indices]]), bonds, movers)
+                for indices, bonds, movers in pendants]
+        declash_pendants(coords, work, env_heavy, cycles, clashdist, self._DECLASH_SEED)
         cm.coords = coords
         cm.write_pdb(f'{self.basename}.pdb')
 
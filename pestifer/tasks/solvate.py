@@ -4,6 +4,8 @@ Definition of the :class:`SolvateTask` class for solvating a molecular structure
 This class is a descendant of the :class:`BaseTask <pestifer.tasks.basetask.BaseTask>` class and is used to solvate a molecular structure
 using the VMD solvate and autoionize packages.
 It generates a solvated PDB and PSF file, optionally adding ions based on specified salt concentration and ion types.
+With ``backend: python`` the solvent box is instead tiled, carved and ionized in numpy
+(:mod:`pestifer.psfutil.solvation`) and psfgen only stitches the resulting fragments onto the solute.
 The task can also handle cubic or rectangular boxes for solvation based on the provided specifications.
 The task reads the input PDB and PSF files, calculates the bounding box for the solvation,
 and generates the necessary Tcl commands to perform the solvation and ionization.
@@ -16,12 +18,11 @@ import os
 
 import numpy as np
 
-from pidibble.pdbparse import PDBParser
-
 from .basetask import VMDTask
 from ..core.artifacts import *
 from ..core.errors import PestiferError
-from ..psfutil.psfcontents import PSFContents
+from ..psfutil import solvation
+from ..psfutil.loop_ccd import heavy_env_mask, pdb_atoms
 from ..util.util import cell_from_xsc, cell_to_xsc
 from ..scripters import VMDScripter
 
@@ -185,6 +186,129 @@ class SolvateTask(VMDTask):
                 counts[cation] = counts.get(cation, 0) + int(round(-net / qcat))
         return {k: v for k, v in counts.items() if v > 0}
 
+    # liquid water at 298 K holds about 0.0334 molecules per cubic Angstrom (0.997 g/cc)
+    _WATER_NUMBER_DENSITY = 0.0334
+    # the TIP3 RESI's explicit ANGLE record; its water segments are built with `auto none`
+    _TIP3_ANGLES = [('H1', 'OH2', 'H2')]
+
+    def _python_solvent_box(self, solvent: str):
+        """
+        Return the :class:`~pestifer.psfutil.solvation.SolventBox` the python backend tiles for
+        ``solvent``: the solvent's own ``kind: box`` entry, or for water a ``TIP3`` box entry if
+        the repository has one and otherwise a lattice box built from its single ``TIP3``
+        molecule (VMD's built-in water box is not visible from Python).  ``None`` if neither is
+        available.
+        """
+        entry = self._solvent_box_entry(solvent)
+        if entry is None:
+            CC = self.resource_manager.charmmff_content
+            if CC.pdbrepository is None:
+                CC.provision_pdbrepository()
+            repo = CC.pdbrepository
+            entry = repo.checkout('TIP3') if 'TIP3' in repo else None
+            if entry is None or not entry.is_box():
+                return self._tip3_lattice_box(entry)
+        return solvation.SolventBox.from_files(entry.get_box_psf(), entry.get_box_pdb(),
+                                               entry.get_box_edge(), entry.get_key_atom())
+
+    def _tip3_lattice_box(self, entry):
+        """
+        A :meth:`~pestifer.psfutil.solvation.SolventBox.lattice` box of TIP3 water at liquid
+        density, from the single-molecule repository ``entry``'s geometry and the TIP3 RESI's
+        atoms and bonds; ``None`` if either is missing.
+        """
+        CC = self.resource_manager.charmmff_content
+        CC.provision()
+        resi = CC.get_resi('TIP3')
+        if entry is None or resi is None:
+            return None
+        pdb = next(iter(entry.pdbcontents.values()))
+        geometry = {ln[12:16].strip(): [float(ln[30:38]), float(ln[38:46]), float(ln[46:54])]
+                    for ln in pdb.splitlines() if ln.startswith(('ATOM', 'HETATM'))}
+        names = [a.name for a in resi.atoms]
+        if any(n not in geometry for n in names):
+            return None
+        index = {n: i for i, n in enumerate(names)}
+        atoms = np.array([('', '', 'TIP3', a.name, a.type, a.charge, a.mass) for a in resi.atoms],
+                         dtype=solvation.PSF_ATOM_DTYPE)
+        terms = {'bonds': [[index[b.name1], index[b.name2]] for b in resi.bonds],
+                 'angles': [[index[n] for n in angle] for angle in self._TIP3_ANGLES]}
+        logger.debug('python solvate: building a TIP3 lattice box from the single-molecule entry')
+        return solvation.SolventBox.lattice(atoms, [geometry[n] for n in names], terms,
+                                            self._WATER_NUMBER_DENSITY, key_atom='OH2')
+
+    def _ion_atom(self, resname: str):
+        """``(name, type, charge, mass)`` of the single atom of the monatomic ion ``resname``."""
+        CC = self.resource_manager.charmmff_content
+        CC.provision()
+        topo = CC.get_resi(resname)
+        if topo is None or len(topo.atoms) != 1:
+            raise PestiferError(f'ion {resname} is not a monatomic RESI in the CHARMM force field')
+        a = topo.atoms[0]
+        return a.name, a.type, a.charge, a.mass
+
+    def _do_python(self, state, solute, solvent, box, LL, UR, xsc):
+        """
+        Solvate and ionize in numpy (:mod:`pestifer.psfutil.solvation`): tile the solvent
+        ``box`` over ``[LL, UR]``, drop molecules overlapping the solute's heavy atoms, replace solvent
+        molecules by ions (for water and any other solvent alike), and have psfgen ``readpsf``
+        the solute plus the solvent and ion fragments.  Salt is sized from the full box volume,
+        as the VMD backend's replacement ionization sizes it (VMD ``autoionize``, used there for
+        water, sizes it from the water count instead).  The overlap carve tests solvent atoms
+        against the solute's heavy atoms only; VMD ``solvate`` tests against every solute atom.
+        """
+        heavy = solute['xyz'][heavy_env_mask(solute)]
+        molecules = box.fill(LL, UR)
+        tiled = len(molecules)
+        molecules = molecules[~solvation.overlapping(molecules, heavy)]
+        logger.info(f'python solvate: {tiled} {solvent} molecules tiled, {tiled - len(molecules)} '
+                    f'removed for overlapping the solute')
+
+        wants_ions, _, neutralize = self._ionization_plan(solvent)
+        ion_counts = {}
+        if wants_ions:
+            cation = self.specs.get('cation', None) or 'SOD'
+            anion = self.specs.get('anion', None) or 'CLA'
+            box_volume = float(abs(np.prod(np.asarray(UR) - np.asarray(LL))))
+            ion_counts = self._ion_counts(solvation.net_charge(state.psf.name), box_volume,
+                                          cation, anion, self.specs.get('salt_con', None), neutralize)
+        fragments = [self.basename + '-solvent']
+        taken = set(solute['segname'].tolist())
+        if ion_counts:
+            try:
+                sites = solvation.choose_ion_sites(box.keys(molecules), sum(ion_counts.values()), heavy, rng=0)
+            except ValueError as e:
+                raise PestiferError(f'solvate task {self.taskname}: {e}; lower the ion count/'
+                                    f'concentration or use a larger box')
+            logger.info(f'python solvate: replacing {len(sites)} {solvent} molecules with ions {ion_counts}')
+            resnames = [rn for rn, count in ion_counts.items() for _ in range(count)]
+            solvation.write_ion_fragment(self.basename + '-ions', resnames, box.keys(molecules[sites]),
+                                         {rn: self._ion_atom(rn) for rn in ion_counts}, taken=taken)
+            fragments.append(self.basename + '-ions')
+            molecules = np.delete(molecules, sites, axis=0)
+        elif not wants_ions:
+            logger.info('ionization disabled (neutralize=false, no salt); the system keeps its net charge')
+        else:
+            logger.info(f'{solvent} system is already net-neutral; no ions needed')
+        solvation.write_solvent_fragment(fragments[0], box, molecules, taken=taken)
+
+        pg = self.scripters['psfgen']
+        pg.newscript(self.basename)
+        pg.load_project(state.psf.name, state.pdb.name)
+        for fragment in fragments:
+            pg.load_project(fragment)
+        pg.writescript(self.basename, guesscoord=False, regenerate=False)
+        self.register(self.basename, key='tcl', artifact_type=PsfgenInputScriptArtifact)
+        self.result = pg.runscript()
+        self.register(self.basename, key='log', artifact_type=PsfgenLogFileArtifact)
+        self.register([PSFFileArtifact(f) for f in fragments], key='solvate_fragment_psfs', artifact_type=PSFFileArtifactList)
+        self.register([PDBFileArtifact(f) for f in fragments], key='solvate_fragment_pdbs', artifact_type=PDBFileArtifactList)
+        if self.result != 0:
+            return self.result
+        self.pdb_to_coor(f'{self.basename}.pdb')
+        self.register(dict(pdb=PDBFileArtifact(f'{self.basename}', pytestable=True), coor=NAMDCoorFileArtifact(f'{self.basename}'), psf=PSFFileArtifact(f'{self.basename}', pytestable=True), xsc=xsc), key='state', artifact_type=StateArtifacts)
+        return self.result
+
     def do(self):
         """
         Execute the solvate task.
@@ -196,6 +320,7 @@ class SolvateTask(VMDTask):
         # pdb: Path = self.get_current_artifact_path('pdb')
         # xsc: Path = self.get_current_artifact_path('xsc')
         # self.stash_current_artifact('vel')
+        solute = None
         use_minmax = True
         if state.xsc is not None:
             box, origin = cell_from_xsc(state.xsc.name)
@@ -206,11 +331,8 @@ class SolvateTask(VMDTask):
                 UR = origin + 0.5 * basisvec
             xsc = state.xsc
         if use_minmax:
-            p = PDBParser(filepath=state.pdb.name).parse()
-            x = np.array([a.x for a in p.parsed['ATOM']])
-            y = np.array([a.y for a in p.parsed['ATOM']])
-            z = np.array([a.z for a in p.parsed['ATOM']])
-            minmax = np.array([[x.min(), y.min(), z.min()], [x.max(), y.max(), z.max()]])
+            solute = pdb_atoms(state.pdb.name)
+            minmax = np.array([solute['xyz'].min(axis=0), solute['xyz'].max(axis=0)])
             spans = minmax[1] - minmax[0]
             maxspan = spans.max()
             cubic = self.specs.get('cubic', False)
@@ -225,6 +347,16 @@ class SolvateTask(VMDTask):
             cell_to_xsc(np.diag(basisvec), origin, f'{self.basename}.xsc')
             xsc = NAMDXscFileArtifact(self.basename)
 
+        solvent = self.specs.get('solvent', 'TIP3')
+        if self.specs.get('backend', 'vmd') == 'python':
+            box = self._python_solvent_box(solvent)
+            if box is not None:
+                if solute is None:
+                    solute = pdb_atoms(state.pdb.name)
+                return self._do_python(state, solute, solvent, box, LL, UR, xsc)
+            logger.info(f'no {solvent} box or molecule in the PDB repository for the python '
+                        f'solvate backend; using VMD solvate')
+
         ll_tcl = r'{ ' + ' '.join([str(_) for _ in LL.tolist()]) + r' }'
         ur_tcl = r'{ ' + ' '.join([str(_) for _ in UR.tolist()]) + r' }'
         box_tcl = r'{ ' + ll_tcl + ' ' + ur_tcl + r' }'
@@ -232,7 +364,6 @@ class SolvateTask(VMDTask):
         # solvent species: TIP3/water -> VMD's built-in water box; anything else -> a
         # pre-equilibrated kind:box entry from the 'solvent' PDB collection (supplied to
         # solvate as -spsf/-spdb/-ws/-ks)
-        solvent = self.specs.get('solvent', 'TIP3')
         box_entry = self._solvent_box_entry(solvent)
         box_args = self._solvent_box_args(box_entry, solvent)
 
@@ -259,7 +390,7 @@ class SolvateTask(VMDTask):
         ion_counts, ion_topfile = {}, None
         if replace_ionize:
             CC = self.resource_manager.charmmff_content
-            net_charge = sum(a.charge for a in PSFContents(state.psf.name).atoms)
+            net_charge = solvation.net_charge(state.psf.name)
             box_volume = float(abs(np.prod(basisvec)))
             ion_counts = self._ion_counts(net_charge, box_volume, cation, anion, sc, neutralize)
             if ion_counts:
@@ -266,12 +266,12 @@ class TerminateTask(MDTask):
         logger.debug(f'generate_minimal_params: {len(atomtypes)} unique atom types in PSF')
 
         combined = CharmmParamFile()
-        for fname in param_files:
-            try:
-                combined.merge(CharmmParamFile.from_file(fname))
-                logger.debug(f'generate_minimal_params: parsed {fname}')
-            except Exception as exc:
-                logger.warning(f'generate_minimal_params: failed to parse {fname}: {exc}')
+        for fname, parsed in zip(param_files, CharmmParamFile.from_files(param_files)):
+            if isinstance(parsed, Exception):
+                logger.warning(f'generate_minimal_params: failed to parse {fname}: {parsed}')
+                continue
+            combined.merge(parsed)
+            logger.debug(f'generate_minimal_params: parsed {fname}')
 
         minimal = combined.extract_for_atomtypes(atomtypes)
         logger.debug(f'generate_minimal_params: {minimal.summary()}')
@@ -200,6 +200,16 @@ class ValidateTask(VMDTask):
 
     _yaml_header: ClassVar[str] = 'validate'
 
+    @classmethod
+    def pipeline_contract(cls, specs):
+        from .pipeline_contract import TaskContract, STATE
+        # reads the current state and reports on it; the state passes through unchanged
+        return TaskContract(requires=(STATE,), provides=())
+
+    def resource_demand(self, ncpus, ngpus):
+        # one VMD process, no MD: can run alongside other light tasks
+        return 1, 0
+
     def provision(self, packet: dict = {}):
         super().provision(packet)
         self.test_specs = self.specs.get('tests', [])
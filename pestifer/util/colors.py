@@ -6,17 +6,17 @@ It inherits from :class:`collections.UserList` and provides a way to access colo
 """
 from collections import UserList
 from colorist import ColorHex, ColorRGB
-import matplotlib as mpl
 import numpy as np
 
-__colormapnames__ = list(mpl.colormaps.keys())
-
 class PestiferColorMap(UserList):
     """
     A class for handling color definitions in Pestifer, based on a specified matplotlib colormap.
     """
     def __init__(self, mpl_colormapname):
-        if mpl_colormapname not in __colormapnames__:
+        # matplotlib is imported here rather than at module level: this module is loaded
+        # (via the progress bars) by light CLI commands that never build a colormap
+        import matplotlib as mpl
+        if mpl_colormapname not in mpl.colormaps:
             return None
         cmap = mpl.colormaps[mpl_colormapname]
         self.data = []
@@ -44,7 +44,10 @@ class PestiferColorMap(UserList):
         return self.data[index]
 
 
-__plasma__ = PestiferColorMap('plasma')
+def __getattr__(name):
+    if name == '__plasma__':
+        return PestiferColorMap('plasma')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 PestiferColors = dict(
     adobe = ColorHex("#c04737"),
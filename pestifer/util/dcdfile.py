@@ -0,0 +1,159 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Reading CHARMM/NAMD DCD trajectories frame by frame, in numpy.
+
+A DCD is a Fortran unformatted file: a header of three records (the ``CORD`` control block, the
+title lines and the atom count) followed by one fixed-size block per frame -- an optional unit
+cell record of six doubles and then the x, y and z records of ``natom`` single-precision floats
+each.  Because every frame is the same size, :class:`DCDFile` maps the frames as a
+:class:`numpy.memmap` of a structured frame dtype and reads them in chunks of a bounded number of
+bytes, so a trajectory of any length is streamed without ever being held in memory.  The frame
+count is taken from the file size rather than the header, so a trajectory NAMD is still writing
+(whose header count lags) reads up to its last complete frame.
+
+Trajectories with fixed atoms (whose frames after the first carry only the free atoms) and
+files written with 64-bit record markers are not supported.
+"""
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_BYTES = 16 * 2**20
+""" Default upper bound on the frame bytes :meth:`DCDFile.iter_chunks` reads at once. """
+
+
+class DCDFile:
+    """
+    A DCD trajectory, header parsed and frames mapped but not read.
+
+    Parameters
+    ----------
+    path : str
+        The DCD file.
+
+    Attributes
+    ----------
+    natom : int
+        Atoms per frame.
+    nframes : int
+        Complete frames in the file.
+    istart : int
+        Timestep of the first frame.
+    nsavc : int
+        Timesteps between frames.
+    has_unitcell : bool
+        Whether each frame carries a unit cell record.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            head = f.read(92)
+        if len(head) < 92 or head[4:8] != b'CORD':
+            raise ValueError(f'{path}: not a DCD file (no CORD header)')
+        for endian in ('<', '>'):
+            if int(np.frombuffer(head[:4], dtype=endian + 'i4')[0]) == 84:
+                break
+        else:
+            raise ValueError(f'{path}: unsupported DCD record markers')
+        self.endian = endian
+        i4 = np.dtype(endian + 'i4')
+        icntrl = np.frombuffer(head[8:88], dtype=i4)
+        self.istart, self.nsavc = int(icntrl[1]), int(icntrl[2])
+        if icntrl[8]:
+            raise ValueError(f'{path}: DCD files with fixed atoms are not supported')
+        self.has_unitcell = bool(icntrl[10])
+        with open(path, 'rb') as f:
+            f.seek(92)
+            title_len = int(np.frombuffer(f.read(4), dtype=i4)[0])
+            f.seek(title_len + 4, os.SEEK_CUR)
+            natom_rec = np.frombuffer(f.read(12), dtype=i4)
+        if len(natom_rec) < 3 or natom_rec[0] != 4:
+            raise ValueError(f'{path}: malformed DCD atom-count record')
+        self.natom = int(natom_rec[1])
+        self.header_bytes = 92 + 4 + title_len + 4 + 12
+        n = self.natom
+        fields = []
+        if self.has_unitcell:
+            fields += [('_c0', i4), ('cell', endian + 'f8', 6), ('_c1', i4)]
+        for axis in 'xyz':
+            fields += [(f'_{axis}0', i4), (axis, endian + 'f4', n), (f'_{axis}1', i4)]
+        self.frame_dtype = np.dtype(fields)
+        self.nframes = max(0, (os.path.getsize(path) - self.header_bytes) // self.frame_dtype.itemsize)
+
+    def __len__(self):
+        return self.nframes
+
+    def timesteps(self):
+        """The timestep of each frame."""
+        return self.istart + self.nsavc * np.arange(self.nframes, dtype=np.int64)
+
+    def _frames(self):
+        return np.memmap(self.path, dtype=self.frame_dtype, mode='r', offset=self.header_bytes,
+                         shape=(self.nframes,))
+
+    def cells(self):
+        """
+        ``(nframes, 6)`` unit cells as stored, ``A, gamma, B, beta, alpha, C`` (the lengths in
+        angstroms; the angles as cosines or in degrees, depending on the writer).
+        """
+        if not self.has_unitcell:
+            raise ValueError(f'{self.path}: the DCD has no unit cells')
+        if not self.nframes:
+            return np.empty((0, 6))
+        return np.array(self._frames()['cell'], dtype=float)
+
+    def iter_chunks(self, axes='xyz', stride=1, chunk_bytes=_CHUNK_BYTES):
+        """
+        Yield ``(frames, coords)`` over every ``stride``-th frame, a chunk at a time:
+        ``frames`` the chunk's frame indices and ``coords`` a ``(len(frames), len(axes),
+        natom)`` float32 array of the requested coordinate ``axes``.  About ``chunk_bytes`` of
+        frames are read at a time.
+        """
+        if not self.nframes:
+            return
+        mm = self._frames()
+        stride = max(1, int(stride))
+        per_chunk = max(1, chunk_bytes // self.frame_dtype.itemsize)
+        for lo in range(0, self.nframes, per_chunk * stride):
+            hi = min(self.nframes, lo + per_chunk * stride)
+            frames = np.arange(lo, hi, stride)
+            rows = mm[lo:hi:stride]
+            coords = np.empty((len(frames), len(axes), self.natom), dtype=np.float32)
+            for k, axis in enumerate(axes):
+                coords[:, k] = rows[axis]
+            yield frames, coords
+
+
+def write_dcd(path, coords, cells=None, istart=0, nsavc=1, delta=1.0, title='pestifer'):
+    """
+    Write ``coords`` (``(nframes, natom, 3)``) as a little-endian DCD, with one unit cell record
+    per frame if ``cells`` (``(nframes, 6)``, ``A, gamma, B, beta, alpha, C``) is given.
+    """
+    coords = np.asarray(coords, dtype='<f4')
+    nframes, natom = coords.shape[:2]
+    icntrl = np.zeros(20, dtype='<i4')
+    icntrl[:4] = nframes, istart, nsavc, istart + nsavc * (nframes - 1)
+    icntrl[19] = 24
+    icntrl[9] = np.array(delta, dtype='<f4').view('<i4')
+    if cells is not None:
+        icntrl[10] = 1
+        cells = np.asarray(cells, dtype='<f8').reshape(nframes, 6)
+
+    def record(payload):
+        size = np.array(len(payload), dtype='<i4').tobytes()
+        return size + payload + size
+
+    titles = title.encode('ascii')[:80].ljust(80)
+    with open(path, 'wb') as f:
+        f.write(record(b'CORD' + icntrl.tobytes()))
+        f.write(record(np.array(1, dtype='<i4').tobytes() + titles))
+        f.write(record(np.array(natom, dtype='<i4').tobytes()))
+        for k in range(nframes):
+            if cells is not None:
+                f.write(record(cells[k].tobytes()))
+            for axis in range(3):
+                f.write(record(np.ascontiguousarray(coords[k, :, axis]).tobytes()))
@@ -42,6 +42,7 @@ from dataclasses import dataclass, field
 import numpy as np
 
 from .densityprofile import AMU_PER_A3_TO_G_PER_CC
+from .xstfile import read_xst
 
 logger = logging.getLogger(__name__)
 
@@ -50,30 +51,15 @@ logger = logging.getLogger(__name__)
 _MIN_WINDOW_SAMPLES = 24
 
 
-def _xst_data_rows(path):
-    """Yield the numeric fields of each non-comment data line of a NAMD ``.xst`` file."""
-    with open(path) as f:
-        for ln in f:
-            s = ln.strip()
-            if not s or s.startswith('#'):
-                continue
-            yield [float(x) for x in s.split()]
-
-
 def xst_cell_volumes(path):
     """Return ``(timesteps, volumes)`` from a NAMD ``.xst`` file.
 
     Volume is the scalar triple product ``|a . (b x c)|`` of the three cell vectors, so it is correct
     for any (orthorhombic or triclinic) cell.  Returns two 1-D numpy arrays; empty arrays if the file
-    has no data lines yet."""
-    ts, vol = [], []
-    for v in _xst_data_rows(path):
-        a = np.array(v[1:4])
-        b = np.array(v[4:7])
-        c = np.array(v[7:10])
-        ts.append(v[0])
-        vol.append(abs(float(np.dot(a, np.cross(b, c)))))
-    return np.array(ts, dtype=float), np.array(vol, dtype=float)
+    has no data lines yet.  The file is read through :func:`~pestifer.util.xstfile.read_xst`, so a
+    repeat call on a growing file parses only the lines appended since."""
+    xst = read_xst(path)
+    return xst.steps, xst.volumes()
 
 
 def xst_cell_areas(path):
@@ -84,13 +70,8 @@ def xst_cell_areas(path):
     observable (area-per-lipid = area / lipids-per-leaflet).  Returns two 1-D numpy arrays; empty arrays
     if the file has no data lines yet.  Companion to :func:`xst_cell_volumes` for the membrane-aware
     (density + area) equilibration."""
-    ts, area = [], []
-    for v in _xst_data_rows(path):
-        a = np.array(v[1:4])
-        b = np.array(v[4:7])
-        ts.append(v[0])
-        area.append(float(np.linalg.norm(np.cross(a, b))))
-    return np.array(ts, dtype=float), np.array(area, dtype=float)
+    xst = read_xst(path)
+    return xst.steps, xst.lateral_areas()
 
 
 def total_mass_amu(psf_path):
@@ -293,19 +274,15 @@ def xst_max_shrink_rate(path):
     per dimension divided by the elapsed steps.  Growth (a cell that expands) contributes 0.  Returns
     ``0.0`` if the chunk has fewer than two frames or spans zero steps -- callers then fall back to
     the maximum chunk length."""
-    rows = list(_xst_data_rows(path))
-    if len(rows) < 2:
+    xst = read_xst(path)
+    if len(xst) < 2:
         return 0.0
-    first, last = rows[0], rows[-1]
-    dsteps = last[0] - first[0]
+    steps = xst.steps
+    dsteps = steps[-1] - steps[0]
     if dsteps <= 0:
         return 0.0
-
-    def lengths(v):
-        return (np.linalg.norm(v[1:4]), np.linalg.norm(v[4:7]), np.linalg.norm(v[7:10]))
-
-    l0, l1 = lengths(first), lengths(last)
-    shrink = max((a - b) for a, b in zip(l0, l1))  # most-shrunk dimension; negative if all grew
+    l0, l1 = np.linalg.norm(xst.cell_vectors()[[0, -1]], axis=2)
+    shrink = float(np.max(l0 - l1))  # most-shrunk dimension; negative if all grew
     return max(0.0, shrink) / dsteps
 
 
@@ -14,14 +14,22 @@ and amino-acid residue-name sets are recognized, and everything else is treated
 as lipid.  This is appropriate for the membrane-protein systems pestifer builds;
 the per-species sets can be overridden if needed.
 
-This is a single-frame analysis.  For a smoother, trajectory-averaged profile,
-average the per-frame results over a production DCD (e.g. via ``catdcd``/VMD).
+A :class:`DensityProfile` parses the PSF and classifies its atoms once, and then
+profiles either its single frame (:meth:`DensityProfile.compute`) or a trajectory
+(:meth:`DensityProfile.trajectory`): DCD frames are streamed a chunk at a time, each
+frame binned in coordinates scaled by its own cell (from the XST, or from the DCD's unit
+cell records), and the per-frame densities summed into a fixed number of blocks, so
+memory does not grow with the trajectory.  The block means give the standard error of
+the averaged profile, and several DCDs can be profiled in parallel processes.
 """
 import logging
 import struct
 
 import numpy as np
 
+from .dcdfile import DCDFile
+from .xstfile import read_xst
+
 logger = logging.getLogger(__name__)
 
 # 1 amu/A^3 expressed in g/cm^3
@@ -60,11 +68,18 @@ def _parse_psf(path):
     if i == len(lines):
         raise ValueError(f'{path}: no !NATOM record found; not a PSF?')
     natom = int(lines[i].split()[0])
+    block = lines[i + 1:i + 1 + natom]
+    # XPLOR/CHARMM PSF: id segname resid resname name type charge mass ...
+    tokens = ''.join(block).split()
+    width = len(tokens) // natom if natom else 0
+    if width >= 8 and width * natom == len(tokens) and tokens[(natom - 1) * width] == str(natom):
+        return (np.array(tokens[3::width], dtype=object),
+                np.array(tokens[7::width], dtype=float))
+    # rows of unequal length: split them one at a time
     resnames = np.empty(natom, dtype=object)
     masses = np.empty(natom, dtype=float)
-    for k, line in enumerate(lines[i + 1:i + 1 + natom]):
+    for k, line in enumerate(block):
         p = line.split()
-        # XPLOR/CHARMM PSF: id segname resid resname name type charge mass ...
         resnames[k] = p[3]
         masses[k] = float(p[7])
     return resnames, masses
@@ -113,11 +128,32 @@ def _parse_xsc_cell(path):
     return a_x * b_y, c_z
 
 
+def _read_xst_cells(paths):
+    """Return ``(timesteps, lateral_areas, c_z)`` from the data lines of one or more XSTs."""
+    rows = [read_xst(path).rows[:, [0, 1, 5, 9]] for path in paths]
+    rows = [r for r in rows if len(r)]
+    if not rows:
+        raise ValueError(f'{", ".join(paths)}: no data lines')
+    rows = np.concatenate(rows)
+    rows = rows[np.argsort(rows[:, 0], kind='stable')]
+    return rows[:, 0], rows[:, 1] * rows[:, 2], rows[:, 3]
+
+
+def _nearest(sorted_values, targets):
+    """Index of the element of ``sorted_values`` nearest each of ``targets``."""
+    j = np.clip(np.searchsorted(sorted_values, targets), 1, max(1, len(sorted_values) - 1))
+    if len(sorted_values) == 1:
+        return np.zeros(len(targets), dtype=np.int64)
+    j -= (targets - sorted_values[j - 1]) < (sorted_values[j] - targets)
+    return j
+
+
 def classify_species(resnames, water=WATER_RESNAMES, ions=ION_RESNAMES,
                      protein=PROTEIN_RESNAMES):
     """Map an array of residue names to ``water``/``ion``/``protein``/``lipid``."""
-    cls = np.empty(len(resnames), dtype=object)
-    for i, r in enumerate(resnames):
+    unique, inverse = np.unique(np.asarray(resnames, dtype=object), return_inverse=True)
+    cls = np.empty(len(unique), dtype=object)
+    for i, r in enumerate(unique):
         if r in water:
             cls[i] = 'water'
         elif r in ions:
@@ -126,18 +162,76 @@ def classify_species(resnames, water=WATER_RESNAMES, ions=ION_RESNAMES,
             cls[i] = 'protein'
         else:
             cls[i] = 'lipid'
-    return cls
+    return cls[inverse.reshape(-1)]
+
+
+def _density_sums(z, area, c_z, nbins, masses, lipid, label_sets, nlabels, block, nblocks):
+    """Per-block sums of the per-frame densities of frames ``z`` (``(nframes, natom)``).
+
+    Each frame is centered on its lipid midplane, wrapped into its own cell and binned in
+    coordinates scaled by its ``c_z``, so frames of different heights share ``nbins`` bins.
+    ``label_sets`` pairs an atom selection (indices or a slice) with each selected atom's
+    label index; ``block`` assigns each frame to one of ``nblocks`` blocks.  Returns
+    ``(nblocks, nlabels, nbins)`` sums in g/cm^3.
+    """
+    z = np.asarray(z, dtype=float)
+    area, c_z = np.asarray(area, dtype=float), np.asarray(c_z, dtype=float)
+    m_lip = masses[lipid]
+    z0 = z[:, lipid] @ m_lip / m_lip.sum()
+    s = (z - z0[:, None]) / c_z[:, None]
+    s -= np.round(s)
+    bins = np.minimum(((s + 0.5) * nbins).astype(np.int64), nbins - 1)
+    weight = masses[None, :] * (nbins * AMU_PER_A3_TO_G_PER_CC / (area * c_z))[:, None]
+    row = np.asarray(block, dtype=np.int64)[:, None] * nlabels
+    sums = np.zeros(nblocks * nlabels * nbins)
+    for atoms, labels in label_sets:
+        flat = (row + labels[None, :]) * nbins + bins[:, atoms]
+        sums += np.bincount(flat.ravel(), weights=weight[:, atoms].ravel(), minlength=sums.size)
+    return sums.reshape(nblocks, nlabels, nbins)
+
+
+def _dcd_density_sums(path, stride, area, c_z, block, nbins, masses, lipid, label_sets,
+                      nlabels, nblocks):
+    """:func:`_density_sums` over the ``stride``-th frames of one DCD, streamed in chunks;
+    ``area``, ``c_z`` and ``block`` are given per selected frame."""
+    sums = np.zeros((nblocks, nlabels, nbins))
+    for frames, coords in DCDFile(path).iter_chunks('z', stride):
+        k = frames // stride
+        sums += _density_sums(coords[:, 0], area[k], c_z[k], nbins, masses, lipid, label_sets,
+                              nlabels, block[k], nblocks)
+    return sums
 
 
 class DensityProfile:
-    """Compute species-resolved mass-density profiles for one membrane frame."""
+    """Compute species-resolved mass-density profiles for a membrane frame or trajectory.
 
-    def __init__(self, psf, coor, xsc, **species_sets):
+    The PSF is parsed and its atoms classified once; ``coor`` and ``xsc`` give the single
+    frame :meth:`compute` profiles and may be omitted when only :meth:`trajectory` is used.
+    """
+
+    def __init__(self, psf, coor=None, xsc=None, **species_sets):
         self.resnames, self.masses = _parse_psf(psf)
-        self.z = _read_z(coor, len(self.resnames))
-        self.area, self.c_z = _parse_xsc_cell(xsc)
+        self.z = _read_z(coor, len(self.resnames)) if coor else None
+        self.area, self.c_z = _parse_xsc_cell(xsc) if xsc else (None, None)
         self.cls = classify_species(self.resnames, **species_sets)
-        self.lipid_resnames = sorted(set(self.resnames[self.cls == 'lipid']))
+        self.lipid_resnames = sorted(set(self.resnames[self.cls == 'lipid'].tolist()))
+
+    def _labels(self, lipid_components):
+        """The profile labels and the ``(atoms, label indices)`` sets that fill them."""
+        lip = self.cls == 'lipid'
+        if not lip.any():
+            raise ValueError('no lipid atoms found; cannot locate a midplane')
+        labels = [sp for sp in ('water', 'lipid', 'protein', 'ion') if (self.cls == sp).any()]
+        species = np.empty(len(self.cls), dtype=np.int64)
+        for k, sp in enumerate(labels):
+            species[self.cls == sp] = k
+        label_sets = [(slice(None), species)]
+        if lipid_components:
+            atoms = np.flatnonzero(lip)
+            component = np.searchsorted(self.lipid_resnames, self.resnames[atoms].astype(str))
+            label_sets.append((atoms, component + len(labels)))
+            labels += [f'lipid:{rn}' for rn in self.lipid_resnames]
+        return labels, label_sets, lip
 
     def compute(self, dz=1.0, lipid_components=False):
         """Return ``(z_centers, profiles)`` with the midplane at ``z=0``.
@@ -147,46 +241,107 @@ class DensityProfile:
         included; when ``lipid_components`` is True the individual lipid
         residue names are added after the total lipid curve.
         """
-        lip = self.cls == 'lipid'
-        if not lip.any():
-            raise ValueError('no lipid atoms found; cannot locate a midplane')
-        z0 = np.average(self.z[lip], weights=self.masses[lip])
-        # wrap into the periodic cell about the midplane so bulk solvent is
+        if self.z is None or self.c_z is None:
+            raise ValueError('no single frame to profile: give both coor and xsc')
+        labels, label_sets, lip = self._labels(lipid_components)
+        # each atom is wrapped into the periodic cell about the midplane so bulk solvent is
         # continuous through the z-PBC instead of reading zero at the box edges
-        zc = self.z - z0
-        zc -= self.c_z * np.round(zc / self.c_z)
-
         nbins = max(1, int(round(self.c_z / dz)))
-        edges = np.linspace(-self.c_z / 2, self.c_z / 2, nbins + 1)
-        centers = 0.5 * (edges[:-1] + edges[1:])
-        slab_vol = self.area * (self.c_z / nbins)
-
-        def density(mask):
-            hist, _ = np.histogram(zc[mask], bins=edges, weights=self.masses[mask])
-            return hist / slab_vol * AMU_PER_A3_TO_G_PER_CC
-
-        profiles = {}
-        for species in ('water', 'lipid', 'protein', 'ion'):
-            mask = self.cls == species
-            if mask.any():
-                profiles[species] = density(mask)
-        if lipid_components:
-            for rn in self.lipid_resnames:
-                profiles[f'lipid:{rn}'] = density(self.resnames == rn)
-        return centers, profiles
+        sums = _density_sums(self.z[None], [self.area], [self.c_z], nbins, self.masses, lip,
+                             label_sets, len(labels), [0], 1)
+        centers = (np.arange(nbins) + 0.5) * (self.c_z / nbins) - self.c_z / 2
+        return centers, dict(zip(labels, sums[0]))
+
+    def trajectory(self, dcds, xst=None, dz=1.0, lipid_components=False, nblocks=5, stride=1,
+                   nworkers=1):
+        """Return ``(z_centers, profiles, errors)`` averaged over the frames of ``dcds``.
+
+        ``dcds`` are one or more DCD files, taken as one trajectory in the order given, of
+        which every ``stride``-th frame of each is profiled.  A frame's cell is that of the
+        ``xst`` data line nearest its timestep, or, with no ``xst``, the DCD's own unit cell
+        record.  Given one XST per DCD, each DCD takes its cells from its own XST (so runs that
+        each restart the step count stay apart); otherwise the data lines of all the XSTs are
+        merged by timestep.  Frames are binned in coordinates scaled by their
+        own cell height, into as many bins as the mean height holds slabs of ``dz``.
+
+        ``profiles`` holds the frame-averaged densities as in :meth:`compute`.  The frames
+        are split into ``nblocks`` consecutive blocks, and ``errors`` holds the standard
+        error of each profile from the spread of its block means (``None`` for fewer than
+        two blocks).  With ``nworkers`` > 1 the DCDs are profiled in parallel processes.
+        """
+        dcds = [dcds] if isinstance(dcds, str) else list(dcds)
+        xst_cells = [None] * len(dcds)
+        if xst is not None:
+            xst = [xst] if isinstance(xst, str) else list(xst)
+            if len(xst) == len(dcds):
+                xst_cells = [_read_xst_cells([path]) for path in xst]
+            else:
+                xst_cells = [_read_xst_cells(xst)] * len(dcds)
+        labels, label_sets, lip = self._labels(lipid_components)
+        cells = []
+        for path, xst_cell in zip(dcds, xst_cells):
+            dcd = DCDFile(path)
+            if dcd.natom != len(self.masses):
+                raise ValueError(f'{path}: {dcd.natom} atoms but PSF has {len(self.masses)}')
+            if xst_cell is not None:
+                steps, area, c_z = xst_cell
+                j = _nearest(steps, dcd.timesteps()[::stride])
+                cells.append((area[j], c_z[j]))
+            elif dcd.has_unitcell:
+                cell = dcd.cells()[::stride]
+                cells.append((cell[:, 0] * cell[:, 2], cell[:, 5]))
+            else:
+                raise ValueError(f'{path}: no unit cells in the DCD and no XST given')
+        nframes = sum(len(c_z) for _, c_z in cells)
+        if not nframes:
+            raise ValueError(f'no frames in {", ".join(dcds)}')
+        nblocks = max(1, min(int(nblocks), nframes))
+        mean_c_z = np.concatenate([c_z for _, c_z in cells]).mean()
+        nbins = max(1, int(round(mean_c_z / dz)))
+        offsets = np.cumsum([0] + [len(c_z) for _, c_z in cells])
+        tasks = [(path, stride, area, c_z, (off + np.arange(len(c_z))) * nblocks // nframes, nbins,
+                  self.masses, lip, label_sets, len(labels), nblocks)
+                 for path, (area, c_z), off in zip(dcds, cells, offsets)]
+        nworkers = max(1, min(int(nworkers), len(tasks)))
+        if nworkers == 1:
+            parts = [_dcd_density_sums(*t) for t in tasks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=nworkers) as ex:
+                parts = list(ex.map(_dcd_density_sums, *zip(*tasks)))
+        sums = np.sum(parts, axis=0)
+        counts = np.bincount(np.arange(nframes) * nblocks // nframes, minlength=nblocks)
+        logger.debug(f'profiled {nframes} frames of {len(dcds)} DCD(s) in {nblocks} blocks')
+        centers = (np.arange(nbins) + 0.5) * (mean_c_z / nbins) - mean_c_z / 2
+        profiles = dict(zip(labels, sums.sum(axis=0) / nframes))
+        errors = None
+        if nblocks > 1:
+            means = sums / counts[:, None, None]
+            sem = means.std(axis=0, ddof=1) / np.sqrt(nblocks)
+            errors = dict(zip(labels, sem))
+        return centers, profiles, errors
 
     def plot(self, outfile, title='', dz=1.0, lipid_components=False,
-             figsize=(6.4, 4.4), dpi=150, stamp=None):
+             figsize=(6.4, 4.4), dpi=150, stamp=None, dcds=None, xst=None, nblocks=5,
+             stride=1, nworkers=1):
         """Compute and render the profile to ``outfile``; returns ``outfile``.
 
         ``stamp`` is an optional provenance mark drawn in the corner.  It is passed in rather than
-        looked up so this module keeps its independence from the rest of pestifer.
+        looked up so this module keeps its independence from the rest of pestifer.  Given
+        ``dcds``, the profile is the :meth:`trajectory` average, drawn with a band of one
+        standard error.
         """
         import matplotlib
         matplotlib.use('Agg')
         import matplotlib.pyplot as plt
 
-        centers, profiles = self.compute(dz=dz, lipid_components=lipid_components)
+        errors = None
+        if dcds:
+            centers, profiles, errors = self.trajectory(
+                dcds, xst=xst, dz=dz, lipid_components=lipid_components, nblocks=nblocks,
+                stride=stride, nworkers=nworkers)
+        else:
+            centers, profiles = self.compute(dz=dz, lipid_components=lipid_components)
         components = [k for k in profiles if k.startswith('lipid:')]
         comp_colors = {}
         if components:
@@ -196,10 +351,13 @@ class DensityProfile:
         fig, ax = plt.subplots(figsize=figsize)
         for label, rho in profiles.items():
             if label in _SPECIES_STYLE:
-                ax.plot(centers, rho, label=label, **_SPECIES_STYLE[label])
+                style = dict(label=label, **_SPECIES_STYLE[label])
             else:  # a lipid component
-                rn = label.split(':', 1)[1]
-                ax.plot(centers, rho, label=rn, lw=1.1, color=comp_colors[label])
+                style = dict(label=label.split(':', 1)[1], lw=1.1, color=comp_colors[label])
+            ax.plot(centers, rho, **style)
+            if errors is not None:
+                ax.fill_between(centers, rho - errors[label], rho + errors[label],
+                                color=style['color'], alpha=0.25, lw=0)
 
         ax.set_xlabel(r'$z$ relative to bilayer midplane (Å)')
         ax.set_ylabel(r'mass density (g cm$^{-3}$)')
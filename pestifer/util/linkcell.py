@@ -1,7 +1,9 @@
 # Author: Cameron F. Abrams, <cfa22@drexel.edu>
 """ 
 Custom link-cell algorithm for pair-wise searches in 3D space
-The :class:`Linkcell` object is used by the :class:`RingCheck algorithm <pestifer.tasks.ringcheck.RingCheckTask>` to detect pierced rings
+The :class:`Linkcell` object is used by the :class:`RingCheck algorithm <pestifer.tasks.ringcheck.RingCheckTask>` to detect pierced rings;
+the :class:`GridHash` is an insertable, vectorized cell list used by :meth:`Bilayer.write_grid_pdb <pestifer.molecule.bilayer.Bilayer.write_grid_pdb>`
+to check each candidate lipid placement against everything placed so far
 """
 import logging
 
@@ -159,3 +161,104 @@ class Linkcell:
         searchlist = [self.ldx_of_cellndx(np.mod(C + p, nc)) for p in product(d, d, d)]
         assert i in searchlist
         return searchlist
+
+
+_NEIGHBOR_OFFSETS = np.array(list(product((-1, 0, 1), repeat=3)), dtype=int)
+
+
+class GridHash:
+    """
+    An insertable cell list answering "how close is the nearest stored point?" within a cutoff.
+
+    Points are binned into cells at least ``cutoff`` wide on a dense grid over ``corners``, so
+    a point's neighbors within ``cutoff`` all lie in its own or the 26 adjacent cells. Points
+    outside ``corners`` are clamped into the edge cells, which keeps every query exact (only
+    slower there). Each cell holds a fixed number of slots indexing into the stored points,
+    grown for all cells when one fills.
+    Both :meth:`insert` and :meth:`nearest` take whole arrays of points, so a caller can add an
+    accepted molecule and score a stack of candidate molecules with one call each, where a
+    ``cKDTree`` would have to be rebuilt over everything after every insertion.
+
+    Parameters
+    ----------
+    corners : np.ndarray
+        A 2x3 array of the lower-left and upper-right corners of the region most points occupy.
+    cutoff : float
+        The largest distance :meth:`nearest` resolves, in Angstroms.
+    cellsize : float, optional
+        Cell width (at least ``cutoff``); larger cells use less memory for a sparse cutoff.
+    capacity : int, optional
+        Initial slots per cell.
+    """
+    def __init__(self, corners: np.ndarray, cutoff: float, cellsize: float = None, capacity: int = 4):
+        self.cutoff = float(cutoff)
+        self.lower_left_corner, self.upper_right_corner = np.asarray(corners, dtype=float)
+        self.sidelengths = self.upper_right_corner - self.lower_left_corner
+        width = max(self.cutoff, cellsize or 0.0)
+        self.cells_per_dim = np.maximum(1, np.floor(self.sidelengths / width)).astype(int)
+        self.celldim = np.where(self.cells_per_dim > 1, self.sidelengths / self.cells_per_dim, np.inf)
+        self.ncells = int(np.prod(self.cells_per_dim))
+        self._count = np.zeros(self.ncells, dtype=int)
+        self._slots = np.full((self.ncells, capacity), -1, dtype=np.int32)
+        self._points = np.empty((0, 3))
+        self.npoints = 0
+
+    def _cellndx(self, R: np.ndarray) -> np.ndarray:
+        C = np.floor((R - self.lower_left_corner) / self.celldim).astype(int)
+        return np.clip(C, 0, self.cells_per_dim - 1)
+
+    def _ldx(self, C: np.ndarray) -> np.ndarray:
+        nc = self.cells_per_dim
+        return (C[..., 2] * nc[1] + C[..., 1]) * nc[0] + C[..., 0]   # as Linkcell.ldx_of_cellndx
+
+    def insert(self, points: np.ndarray):
+        """Add an (N, 3) array of points."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if not len(points):
+            return
+        ldx = self._ldx(self._cellndx(points))
+        order = np.argsort(ldx, kind='stable')
+        ldx = ldx[order]
+        cells, first, counts = np.unique(ldx, return_index=True, return_counts=True)
+        slot = self._count[ldx] + np.arange(len(ldx)) - np.repeat(first, counts)
+        capacity = self._slots.shape[1]
+        if slot.max() >= capacity:
+            grown = np.full((self.ncells, max(2 * capacity, int(slot.max()) + 1)), -1, dtype=np.int32)
+            grown[:, :capacity] = self._slots
+            self._slots = grown
+        if self.npoints + len(points) > len(self._points):
+            grown = np.empty((max(2 * len(self._points), self.npoints + len(points)), 3))
+            grown[:self.npoints] = self._points[:self.npoints]
+            self._points = grown
+        self._points[self.npoints:self.npoints + len(points)] = points
+        self._slots[ldx, slot] = self.npoints + order
+        self._count[cells] += counts
+        self.npoints += len(points)
+
+    def nearest(self, points: np.ndarray) -> np.ndarray:
+        """
+        Distance from each point of an (..., 3) array to the nearest stored point, or ``inf``
+        where none is within ``cutoff``.
+
+        Only the stored points in the cells around the query points are gathered, and a small
+        ``cKDTree`` over them answers the query.
+        """
+        from scipy.spatial import cKDTree
+        points = np.asarray(points, dtype=float)
+        shape = points.shape[:-1]
+        points = points.reshape(-1, 3)
+        out = np.full(len(points), np.inf)
+        if not self.npoints or not len(points):
+            return out.reshape(shape)
+        nc = self.cells_per_dim
+        occupied = np.unique(self._ldx(self._cellndx(points)))
+        C = np.stack([occupied % nc[0], (occupied // nc[0]) % nc[1], occupied // (nc[0] * nc[1])], axis=-1)
+        near = np.unique(self._ldx(np.clip(C[:, None, :] + _NEIGHBOR_OFFSETS[None], 0, nc - 1)))
+        near = near[self._count[near] > 0]
+        if not len(near):
+            return out.reshape(shape)
+        stored = self._slots[near, :int(self._count[near].max())].ravel()
+        stored = self._points[stored[stored >= 0]]
+        out, _ = cKDTree(stored).query(points, distance_upper_bound=self.cutoff)
+        out[out >= self.cutoff] = np.inf
+        return out.reshape(shape)
@@ -11,9 +11,14 @@ from whatever happened to still be installed -- which is not evidence.
 :func:`log_environment` writes the whole chain into the log at the start of a build, so any build
 log is self-describing.  Nothing here may raise: a failed probe records ``unknown`` and the build
 proceeds.  Provenance is worth a second of startup, never a failed run.
+
+Probing is not free -- ``vmd --version`` is a full VMD startup and the NAMD GPU probe binds a
+device -- so reported versions are remembered per user (see :func:`cached_versions`) against the
+identity of the binary that reported them, and a build normally pays only a few ``stat`` calls.
 """
 
 import importlib.metadata
+import json
 import logging
 import os
 import platform
@@ -23,6 +28,9 @@ import subprocess
 import sys
 import tempfile
 
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from .stringthings import __pestifer_version__
 
 logger = logging.getLogger(__name__)
@@ -188,22 +196,127 @@ _PROBERS = {'vmd': vmd_version, 'namd3': namd_version, 'namd3gpu': namd_version,
 is recorded by resolved path alone."""
 
 
-def executable_versions(config):
+_VERSION_CACHE_FORMAT = 1
+
+
+def version_cache_file():
+    """Where reported versions are remembered between runs."""
+    from platformdirs import user_cache_dir
+    return Path(user_cache_dir('pestifer')) / 'tool-versions.json'
+
+
+def _binary_identity(cmd):
+    """``(path, [size, mtime_ns, inode])`` of the file ``cmd`` resolves to, or None.
+
+    Symlinks are followed, so a ``vmd`` on PATH re-pointed at another install is a different
+    binary; replacing, rebuilding or touching the file changes the signature.
+    """
+    try:
+        path = os.path.realpath(shutil.which(cmd))
+        st = os.stat(path)
+    except Exception:
+        return None
+    return path, [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _read_version_cache(cache_file):
+    try:
+        with open(cache_file) as f:
+            data = json.load(f)
+        if data.get('format') == _VERSION_CACHE_FORMAT:
+            return data.get('entries', {})
+    except Exception:
+        pass
+    return {}
+
+
+def _write_version_cache(cache_file, fresh):
+    """Merge ``fresh`` entries into the cache file (locked, atomically replaced)."""
+    from filelock import FileLock
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(str(cache_file) + '.lock'):
+            entries = _read_version_cache(cache_file)
+            entries.update(fresh)
+            tmp = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+            with open(tmp, 'w') as f:
+                json.dump({'format': _VERSION_CACHE_FORMAT, 'entries': entries}, f, indent=1)
+            os.replace(tmp, cache_file)
+    except Exception as e:
+        logger.debug(f'could not update {cache_file}: {e}')
+
+
+def cached_versions(probes, cache_file=None):
+    """Versions reported by each ``(prober, cmd)`` in ``probes``, in order.
+
+    A version is remembered against the resolved binary's path, size, mtime and inode, so it is
+    re-probed exactly when the binary changes.  Cache misses are probed concurrently -- on a cold
+    cache the wait is the slowest probe, not the sum.  A probe that reports ``unknown`` is not
+    remembered, so a transient failure (a timeout on a loaded node) does not stick.  A command that
+    does not resolve to a file is probed every time.
+    """
+    cache_file = Path(cache_file) if cache_file else version_cache_file()
+    entries = _read_version_cache(cache_file)
+    results = [None] * len(probes)
+    misses = {}         # cache key -> (prober, cmd, signature, indices into results)
+    for i, (prober, cmd) in enumerate(probes):
+        identity = _binary_identity(cmd)
+        key, signature = f'uncached:{i}', None
+        if identity:
+            path, signature = identity
+            key = f'{getattr(prober, "__name__", "probe")}:{path}'
+            entry = entries.get(key)
+            if entry and entry.get('signature') == signature:
+                results[i] = entry['version']
+                continue
+        misses.setdefault(key, (prober, cmd, signature, []))[3].append(i)
+    if not misses:
+        return results
+    with ThreadPoolExecutor(max_workers=len(misses)) as ex:
+        futures = {key: ex.submit(prober, cmd) for key, (prober, cmd, _, _) in misses.items()}
+    fresh = {}
+    for key, (prober, cmd, signature, indices) in misses.items():
+        try:
+            version = futures[key].result()
+        except Exception as e:
+            logger.warning(f'version probe {cmd!r} failed ({e}); it will be recorded as unknown')
+            version = _UNKNOWN
+        for i in indices:
+            results[i] = version
+        if signature is not None and version != _UNKNOWN:
+            fresh[key] = {'signature': signature, 'version': version}
+    if fresh:
+        _write_version_cache(cache_file, fresh)
+    return results
+
+
+def cached_version(prober, cmd, cache_file=None):
+    """Version reported by ``prober(cmd)``, remembered as in :func:`cached_versions`."""
+    return cached_versions([(prober, cmd)], cache_file=cache_file)[0]
+
+
+def executable_versions(config, cache_file=None):
     """Resolved path and reported version of each external program this build may invoke.
 
     ``namd3`` is always probed -- even a GPU build runs it for any task carrying
     ``cpu-override`` -- while ``namd3gpu`` is probed only in GPU mode, since probing the CUDA
-    build binds a GPU device and a CPU run will never touch it.
+    build binds a GPU device and a CPU run will never touch it.  Versions come through
+    :func:`cached_versions`, so an unchanged toolchain is not probed at all.
     """
     out = {}
+    probes = []
     gpu = getattr(config, 'namd_type', 'cpu') == 'gpu'
     for name, cmd in sorted(getattr(config, 'shell_commands', {}).items()):
         if name == 'namd3gpu' and not gpu:
             continue
         path = shutil.which(cmd) or _UNKNOWN
         prober = _PROBERS.get(name)
-        version = prober(cmd) if (prober and path != _UNKNOWN) else ''
-        out[name] = {'path': path, 'version': version}
+        out[name] = {'path': path, 'version': ''}
+        if prober and path != _UNKNOWN:
+            probes.append((name, prober, cmd))
+    versions = cached_versions([(prober, cmd) for _, prober, cmd in probes], cache_file=cache_file)
+    for (name, _, _), version in zip(probes, versions):
+        out[name]['version'] = version
     return out
 
 
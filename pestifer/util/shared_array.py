@@ -0,0 +1,83 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+A numpy array published to worker processes through :mod:`multiprocessing.shared_memory`.
+
+Handing a large array to a process pool by value pickles a full copy into every task. A
+:class:`SharedArray` pickles as the name, shape and dtype of its shared-memory block instead;
+each worker process attaches to the block once (later tasks reuse the attachment) and reads the
+same physical pages. The creating process owns the block and must :meth:`~SharedArray.unlink`
+it when the workers are done, conveniently by using the array as a context manager.
+"""
+import logging
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_attached = {}
+""" Blocks this process has attached to, by name: one attachment per process, however many
+tasks carry the array. """
+
+
+class SharedArray:
+    """
+    A read-mostly numpy array held in a shared-memory block.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        Copied into a new block, which this process owns.
+
+    Attributes
+    ----------
+    name : str
+        The block's system-wide name.
+    array : numpy.ndarray
+        A view of the block (the same pages in every attached process).
+    """
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self._owner = True
+        self.name = self._shm.name
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        self.array[...] = array
+        logger.debug(f'shared {array.nbytes} bytes as {self.name}')
+
+    @classmethod
+    def _attach(cls, name, shape, dtype):
+        if name in _attached:
+            return _attached[name]
+        self = cls.__new__(cls)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self.name = name
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        _attached[name] = self
+        return self
+
+    def __reduce__(self):
+        return (SharedArray._attach, (self.name, self.array.shape, self.array.dtype))
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+    def __len__(self):
+        return len(self.array)
+
+    def unlink(self):
+        """Release the block. Only the owning process destroys it; workers just detach."""
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
+        return False
@@ -11,8 +11,6 @@ import subprocess
 import shutil
 import sys
 
-import pandas as pd
-
 from argparse import Namespace
 from collections import UserList
 from io import StringIO
@@ -374,7 +372,16 @@ class ByteCollector:
         """
         return self.byte_collector
 
-def my_logger(msg: str | list | dict | pd.DataFrame, logf: Callable, width=None, fill='', just='<', frame='', depth=0, **kwargs):
+def _is_dataframe(msg) -> bool:
+    """True if ``msg`` is a :class:`pandas.DataFrame`.
+
+    pandas is not imported for the test: a DataFrame can only exist if something else already
+    imported it, and importing it here would cost every CLI invocation a third of a second.
+    """
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(msg, pd.DataFrame)
+
+def my_logger(msg: 'str | list | dict | pd.DataFrame', logf: Callable, width=None, fill='', just='<', frame='', depth=0, **kwargs):
     """
     A fancy recursive logger
     
@@ -410,7 +417,7 @@ def my_logger(msg: str | list | dict | pd.DataFrame, logf: Callable, width=None,
     if frame:
         ffmt = r'{'+r':'+frame+just+f'{width}'+r'}'
         logf(ffmt.format(frame))
-    # logger.debug(f'Logging message of type {type(msg)} at depth {depth}; is list? {isinstance(msg, list)}; is dict? {isinstance(msg, dict)}; is DataFrame? {isinstance(msg, pd.DataFrame)}')
+    # logger.debug(f'Logging message of type {type(msg)} at depth {depth}; is list? {isinstance(msg, list)}; is dict? {isinstance(msg, dict)}; is DataFrame? {_is_dataframe(msg)}')
     if isinstance(msg, list):
         for tok in msg:
             my_logger(tok, logf, width=width, fill=fill, just=just, frame=False, depth=depth, kwargs=kwargs)
@@ -426,7 +433,7 @@ def my_logger(msg: str | list | dict | pd.DataFrame, logf: Callable, width=None,
             else:
                 my_logger(f'{key}:', logf, width=width, fill=fill, just=just, frame=False, depth=depth, kwargs=kwargs)
                 my_logger(value, logf, width=width, fill=fill, just=just, frame=False, depth=depth+1, kwargs=kwargs)
-    elif isinstance(msg, pd.DataFrame):
+    elif _is_dataframe(msg):
         dfoutmode = kwargs.get('dfoutmode', 'value')
         if dfoutmode == 'value':
             my_logger([ll+x+rr for x in msg.to_string().split('\n')], logf, width=width, fill=fill, just=just, frame=False, depth=depth, kwargs=kwargs)
@@ -7,7 +7,6 @@ import os
 import time
 import sys
 
-import pandas as pd
 import numpy as np
 
 from argparse import ArgumentParser
@@ -85,6 +84,7 @@ def cell_from_xsc(xsc: Path | str):
         A tuple containing the box vectors and origin, or (None, None) if the file is not found or invalid.
     """
     if xsc and os.path.exists(xsc):
+        import pandas as pd
         celldf = pd.read_csv(xsc, skiprows=2, header=None, sep=r'\s+', index_col=None)
         col = 'step a_x a_y a_z b_x b_y b_z c_x c_y c_z o_x o_y o_z s_x s_y s_z s_u s_v s_w'.split()[:len(celldf.columns)]
         celldf.columns = col
@@ -0,0 +1,158 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""
+Reading NAMD extended-system trajectory (``.xst``) files, incrementally, in numpy.
+
+NAMD appends one line to the ``.xst`` every ``xstFreq`` steps: the step, the three cell vectors
+``a``, ``b`` and ``c``, the cell origin and, for a flexible cell, its strain rates.  An
+:class:`XSTFile` parses the data lines with one :func:`numpy.loadtxt` call and remembers the byte
+offset it has read up to, so reading a growing file again parses only the lines appended since.
+A file replaced in the meantime (NAMD backs up and rewrites the ``.xst`` at the start of every
+run) is recognized by the bytes just before that offset no longer matching, and read afresh.
+Cell volumes, lateral areas and edge lengths are array operations over all rows at once.
+
+:func:`read_xst` keeps one :class:`XSTFile` per path, so the several readers of one file in a
+process -- the NAMD log parser's ``xst`` data frame and the equilibration tasks' density, area
+and shrink-rate series -- parse each line once between them.  The cache holds the
+:data:`_MAX_CACHED` most recently read files and is emptied by :func:`forget_xst` when a task
+finishes; an :class:`XSTFile` is read under its own lock, so threads sharing it do not interleave.
+"""
+import io
+import logging
+import os
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MARK_BYTES = 128
+""" Bytes before the read offset remembered to tell an appended file from a replaced one. """
+
+_MAX_CACHED = 32
+""" Most :class:`XSTFile` objects :func:`read_xst` keeps; the least recently read go first. """
+
+_xst_files = OrderedDict()
+""" The :class:`XSTFile` of each path :func:`read_xst` has read, by absolute path. """
+
+_xst_files_lock = threading.Lock()
+
+
+class XSTFile:
+    """
+    The rows of a NAMD ``.xst`` file, parsed as far as it has been read.
+
+    Parameters
+    ----------
+    path : str
+        The ``.xst`` file.
+
+    Attributes
+    ----------
+    offset : int
+        Bytes of complete lines parsed so far.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self._mark = b''
+        self._complete = np.empty((0, 10))
+        self._pending = self._complete
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def rows(self):
+        """``(nrows, ncolumns)`` data lines: step, ``a``, ``b``, ``c``, then any further fields."""
+        with self._lock:
+            complete, pending = self._complete, self._pending
+        if len(pending):
+            return np.concatenate([complete, pending])
+        return complete
+
+    def read(self):
+        """Parse the lines appended since the last read (every line, if the file was replaced);
+        returns this :class:`XSTFile`."""
+        with self._lock:
+            self._read()
+        return self
+
+    def _read(self):
+        with open(self.path, 'rb') as f:
+            if self.offset:
+                f.seek(self.offset - len(self._mark))
+                if f.read(len(self._mark)) != self._mark:
+                    logger.debug(f'{self.path} was replaced; reading it afresh')
+                    self._reset()
+            f.seek(self.offset)
+            new = f.read()
+        end = new.rfind(b'\n') + 1
+        if end:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)   # a block of only comment lines
+                rows = np.loadtxt(io.BytesIO(new[:end]), comments='#', ndmin=2)
+            if len(rows):
+                self._complete = np.concatenate([self._complete, rows]) if len(self._complete) else rows
+            self.offset += end
+            self._mark = new[max(0, end - _MARK_BYTES):end]
+        # a last line without its newline counts if it has every field, but is parsed again next
+        # time in case NAMD was still writing it
+        fields = new[end:].split()
+        width = self._complete.shape[1] if len(self._complete) else max(10, len(fields))
+        self._pending = self._complete[:0]
+        if len(fields) == width and not fields[0].startswith(b'#'):
+            self._pending = np.array(fields, dtype=float)[None]
+
+    @property
+    def steps(self):
+        """The step of each row."""
+        return self.rows[:, 0]
+
+    def cell_vectors(self):
+        """``(nrows, 3, 3)`` cell vectors ``a``, ``b`` and ``c`` of each row."""
+        return self.rows[:, 1:10].reshape(-1, 3, 3)
+
+    def volumes(self):
+        """Cell volumes ``|a . (b x c)|``, correct for any (orthorhombic or triclinic) cell."""
+        cell = self.cell_vectors()
+        return np.abs(np.einsum('ij,ij->i', cell[:, 0], np.cross(cell[:, 1], cell[:, 2])))
+
+    def lateral_areas(self):
+        """Lateral areas ``|a x b|`` normal to z (``a_x * b_y`` for an orthorhombic cell)."""
+        cell = self.cell_vectors()
+        return np.linalg.norm(np.cross(cell[:, 0], cell[:, 1]), axis=1)
+
+    def lengths(self):
+        """``(nrows, 3)`` lengths of the cell vectors."""
+        return np.linalg.norm(self.cell_vectors(), axis=2)
+
+
+def read_xst(path):
+    """The :class:`XSTFile` of ``path``, brought up to date with the lines appended since this
+    process last read it."""
+    key = os.path.abspath(path)
+    with _xst_files_lock:
+        xst = _xst_files.pop(key, None)
+        if xst is None:
+            xst = XSTFile(path)
+        _xst_files[key] = xst
+        while len(_xst_files) > _MAX_CACHED:
+            _xst_files.popitem(last=False)
+    return xst.read()
+
+
+def forget_xst(path=None):
+    """Drop ``path``'s :class:`XSTFile` (every one, with no ``path``) from the :func:`read_xst`
+    cache; the next read of the file parses it from the start."""
+    with _xst_files_lock:
+        if path is None:
+            _xst_files.clear()
+        else:
+            _xst_files.pop(os.path.abspath(path), None)
@@ -1,10 +1,14 @@
 # Author: Cameron F. Abrams, <cfa22@drexel.edu>
 import logging
 import os
+import tempfile
 import unittest
 
+from pathlib import Path
+
 from pestifer.charmmff.charmmffprm import (
     CharmmParamFile,
+    ParamParseCache,
 )
 
 logging.basicConfig(level=logging.DEBUG)
@@ -464,3 +468,63 @@ class TestCharmmParamFileRoundTrip(unittest.TestCase):
         original, reread = self._round_trip(_STR_TEXT, 'test_str_rt.prm')
         self.assertEqual(len(original.bonds), len(reread.bonds))
         self.assertEqual(len(original.nonbonded), len(reread.nonbonded))
+
+
+class TestParamParseCache(unittest.TestCase):
+    """Tests for the content-addressed parse cache behind from_file()/from_files()."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.cache = ParamParseCache(self.dir / 'cache')
+        self.prm = self.dir / 'a.prm'
+        self.prm.write_text(_PRM_TEXT)
+        self.str = self.dir / 'b.str'
+        self.str.write_text(_STR_TEXT)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_cached_parse_matches_fresh_parse(self):
+        fresh = CharmmParamFile.from_text(_PRM_TEXT)
+        first = CharmmParamFile.from_file(str(self.prm), cache=self.cache)
+        # a new cache on the same directory must hit the persisted entry
+        second = CharmmParamFile.from_file(str(self.prm), cache=ParamParseCache(self.dir / 'cache'))
+        for parsed in (first, second):
+            self.assertEqual(parsed.bonds, fresh.bonds)
+            self.assertEqual(parsed.dihedrals, fresh.dihedrals)
+            self.assertEqual(parsed.nonbonded, fresh.nonbonded)
+            self.assertEqual(parsed.nonbonded_header, fresh.nonbonded_header)
+        self.assertEqual(len(list((self.dir / 'cache').glob('*.pkl'))), 1)
+
+    def test_cache_is_keyed_by_content_not_name(self):
+        copy = self.dir / 'renamed.prm'
+        copy.write_text(_PRM_TEXT)
+        CharmmParamFile.from_file(str(self.prm), cache=self.cache)
+        CharmmParamFile.from_file(str(copy), cache=self.cache)
+        self.assertEqual(len(list((self.dir / 'cache').glob('*.pkl'))), 1)
+
+    def test_cached_records_are_independent_copies(self):
+        a = CharmmParamFile.from_file(str(self.prm), cache=self.cache)
+        a.nonbonded.clear()
+        a.bonds[0].Kb = -1.0
+        b = CharmmParamFile.from_file(str(self.prm), cache=self.cache)
+        self.assertTrue(b.nonbonded)
+        self.assertNotEqual(b.bonds[0].Kb, -1.0)
+
+    def test_damaged_entry_is_a_miss(self):
+        CharmmParamFile.from_file(str(self.prm), cache=self.cache)
+        for f in (self.dir / 'cache').glob('*.pkl'):
+            f.write_bytes(b'not a pickle')
+        parsed = CharmmParamFile.from_file(str(self.prm), cache=ParamParseCache(self.dir / 'cache'))
+        self.assertEqual(len(parsed.bonds), len(CharmmParamFile.from_text(_PRM_TEXT).bonds))
+
+    def test_from_files_preserves_order_and_reports_failures(self):
+        files = [str(self.prm), str(self.dir / 'absent.prm'), str(self.str)]
+        results = CharmmParamFile.from_files(files, cache=self.cache, processes=1)
+        self.assertEqual(len(results), 3)
+        self.assertIsInstance(results[1], OSError)
+        self.assertEqual(results[0].nonbonded, CharmmParamFile.from_text(_PRM_TEXT).nonbonded)
+        self.assertEqual(results[2].bonds, CharmmParamFile.from_text(_STR_TEXT).bonds)
+        self.assertEqual(len(list((self.dir / 'cache').glob('*.pkl'))), 2)
+
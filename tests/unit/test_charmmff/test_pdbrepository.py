@@ -2,7 +2,7 @@ import unittest
 import os
 from pathlib import Path
 from pestifer import resources
-from pestifer.charmmff.pdbrepository import PDBInput, PDBRepository, PDBCollection
+from pestifer.charmmff.pdbrepository import PDBInput, PDBRepository, PDBCollection, PDBCollectionIndex
 import logging
 logger = logging.getLogger(__name__)
 
@@ -61,6 +61,70 @@ class TestPDBCollection(unittest.TestCase):
         self.assertIsNone(mol.get_box_edge())
         self.assertIsNone(mol.get_box_psf())
 
+class TestPDBCollectionIndex(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        import yaml
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self._tmp.name, 'cache')
+        self.coll_dir = os.path.join(self._tmp.name, 'mycoll')
+        os.makedirs(os.path.join(self.coll_dir, 'LIPA'))
+        for i, dz in enumerate((10.0, 12.5)):
+            with open(os.path.join(self.coll_dir, 'LIPA', f'LIPA-{i:02d}.pdb'), 'w') as f:
+                f.write(f'ATOM      1  P   LIP X   1    {0.0:8.3f}{0.0:8.3f}{0.0:8.3f}  1.00  0.00      X    P\n'
+                        f'ATOM      2  C1  LIP X   1    {0.0:8.3f}{0.0:8.3f}{-dz:8.3f}  1.00  0.00      X    C\nEND\n')
+        with open(os.path.join(self.coll_dir, 'LIPA', 'info.yaml'), 'w') as f:
+            yaml.safe_dump({'charge': -1.0, 'conformers': [
+                {'pdb': 'LIPA-00.pdb', 'head-tail-length': 9.0},
+                {'pdb': 'LIPA-01.pdb', 'head-tail-length': 11.0}]}, f)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_rows_carry_compact_metadata(self):
+        row = PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache).entries['LIPA']
+        self.assertEqual(row['n_conformers'], 2)
+        self.assertEqual(row['z_extents'], [10.0, 12.5])
+        self.assertEqual(row['charge'], -1.0)
+        self.assertEqual(row['head_tail_lengths'], [9.0, 11.0])
+        self.assertFalse(row['is_box'])
+
+    def test_reopening_does_not_rescan_entries(self):
+        from unittest import mock
+        PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache)
+        with mock.patch.object(PDBCollectionIndex, '_scan', side_effect=AssertionError('rescanned')):
+            index = PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache)
+        self.assertIn('LIPA', index.entries)
+
+    def test_new_entry_invalidates_the_index(self):
+        PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache)
+        with open(os.path.join(self.coll_dir, 'SOLO.pdb'), 'w') as f:
+            f.write('ATOM      1 SOD  SOD X   1       0.0     0.0     0.0  1.00  0.00      X   NA\nEND\n')
+        index = PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache)
+        self.assertEqual(sorted(index.entries), ['LIPA', 'SOLO'])
+
+    def test_conformers_are_read_on_demand_and_memoized(self):
+        index = PDBCollectionIndex(self.coll_dir, 'mycoll', cache_dir=self.cache)
+        pdbi = index.checkout('LIPA')
+        self.assertEqual(len(pdbi.pdbcontents), 2)
+        self.assertEqual(pdbi.get_max_z_extent(), 12.5)   # from the index, no coordinates read
+        self.assertEqual(pdbi.pdbcontents._texts, {})
+        self.assertIn('C1  LIP', pdbi.pdbcontents[1])
+        os.remove(os.path.join(self.coll_dir, 'LIPA', 'LIPA-01.pdb'))
+        self.assertIn('C1  LIP', pdbi.pdbcontents[1])     # memoized
+
+    def test_tarball_is_extracted_once(self):
+        import tarfile
+        tgz = os.path.join(self._tmp.name, 'mycoll.tgz')
+        with tarfile.open(tgz, 'w:gz') as tf:
+            tf.add(self.coll_dir, arcname='mycoll')
+        index = PDBCollectionIndex(tgz, 'mycoll', cache_dir=self.cache)
+        self.assertEqual(index.checkout('LIPA').get_z_extent(0), 10.0)
+        self.assertIn('C1', index.read('LIPA/LIPA-00.pdb'))
+        with self.assertRaises(ValueError):
+            PDBCollectionIndex(tgz, 'othername', cache_dir=self.cache)
+
 class TestShippedCollections(unittest.TestCase):
 
     def test_shipped_tarballs_carry_no_autocache_artifacts(self):
@@ -134,6 +134,28 @@ class TestPsfParamCheck(unittest.TestCase):
         missing = check_psf_parameters(psf, self.param)
         self.assertFalse(missing.any())
 
+    def test_reversed_improper_matches_wildcard(self):
+        # 'C X X O' must also resolve the improper listed in the opposite direction
+        psf = PSFContents(_write_psf(self.dir))
+        psf.token_lines['IMPHI'] = ['       4       1       2       3']
+        missing = check_psf_parameters(psf, self.param)
+        self.assertEqual(missing.impropers, [])
+
+    def test_distinct_terms_reported_once_in_order_of_appearance(self):
+        psf = PSFContents(_write_psf(self.dir))
+        self.param.bonds = []
+        # repeat every bond, in both directions
+        psf.token_lines['BOND'] = psf.token_lines['BOND'] + ['       2       1       4       3']
+        missing = check_psf_parameters(psf, self.param)
+        self.assertEqual([t for t, _ in missing.bonds], ['NH1-CT1', 'CT1-C', 'C-O'])
+        self.assertEqual(missing.bonds[0][1], 'ALA PROA1')
+
+    def test_term_with_unknown_serial_is_skipped(self):
+        psf = PSFContents(_write_psf(self.dir))
+        psf.token_lines['BOND'] = psf.token_lines['BOND'] + ['       1      99']
+        missing = check_psf_parameters(psf, self.param)
+        self.assertEqual(missing.bonds, [])
+
 
 if __name__ == '__main__':
     unittest.main()
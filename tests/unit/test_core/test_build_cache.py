@@ -0,0 +1,178 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""The content-addressed build cache: keys, storage, restore and eviction."""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from types import SimpleNamespace
+from unittest import mock
+
+from pestifer.core.artifacts import PDBFileArtifact, PSFFileArtifact, StateArtifacts
+from pestifer.core.build_cache import BuildCache, task_key
+from pestifer.core.controller import Controller
+from pestifer.core.pipeline import PipelineContext
+from pestifer.tasks.fetch import FetchTask
+from pestifer.tasks.psfgen import PsfgenTask
+
+
+def _task(taskname='psfgen', **specs):
+    return SimpleNamespace(taskname=taskname, specs=specs, cache_inputs=list)
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.cache = BuildCache(directory=os.path.join(self.tmp, 'store'), pestifer_version='1.0')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(name, 'w') as f:
+            f.write(text)
+        return name
+
+    def test_key_covers_spec_inputs_files_and_versions(self):
+        base = task_key(_task(), {'psf': 'a'}, '1.0', 'c36')
+        self.assertEqual(base, task_key(_task(), {'psf': 'a'}, '1.0', 'c36'))
+        self.assertNotEqual(base, task_key(_task(minimize=True), {'psf': 'a'}, '1.0', 'c36'))
+        self.assertNotEqual(base, task_key(_task(), {'psf': 'b'}, '1.0', 'c36'))
+        self.assertNotEqual(base, task_key(_task(), {'psf': 'a'}, '1.1', 'c36'))
+        self.assertNotEqual(base, task_key(_task(), {'psf': 'a'}, '1.0', 'c35'))
+        self.write('extra.pdb', 'ATOM 1\n')
+        first = task_key(_task(pdb='extra.pdb'), {}, '1.0', 'c36')
+        self.write('extra.pdb', 'ATOM 2\n')
+        self.assertNotEqual(first, task_key(_task(pdb='extra.pdb'), {}, '1.0', 'c36'))
+
+    def test_key_covers_upstream_keys(self):
+        base = task_key(_task(), {}, upstream=['fetch-6pti'])
+        self.assertEqual(base, task_key(_task(), {}, upstream=['fetch-6pti']))
+        self.assertNotEqual(base, task_key(_task(), {}, upstream=['fetch-4zmj']))
+        self.assertEqual(task_key(_task(), {}, upstream=['a', 'b']), task_key(_task(), {}, upstream=['b', 'a']))
+
+    def test_key_covers_cache_inputs(self):
+        task = _task()
+        task.cache_inputs = lambda: ['1abc.pdb']
+        self.write('1abc.pdb', 'ATOM 1\n')
+        first = task_key(task, {})
+        self.write('1abc.pdb', 'ATOM 2\n')
+        self.assertNotEqual(first, task_key(task, {}))
+
+    def test_put_get_restore_round_trip(self):
+        self.write('my_5.psf', 'psf')
+        self.write('my_5.pdb', 'pdb')
+        key = self.cache.key(_task(), {})
+        self.assertIsNone(self.cache.get(key))
+        self.assertTrue(self.cache.put(key, 'psfgen', {'psf': 'my_5.psf', 'pdb': 'my_5.pdb'},
+                                       data={'base_coordinates': [1, 2]}))
+        entry = self.cache.get(key)
+        self.assertEqual(entry['data'], {'base_coordinates': [1, 2]})
+        os.mkdir('elsewhere')
+        restored = self.cache.restore(entry, 'elsewhere')
+        self.assertEqual(restored, {'psf': 'my_5.psf', 'pdb': 'my_5.pdb'})
+        with open(os.path.join('elsewhere', 'my_5.psf')) as f:
+            self.assertEqual(f.read(), 'psf')
+
+    def test_identical_files_are_stored_once(self):
+        self.write('a.pdb', 'same')
+        self.write('b.pdb', 'same')
+        self.cache.put('k1', 't1', {'pdb': 'a.pdb'})
+        self.cache.put('k2', 't2', {'pdb': 'b.pdb'})
+        blobs = [p for p in (self.cache.directory / 'blobs').rglob('*') if p.is_file()]
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_bytes = 2500
+        for i in range(3):
+            self.write(f'f{i}.pdb', str(i) * 1000)
+            self.cache.put(f'k{i}', f't{i}', {'pdb': f'f{i}.pdb'})
+            if i == 1:
+                time.sleep(0.05)
+                self.assertIsNotNone(self.cache.get('k0'))     # k0 is now more recent than k1
+            time.sleep(0.05)
+        self.assertIsNotNone(self.cache.get('k0'))
+        self.assertIsNone(self.cache.get('k1'))
+        self.assertIsNotNone(self.cache.get('k2'))
+        blobs = [p for p in (self.cache.directory / 'blobs').rglob('*') if p.is_file()]
+        self.assertEqual(len(blobs), 2)
+
+    def test_entry_with_missing_blob_misses_and_clear_empties(self):
+        self.write('a.pdb', 'x')
+        self.cache.put('k', 't', {'pdb': 'a.pdb'})
+        shutil.rmtree(self.cache.directory / 'blobs')
+        self.assertIsNone(self.cache.get('k'))
+        self.assertEqual(self.cache.clear(), 1)
+        self.assertEqual(self.cache.entries(), [])
+
+
+def _fake_fetch(task):
+    """Stand-in for FetchTask.do: the "downloaded" structure is just its ID."""
+    sourceID = task.specs['sourceID']
+    with open(f'{sourceID}.pdb', 'w') as f:
+        f.write(f'{sourceID}\n')
+    task.register(sourceID, key='base_coordinates', artifact_type=PDBFileArtifact)
+    return 0
+
+
+def _fake_psfgen(task):
+    """Stand-in for PsfgenTask.do: "builds" a PSF/PDB pair carrying the fetched structure."""
+    with open(task.get_current_artifact('base_coordinates').name) as f:
+        source = f.read()
+    for ext in ('psf', 'pdb'):
+        with open(f'build.{ext}', 'w') as f:
+            f.write(source)
+    task.register(dict(psf=PSFFileArtifact('build'), pdb=PDBFileArtifact('build')), key='state',
+                  artifact_type=StateArtifacts)
+    return 0
+
+
+class TestBuildCacheController(unittest.TestCase):
+    """fetch -> psfgen builds of different structures, with identical psfgen specs."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        self.cache = BuildCache(directory=os.path.join(self.tmp, 'store'), pestifer_version='1.0')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _build(self, builddir, sourceID):
+        os.makedirs(os.path.join(self.tmp, builddir))
+        os.chdir(os.path.join(self.tmp, builddir))
+        c = Controller()
+        c.config = SimpleNamespace(ncpus=1, ngpus=0)
+        c.pipeline = PipelineContext(controller_index=0)
+        c.build_cache = self.cache
+        c.tasks = [FetchTask(specs={'source': 'rcsb', 'sourceID': sourceID}, index=0),
+                   PsfgenTask(specs={'mods': {}}, index=1)]
+        for task in c.tasks:
+            task.provision({'pipeline': c.pipeline, 'controller_index': 0})
+        # with no force field here, the continuation that registers restored files is skipped
+        with mock.patch.object(FetchTask, 'do', _fake_fetch), \
+             mock.patch.object(PsfgenTask, 'do', autospec=True, side_effect=_fake_psfgen) as psfgen, \
+             mock.patch.object(Controller, '_continue_from_state', return_value=True):
+            report = c.do_tasks()
+        self.assertEqual([r['result'] for r in report.values()], [0] * len(report))
+        with open('build.pdb') as f:
+            return psfgen.call_count, f.read().strip()
+
+    def test_source_id_reaches_psfgen_key(self):
+        self.assertEqual(self._build('a', '6pti'), (1, '6pti'))
+        # the same psfgen specs on another structure must not hit the first build's entry
+        self.assertEqual(self._build('b', '4zmj'), (1, '4zmj'))
+        # and each build's entries survive the other: rebuilding either restores its own protein
+        self.assertEqual(self._build('c', '6pti'), (0, '6pti'))
+        self.assertEqual(self._build('d', '4zmj'), (0, '4zmj'))
+
+
+if __name__ == '__main__':
+    unittest.main()
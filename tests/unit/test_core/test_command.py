@@ -24,6 +24,51 @@ class TestCommand(unittest.TestCase):
         self.assertEqual(set(command_mod._active_children), before)
 
 
+class TestCommandStreaming(unittest.TestCase):
+    """Both pipes are pumped together in chunks; only a bounded tail of each is kept."""
+
+    def test_chatty_stderr_does_not_stall_the_child(self):
+        # 4 MB on stderr would fill its pipe and hang a reader that drains only stdout
+        c = Command('python3 -c "import sys; sys.stderr.write(\'e\' * (1 << 22)); print(\'done\')"')
+        self.assertEqual(c.run(), 0)
+        self.assertEqual(c.stdout, 'done\n')
+        self.assertEqual(c.stderr, 'e' * Command.tail_chars)   # the retained tail
+
+    def test_only_the_tail_is_retained(self):
+        c = Command('seq 1 200000')
+        c.tail_chars = 1000
+        self.assertEqual(c.run(), 0)
+        self.assertLessEqual(len(c.stdout), 1000)
+        self.assertTrue(c.stdout.endswith('199999\n200000\n'))
+
+    def test_logfile_gets_everything(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as d:
+            logfile = os.path.join(d, 'seq.log')
+            c = Command('seq 1 100000')
+            c.tail_chars = 100
+            c.run(logfile=logfile)
+            with open(logfile) as f:
+                self.assertEqual(f.read(), ''.join(f'{i}\n' for i in range(1, 100001)))
+
+    def test_override_needle_found_outside_the_tail(self):
+        from unittest import mock
+        c = Command('echo FATAL ERROR; seq 1 50000')
+        c.tail_chars = 100
+        with mock.patch.object(command_mod.logger, 'error') as m_error:
+            c.run(override=('FATAL ERROR', 'a fatal error'))
+        m_error.assert_any_call('a fatal error')
+
+    def test_parser_is_updated_in_batches(self):
+        from pestifer.logparsers import LogParser
+        parser = LogParser()
+        calls = []
+        parser.update = lambda text: (calls.append(len(text)), LogParser.update(parser, text))
+        Command('seq 1 100000').run(logparser=parser)
+        self.assertEqual(parser.byte_collector, ''.join(f'{i}\n' for i in range(1, 100001)))
+        self.assertLess(len(calls), 100)
+
+
 class TestChildShutdown(unittest.TestCase):
     """The teardown machinery that turns Ctrl-C / kill into a clean shutdown of the
     whole external-process tree (charmrun -> namd3 -> PEs)."""
@@ -289,9 +289,9 @@ class TestConfig(unittest.TestCase):
                 self.assertTrue('base' in c)
                 self.assertTrue('user' in c)
                 D = c['base']['attributes']
-                self.assertEqual(len(D), 6)
+                self.assertEqual(len(D), 7)
                 tld = [x['name'] for x in D]
-                self.assertEqual(tld, ['charmmff', 'psfgen', 'namd', 'title', 'paths', 'tasks'])
+                self.assertEqual(tld, ['charmmff', 'psfgen', 'namd', 'title', 'paths', 'vmd', 'tasks'])
                 T = D[tld.index('title')]
                 self.assertEqual(T['name'], 'title')
                 self.assertEqual(T['type'], 'str')
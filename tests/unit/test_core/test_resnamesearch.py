@@ -0,0 +1,72 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""Unit tests for the residue-name n-gram search index."""
+import unittest
+
+from pestifer.core.resnamesearch import ResnameSearchIndex
+
+_SYNONYMS = {
+    'POPC': '1-palmitoyl-2-oleoyl-sn-glycero-3-phosphocholine',
+    'POPE': '1-palmitoyl-2-oleoyl-sn-glycero-3-phosphoethanolamine',
+    'DPPC': 'dipalmitoylphosphatidylcholine',
+    'CHL1': 'cholesterol',
+    'TIP3': '',
+    'SOD': 'sodium ion',
+    'ALA': '',
+    'PO4': '',
+}
+
+
+class TestResnameSearchIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = ResnameSearchIndex(_SYNONYMS)
+
+    def _brute(self, needle, synonyms=False):
+        n = needle.upper()
+        return sorted(k for k, v in _SYNONYMS.items()
+                      if n in k.upper() or (synonyms and n in v.upper()))
+
+    def test_contains_agrees_with_a_linear_scan(self):
+        for needle in ('p', 'PO', 'pop', 'POPC', 'OPE', 'ZZ', '3', 'chol', 'oleoyl', 'x'):
+            self.assertEqual(self.index.contains(needle), self._brute(needle), needle)
+            self.assertEqual(self.index.contains(needle, synonyms=True),
+                             self._brute(needle, synonyms=True), needle)
+
+    def test_synonym_search(self):
+        self.assertEqual(self.index.contains('cholesterol', synonyms=True), ['CHL1'])
+        self.assertEqual(self.index.contains('phosphocholine', synonyms=True), ['POPC'])
+        self.assertEqual(self.index.contains('cholesterol'), [])
+
+    def test_startswith(self):
+        self.assertEqual(self.index.startswith('po'), ['PO4', 'POPC', 'POPE'])
+        self.assertEqual(self.index.startswith('Q'), [])
+
+    def test_membership_and_length(self):
+        self.assertIn('popc', self.index)
+        self.assertNotIn('POPX', self.index)
+        self.assertEqual(len(self.index), len(_SYNONYMS))
+
+    def test_fuzzy_ranks_near_misses_first(self):
+        self.assertEqual(self.index.fuzzy('POPX', limit=2), ['POPC', 'POPE'])
+        self.assertEqual(self.index.fuzzy('CHL'), ['CHL1'])
+        self.assertEqual(self.index.fuzzy('QQQQQ'), [])
+
+    def test_shared_index_is_built_once_per_key(self):
+        calls = []
+
+        def synonyms():
+            calls.append(1)
+            return dict(_SYNONYMS)
+
+        ResnameSearchIndex.forget_shared()
+        a = ResnameSearchIndex.shared('k', synonyms)
+        b = ResnameSearchIndex.shared('k', synonyms)
+        self.assertIs(a, b)
+        self.assertEqual(len(calls), 1)
+        ResnameSearchIndex.forget_shared()
+        self.assertIsNot(ResnameSearchIndex.shared('k', synonyms), a)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""The dependency-aware task scheduler, driven by stand-in tasks."""
+import threading
+import time
+import unittest
+
+from types import SimpleNamespace
+
+from pestifer.core.controller import _ManifestRecorder
+from pestifer.core.scheduler import TaskScheduler
+
+
+class _Task:
+    """A task that naps, notes the thread it ran on, and returns ``result``."""
+
+    def __init__(self, index, nap=0.0, result=0, light=False):
+        self.index = index
+        self.taskname = f'task{index}'
+        self.nap = nap
+        self.returns = result
+        self.light = light
+        self.result = None
+        self.thread = None
+
+    def resource_demand(self, ncpus, ngpus):
+        return (1, 0) if self.light else (ncpus, ngpus)
+
+    def execute(self):
+        self.thread = threading.current_thread()
+        time.sleep(self.nap)
+        self.result = self.returns
+        return self.result
+
+
+class _Light(_Task):
+    pass
+
+
+class _Other(_Task):
+    pass
+
+
+class TestTaskScheduler(unittest.TestCase):
+
+    def test_exclusive_tasks_run_in_order_on_the_calling_thread(self):
+        tasks = [_Task(i) for i in range(4)]
+        done = TaskScheduler(tasks, {}, ncpus=8).run()
+        self.assertEqual([t.index for t in done], [0, 1, 2, 3])
+        self.assertTrue(all(t.thread is threading.current_thread() for t in tasks))
+
+    def test_independent_light_tasks_overlap(self):
+        tasks = [_Task(0), _Light(1, nap=0.4, light=True), _Other(2, nap=0.4, light=True), _Task(3)]
+        deps = {1: {0}, 2: {0}, 3: {0, 1, 2}}
+        scheduler = TaskScheduler(tasks, deps, ncpus=2)
+        t0 = time.monotonic()
+        done = scheduler.run()
+        self.assertLess(time.monotonic() - t0, 0.75)
+        self.assertEqual(scheduler.max_concurrent, 2)
+        self.assertEqual(done[-1].index, 3)
+
+    def test_budget_and_class_limit_overlap(self):
+        deps = {1: {0}, 2: {0}}
+        one_cpu = TaskScheduler([_Task(0), _Light(1, light=True), _Other(2, light=True)], deps, ncpus=1)
+        one_cpu.run()
+        self.assertEqual(one_cpu.max_concurrent, 1)
+        same_class = TaskScheduler([_Task(0), _Light(1, light=True), _Light(2, light=True)], deps, ncpus=4)
+        same_class.run()
+        self.assertEqual(same_class.max_concurrent, 1)
+
+    def test_failure_stops_new_tasks(self):
+        tasks = [_Task(0), _Light(1, nap=0.2, light=True), _Other(2, result=3, light=True), _Task(3)]
+        done = TaskScheduler(tasks, {1: {0}, 2: {0}, 3: {1, 2}}, ncpus=2).run()
+        self.assertEqual(sorted(t.index for t in done), [0, 1, 2])
+        self.assertIsNone(tasks[3].result)
+
+    def test_exception_is_reraised_after_running_tasks_finish(self):
+        class Boom(_Other):
+            def execute(self):
+                raise RuntimeError('boom')
+        tasks = [_Light(0, nap=0.2, light=True), Boom(1, light=True)]
+        with self.assertRaises(RuntimeError):
+            TaskScheduler(tasks, {}, ncpus=2).run()
+        self.assertEqual(tasks[0].result, 0)
+
+
+class TestManifestRecorder(unittest.TestCase):
+
+    def test_records_in_pipeline_order_with_serial_state(self):
+        from pestifer.tasks.pipeline_contract import TaskContract, STATE, MD_OUTPUT
+        recorded = []
+        manifest = SimpleNamespace(record=lambda task, pipeline, task_spec_hash=None, state=None:
+                                   recorded.append((task.index, state)))
+        contracts = {0: TaskContract(requires=(STATE,), provides=(STATE, MD_OUTPUT)),
+                     1: TaskContract(requires=(MD_OUTPUT,), provides=()),
+                     2: TaskContract(requires=(STATE,), provides=())}
+        tasks = [_Task(i) for i in range(3)]
+        for t in tasks:
+            t.specs = {}
+            t.result = 0
+            t.pipeline_contract = (lambda c: lambda specs: c)(contracts[t.index])
+        recorder = _ManifestRecorder(manifest, None, tasks)
+        recorder.finished(tasks[0], 'h0', 'state-after-md')
+        recorder.finished(tasks[2], 'h2', 'state-after-validate')
+        self.assertEqual([i for i, _ in recorded], [0])
+        recorder.finished(tasks[1], 'h1', 'state-later')
+        self.assertEqual(recorded, [(0, 'state-after-md'), (1, 'state-after-md'), (2, 'state-after-validate')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""Opt-in build profiling: task spans, external commands, hot sections and the trace."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from types import SimpleNamespace
+
+from pestifer.core import telemetry
+from pestifer.core.command import Command
+from pestifer.core.run_record import build_run_record
+
+
+@telemetry.profiled('busy')
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        telemetry.disable()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_hooks_are_inert_when_off(self):
+        self.assertIsNone(telemetry.active())
+        self.assertIsNone(telemetry.command_probe('true'))
+        with telemetry.task_span(SimpleNamespace(index=0, taskname='t')), telemetry.section('s'):
+            self.assertEqual(_busy(10), 285)
+
+    def test_task_commands_and_sections_are_recorded(self):
+        session = telemetry.enable()
+        task = SimpleNamespace(index=3, taskname='psfgen', controller_index=0, result=0)
+        with telemetry.task_span(task):
+            _busy(200000)
+            with telemetry.section('busy'):          # re-entered: counted once
+                _busy(10)
+            rc = Command(f'{sys.executable} -c "sum(range(3000000))"').run()
+        self.assertEqual(rc, 0)
+        report = session.report()
+        record, = report['tasks']
+        self.assertEqual((record['index'], record['taskname'], record['result']), (3, 'psfgen', 0))
+        self.assertGreater(record['wall_s'], 0.0)
+        self.assertGreater(record['cpu_s'], 0.0)
+        self.assertGreater(record['peak_rss_mb'], 0.0)
+        command, = record['commands']
+        self.assertEqual(command['returncode'], 0)
+        self.assertGreater(command['cpu_s'], 0.0)
+        self.assertGreater(command['peak_rss_mb'], 0.0)
+        self.assertEqual(record['sections']['busy']['calls'], 2)
+        self.assertEqual(report['sections']['busy']['calls'], 2)
+        json.dumps(build_run_record(None, [], telemetry=report))
+
+    def test_nonzero_exit_is_reported_through_the_probe(self):
+        telemetry.enable()
+        self.assertEqual(Command(f'{sys.executable} -c "import sys; sys.exit(4)"').run(), 4)
+
+    def test_nested_tasks_name_their_parent_and_trace_is_written(self):
+        session = telemetry.enable()
+        outer = SimpleNamespace(index=0, taskname='make_membrane_system', controller_index=0)
+        inner = SimpleNamespace(index=1, taskname='md', controller_index=1)
+        with telemetry.task_span(outer):
+            with telemetry.task_span(inner):
+                _busy(10)
+        records = {r['taskname']: r for r in session.report()['tasks']}
+        self.assertEqual(records['md']['parent'], '0:00:make_membrane_system')
+        self.assertIsNone(records['make_membrane_system']['parent'])
+        session.write_trace('trace.json')
+        with open('trace.json') as f:
+            events = json.load(f)['traceEvents']
+        spans = [e for e in events if e['ph'] == 'X']
+        self.assertEqual(sorted(e['cat'] for e in spans), ['section', 'task', 'task'])
+        self.assertIn('thread_name', {e['name'] for e in events if e['ph'] == 'M'})
+
+
+if __name__ == '__main__':
+    unittest.main()
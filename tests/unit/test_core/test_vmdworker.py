@@ -0,0 +1,126 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""The persistent-worker loop, driven by plain ``tclsh`` standing in for VMD."""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from importlib.resources import files
+
+from pestifer.core.vmdworker import VMDWorker, VMDWorkerPool
+from pestifer.logparsers import VMDLogParser
+
+WORKER_TCL = str(files('pestifer.resources').joinpath('tcl', 'worker.tcl'))
+TCLSH = f'tclsh {WORKER_TCL}'
+
+
+@unittest.skipIf(shutil.which('tclsh') is None, 'tclsh not available')
+class TestVMDWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.worker = VMDWorker(TCLSH)
+
+    def tearDown(self):
+        self.worker.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def script(self, name, text):
+        with open(name, 'w') as f:
+            f.write(text)
+        return name
+
+    def test_return_codes(self):
+        self.assertEqual(self.worker.run(self.script('a.tcl', 'puts hi\n')), 0)
+        self.assertEqual(self.worker.run(self.script('b.tcl', 'puts hi\nexit\nputs unreached\n')), 0)
+        self.assertEqual(self.worker.run(self.script('c.tcl', 'exit 3\n')), 3)
+        self.assertEqual(self.worker.run(self.script('d.tcl', 'error boom\n')), 1)
+        self.assertTrue(self.worker.alive)
+
+    def test_log_holds_exactly_the_job_output(self):
+        self.worker.run(self.script('a.tcl', 'for {set i 0} {$i < 50000} {incr i} {puts "line $i"}\n'),
+                        logfile='a.log')
+        with open('a.log') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 50000)
+        self.assertEqual(lines[-1], 'line 49999')
+        self.worker.run(self.script('b.tcl', 'puts second\n'), logfile='b.log')
+        with open('b.log') as f:
+            self.assertEqual(f.read(), 'second\n')
+
+    def test_logparser_is_fed(self):
+        lp = VMDLogParser(basename='w')
+        self.worker.run(self.script('a.tcl', 'puts "Info) something"\n'), logparser=lp)
+        self.assertIn('Info) something', lp.byte_collector)
+
+    def test_each_job_starts_clean(self):
+        os.mkdir('sub')
+        self.script('sub/a.tcl', 'set leftover 1\nputs "argv=$argv"\ncd /\n')
+        self.worker.run(os.path.join('sub', 'a.tcl'), args=['-pdb', 'x y.pdb'], logfile='a.log')
+        with open('a.log') as f:
+            self.assertEqual(f.read(), 'argv=-pdb {x y.pdb}\n')
+        self.worker.run(self.script('b.tcl', 'puts "[info exists leftover] $argc [pwd]"\n'), logfile='b.log')
+        with open('b.log') as f:
+            self.assertEqual(f.read(), f'0 0 {os.path.realpath(self.tmp)}\n')
+
+    def test_worker_dying_under_a_job(self):
+        self.assertEqual(self.worker.run(self.script('a.tcl', 'puts bye\n::pestifer_worker::real_exit 7\n')), 1)
+        self.assertFalse(self.worker.alive)
+
+
+@unittest.skipIf(shutil.which('tclsh') is None, 'tclsh not available')
+class TestVMDWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_workers_are_reused_and_retired(self):
+        with open('pid.tcl', 'w') as f:
+            f.write('puts [pid]\n')
+        pool = VMDWorkerPool(TCLSH, size=1, max_jobs=2)
+        pids = []
+        for i in range(3):
+            pool.run('pid.tcl', logfile='pid.log', overwrite_logs=True)
+            with open('pid.log') as f:
+                pids.append(f.read().strip())
+        pool.close()
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_concurrent_callers_get_separate_workers(self):
+        with open('nap.tcl', 'w') as f:
+            f.write('after 500\n')
+        pool = VMDWorkerPool(TCLSH, size=2)
+        pool.run('nap.tcl')     # warm one worker up front, so the timing below excludes startup
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(pool.run('nap.tcl'))) for _ in range(2)]
+        t0 = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - t0
+        pool.close()
+        self.assertEqual(results, [0, 0])
+        self.assertLess(elapsed, 0.95)
+
+    def test_unstartable_worker_disables_the_pool(self):
+        pool = VMDWorkerPool('false')
+        self.assertIsNone(pool.run('anything.tcl'))
+        self.assertFalse(pool.available)
+        self.assertIsNone(pool.run('anything.tcl'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,10 @@ import unittest
 import numpy as np
 from scipy.spatial import cKDTree
 
-from pestifer.psfutil.declash import declash_pendant, declash_loop, _contact_count
+from pestifer.psfutil.declash import (declash_pendant, declash_pendants, declash_loop, declash_loops,
+                                      dependency_waves, pendant_clusters, _contact_count,
+                                      _rotation_trials, _PENDANT_DEGS)
+from pestifer.util.coord import rotate_points_about_axis
 
 
 class TestDeclashPendant(unittest.TestCase):
@@ -26,6 +29,29 @@ class TestDeclashPendant(unittest.TestCase):
         after = _contact_count(cKDTree(coords[env]), coords[pend], 2.0)   # env is static
         self.assertLessEqual(after, before)
 
+    def test_incremental_count_matches_a_recount(self):
+        rng = np.random.default_rng(4)
+        coords = rng.normal(scale=2.0, size=(40, 3))
+        pend, env = np.arange(0, 30, 2), np.arange(30, 40)
+        bonds = [(0, 1), (3, 4), (7, 8)]
+        movers = [np.arange(2, 30), np.arange(5, 20), np.array([9, 10, 11, 26])]
+        n = declash_pendant(coords, pend, env, bonds, movers, 60, 2.0, rng)
+        self.assertEqual(n, _contact_count(cKDTree(coords[env]), coords[pend], 2.0))
+
+    def test_cycle_keeps_the_best_angle(self):
+        # one cycle over the only bond scores every increment and keeps the lowest count
+        rng = np.random.default_rng(6)
+        coords = rng.normal(scale=2.0, size=(30, 3))
+        pend, env = np.arange(10), np.arange(10, 30)
+        tree = cKDTree(coords[env])
+        best = min(_contact_count(tree, rotate_points_about_axis(coords[pend[2:]], coords[0],
+                                                                  coords[1] - coords[0], d), 2.0)
+                   for d in _PENDANT_DEGS)
+        fixed = _contact_count(tree, coords[pend[:2]], 2.0)
+        start = fixed + _contact_count(tree, coords[pend[2:]], 2.0)
+        n = declash_pendant(coords, pend, env, [(0, 1)], [pend[2:]], 1, 2.0, rng)
+        self.assertEqual(n, min(start, fixed + best))
+
     def test_no_bonds_is_a_noop(self):
         coords = np.random.default_rng(2).normal(size=(6, 3))
         orig = coords.copy()
@@ -34,6 +60,17 @@ class TestDeclashPendant(unittest.TestCase):
         self.assertTrue(np.array_equal(coords, orig))
 
 
+class TestRotationTrials(unittest.TestCase):
+    def test_matches_single_rotations(self):
+        rng = np.random.default_rng(7)
+        pts, pivot, axis = rng.normal(size=(6, 3)), rng.normal(size=3), rng.normal(size=3)
+        degs = [-150.0, -30.0, 0.0, 45.0, 170.0]
+        trials = _rotation_trials(pts, pivot, axis, degs)
+        self.assertEqual(trials.shape, (5, 6, 3))
+        for t, d in zip(trials, degs):
+            np.testing.assert_allclose(t, rotate_points_about_axis(pts, pivot, axis, d), atol=1e-12)
+
+
 class TestDeclashLoop(unittest.TestCase):
     def test_reduces_loop_clash(self):
         # a "loop" mover atom overlaps an env atom; a phi rotation about N->CA moves it off
@@ -52,5 +89,103 @@ class TestDeclashLoop(unittest.TestCase):
         self.assertTrue(np.array_equal(coords, orig))
 
 
+class TestDependencyWaves(unittest.TestCase):
+    def test_far_apart_items_share_a_wave(self):
+        centers = [[0, 0, 0], [100, 0, 0], [200, 0, 0]]
+        wave, dep = dependency_waves(centers, [10, 10, 10], 2.0)
+        self.assertEqual(wave.tolist(), [0, 0, 0])
+        self.assertFalse(dep.any())
+
+    def test_dependent_items_follow_their_predecessors(self):
+        # 0-1 touch, 1-2 touch, 0-2 do not; 3 is alone
+        centers = [[0, 0, 0], [15, 0, 0], [30, 0, 0], [500, 0, 0]]
+        wave, dep = dependency_waves(centers, [7, 7, 7, 7], 2.0)
+        self.assertEqual(wave.tolist(), [0, 1, 2, 0])
+        self.assertTrue(dep[0, 1] and dep[1, 2] and not dep[0, 2])
+        self.assertTrue(np.array_equal(dep, dep.T))
+
+
+class TestDeclashLoops(unittest.TestCase):
+    @staticmethod
+    def _system(nloops, spacing):
+        # per loop: N, CA, and two movers overlapping two env atoms
+        rng = np.random.default_rng(5)
+        coords, loops, env = [], [], []
+        for i in range(nloops):
+            o = np.array([spacing * i, 0.0, 0.0])
+            block = o + np.array([[0., 0, 0], [0, 0, 1], [1, 0, 2], [1, 0, 3], [1, 0, 2], [1, 0, 3]])
+            block[2:] += rng.normal(scale=0.05, size=(4, 3))
+            r = len(coords)
+            coords.extend(block)
+            res = [{'pivot': r, 'axis_to': r + 1, 'movers': np.array([r + 2, r + 3]),
+                    'frag_heavy': np.array([r + 2, r + 3])}]
+            loops.append((res, np.array([r + 1, r + 2, r + 3])))
+            env += [r + 4, r + 5]
+        return np.array(coords), loops, np.array(env)
+
+    def test_independent_of_worker_count(self):
+        coords, loops, env = self._system(6, 40.0)
+        serial, parallel = coords.copy(), coords.copy()
+        a = declash_loops(serial, loops, env, 100, 1.5, 11, nworkers=1)
+        b = declash_loops(parallel, loops, env, 100, 1.5, 11, nworkers=3)
+        self.assertEqual(a, b)
+        self.assertTrue(np.array_equal(serial, parallel))
+        self.assertEqual(sum(a), 0)
+
+    def test_each_loop_seeded_by_index(self):
+        coords, loops, env = self._system(3, 40.0)
+        together = coords.copy()
+        declash_loops(together, loops, env, 100, 1.5, 11, nworkers=1)
+        for i, (res, _heavy) in enumerate(loops):
+            alone = coords.copy()
+            declash_loop(alone, res, env, 100, 1.5, np.random.default_rng(11 + i))
+            rows = res[0]['movers']
+            np.testing.assert_allclose(together[rows], alone[rows])
+
+    def test_dependent_loops_see_each_other(self):
+        coords, loops, env = self._system(2, 0.0)      # two loops on top of one another
+        declash_loops(coords, loops, env, 200, 1.5, 11, nworkers=2)
+        movers = np.concatenate([res[0]['movers'] for res, _ in loops])
+        self.assertEqual(_contact_count(cKDTree(coords[env]), coords[movers], 1.5), 0)
+
+
+class TestDeclashPendants(unittest.TestCase):
+    @staticmethod
+    def _system(spacing):
+        # five pendants of (i, j, mover, mover) along x; pendants 1 and 2 touch; env atoms sit
+        # on the movers
+        coords, pendants, env = [], [], []
+        for i, x in enumerate([0.0, spacing, spacing + 2.5, 3 * spacing, 4 * spacing]):
+            r = len(coords)
+            coords += [[x, 0, 0], [x, 0, 3], [x + 1, 0, 3], [x + 1, 0.5, 3.5], [x + 1, 0, 3], [x + 1, 0.5, 3.5]]
+            pendants.append((np.array([r + 2, r + 3]), [(r, r + 1)], [np.array([r + 2, r + 3])]))
+            env += [r + 4, r + 5]
+        return np.array(coords), pendants, np.array(env)
+
+    def test_clusters_join_touching_pendants(self):
+        coords, pendants, _env = self._system(30.0)
+        clusters = pendant_clusters(coords, [p[0] for p in pendants], 4.0)
+        self.assertEqual([c.tolist() for c in clusters], [[0], [1, 2], [3], [4]])
+
+    def test_independent_of_worker_count(self):
+        coords, pendants, env = self._system(30.0)
+        serial, parallel = coords.copy(), coords.copy()
+        a = declash_pendants(serial, pendants, env, 50, 1.5, 3, nworkers=1)
+        b = declash_pendants(parallel, pendants, env, 50, 1.5, 3, nworkers=2)
+        self.assertEqual(a, b)
+        self.assertTrue(np.array_equal(serial, parallel))
+        heavy = np.concatenate([p[0] for p in pendants])
+        self.assertLess(sum(a), _contact_count(cKDTree(coords[env]), coords[heavy], 1.5))
+
+    def test_each_pendant_seeded_by_index(self):
+        coords, pendants, env = self._system(30.0)
+        together = coords.copy()
+        declash_pendants(together, pendants, env, 50, 1.5, 3, nworkers=1)
+        for i, (heavy, bonds, movers) in enumerate(pendants):
+            alone = coords.copy()
+            declash_pendant(alone, heavy, env, bonds, movers, 50, 1.5, np.random.default_rng(3 + i))
+            np.testing.assert_allclose(together[heavy], alone[heavy])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pestifer.psfutil.embed import SlabHulls, clashing_residues, embed_prefill, placement_shift
+from pestifer.psfutil.loop_ccd import pdb_atoms
+from pestifer.psfutil.solvation import PSF_ATOM_DTYPE, _write_pdb, _write_psf, psf_remarks, read_psf
+
+
+def _empty_terms():
+    return {'bonds': np.empty((0, 2), dtype=np.int64), 'angles': np.empty((0, 3), dtype=np.int64),
+            'dihedrals': np.empty((0, 4), dtype=np.int64), 'impropers': np.empty((0, 4), dtype=np.int64),
+            'crossterms': np.empty((0, 8), dtype=np.int64)}
+
+
+def _membrane(n=10, spacing=8.0):
+    """An n x n grid of 2-atom "lipids" (segment L1) at z = +-10, with a water (WT1) over each."""
+    rows, xyz, bonds = [], [], []
+    g = (np.arange(n) - (n - 1) / 2) * spacing
+    k = 0
+    for x in g:
+        for y in g:
+            for z in (-10.0, 10.0):
+                k += 1
+                rows += [('L1', str(k), 'POPC', 'P', 'PL', 0.0, 30.0), ('L1', str(k), 'POPC', 'C2', 'CTL2', 0.0, 12.0)]
+                bonds.append([len(xyz), len(xyz) + 1])
+                xyz += [[x, y, z], [x, y, z - np.sign(z) * 1.5]]
+    for w, (x, y) in enumerate([(x, y) for x in g for y in g]):
+        rows.append(('WT1', str(w + 1), 'TIP3', 'OH2', 'OT', 0.0, 16.0))
+        xyz.append([x, y, 20.0])
+    terms = _empty_terms()
+    terms['bonds'] = np.array(bonds)
+    return np.array(rows, dtype=PSF_ATOM_DTYPE), terms, np.array(xyz)
+
+
+def _protein():
+    """A 4-residue "helix bundle" of 2-atom residues at the corners of a 12 A square, with a
+    hydrogen on each, and one crossterm."""
+    rows, xyz, bonds = [], [], []
+    for r, (x, y) in enumerate([(-6, -6), (6, -6), (6, 6), (-6, 6)]):
+        for z in np.arange(-15.0, 16.0, 3.0):
+            rows += [('PROA', str(r + 1), 'ALA', 'CA', 'CT1', 0.0, 12.0), ('PROA', str(r + 1), 'ALA', 'HA', 'HB1', 0.0, 1.0)]
+            bonds.append([len(xyz), len(xyz) + 1])
+            xyz += [[x, y, z], [x + 1.0, y, z]]
+    terms = _empty_terms()
+    terms['bonds'] = np.array(bonds)
+    terms['crossterms'] = np.array([[0, 2, 4, 6, 2, 4, 6, 8]])
+    return np.array(rows, dtype=PSF_ATOM_DTYPE), terms, np.array(xyz, dtype=float)
+
+
+class TestEmbedGeometry(unittest.TestCase):
+    def test_placement_shift(self):
+        m = np.array([[0.0, 0.0, -5.0], [10.0, 20.0, 5.0]])
+        p = np.array([[1.0, 1.0, 1.0], [3.0, 3.0, 3.0]])
+        shift = placement_shift(m, [1.0, 3.0], p, [1.0, 1.0], protein_mid_z=2.0, z_value=1.0)
+        np.testing.assert_allclose(shift, [5.0 - 2.0, 10.0 - 2.0, 2.5 - 2.0 - 1.0])
+
+    def test_slab_hulls(self):
+        _, _, xyz = _protein()
+        hulls = SlabHulls(xyz, thickness=4.0)
+        pts = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, -14.0], [10.0, 0.0, 0.0], [0.0, 0.0, 40.0]])
+        np.testing.assert_array_equal(hulls.contains(pts), [True, True, False, False])
+
+    def test_clashing_residues_drops_whole_residues(self):
+        atoms, _, xyz = _membrane()
+        p_atoms, _, p_xyz = _protein()
+        heavy = p_xyz[p_atoms['name'] == 'CA']
+        drop = clashing_residues(atoms, xyz, heavy, margin=2.4)
+        resid = np.char.add(atoms['segname'], atoms['resid'])
+        for r in np.unique(resid):
+            self.assertEqual(len(set(drop[resid == r].tolist())), 1)
+        # lipids inside the bundle go even though no atom is within the margin; water stays
+        inside = (np.abs(xyz[:, 0]) < 6) & (np.abs(xyz[:, 1]) < 6)
+        lipid = atoms['resname'] == 'POPC'
+        self.assertTrue(np.all(drop[inside & lipid]))
+        self.assertFalse(np.any(drop[atoms['resname'] == 'TIP3']))
+        self.assertFalse(np.any(clashing_residues(atoms, xyz, heavy, hull_thickness=None)[inside & lipid]))
+        d = np.linalg.norm(xyz[:, None] - heavy[None], axis=-1).min(axis=1)
+        self.assertTrue(np.all(drop[d < 2.4]))
+
+
+class TestEmbedPrefill(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_prefill_round_trip(self):
+        m_atoms, m_terms, m_xyz = _membrane()
+        p_atoms, p_terms, p_xyz = _protein()
+        p_xyz = p_xyz + [30.0, -20.0, 0.0]
+        _write_psf('pro.psf', p_atoms, p_terms, ['topology top_all36_prot.rtf',
+                                                 'segment PROA { first NTER; last CTER; auto angles dihedrals }'])
+        _write_pdb('pro.pdb', p_atoms, p_xyz, 'A')
+        _write_psf('mem.psf', m_atoms, m_terms, ['topology top_all36_lipid.rtf',
+                                                 'segment L1 { first NONE; last NONE; auto none }',
+                                                 'segment WT1 { first NONE; last NONE; auto none }'])
+        _write_pdb('mem.pdb', m_atoms, m_xyz, 'L')
+        shift, nremoved = embed_prefill('emb', 'pro.psf', 'pro.pdb', 'mem.psf', 'mem.pdb')
+        # laterally centered (the hydrogens pull the protein's center 1/13 A off its CAs); with no
+        # reference depth the protein's z = 0 goes to the membrane's center of mass
+        np.testing.assert_allclose(shift, [-30.0 - 1 / 13, 20.0, np.average(m_xyz[:, 2], weights=m_atoms['mass'])],
+                                   atol=1e-3)
+        np.testing.assert_allclose(pdb_atoms('emb_embedded.pdb')['xyz'], p_xyz + shift, atol=1e-3)
+        atoms, terms = read_psf('emb_prefill.psf')
+        xyz = pdb_atoms('emb_prefill.pdb')['xyz']
+        self.assertEqual(nremoved, 8)
+        self.assertEqual(len(atoms), len(p_atoms) + len(m_atoms) - 2 * nremoved)
+        self.assertEqual(len(xyz), len(atoms))
+        self.assertEqual(atoms['segname'][:len(p_atoms)].tolist(), ['PROA'] * len(p_atoms))
+        self.assertEqual(terms['crossterms'].tolist(), p_terms['crossterms'].tolist())
+        self.assertEqual(len(terms['bonds']), len(p_terms['bonds']) + len(m_terms['bonds']) - nremoved)
+        np.testing.assert_array_equal(atoms['name'][terms['bonds']][len(p_terms['bonds']):],
+                                      np.tile(['P', 'C2'], (len(m_terms['bonds']) - nremoved, 1)))
+        self.assertEqual(psf_remarks('emb_prefill.psf'),
+                         ['topology top_all36_prot.rtf', 'segment PROA { first NTER; last CTER; auto angles dihedrals }',
+                          'topology top_all36_lipid.rtf', 'segment L1 { first NONE; last NONE; auto none }',
+                          'segment WT1 { first NONE; last NONE; auto none }'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -521,3 +521,134 @@ class TestLoopClashReport(unittest.TestCase):
         rep = loop_clash_report(order, coords, [10, 12])
         self.assertEqual(rep['n_deep'], 0)
         self.assertFalse(rep['topological'])
+
+
+class TestBatchedCCD(unittest.TestCase):
+    """The batched engine must give every seed the result the serial functions give it alone."""
+
+    @classmethod
+    def setUpClass(cls):
+        from pathlib import Path
+        from pestifer.psfutil.loop_ccd import (loop_atoms_from_pdb, build_loop_problem,
+                                               backbone_from_pdb, anchor_closure_target)
+        pdb = str(Path(__file__).parents[2] / 'inputs' / '6pti.pdb')
+        cls.loop = [24, 25, 26, 27, 28]
+        cls.bb = backbone_from_pdb(pdb, chainID='A')
+        cls.order, coords, _ = loop_atoms_from_pdb(pdb, cls.loop, chainID='A')
+        cls.prob = build_loop_problem(cls.order, coords, cls.loop)
+        r = cls.prob['row']
+        cls.end_idx = [r[(28, 'CA')], r[(28, 'C')]]
+        cls.target = anchor_closure_target(cls.bb[29]['N'], cls.bb[29]['CA'], cls.bb[29]['C'])[[0, 1]]
+        rng = np.random.default_rng(11)
+        cls.phipsi = np.stack([sample_backbone_dihedrals(rng, len(cls.loop)) for _ in range(6)])
+
+    def _serial_starts(self):
+        return np.stack([apply_backbone_dihedrals(self.prob['coords'], self.prob, self.loop, pp,
+                                                  self.bb[23]['C'], self.bb[29]['N'])
+                         for pp in self.phipsi])
+
+    def test_seeding_matches_serial(self):
+        from pestifer.psfutil.loop_ccd import apply_backbone_dihedrals_batch
+        X = apply_backbone_dihedrals_batch(self.prob['coords'], self.prob, self.loop, self.phipsi,
+                                           self.bb[23]['C'], self.bb[29]['N'])
+        np.testing.assert_allclose(X, self._serial_starts(), atol=1e-8)
+
+    def test_optimal_angles_match_serial(self):
+        from pestifer.psfutil.loop_ccd import optimal_ccd_angles
+        starts = self._serial_starts()
+        a, b = self.prob['bonds'][3]
+        pivots, axes = starts[:, a], starts[:, b] - starts[:, a]
+        batch = optimal_ccd_angles(starts[:, self.end_idx], self.target, pivots, axes)
+        serial = [optimal_ccd_angle(s[self.end_idx], self.target, p, x)
+                  for s, p, x in zip(starts, pivots, axes)]
+        np.testing.assert_allclose(batch, serial, atol=1e-9)
+
+    def test_close_matches_serial_per_seed(self):
+        from pestifer.psfutil.loop_ccd import ccd_close_batch
+        starts = self._serial_starts()
+        closed, rmsd, iters = ccd_close_batch(starts, self.prob['bonds'], self.prob['moving_masks'],
+                                              self.end_idx, self.target, tol=0.1, max_iters=300)
+        for s in range(len(starts)):
+            X, r, it = ccd_close(starts[s], self.prob['bonds'], self.prob['moving_masks'],
+                                 self.end_idx, self.target, tol=0.1, max_iters=300)
+            self.assertEqual(iters[s], it)
+            self.assertAlmostEqual(rmsd[s], r, places=6)
+            np.testing.assert_allclose(closed[s], X, atol=1e-6)
+
+    def test_scorer_matches_clash_report(self):
+        from pestifer.psfutil.loop_ccd import LoopClashScorer, loop_clash_report, _clash_score
+        starts = self._serial_starts()
+        heavy = np.array([not n.startswith('H') for (_r, n) in self.order])
+        env = starts[0][heavy][:20] + 0.8        # an environment overlapping some poses
+        scorer = LoopClashScorer(self.order, self.loop, env_coords=env)
+        expected = [_clash_score(loop_clash_report(self.order, X, self.loop, env_coords=env))
+                    for X in starts]
+        np.testing.assert_array_equal(scorer.score(starts), expected)
+
+
+class TestCloseOneLoop(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import tempfile
+        from pathlib import Path
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.pdb = str(Path(cls.tmp.name) / 'bpti.pdb')
+        with open(Path(__file__).parents[2] / 'inputs' / '6pti.pdb') as f, open(cls.pdb, 'w') as g:
+            for line in f:
+                if line.startswith('ATOM') and line[21] == 'A':
+                    g.write(f'{line[:66].ljust(72)}A   \n')   # segname A, cols 73-76
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_closes_ensemble_deterministically(self):
+        from pestifer.psfutil.loop_ccd import close_one_loop, loop_atoms_from_pdb
+        loop = [12, 13, 14, 15, 16, 17]
+        _o, _c, serials = loop_atoms_from_pdb(self.pdb, loop, segname='A')
+        run = lambda: close_one_loop(self.pdb, 'A', loop, 11, 18, serials, seed=5,  # noqa: E731
+                                     ensemble=6, refine=20, batch=3)
+        a, b = run(), run()
+        np.testing.assert_array_equal(a['closed'], b['closed'])
+        r = {key: i for i, key in enumerate(a['order'])}
+        self.assertLess(np.linalg.norm(a['closed'][r[(17, 'C')]] - self._anchor_N()), 1.6)
+
+    def _anchor_N(self):
+        from pestifer.psfutil.loop_ccd import backbone_from_pdb
+        return backbone_from_pdb(self.pdb, segname='A')[18]['N']
+
+    def test_parsed_structure_matches_file_path(self):
+        from pestifer.psfutil.loop_ccd import close_one_loop, loop_atoms_from_pdb, pdb_atoms
+        loop = [12, 13, 14, 15, 16, 17]
+        _o, _c, serials = loop_atoms_from_pdb(self.pdb, loop, segname='A')
+        kw = dict(seed=2, ensemble=3, refine=10)
+        a = close_one_loop(self.pdb, 'A', loop, 11, 18, serials, **kw)
+        b = close_one_loop(None, 'A', loop, 11, 18, serials, atoms=pdb_atoms(self.pdb), **kw)
+        np.testing.assert_array_equal(a['closed'], b['closed'])
+        self.assertEqual(a['rep'], b['rep'])
+
+    def test_shared_tree_with_excluded_anchors_matches_subset(self):
+        from pestifer.psfutil.loop_ccd import (LoopClashScorer, LoopEnvironment, loop_atoms_from_pdb,
+                                               pdb_atoms)
+        loop = [12, 13, 14, 15, 16, 17]
+        atoms = pdb_atoms(self.pdb)
+        order, coords, serials = loop_atoms_from_pdb(self.pdb, loop, segname='A')
+        _o, _c, anchors = loop_atoms_from_pdb(self.pdb, [11, 18], segname='A')
+        lenv = LoopEnvironment(atoms, serials)
+        excl = lenv.exclude(anchors)
+        self.assertGreater(len(excl), 0)
+        shared = LoopClashScorer(order, loop, env_tree=lenv.tree, env_exclude=excl)
+        subset = LoopClashScorer(order, loop, env_coords=np.delete(lenv.coords, excl, axis=0))
+        poses = np.stack([coords, coords + 0.7, coords - 0.5])
+        np.testing.assert_array_equal(shared.score(poses), subset.score(poses))
+        self.assertEqual(shared.report(poses[1]), subset.report(poses[1]))
+
+    def test_forget_environments_drops_cached_trees(self):
+        from pestifer.psfutil.loop_ccd import forget_environments, loop_environment, pdb_atoms
+        atoms = pdb_atoms(self.pdb)
+        lenv = loop_environment(atoms, [1, 2, 3])
+        self.assertIs(loop_environment(atoms, [3, 2, 1]), lenv)
+        forget_environments()
+        self.assertIsNot(loop_environment(atoms, [1, 2, 3]), lenv)
+        forget_environments()
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pestifer.psfutil.loop_ccd import pdb_atoms
+from pestifer.psfutil.psfarrays import PSFArrays, remark_residues, rename_remark
+from pestifer.psfutil.solvation import PSF_ATOM_DTYPE, _pdb_atom_text, _psf_atom_text, psf_remarks, read_psf
+from pestifer.tasks.merge import MergeTask
+
+_FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'test_tasks', 'fixtures', 'continuation_inputs', 'my_6pti')
+
+
+def _system():
+    """A 3-residue "protein" (A:1-3, two atoms each, chained by bonds and an angle), a DISU patch
+    between residues 1 and 3, and two waters in WT1."""
+    rows = [('A', str(r), 'CYS', n, 'CT', 0.25 * r, 12.0) for r in (1, 2, 3) for n in ('CA', 'SG')]
+    rows += [('WT1', str(w), 'TIP3', 'OH2', 'OT', 0.0, 16.0) for w in (1, 2)]
+    terms = {'bonds': np.array([[0, 1], [1, 2], [2, 3], [3, 4], [4, 5], [1, 5]]),
+             'angles': np.array([[0, 1, 2], [3, 4, 5]]),
+             'crossterms': np.array([[0, 1, 2, 3, 2, 3, 4, 5]])}
+    remarks = ['topology top_all36_prot.rtf', 'segment A { first NTER; last CTER; auto angles dihedrals }',
+               'segment WT1 { first NONE; last NONE; auto none }', 'patch DISU A:1  A:3', 'defaultpatch NTER A:1']
+    xyz = np.arange(24, dtype=float).reshape(8, 3)
+    return PSFArrays(np.array(rows, dtype=PSF_ATOM_DTYPE), terms, remarks, xyz, ['A'] * 6 + ['W'] * 2)
+
+
+class TestRemarks(unittest.TestCase):
+    def test_remark_residues(self):
+        self.assertEqual(remark_residues('patch DISU A:5  A:55'), [('A', '5'), ('A', '55')])
+        self.assertEqual(remark_residues('topology top.rtf'), [])
+
+    def test_rename_remark(self):
+        m = {'A': 'B', 'e': 'X'}
+        self.assertEqual(rename_remark('patch DISU A:5  A:55', m), 'patch DISU B:5 B:55')
+        self.assertEqual(rename_remark('segment e { first NONE; last NONE; auto none }', m),
+                         'segment X { first NONE; last NONE; auto none }')
+        self.assertEqual(rename_remark('topology top_A.rtf', m), 'topology top_A.rtf')
+
+
+class TestPSFArrays(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_subset_remaps_terms_and_remarks(self):
+        s = _system()
+        sub = s.subset((s.atoms['resid'] != '2') | (s.atoms['segname'] == 'WT1'))
+        self.assertEqual(len(sub), 6)
+        self.assertEqual(sub.terms['bonds'].tolist(), [[0, 1], [2, 3], [1, 3]])
+        self.assertEqual(sub.terms['angles'].tolist(), [])
+        self.assertEqual(len(sub.terms['crossterms']), 0)
+        np.testing.assert_array_equal(sub.xyz, s.xyz[[0, 1, 4, 5, 6, 7]])
+        self.assertEqual(sub.remarks, s.remarks)
+        # removing residue 3 takes the DISU patch with it; removing the waters takes WT1's record
+        sub = s.subset(np.flatnonzero(s.atoms['resid'] != '3')[:4])
+        self.assertEqual(sub.remarks, ['topology top_all36_prot.rtf',
+                                       'segment A { first NTER; last CTER; auto angles dihedrals }',
+                                       'defaultpatch NTER A:1'])
+        self.assertEqual(sub.terms['bonds'].tolist(), [[0, 1], [1, 2], [2, 3]])
+        self.assertEqual(sub.terms['angles'].tolist(), [[0, 1, 2]])
+
+    def test_rename_and_concatenate(self):
+        s = _system()
+        t = s.renamed({'A': 'B'}, {'W': 'X'})
+        self.assertEqual(t.segnames(), ['B', 'WT1'])
+        self.assertEqual(t.chainIDs.tolist(), ['B'] * 6 + ['X'] * 2)
+        self.assertIn('patch DISU B:1 B:3', t.remarks)
+        c = PSFArrays.concatenate([s, t])
+        self.assertEqual(len(c), 16)
+        np.testing.assert_array_equal(c.terms['bonds'][6:], s.terms['bonds'] + 8)
+        np.testing.assert_array_equal(c.terms['crossterms'][1], s.terms['crossterms'][0] + 8)
+        self.assertEqual(c.remarks.count('topology top_all36_prot.rtf'), 1)
+        self.assertIn('patch DISU A:1  A:3', c.remarks)
+        self.assertIn('patch DISU B:1 B:3', c.remarks)
+        c.write('merged')
+        atoms, terms = read_psf('merged.psf')
+        np.testing.assert_array_equal(atoms, c.atoms)
+        for key, idx in c.terms.items():
+            np.testing.assert_array_equal(terms[key], idx)
+        self.assertEqual(psf_remarks('merged.psf'), c.remarks)
+        records = pdb_atoms('merged.pdb')
+        np.testing.assert_allclose(records['xyz'], c.xyz)
+        self.assertEqual(records['chainID'].tolist(), c.chainIDs.tolist())
+
+    def test_psfgen_round_trip(self):
+        s = PSFArrays.from_files(f'{_FIXTURE}.psf', f'{_FIXTURE}.pdb')
+        water = np.isin(s.atoms['resname'], ['TIP3'])
+        dry = s.subset(~water)
+        dry.write('dry')
+        atoms, terms = read_psf('dry.psf')
+        self.assertEqual(len(atoms), np.count_nonzero(~water))
+        self.assertEqual(len(terms['crossterms']), len(s.terms['crossterms']))
+        self.assertIn('patch DISU A:5  A:55', psf_remarks('dry.psf'))
+        self.assertNotIn('segment WT1 { first NONE; last NONE; auto none  }', psf_remarks('dry.psf'))
+        np.testing.assert_allclose(pdb_atoms('dry.pdb')['xyz'], s.xyz[~water], atol=1e-3)
+
+
+class TestFixedWidthText(unittest.TestCase):
+    def test_matches_percent_formatting(self):
+        s = _system()
+        atoms = s.atoms.copy()
+        atoms['resid'][:2] = '100A'
+        atoms['charge'][0] = -0.834
+        lines = _psf_atom_text(atoms, start=3).splitlines()
+        self.assertEqual(lines[0], '%10d %-8s %-8s %-8s %-8s %-8s%9.6f%14.4f%12d' % (3, 'A', '100A', 'CYS', 'CA', 'CT',
+                                                                                  -0.834, 12.0, 0))
+        pdb = _pdb_atom_text(atoms, s.xyz - 50.0, s.chainIDs).splitlines()
+        self.assertEqual(pdb[0], 'ATOM      1  CA  CYS A 100A    -50.000 -49.000 -48.000  1.00  0.00      A   ')
+        self.assertEqual(pdb[6], 'ATOM      7  OH2 TIP3W   1     -32.000 -31.000 -30.000  1.00  0.00      WT1 ')
+
+    def test_wide_values_fall_back(self):
+        s = _system()
+        pdb = _pdb_atom_text(s.atoms[:1], [[-12345.0, 0.0, 0.0]], 'A')
+        self.assertIn('-12345.000   0.000', pdb)
+
+
+class TestWriteMerged(unittest.TestCase):
+    """The merge task's python backend renames and concatenates the systems without psfgen."""
+
+    def test_two_copies_renamed(self):
+        psf, pdb = _FIXTURE + '.psf', _FIXTURE + '.pdb'
+        task = MergeTask.__new__(MergeTask)
+        resolved = task._resolve_collisions([{'psf': psf, 'pdb': pdb, 'segname_map': {}} for _ in range(2)],
+                                            'enumerate')
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                task.basename = 'merged'
+                task._write_merged(resolved, ['toppar_all36_moreions.str'])
+                atoms, terms = read_psf('merged.psf')
+                remarks = psf_remarks('merged.psf')
+                chains = pdb_atoms('merged.pdb')['chainID']
+            finally:
+                os.chdir(cwd)
+        single, single_terms = read_psf(psf)
+        n = len(single)
+        self.assertEqual(len(atoms), 2 * n)
+        renamed = resolved[1]['effective_segname_map']
+        segnames = set(single['segname'].tolist())
+        self.assertEqual(set(atoms['segname'][n:].tolist()), {renamed.get(s, s) for s in segnames})
+        self.assertFalse(segnames & set(atoms['segname'][n:].tolist()))
+        self.assertEqual(terms['bonds'][len(single_terms['bonds']):].tolist(), (single_terms['bonds'] + n).tolist())
+        self.assertIn('patch DISU A:5  A:55', remarks)
+        self.assertIn(f"patch DISU {renamed['A']}:5 {renamed['A']}:55", remarks)
+        self.assertNotIn('topology toppar_all36_moreions.str', remarks)
+        self.assertEqual(remarks.count('topology top_all36_prot.rtf'), 1)
+        self.assertEqual(set(chains[n:][atoms['segname'][n:] == renamed['A']].tolist()), {renamed['A']})
+
+
+if __name__ == '__main__':
+    unittest.main()
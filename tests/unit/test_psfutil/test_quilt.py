@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pestifer.psfutil.loop_ccd import pdb_atoms
+from pestifer.psfutil.quilt import Quilt, quilt_patch, segment_label
+from pestifer.psfutil.solvation import PSF_ATOM_DTYPE, _write_pdb, _write_psf, psf_remarks, read_psf
+
+
+def _patch(nlipid=4, nwater=6, edge=20.0):
+    """A toy patch: ``nlipid`` 3-atom chain "lipids" in segment L1 and ``nwater`` waters in WT1."""
+    rng = np.random.default_rng(1)
+    rows, xyz, bonds, angles = [], [], [], []
+    for k in range(nlipid):
+        base = rng.uniform(2, edge - 4, 3)
+        for a, name in enumerate(('P', 'C1', 'C2')):
+            rows.append(('L1', str(k + 1), 'LIP', name, 'CT', 0.0, 12.0))
+            xyz.append(base + [0, 0, 1.5 * a])
+        n = 3 * k
+        bonds += [[n, n + 1], [n + 1, n + 2]]
+        angles.append([n, n + 1, n + 2])
+    for k in range(nwater):
+        n = len(rows)
+        O = rng.uniform(0, edge - 1, 3)
+        for name, typ, q in (('OH2', 'OT', -0.834), ('H1', 'HT', 0.417), ('H2', 'HT', 0.417)):
+            rows.append(('WT1', str(k + 1), 'TIP3', name, typ, q, 1.0))
+        xyz += [O, O + [0.9572, 0, 0], O + [-0.24, 0.927, 0]]
+        bonds += [[n, n + 1], [n, n + 2]]
+        angles.append([n + 1, n, n + 2])
+    terms = {'bonds': np.array(bonds), 'angles': np.array(angles),
+             'dihedrals': np.empty((0, 4), dtype=np.int64), 'impropers': np.empty((0, 4), dtype=np.int64)}
+    return np.array(rows, dtype=PSF_ATOM_DTYPE), np.array(xyz), terms, np.diag([edge, edge, 40.0])
+
+
+class TestQuilt(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_segment_label(self):
+        self.assertEqual(segment_label('WT12'), 'WT')
+        self.assertEqual(segment_label('L1'), 'L')
+        self.assertEqual(segment_label('123'), '123')
+
+    def test_quilt_replicates_atoms_coordinates_and_terms(self):
+        atoms, xyz, terms, box = _patch()
+        _write_psf('patch.psf', atoms, terms, ['topology top_all36_lipid.rtf'])
+        _write_pdb('patch.pdb', atoms, xyz, 'L')
+        q = quilt_patch('patch.psf', 'patch.pdb', box, [2, 3], 'quilt')
+        np.testing.assert_allclose(q.box, np.diag([40.0, 60.0, 40.0]))
+        qatoms, qterms = read_psf('quilt.psf')
+        qxyz = pdb_atoms('quilt.pdb')['xyz']
+        self.assertEqual(len(qatoms), 6 * len(atoms))
+        self.assertEqual(len(qxyz), len(qatoms))
+        self.assertEqual(psf_remarks('quilt.psf', segments=False), ['topology top_all36_lipid.rtf'])
+        # all lipids come first, as one renumbered segment, then all the waters
+        self.assertEqual(list(dict.fromkeys(qatoms['segname'].tolist())), ['L1', 'WT1'])
+        lip = qatoms[qatoms['segname'] == 'L1']
+        self.assertEqual(lip['resid'][-1], '24')
+        self.assertAlmostEqual(qatoms['charge'].sum(), 0.0, places=6)
+        # every replica keeps the patch's bond lengths and angles
+        for key in ('bonds', 'angles'):
+            self.assertEqual(len(qterms[key]), 6 * len(terms[key]))
+        np.testing.assert_allclose(
+            np.sort(np.linalg.norm(qxyz[qterms['bonds'][:, 0]] - qxyz[qterms['bonds'][:, 1]], axis=1)),
+            np.sort(np.tile(np.linalg.norm(xyz[terms['bonds'][:, 0]] - xyz[terms['bonds'][:, 1]], axis=1), 6)),
+            atol=2e-3)
+        self.assertTrue(np.all(qatoms['name'][qterms['angles'][:, 1]] != 'H1'))
+        # the replicas tile the quilt's box, centered on the patch
+        shifts = np.unique(np.round(qxyz[qatoms['name'] == 'P'] - np.tile(xyz[atoms['name'] == 'P'], (6, 1)), 2), axis=0)
+        self.assertEqual(len(shifts), 6)
+        self.assertEqual(sorted(set(shifts[:, 0].tolist())), [-10.0, 10.0])
+        self.assertEqual(sorted(set(shifts[:, 1].tolist())), [-20.0, 0.0, 20.0])
+
+    def test_segments_split_at_the_residue_limit(self):
+        atoms, xyz, terms, box = _patch(nlipid=1, nwater=400)
+        q = Quilt(atoms, xyz, terms, box, [5, 6])
+        self.assertEqual(q.segnames(), ['L1', 'WT1', 'WT2'])
+        q.write('quilt')
+        qatoms, qterms = read_psf('quilt.psf')
+        water = qatoms[qatoms['resname'] == 'TIP3']
+        self.assertEqual(len(water), 3 * 400 * 30)
+        self.assertEqual(water['resid'][3 * 9999 - 1], '9999')
+        self.assertEqual(water['segname'][3 * 9999], 'WT2')
+        self.assertEqual(water['resid'][-1], str(400 * 30 - 9999))
+        np.testing.assert_array_equal(np.sort(qterms['bonds'].ravel()),
+                                      np.sort(np.concatenate([np.flatnonzero(qatoms['name'] != 'OH2'),
+                                                              np.repeat(np.flatnonzero(qatoms['name'] == 'OH2'), 2),
+                                                              np.flatnonzero(qatoms['name'] == 'C1')])))
+
+    def test_rejects_bad_npatch(self):
+        atoms, xyz, terms, box = _patch()
+        with self.assertRaises(ValueError):
+            Quilt(atoms, xyz, terms, box, [0, 2])
+        with self.assertRaises(ValueError):
+            Quilt(atoms, xyz[:-1], terms, box, [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.spatial.distance import cdist, pdist
+
+from pestifer.psfutil.solvation import (PSF_ATOM_DTYPE, SolventBox, choose_ion_sites, net_charge,
+                                        overlapping, read_psf, write_ion_fragment,
+                                        write_solvent_fragment)
+
+
+def _water_box(n=4, edge=12.4):
+    """An n^3 lattice of rigid 3-site waters in a periodic box of ``edge`` centered on 0."""
+    g = (np.arange(n) + 0.5) * edge / n - edge / 2
+    O = np.stack(np.meshgrid(g, g, g, indexing='ij'), -1).reshape(-1, 3)
+    xyz = np.stack([O, O + [0.9572, 0, 0], O + [-0.24, 0.927, 0]], 1).reshape(-1, 3)
+    nmol = len(O)
+    atoms = np.zeros(3 * nmol, dtype=PSF_ATOM_DTYPE)
+    atoms['segname'] = 'QQQ'
+    atoms['resid'] = np.repeat(np.arange(1, nmol + 1).astype(str), 3)
+    atoms['resname'] = 'TIP3'
+    atoms['name'] = np.tile(['OH2', 'H1', 'H2'], nmol)
+    atoms['type'] = np.tile(['OT', 'HT', 'HT'], nmol)
+    atoms['charge'] = np.tile([-0.834, 0.417, 0.417], nmol)
+    atoms['mass'] = np.tile([15.9994, 1.008, 1.008], nmol)
+    offsets = 3 * np.arange(nmol)[:, None, None]
+    terms = {'bonds': (np.array([[0, 1], [0, 2], [1, 2]])[None] + offsets).reshape(-1, 2),
+             'angles': (np.array([[1, 0, 2]])[None] + offsets).reshape(-1, 3),
+             'dihedrals': np.empty((0, 4), dtype=np.int64),
+             'impropers': np.empty((0, 4), dtype=np.int64)}
+    return SolventBox(atoms, xyz, terms, edge, 'OH2')
+
+
+class TestSolventBox(unittest.TestCase):
+    def test_template_is_one_molecule(self):
+        box = _water_box()
+        self.assertEqual(box.natom, 3)
+        self.assertEqual(box.molecules.shape, (64, 3, 3))
+        self.assertEqual(box.terms['bonds'].tolist(), [[0, 1], [0, 2], [1, 2]])
+        self.assertEqual(box.terms['angles'].tolist(), [[1, 0, 2]])
+        keys = box.keys(box.molecules)
+        self.assertTrue(np.all((keys >= 0) & (keys < box.edge)))
+
+    def test_rejects_mixed_molecule_sizes(self):
+        box = _water_box()
+        atoms = np.zeros(5, dtype=PSF_ATOM_DTYPE)
+        atoms['resid'] = ['1', '1', '1', '2', '2']
+        with self.assertRaises(ValueError):
+            SolventBox(atoms, np.zeros((5, 3)), {k: v[:0] for k, v in box.terms.items()}, 10.0)
+
+    def test_fill_keeps_whole_molecules_at_box_density(self):
+        box = _water_box()
+        LL, UR = np.array([-30.0, -25.0, -20.0]), np.array([31.0, 26.0, 21.0])
+        mols = box.fill(LL, UR)
+        self.assertTrue(np.all((mols >= LL) & (mols <= UR)))
+        # no molecule placed twice
+        self.assertEqual(len(np.unique(np.round(box.keys(mols), 3), axis=0)), len(mols))
+        # all but a boundary layer of the cell is filled at the box's density
+        expected = np.prod(UR - LL) / box.molecule_volume
+        self.assertGreater(len(mols), 0.85 * expected)
+        self.assertLessEqual(len(mols), expected)
+
+    def test_overlapping(self):
+        box = _water_box()
+        mols = box.fill([-20, -20, -20], [20, 20, 20])
+        solute = np.array([[0.0, 0.0, 0.0]])
+        clash = overlapping(mols, solute, cutoff=2.4)
+        d = cdist(mols.reshape(-1, 3), solute).reshape(len(mols), 3).min(axis=1)
+        np.testing.assert_array_equal(clash, d < 2.4)
+        self.assertFalse(overlapping(mols, np.empty((0, 3))).any())
+
+    def test_lattice_from_one_molecule(self):
+        one = _water_box(n=1)
+        terms = {'bonds': [[0, 1], [0, 2], [1, 2]], 'angles': [[1, 0, 2]]}
+        box = SolventBox.lattice(one.template, one.molecules[0], terms, 0.0334, n=4, key_atom='OH2')
+        self.assertEqual(box.molecules.shape, (64, 3, 3))
+        self.assertAlmostEqual(64 / box.edge ** 3, 0.0334)
+        self.assertEqual(box.terms['bonds'].tolist(), terms['bonds'])
+        self.assertEqual(box.terms['angles'].tolist(), terms['angles'])
+        # rigid copies: every molecule keeps the template's internal geometry
+        d = np.linalg.norm(box.molecules[:, 1:] - box.molecules[:, :1], axis=2)
+        np.testing.assert_allclose(d, np.linalg.norm(one.molecules[0, 1:] - one.molecules[0, 0], axis=1)
+                                   [None].repeat(64, 0), atol=1e-9)
+        # one key atom per lattice site, none doubled up
+        self.assertGreater(pdist(box.keys(box.molecules)).min(), 0.5 * box.edge / 4)
+
+
+class TestChooseIonSites(unittest.TestCase):
+    def test_spacing_constraints(self):
+        rng = np.random.default_rng(3)
+        sites = rng.uniform(-40, 40, (5000, 3))
+        solute = rng.uniform(-10, 10, (200, 3))
+        idx = choose_ion_sites(sites, 150, solute, from_solute=5.0, between=5.0, rng=0)
+        self.assertEqual(len(idx), 150)
+        self.assertEqual(len(set(idx.tolist())), 150)
+        self.assertGreaterEqual(pdist(sites[idx]).min(), 5.0)
+        self.assertGreaterEqual(cdist(sites[idx], solute).min(), 5.0)
+
+    def test_deterministic_by_seed(self):
+        sites = np.random.default_rng(4).uniform(0, 50, (2000, 3))
+        a = choose_ion_sites(sites, 40, rng=7)
+        np.testing.assert_array_equal(a, choose_ion_sites(sites, 40, rng=7))
+
+    def test_too_many_ions_raises(self):
+        sites = np.array([[0.0, 0, 0], [1.0, 0, 0], [2.0, 0, 0]])
+        with self.assertRaises(ValueError):
+            choose_ion_sites(sites, 2, between=5.0, rng=0)
+        self.assertEqual(len(choose_ion_sites(sites, 0)), 0)
+
+
+class TestFragments(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_solvent_fragment_round_trips(self):
+        box = _water_box()
+        mols = box.fill([-15, -15, -15], [15, 15, 15])
+        segnames = write_solvent_fragment('solv', box, mols, taken={'WT1', 'PROA'})
+        self.assertEqual(segnames, ['WT2'])
+        atoms, terms = read_psf('solv.psf')
+        self.assertEqual(len(atoms), 3 * len(mols))
+        self.assertEqual(len(terms['bonds']), 3 * len(mols))
+        self.assertEqual(terms['angles'][-1].tolist(), [3 * len(mols) - 2, 3 * len(mols) - 3, 3 * len(mols) - 1])
+        self.assertEqual(atoms['resid'][-1], str(len(mols)))
+        self.assertAlmostEqual(net_charge('solv.psf'), 0.0, places=6)
+        again = SolventBox.from_files('solv.psf', 'solv.pdb', box.edge, 'OH2')
+        np.testing.assert_allclose(again.keys(again.molecules) % box.edge,
+                                   box.keys(mols) % box.edge, atol=1e-3)
+
+    def test_large_solvent_splits_segments(self):
+        box = _water_box()
+        mols = box.fill([-70, -70, -70], [70, 70, 70])
+        self.assertGreater(len(mols), 9999)
+        segnames = write_solvent_fragment('solv', box, mols)
+        atoms, _ = read_psf('solv.psf', bonded=False)
+        self.assertEqual(list(dict.fromkeys(atoms['segname'].tolist())), segnames)
+        self.assertEqual(atoms['resid'][3 * 9999 - 1], '9999')
+        self.assertEqual(atoms['resid'][3 * 9999], '1')
+
+    def test_ion_fragment(self):
+        ion_atoms = {'SOD': ('SOD', 'SOD', 1.0, 22.98977), 'CLA': ('CLA', 'CLA', -1.0, 35.45)}
+        write_ion_fragment('ions', ['SOD', 'SOD', 'CLA'], np.arange(9.0).reshape(3, 3), ion_atoms)
+        atoms, terms = read_psf('ions.psf')
+        self.assertEqual(atoms['segname'].tolist(), ['ION'] * 3)
+        self.assertEqual(atoms['resname'].tolist(), ['SOD', 'SOD', 'CLA'])
+        self.assertEqual(len(terms['bonds']), 0)
+        self.assertAlmostEqual(net_charge('ions.psf'), 1.0)
+        with open('ions.pdb') as f:
+            self.assertEqual(float(f.readlines()[2][30:38]), 6.0)
+
+    def test_ion_fragment_avoids_taken_segname(self):
+        ion_atoms = {'SOD': ('SOD', 'SOD', 1.0, 22.98977)}
+        segname = write_ion_fragment('ions', ['SOD'], np.zeros((1, 3)), ion_atoms, taken={'ION', 'ION1'})
+        self.assertEqual(segname, 'ION2')
+        atoms, _ = read_psf('ions.psf', bonded=False)
+        self.assertEqual(atoms['segname'].tolist(), ['ION2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
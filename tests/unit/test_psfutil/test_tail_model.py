@@ -3,8 +3,8 @@ from types import SimpleNamespace as NS
 
 import numpy as np
 
-from pestifer.psfutil.loop_ccd import place_atom_nerf
-from pestifer.psfutil.tail_model import model_one_tail, downstream_anchor_target, _selection_key
+from pestifer.psfutil.loop_ccd import pdb_atoms, place_atom_nerf
+from pestifer.psfutil.tail_model import model_one_tail, downstream_anchor_target, tail_reach, _selection_key
 from pestifer.molecule.stateinterval import StateInterval, StateIntervalList
 from pestifer.molecule.molecule import Molecule
 
@@ -97,6 +97,22 @@ class TestModelOneTail(unittest.TestCase):
         b = model_one_tail(self.pdb, 'A', tail, 1, 'C', self._modeled(tail), seed=7, ensemble=6)
         np.testing.assert_allclose(a['modeled'], b['modeled'])
 
+    def test_parsed_atoms_match_file(self):
+        # a caller that parsed the structure once (and shares it across tails) gets the same tail
+        tail = list(range(2, 9))
+        a = model_one_tail(self.pdb, 'A', tail, 1, 'C', self._modeled(tail), seed=7, ensemble=6)
+        b = model_one_tail(self.pdb, 'A', tail, 1, 'C', self._modeled(tail), seed=7, ensemble=6,
+                           atoms=pdb_atoms(self.pdb))
+        np.testing.assert_array_equal(a['modeled'], b['modeled'])
+        self.assertEqual(a['rep'], b['rep'])
+
+    def test_reach_holds_the_tail(self):
+        tail = list(range(2, 9))
+        center, radius = tail_reach(pdb_atoms(self.pdb), 'A', tail, 1)
+        np.testing.assert_allclose(center, _atom_from_file(self.pdb, 1, 'CA'), atol=1e-3)
+        res = model_one_tail(self.pdb, 'A', tail, 1, 'C', self._modeled(tail), seed=7, ensemble=6)
+        self.assertLess(np.linalg.norm(res['modeled'] - center, axis=1).max(), radius)
+
     def test_bond_lengths_preserved(self):
         # a rigid-placed Ramachandran backbone keeps ideal peptide bond lengths within the tail
         tail = list(range(2, 9))
@@ -0,0 +1,31 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""Tests for the density-profile subcommand's argument checks (pestifer.subcommands.density_profile)."""
+import argparse as ap
+import unittest
+from unittest import mock
+
+from pestifer.subcommands.density_profile import DensityProfileSubcommand
+
+
+def _args(*argv):
+    subparsers = ap.ArgumentParser().add_subparsers()
+    return DensityProfileSubcommand().add_subparser(subparsers).parse_args(list(argv))
+
+
+class TestTrajectoryOptions(unittest.TestCase):
+
+    def test_trajectory_options_need_dcd(self):
+        for extra in (['--xst', 'a.xst'], ['--blocks', '4'], ['--stride', '2']):
+            with self.subTest(extra=extra):
+                with self.assertRaisesRegex(ValueError, extra[0]):
+                    DensityProfileSubcommand.func(_args('--basename', 'sys', *extra))
+
+    def test_trajectory_defaults(self):
+        with mock.patch('pestifer.subcommands.density_profile.DensityProfile') as dp:
+            DensityProfileSubcommand.func(_args('--psf', 'sys.psf', '--dcd', 'a.dcd'))
+        kwargs = dp.return_value.plot.call_args.kwargs
+        self.assertEqual((kwargs['nblocks'], kwargs['stride'], kwargs['xst']), (5, 1, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -43,6 +43,13 @@ class TestReportResnameSynonym(unittest.TestCase):
         out = self._capture(_report_resname_compact, _base(charmm_synonym=None))
         self.assertTrue(out.rstrip().endswith('pdb: -'))
 
+    def test_block_shows_suggestions_for_an_unknown_name(self):
+        lines = []
+        _report_resname(_base(resname='POPX', in_topology=False), out_stream=lines.append,
+                        suggestions=['POPC', 'POPE'])
+        self.assertIn('  did you mean: POPC, POPE?', lines)
+        self.assertEqual(lines[-1], '')
+
 
 if __name__ == '__main__':
     unittest.main()
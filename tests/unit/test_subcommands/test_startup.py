@@ -0,0 +1,83 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""Startup budget for the command line.
+
+pestifer is run thousands of times from batch scripts, so what a light command imports is a
+cost paid on every call.  Each case below imports the CLI plus one light subcommand in a fresh
+interpreter under ``-X importtime`` and checks two things: that none of the heavy libraries the
+build machinery needs was dragged in, and that the import fits the budget.  The budget is
+deliberately generous (a cold, slow CI disk must pass); ``PESTIFER_STARTUP_BUDGET_MS`` overrides
+it.
+"""
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+from pestifer.subcommands import _subcommands, find_subcommand
+
+HEAVY = ('pandas', 'matplotlib', 'scipy', 'networkx', 'pidibble', 'pydantic')
+BUDGET_MS = float(os.environ.get('PESTIFER_STARTUP_BUDGET_MS', 750))
+
+
+def _import_profile(*modules: str) -> tuple[float, list[str]]:
+    """Cumulative import time in ms of ``modules`` (in a fresh interpreter) and the heavy
+    libraries left in ``sys.modules``."""
+    code = (f'import sys\nfor m in {list(modules)!r}: __import__(m)\n'
+            f'print(",".join(h for h in {HEAVY!r} if h in sys.modules))')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        m = re.match(r'import time:\s+\d+\s+\|\s+(\d+)\s+\|( *)\S', line)
+        if m and m.group(2) == ' ':     # top-level imports only; nested ones are included
+            total_us += int(m.group(1))
+    loaded = [h for h in proc.stdout.strip().split(',') if h]
+    return total_us / 1000, loaded
+
+
+class TestStartupBudget(unittest.TestCase):
+
+    def _check(self, *modules):
+        elapsed, loaded = _import_profile(*modules)
+        self.assertEqual(loaded, [], f'heavy imports pulled in by {modules}')
+        self.assertLess(elapsed, BUDGET_MS, f'importing {modules} took {elapsed:.0f} ms')
+
+    def test_help(self):
+        self._check('pestifer.cli.pestifer')
+
+    def test_wheretcl(self):
+        self._check('pestifer.cli.pestifer', 'pestifer.subcommands.wheretcl')
+
+    def test_follow_namd_log(self):
+        self._check('pestifer.cli.pestifer', 'pestifer.subcommands.follow_namd_log')
+
+
+class TestLazyRegistry(unittest.TestCase):
+    """The registry repeats each command's listing metadata so the top-level parser can be built
+    without importing it; this keeps the copy honest."""
+
+    def test_entries_match_their_subcommands(self):
+        for entry in _subcommands:
+            with self.subTest(command=entry.name):
+                s = entry.load()
+                self.assertEqual(entry.name, s.name)
+                self.assertEqual(entry.group, s.group)
+                self.assertEqual(entry.short_help, s.short_help)
+                self.assertEqual(list(entry.aliases), list(s.aliases))
+
+    def test_find_by_name_or_alias(self):
+        self.assertEqual(find_subcommand('run').name, 'build')
+        self.assertEqual(find_subcommand('wheretcl').name, 'wheretcl')
+        self.assertIsNone(find_subcommand('no-such-command'))
+
+    def test_invoked_command_skips_option_values(self):
+        from pestifer.cli.pestifer import invoked_command
+        self.assertEqual(invoked_command(['--log-level', 'info', '--no-banner', 'wheretcl', '--root']),
+                         'wheretcl')
+        self.assertEqual(invoked_command(['--log-file=x.log', 'cache']), 'cache')
+        self.assertIsNone(invoked_command(['--help']))
+
+
+if __name__ == '__main__':
+    unittest.main()
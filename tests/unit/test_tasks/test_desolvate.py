@@ -1,6 +1,6 @@
 # Author: Cameron F. Abrams, <cfa22@drexel.edu>
 """
-Integration tests for DesolvateTask  (require VMD + catdcd; run with --runslow).
+Tests for DesolvateTask.  The integration tests require VMD + catdcd (run with --runslow).
 
 Fixtures are extracted on-demand from the BPTI build tarball in scratch/builds/1/.
 The solvated PSF carries three DISU patch remarks; the test verifies that the
@@ -9,15 +9,18 @@ desolvated (dry) PSF preserves them.
 import os
 import shutil
 import tarfile
+import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from pestifer.core.config import Config
 from pestifer.core.controller import Controller
-
-pytestmark = pytest.mark.needs_tools
+from pestifer.core.errors import PestiferError
+from pestifer.psfutil.solvation import psf_remarks, read_psf
+from pestifer.tasks.desolvate import DesolvateTask
 
 
 _TARBALL = (Path(__file__).parents[3] / 'scratch' / 'builds' / '1' / 'artifacts.tar.gz').resolve()
@@ -54,6 +57,50 @@ def _psf_patch_remarks(psf_path: str) -> set[str]:
     return remarks
 
 
+_CONTINUATION = (Path(__file__).parent / 'fixtures' / 'continuation_inputs').resolve()
+
+
+class TestWriteKeptPSF(unittest.TestCase):
+    """The dry PSF is cut in Python from the index file VMD writes."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.task = DesolvateTask.__new__(DesolvateTask)
+        self.task.basename = 'desolv'
+        self.psf = str(_CONTINUATION / 'my_6pti.psf')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_subsets_from_index_file(self):
+        atoms, terms = read_psf(self.psf)
+        keep = np.flatnonzero(atoms['resname'] != 'TIP3')
+        with open('dry.idx', 'w') as f:
+            f.write(' '.join(map(str, keep)) + '\n')
+        self.task.write_kept_psf(self.psf, 'dry.idx', 'dry.psf', 'not water')
+        dry, dry_terms = read_psf('dry.psf')
+        self.assertEqual(len(dry), len(keep))
+        self.assertNotIn('TIP3', dry['resname'].tolist())
+        self.assertEqual(dry['name'].tolist(), atoms['name'][keep].tolist())
+        self.assertLess(len(dry_terms['bonds']), len(terms['bonds']))
+        self.assertIn('patch DISU A:5  A:55', psf_remarks('dry.psf'))
+
+    def test_empty_selection_raises(self):
+        with open('dry.idx', 'w') as f:
+            f.write('\n')
+        with self.assertRaises(PestiferError):
+            self.task.write_kept_psf(self.psf, 'dry.idx', 'dry.psf', 'resname XXX')
+        self.assertFalse(os.path.exists('dry.psf'))
+
+    def test_missing_index_raises(self):
+        with self.assertRaises(PestiferError):
+            self.task.write_kept_psf(self.psf, 'dry.idx', 'dry.psf', 'protein')
+
+
+@pytest.mark.needs_tools
 class TestDesolvateTask(unittest.TestCase):
 
     def setUp(self):
@@ -634,6 +634,51 @@ class TestDifferentialStressDiagnostic(unittest.TestCase):
         self.assertAlmostEqual(soft / stiff, 4.0, places=1)
 
 
+class TestConcurrentPatches(unittest.TestCase):
+    """The two calibration patches of an asymmetric build share the CPUs and run together only
+    where a NAMD ``+p`` split is honored; either way their results merge in patch order."""
+
+    def _task(self, ncpus=64, processor='cpu', slurmvars=None, launcher='auto'):
+        config = mock.MagicMock(ncpus=ncpus, slurmvars=slurmvars or {})
+        config.__getitem__.return_value = {'namd': {'cpu-parallel-launcher': launcher}}
+        return _task(provisions={'processor-type': processor}, subcontroller=mock.Mock(config=config))
+
+    def test_cpu_shares(self):
+        self.assertEqual(self._task()._patch_cpu_shares(2), [32, 32])
+        self.assertEqual(self._task(ncpus=7)._patch_cpu_shares(2), [4, 3])
+        self.assertIsNone(self._task()._patch_cpu_shares(1))
+        self.assertIsNone(self._task(ncpus=1)._patch_cpu_shares(2))
+        self.assertIsNone(self._task(processor='gpu')._patch_cpu_shares(2))
+
+    def test_multinode_launch_runs_patches_in_turn(self):
+        one_node = {'SLURM_NNODES': '1', 'SLURM_NTASKS_PER_NODE': '64'}
+        two_nodes = {'SLURM_NNODES': '2', 'SLURM_NTASKS_PER_NODE': '32'}
+        self.assertEqual(self._task(slurmvars=one_node)._patch_cpu_shares(2), [32, 32])
+        self.assertIsNone(self._task(slurmvars=two_nodes)._patch_cpu_shares(2))
+        self.assertIsNone(self._task(slurmvars=one_node, launcher='srun')._patch_cpu_shares(2))
+
+    def test_patches_run_together_and_merge_in_order(self):
+        import threading
+        t = self._task()
+        t.subtaskcount = 0
+        t.controller_index = 0
+        t.index = 3
+        spawned = []
+        t.subcontroller.parent = 'progenitor'
+        t.subcontroller.spawn_subcontroller = lambda parent, ncpus=0: spawned.append(ncpus) or mock.Mock(ncpus=ncpus)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run(patch, name, basename, protocol, subcontroller):
+            barrier.wait()     # both patches must be in flight at once
+            return f'last-{name}'
+        merged = []
+        t._run_bilayer_equilibration = run
+        t._merge_bilayer_equilibration = lambda patch, name, sub, last: merged.append((name, sub.ncpus, last))
+        t.equilibrate_patches([('A', 'patchA'), ('B', 'patchB')], [], [32, 32])
+        self.assertEqual(spawned, [32, 32])
+        self.assertEqual(merged, [('patchA', 32, 'last-patchA'), ('patchB', 32, 'last-patchB')])
+
+
 if __name__ == '__main__':
     unittest.main()
 
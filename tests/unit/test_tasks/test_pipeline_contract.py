@@ -3,7 +3,7 @@ import unittest
 from pestifer.tasks.taskcollections import TaskList
 from pestifer.tasks import TerminateTask
 from pestifer.tasks.pipeline_contract import (
-    validate_pipeline, TaskContract, SOURCE, STATE, MOLECULE, MD_OUTPUT, SOLVATED)
+    validate_pipeline, task_dependencies, TaskContract, SOURCE, STATE, MOLECULE, MD_OUTPUT, SOLVATED)
 from pestifer.core.errors import PestiferBuildError
 
 
@@ -110,5 +110,24 @@ class TestPipelineContract(unittest.TestCase):
         self.assertEqual(c.provides, frozenset({STATE}))
 
 
+
+class TestTaskDependencies(unittest.TestCase):
+
+    def test_readers_of_md_output_are_independent(self):
+        # 0 fetch, 1 psfgen, 2 md, 3 mdplot, 4 validate, 5 terminate
+        deps = task_dependencies(_build([{'fetch': {'sourceID': '6pti'}}, {'psfgen': {}}, {'md': {}},
+                                         {'mdplot': {}}, {'validate': {}}]))
+        self.assertEqual(deps[2], {1})
+        self.assertEqual(deps[3], {2})
+        self.assertEqual(deps[4], {2})
+        self.assertEqual(deps[5], {0, 1, 2, 3, 4})
+
+    def test_writer_waits_for_earlier_readers(self):
+        # 0 continuation, 1 md, 2 mdplot, 3 validate, 4 md, 5 terminate
+        deps = task_dependencies(_build([{'continuation': {'psf': 'x.psf', 'pdb': 'x.pdb'}}, {'md': {}},
+                                         {'mdplot': {}}, {'validate': {}}, {'md': {}}]))
+        self.assertEqual(deps[4], {1, 2, 3})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,8 +2,14 @@ import os
 import tempfile
 import types
 import unittest
+from pathlib import Path
 from unittest import mock
 
+import numpy as np
+
+from pestifer import resources
+from pestifer.charmmff.pdbrepository import PDBRepository
+from pestifer.psfutil import solvation
 from pestifer.tasks.solvate import SolvateTask
 from pestifer.core.errors import PestiferError
 
@@ -128,6 +134,102 @@ class TestSolventBoxLookup(unittest.TestCase):
         self.assertNotIn('-ks', t._solvent_box_args(_box_entry(key=None), 'X'))
 
 
+def _tip3_repo():
+    """The shipped PDB repository, whose TIP3 entry is a single molecule, not a box."""
+    root = Path(resources.__file__).parent / 'charmmff'
+    version_dirs = sorted((p for p in root.iterdir() if (p / 'pdbrepository').is_dir()),
+                          key=lambda p: p.stat().st_mtime)
+    return PDBRepository(str(version_dirs[-1] / 'pdbrepository'))
+
+
+def _tip3_resi():
+    A = lambda name, t, q, m: types.SimpleNamespace(name=name, type=t, charge=q, mass=m)
+    B = lambda a, b: types.SimpleNamespace(name1=a, name2=b)
+    return types.SimpleNamespace(atoms=[A('OH2', 'OT', -0.834, 15.9994), A('H1', 'HT', 0.417, 1.008),
+                                        A('H2', 'HT', 0.417, 1.008)],
+                                 bonds=[B('OH2', 'H1'), B('OH2', 'H2'), B('H1', 'H2')])
+
+
+class TestPythonSolventBox(unittest.TestCase):
+    def test_non_water_uses_its_own_entry(self):
+        repo = mock.MagicMock()
+        repo.__contains__.return_value = True
+        repo.checkout.return_value = _box_entry()
+        with mock.patch.object(solvation.SolventBox, 'from_files') as from_files:
+            box = _make_task(repo)._python_solvent_box('MEOH')
+        self.assertIs(box, from_files.return_value)
+        from_files.assert_called_once_with('MEOH-box.psf', 'MEOH-box.pdb', 20.34, 'O1')
+
+    def test_water_uses_a_tip3_box_entry(self):
+        repo = mock.MagicMock()
+        repo.__contains__.side_effect = lambda name: name == 'TIP3'
+        repo.checkout.return_value = _box_entry(key='OH2')
+        with mock.patch.object(solvation.SolventBox, 'from_files') as from_files:
+            for w in ('TIP3', 'WATER', None):
+                self.assertIs(_make_task(repo)._python_solvent_box(w), from_files.return_value)
+        repo.checkout.assert_called_with('TIP3')
+
+    def test_water_from_the_single_tip3_molecule(self):
+        # the shipped TIP3 entry is one molecule; the box is built from it and the TIP3 RESI
+        t = _make_task(_tip3_repo())
+        t.resource_manager.charmmff_content.get_resi.return_value = _tip3_resi()
+        box = t._python_solvent_box('TIP3')
+        self.assertIsInstance(box, solvation.SolventBox)
+        self.assertEqual(box.molecules.shape, (512, 3, 3))
+        self.assertAlmostEqual(512 / box.edge ** 3, SolvateTask._WATER_NUMBER_DENSITY)
+        self.assertEqual(box.template['name'][box.key], 'OH2')
+        self.assertEqual(len(box.terms['bonds']), 3)
+        self.assertEqual(box.terms['angles'].tolist(), [[1, 0, 2]])
+
+    def test_water_without_molecule_or_resi_falls_back(self):
+        repo = mock.MagicMock()
+        repo.__contains__.return_value = False
+        self.assertIsNone(_make_task(repo)._python_solvent_box('TIP3'))
+        t = _make_task(_tip3_repo())
+        t.resource_manager.charmmff_content.get_resi.return_value = None
+        self.assertIsNone(t._python_solvent_box('TIP3'))
+
+    def test_default_water_python_backend_takes_the_numpy_path(self):
+        t = _make_task(_tip3_repo())
+        t.resource_manager.charmmff_content.get_resi.return_value = _tip3_resi()
+        t.specs = {'backend': 'python'}
+        t.basename = 'solv'
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        try:
+            with open('solute.pdb', 'w') as f:
+                f.write('ATOM      1  CA  ALA A   1       0.000   0.000   0.000  1.00  0.00      A\n'
+                        'ATOM      2  CA  ALA A   2       3.800   0.000   0.000  1.00  0.00      A\n')
+            state = mock.Mock(xsc=None, pdb=mock.Mock())
+            state.pdb.name = 'solute.pdb'
+            with mock.patch.object(SolvateTask, 'next_basename'), \
+                 mock.patch.object(SolvateTask, 'get_current_artifact', return_value=state), \
+                 mock.patch.object(SolvateTask, '_do_python', return_value=0) as do_python:
+                self.assertEqual(t.do(), 0)
+        finally:
+            os.chdir(cwd)
+        do_python.assert_called_once()
+        self.assertIsInstance(do_python.call_args.args[3], solvation.SolventBox)
+
+    def test_python_backend_sizes_salt_from_the_box_volume(self):
+        # the same convention as the VMD backend's replacement ionization, however much
+        # of the box the solute displaces
+        t = _task_with_specs({'salt_con': 0.15})
+        box = mock.Mock()
+        box.fill.return_value = np.zeros((0, 3, 3))
+        solute = {'xyz': np.zeros((1, 3))}
+        state = mock.Mock()
+
+        class Sized(Exception):
+            pass
+        with mock.patch('pestifer.tasks.solvate.heavy_env_mask', return_value=np.ones(1, bool)), \
+             mock.patch.object(solvation, 'net_charge', return_value=0.0), \
+             mock.patch.object(SolvateTask, '_ion_counts', side_effect=Sized) as ion_counts:
+            with self.assertRaises(Sized):
+                t._do_python(state, solute, 'TIP3', box, np.zeros(3), np.array([40.0, 50.0, 60.0]), None)
+        self.assertAlmostEqual(ion_counts.call_args.args[1], 40.0 * 50.0 * 60.0)
+
+
 class TestSolventTopology(unittest.TestCase):
     def test_writes_mass_records_and_resi(self):
         # solvate's isolated psfgen context needs the atom-type MASS records + the RESI block
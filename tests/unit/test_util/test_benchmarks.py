@@ -0,0 +1,56 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+"""Tests for the benchmark harness and its synthetic-system generators."""
+import os
+import tempfile
+import unittest
+
+from benchmarks import generators, harness
+from pestifer.charmmff.charmmffprm import CharmmParamFile
+from pestifer.charmmff.psf_param_check import check_psf_parameters
+from pestifer.psfutil.psfcontents import PSFContents
+from pestifer.util.coord import coorddf_from_pdb
+
+
+class TestGenerators(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_synthetic_system_is_consistent(self):
+        psf = os.path.join(self.tmp.name, 's.psf')
+        pdb = os.path.join(self.tmp.name, 's.pdb')
+        generators.write_psf(psf, 1200)
+        generators.write_pdb(pdb, 1200)
+        contents = PSFContents(psf, parse_topology=['bonds'], topology_segtypes=['lipid'])
+        self.assertEqual(len(contents.atoms), 1200)
+        self.assertEqual(len(coorddf_from_pdb(pdb)), 1200)
+        missing = check_psf_parameters(PSFContents(psf), CharmmParamFile.from_text(generators.parameter_text()))
+        self.assertFalse(missing.any())
+
+    def test_generators_are_deterministic(self):
+        a, b = (os.path.join(self.tmp.name, f'{x}.pdb') for x in 'ab')
+        generators.write_pdb(a, 600, seed=3)
+        generators.write_pdb(b, 600, seed=3)
+        with open(a) as fa, open(b) as fb:
+            self.assertEqual(fa.read(), fb.read())
+
+
+class TestCompare(unittest.TestCase):
+
+    def _results(self, t, mb):
+        return dict(format=harness.RESULTS_FORMAT, meta={},
+                    results={'x': {'10k': dict(min_s=t, median_s=t, times_s=[t], peak_mb=mb)},
+                             'y': {'10k': dict(skipped='no charmmff')}})
+
+    def test_flags_time_and_memory_regressions(self):
+        base = self._results(1.0, 100.0)
+        self.assertEqual(harness.compare(base, self._results(1.05, 100.0))[0]['regressed'], [])
+        self.assertEqual(harness.compare(base, self._results(1.5, 100.0))[0]['regressed'], ['time'])
+        self.assertEqual(harness.compare(base, self._results(1.0, 150.0))[0]['regressed'], ['memory'])
+        self.assertEqual(len(harness.compare(base, base)), 1)   # skipped benchmarks are not compared
+
+    def test_parse_size(self):
+        self.assertEqual(harness.parse_size('10k'), 10_000)
+        self.assertEqual(harness.parse_size('1M'), 1_000_000)
+        self.assertEqual(harness.parse_size('2500'), 2500)
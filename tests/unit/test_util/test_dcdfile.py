@@ -0,0 +1,57 @@
+"""Unit tests for pestifer.util.dcdfile."""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pestifer.util.dcdfile import DCDFile, write_dcd
+
+
+class TestDCDFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traj.dcd')
+        rng = np.random.default_rng(7)
+        self.coords = rng.uniform(-20, 20, (7, 5, 3)).astype(np.float32)
+        self.cells = np.column_stack([np.linspace(30, 31, 7), np.zeros(7), np.full(7, 32.0),
+                                      np.zeros(7), np.zeros(7), np.linspace(60, 58, 7)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_header_and_frames(self):
+        write_dcd(self.path, self.coords, self.cells, istart=500, nsavc=100)
+        dcd = DCDFile(self.path)
+        self.assertEqual((dcd.natom, len(dcd), dcd.istart, dcd.nsavc), (5, 7, 500, 100))
+        self.assertTrue(dcd.has_unitcell)
+        np.testing.assert_array_equal(dcd.timesteps(), 500 + 100 * np.arange(7))
+        np.testing.assert_allclose(dcd.cells(), self.cells)
+        frames, coords = zip(*dcd.iter_chunks('xyz', chunk_bytes=1))
+        np.testing.assert_array_equal(np.concatenate(frames), np.arange(7))
+        np.testing.assert_array_equal(np.concatenate(coords), self.coords.transpose(0, 2, 1))
+
+    def test_stride_and_chunks(self):
+        write_dcd(self.path, self.coords)
+        dcd = DCDFile(self.path)
+        self.assertFalse(dcd.has_unitcell)
+        for chunk_bytes in (1, 200, 10**6):
+            frames, coords = zip(*dcd.iter_chunks('z', stride=3, chunk_bytes=chunk_bytes))
+            np.testing.assert_array_equal(np.concatenate(frames), [0, 3, 6])
+            np.testing.assert_array_equal(np.concatenate(coords)[:, 0], self.coords[::3, :, 2])
+
+    def test_partial_frame_is_ignored(self):
+        write_dcd(self.path, self.coords, self.cells)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 10)
+        self.assertEqual(len(DCDFile(self.path)), 6)
+
+    def test_rejects_non_dcd(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\x00' * 200)
+        with self.assertRaises(ValueError):
+            DCDFile(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ import unittest
 
 import numpy as np
 
+from pestifer.util.dcdfile import write_dcd
 from pestifer.util.densityprofile import (
     DensityProfile, classify_species, AMU_PER_A3_TO_G_PER_CC)
 
@@ -128,5 +129,84 @@ class TestDensityProfile(unittest.TestCase):
         np.testing.assert_allclose(p_bin['lipid'], p_pdb['lipid'], atol=1e-9)
 
 
+class TestTrajectoryProfile(unittest.TestCase):
+    setUp = TestDensityProfile.setUp
+
+    def _frames(self, nframes, jitter=0.0):
+        rng = np.random.default_rng(3)
+        z = np.array([a[3] for a in self.atoms]) + 0.3
+        xyz = np.zeros((nframes, len(z), 3))
+        xyz[:, :, 2] = z + jitter * rng.normal(size=(nframes, len(z)))
+        return xyz
+
+    def test_single_frame_matches_compute(self):
+        dcd = os.path.join(self.tmp, 'one.dcd')
+        write_dcd(dcd, self._frames(1) - [0, 0, 0.3], [[10.0, 0, 10.0, 0, 0, 100.0]])
+        dp = DensityProfile(self.base + '.psf', self.base + '.pdb', self.base + '.xsc')
+        centers, profiles = dp.compute(dz=1.0, lipid_components=True)
+        t_centers, t_profiles, errors = dp.trajectory(dcd, dz=1.0, lipid_components=True)
+        self.assertIsNone(errors)
+        np.testing.assert_allclose(t_centers, centers)
+        self.assertEqual(list(t_profiles), list(profiles))
+        for label in profiles:
+            np.testing.assert_allclose(t_profiles[label], profiles[label], atol=1e-9)
+
+    def test_blocks_workers_and_xst_cells(self):
+        # two DCDs without unit cells; the XST gives each frame its own height
+        xyz = self._frames(8, jitter=0.5)
+        dcds = [os.path.join(self.tmp, f'part{k}.dcd') for k in (1, 2)]
+        write_dcd(dcds[0], xyz[:4], istart=100, nsavc=100)
+        write_dcd(dcds[1], xyz[4:], istart=500, nsavc=100)
+        xst = os.path.join(self.tmp, 'sys.xst')
+        c_z = 96.0 + np.arange(9)
+        with open(xst, 'w') as f:
+            f.write('# NAMD extended system trajectory file\n')
+            for k in range(9):
+                f.write(f'{100 * k} 10 0 0 0 10 0 0 0 {c_z[k]} 0 0 0\n')
+        dp = DensityProfile(self.base + '.psf')
+        centers, profiles, errors = dp.trajectory(dcds, xst=xst, dz=1.0, nblocks=4)
+        self.assertEqual(len(centers), 100)
+        # each frame's density integrates to the species mass over its own cell, 10 x 10 x c_z
+        recovered = profiles['water'].sum() * 100.0 * 100.0 / len(centers) / AMU_PER_A3_TO_G_PER_CC
+        self.assertAlmostEqual(recovered, 32.0 * np.mean(100.0 / c_z[1:]), places=4)
+        self.assertTrue(np.all(errors['water'] >= 0) and errors['water'].max() > 0)
+        _, p2, e2 = dp.trajectory(dcds, xst=xst, dz=1.0, nblocks=4, nworkers=2)
+        for label in profiles:
+            np.testing.assert_allclose(p2[label], profiles[label])
+            np.testing.assert_allclose(e2[label], errors[label])
+        _, p3, _ = dp.trajectory(dcds, xst=xst, dz=1.0, stride=2)
+        recovered = p3['water'].sum() * 100.0 * 100.0 / len(centers) / AMU_PER_A3_TO_G_PER_CC
+        self.assertAlmostEqual(recovered, 32.0 * np.mean(100.0 / c_z[[1, 3, 5, 7]]), places=4)
+
+    def test_one_xst_per_dcd_pairs_by_position(self):
+        # two runs that each restart the step count: merged by timestep, their XST lines would
+        # collide, so each DCD takes its cells from its own XST
+        xyz = self._frames(4)
+        dcds = [os.path.join(self.tmp, f'run{k}.dcd') for k in (1, 2)]
+        xsts = [os.path.join(self.tmp, f'run{k}.xst') for k in (1, 2)]
+        for k, c_z in enumerate((96.0, 104.0)):
+            write_dcd(dcds[k], xyz[2 * k:2 * k + 2], istart=100, nsavc=100)
+            with open(xsts[k], 'w') as f:
+                for step in (0, 100, 200):
+                    f.write(f'{step} 10 0 0 0 10 0 0 0 {c_z} 0 0 0\n')
+        dp = DensityProfile(self.base + '.psf')
+        centers, profiles, _ = dp.trajectory(dcds, xst=xsts, dz=1.0)
+        recovered = profiles['water'].sum() * 100.0 * 100.0 / len(centers) / AMU_PER_A3_TO_G_PER_CC
+        self.assertAlmostEqual(recovered, 32.0 * np.mean(100.0 / np.array([96.0, 104.0])), places=4)
+        # a single XST for both DCDs is looked up by timestep: every frame gets its 96 A cell
+        centers, merged, _ = dp.trajectory(dcds, xst=xsts[:1], dz=1.0)
+        recovered = merged['water'].sum() * 100.0 * 96.0 / len(centers) / AMU_PER_A3_TO_G_PER_CC
+        self.assertAlmostEqual(recovered, 32.0, places=4)
+
+    def test_needs_cells(self):
+        dcd = os.path.join(self.tmp, 'nocell.dcd')
+        write_dcd(dcd, self._frames(2))
+        dp = DensityProfile(self.base + '.psf')
+        with self.assertRaises(ValueError):
+            dp.trajectory(dcd)
+        with self.assertRaises(ValueError):
+            dp.compute()
+
+
 if __name__ == '__main__':
     unittest.main()
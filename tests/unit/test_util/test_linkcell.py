@@ -1,4 +1,5 @@
-from pestifer.util.linkcell import Linkcell
+from pestifer.util.linkcell import GridHash, Linkcell
+from scipy.spatial import cKDTree
 from pestifer.util.util import cell_from_xsc
 import unittest
 import numpy as np
@@ -53,3 +54,27 @@ class TestLinkcell(unittest.TestCase):
     #     self.assertEqual(np.round(LC.avg_cell_pop,0),109.0)
     #     self.assertTrue('linkcell_idx' in coorddf)
 
+
+class TestGridHash(unittest.TestCase):
+    def _reference(self, stored, queries, cutoff):
+        d = cKDTree(stored).query(queries)[0]
+        return np.where(d < cutoff, d, np.inf)
+
+    def test_nearest_matches_a_kdtree(self):
+        rng = np.random.default_rng(0)
+        stored = rng.uniform(0, 30, (3000, 3))
+        queries = rng.uniform(-6, 36, (2000, 3))     # some outside the grid's corners
+        G = GridHash(np.array([[0, 0, 0], [30, 20, 10]]), 1.5, cellsize=3.0, capacity=1)
+        for chunk in np.array_split(stored, 7):      # inserted in batches, growing the slots
+            G.insert(chunk)
+        self.assertEqual(G.npoints, 3000)
+        np.testing.assert_allclose(G.nearest(queries), self._reference(stored, queries, 1.5))
+
+    def test_nearest_keeps_the_query_shape(self):
+        G = GridHash(np.array([[0, 0, 0], [10, 10, 10]]), 1.0)
+        self.assertTrue(np.all(np.isinf(G.nearest(np.zeros((4, 5, 3))))))
+        G.insert(np.array([[5.0, 5.0, 5.0]]))
+        d = G.nearest(np.array([[[5.0, 5.0, 5.5], [9.0, 9.0, 9.0]]]))
+        self.assertEqual(d.shape, (1, 2))
+        self.assertAlmostEqual(d[0, 0], 0.5)
+        self.assertTrue(np.isinf(d[0, 1]))
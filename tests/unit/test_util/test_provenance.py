@@ -4,6 +4,10 @@
 These do not need the external toolchain: the probes are exercised against captured output.
 """
 
+import os
+import shutil
+import tempfile
+import time
 import unittest
 from types import SimpleNamespace
 from unittest import mock
@@ -125,6 +129,71 @@ class TestExecutableSelection(unittest.TestCase):
         self.assertEqual(got['vmd']['path'], 'unknown')
 
 
+class TestVersionCache(unittest.TestCase):
+    """A build should normally pay a few ``stat`` calls for provenance, not a VMD startup."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = os.path.join(self.tmp, 'tool-versions.json')
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _binary(self, name):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\n')
+        os.chmod(path, 0o755)
+        return path
+
+    def _prober(self, version='1.0', delay=0.0):
+        def probe(cmd):
+            self.calls.append(cmd)
+            time.sleep(delay)
+            return version
+        return probe
+
+    def test_unchanged_binary_is_probed_once(self):
+        vmd, probe = self._binary('vmd'), self._prober()
+        for _ in range(3):
+            self.assertEqual(provenance.cached_version(probe, vmd, cache_file=self.cache), '1.0')
+        self.assertEqual(self.calls, [vmd])
+
+    def test_changed_binary_is_probed_again(self):
+        vmd = self._binary('vmd')
+        provenance.cached_version(self._prober('1.0'), vmd, cache_file=self.cache)
+        st = os.stat(vmd)
+        os.utime(vmd, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(provenance.cached_version(self._prober('2.0'), vmd, cache_file=self.cache), '2.0')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_unknown_is_not_remembered(self):
+        vmd = self._binary('vmd')
+        provenance.cached_version(self._prober('unknown'), vmd, cache_file=self.cache)
+        self.assertEqual(provenance.cached_version(self._prober('1.0'), vmd, cache_file=self.cache), '1.0')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_misses_are_probed_concurrently(self):
+        probes = [(self._prober(delay=0.4), self._binary(n)) for n in ('vmd', 'namd3', 'catdcd')]
+        t0 = time.monotonic()
+        self.assertEqual(provenance.cached_versions(probes, cache_file=self.cache), ['1.0'] * 3)
+        self.assertLess(time.monotonic() - t0, 1.0)
+
+    def test_one_binary_under_two_names_is_probed_once(self):
+        # namd3 and namd3gpu are commonly the same binary
+        namd, probe = self._binary('namd3'), self._prober()
+        self.assertEqual(provenance.cached_versions([(probe, namd), (probe, namd)], cache_file=self.cache),
+                         ['1.0', '1.0'])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache, 'w') as f:
+            f.write('{not json')
+        self.assertEqual(provenance.cached_version(self._prober(), self._binary('vmd'),
+                                                   cache_file=self.cache), '1.0')
+
+
 class TestLogEnvironment(unittest.TestCase):
 
     def test_emits_a_greppable_block(self):
@@ -0,0 +1,46 @@
+# Author: Cameron F. Abrams, <cfa22@drexel.edu>
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pestifer.psfutil.loop_ccd import PDB_ATOM_DTYPE
+from pestifer.util.shared_array import SharedArray
+
+
+def _total(shared):
+    return float(np.asarray(shared)['xyz'].sum()), shared.name
+
+
+class TestSharedArray(unittest.TestCase):
+
+    def setUp(self):
+        self.atoms = np.zeros(50, dtype=PDB_ATOM_DTYPE)
+        self.atoms['serial'] = np.arange(1, 51)
+        self.atoms['name'] = 'CA'
+        self.atoms['xyz'] = np.arange(150, dtype=float).reshape(50, 3)
+
+    def test_pickles_by_name_not_by_value(self):
+        with SharedArray(self.atoms) as shared:
+            self.assertLess(len(pickle.dumps(shared)), self.atoms.nbytes)
+            np.testing.assert_array_equal(np.asarray(shared), self.atoms)
+
+    def test_workers_read_the_shared_block(self):
+        with SharedArray(self.atoms) as shared:
+            with ProcessPoolExecutor(max_workers=2) as ex:
+                results = list(ex.map(_total, [shared] * 3))
+        self.assertEqual({r[0] for r in results}, {float(self.atoms['xyz'].sum())})
+        self.assertEqual({r[1] for r in results}, {shared.name})
+
+    def test_unlink_destroys_the_block(self):
+        from multiprocessing import shared_memory
+        shared = SharedArray(self.atoms)
+        name = shared.name
+        shared.unlink()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
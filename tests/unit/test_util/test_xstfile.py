@@ -0,0 +1,117 @@
+"""Unit tests for pestifer.util.xstfile."""
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from pestifer.util import xstfile
+from pestifer.util.xstfile import XSTFile, forget_xst, read_xst
+
+_HEADER = ('# NAMD extended system trajectory file\n'
+           '#$LABELS step a_x a_y a_z b_x b_y b_z c_x c_y c_z o_x o_y o_z\n')
+
+
+def _line(step, cell):
+    return ' '.join([str(step)] + [f'{v:.6f}' for v in np.ravel(cell)] + ['0', '0', '0']) + '\n'
+
+
+class TestXSTFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'run.xst')
+        rng = np.random.default_rng(5)
+        self.cells = np.diag([40.0, 42.0, 60.0]) + rng.uniform(-2, 2, (6, 3, 3))
+
+    def tearDown(self):
+        forget_xst()
+        self.tmp.cleanup()
+
+    def _write(self, rows, mode='w', header=True):
+        with open(self.path, mode) as f:
+            if header:
+                f.write(_HEADER)
+            for k in rows:
+                f.write(_line(100 * k, self.cells[k]))
+
+    def test_geometry_matches_vector_algebra(self):
+        self._write(range(6))
+        xst = XSTFile(self.path).read()
+        np.testing.assert_array_equal(xst.steps, 100 * np.arange(6))
+        np.testing.assert_allclose(xst.cell_vectors(), self.cells, atol=1e-6)
+        a, b, c = self.cells[:, 0], self.cells[:, 1], self.cells[:, 2]
+        np.testing.assert_allclose(xst.volumes(), [abs(np.dot(a[k], np.cross(b[k], c[k]))) for k in range(6)],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(xst.lateral_areas(), np.linalg.norm(np.cross(a, b), axis=1), rtol=1e-6)
+        np.testing.assert_allclose(xst.lengths(), np.linalg.norm(self.cells, axis=2), rtol=1e-6)
+
+    def test_reads_only_appended_lines(self):
+        self._write(range(3))
+        xst = XSTFile(self.path).read()
+        offset = xst.offset
+        self.assertEqual(offset, os.path.getsize(self.path))
+        self._write(range(3, 5), mode='a', header=False)
+        xst.read()
+        self.assertEqual(len(xst), 5)
+        self.assertGreater(xst.offset, offset)
+        np.testing.assert_array_equal(xst.steps, 100 * np.arange(5))
+
+    def test_unterminated_last_line(self):
+        self._write(range(2))
+        with open(self.path, 'a') as f:
+            f.write(_line(200, self.cells[2]).rstrip('\n'))
+        xst = XSTFile(self.path).read()
+        self.assertEqual(len(xst), 3)
+        with open(self.path, 'a') as f:
+            f.write('\n300 41.0')     # a line NAMD is still writing
+        xst.read()
+        self.assertEqual(len(xst), 3)
+        np.testing.assert_array_equal(xst.steps, [0, 100, 200])
+
+    def test_replaced_file_is_read_afresh(self):
+        self._write(range(4))
+        xst = read_xst(self.path)
+        self.assertEqual(len(xst), 4)
+        os.rename(self.path, self.path + '.BAK')
+        self._write(range(4, 6))
+        self.assertIs(read_xst(self.path), xst)
+        np.testing.assert_array_equal(xst.steps, [400, 500])
+
+    def test_cache_is_bounded_and_forgettable(self):
+        self._write(range(2))
+        first = read_xst(self.path)
+        self.assertIs(read_xst(self.path), first)
+        forget_xst(self.path)
+        self.assertIsNot(read_xst(self.path), first)
+        with mock.patch.object(xstfile, '_MAX_CACHED', 2):
+            others = [os.path.join(self.tmp.name, f'other{k}.xst') for k in range(2)]
+            for other in others:
+                with open(other, 'w') as f:
+                    f.write(_line(0, self.cells[0]))
+                read_xst(other)
+            self.assertEqual(list(xstfile._xst_files), others)
+        forget_xst()
+        self.assertEqual(len(xstfile._xst_files), 0)
+
+    def test_concurrent_reads_parse_each_line_once(self):
+        self._write(range(6))
+        xst = XSTFile(self.path)
+        threads = [threading.Thread(target=xst.read) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        np.testing.assert_array_equal(xst.steps, 100 * np.arange(6))
+
+    def test_empty(self):
+        self._write([])
+        xst = XSTFile(self.path).read()
+        self.assertEqual(len(xst), 0)
+        self.assertEqual(xst.volumes().size, 0)
+        self.assertEqual(xst.lateral_areas().size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()